@@ -1,12 +1,12 @@
 """Action registry with fingerprinting for drift detection."""
 from __future__ import annotations
 
-import hashlib
-import json
 import re
 from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, ConfigDict, field_validator
 
+from app.canonical_json import canonical_sha256
+
 
 # Semver regex: X.Y.Z where X, Y, Z are integers
 SEMVER_REGEX = re.compile(r'^\d+\.\d+\.\d+$')
@@ -126,11 +126,4 @@ def compute_registry_fingerprint(registry: ActionRegistry) -> str:
     Used to detect unintended drift (actions added/removed/modified).
     Fingerprint is deterministic across same registry.
     """
-    canonical = json.dumps(
-        registry.model_dump(),
-        sort_keys=True,
-        separators=(",", ":"),
-        ensure_ascii=False,
-    )
-    blob = canonical.encode("utf-8")
-    return hashlib.sha256(blob).hexdigest()
+    return canonical_sha256(registry.model_dump())
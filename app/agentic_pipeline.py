@@ -13,14 +13,15 @@ This pipeline orchestrates:
 Supports legacy actions for retrocompatibility while enforcing AG-03 for new actions.
 """
 
+import asyncio
 import hashlib
 import json
 import logging
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, Generator, List, NamedTuple, Optional, Tuple, Union
 
 from packaging import version as pkg_version
 
@@ -29,9 +30,13 @@ from app.action_contracts import ActionRequest, ActionResult
 from app.action_registry import get_action_registry
 from app.action_router import route_action as route_action_deterministic
 from app.audit_log import AuditLogError
-from app.digests import sha256_json_or_none
+from app.canonical_json import canonical_scope
+from app.digests import StreamingJSONDigest, sha256_json_or_none
+from app.executors.base import execution_reasons, is_async_executor, is_streaming_executor
 from app.executors.registry import get_executor
 from app.executors.registry import UnknownExecutorError
+from app.executor_pool import PoolSaturated, get_executor_pool
+from app.payload_limits import LimitExceeded, PayloadReport, inspect_payload
 from app.tracing import observed_span
 
 
@@ -158,14 +163,206 @@ def run_agentic_action(
     trace_id: str,
     executor_id: str = "unknown",
     executor_version: str = "unknown",
+    payload_report: Optional[PayloadReport] = None,
 ) -> Tuple[ActionResult, Optional[Any]]:
     """
     Run action through governance pipeline (F8.6.1 observed).
     
+    Args:
+        payload_report: PayloadInspector report of `payload` already computed
+            for this request (see get_request_payload_report); inspected here if None.
+    
     Returns:
         (ActionResult, output) where output is None on BLOCKED/FAILED
     """
-    
+    # Canonical JSON cache for the whole run (shares the request scope when one is active)
+    with canonical_scope():
+        flow = _agentic_action_flow(
+            action, payload, trace_id, executor_id, executor_version, payload_report
+        )
+        try:
+            invocation = next(flow)
+            while True:
+                try:
+                    with execution_reasons(invocation.reasons):
+                        output = get_executor_pool().run(
+                            invocation.lane_id,
+                            invocation.executor.limits,
+                            invocation.executor.execute,
+                            invocation.request,
+                            timeout=invocation.timeout_s,
+                        )
+                except Exception as exc:
+                    invocation = flow.throw(exc)
+                else:
+                    invocation = flow.send(output)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            flow.close()
+
+
+async def run_agentic_action_async(
+    action: str,
+    payload: Dict[str, Any],
+    trace_id: str,
+    executor_id: str = "unknown",
+    executor_version: str = "unknown",
+    payload_report: Optional[PayloadReport] = None,
+) -> Tuple[ActionResult, Optional[Any]]:
+    """
+    Async variant of run_agentic_action (same governance steps, same results).
+
+    Only the executor call is awaited: AsyncExecutor.aexecute runs on the event
+    loop under asyncio.wait_for; sync executors are offloaded to the shared
+    executor pool. The event loop is never blocked by the executor.
+    """
+    with canonical_scope():
+        flow = _agentic_action_flow(
+            action, payload, trace_id, executor_id, executor_version, payload_report
+        )
+        try:
+            invocation = next(flow)
+            while True:
+                try:
+                    with execution_reasons(invocation.reasons):
+                        output = await _invoke_async(invocation)
+                except Exception as exc:
+                    invocation = flow.throw(exc)
+                else:
+                    invocation = flow.send(output)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            flow.close()
+
+
+async def _invoke_async(invocation: "_Invocation") -> Any:
+    pool = get_executor_pool()
+    executor = invocation.executor
+    if is_async_executor(executor):
+        return await pool.arun(
+            invocation.lane_id, executor.limits, executor.aexecute, invocation.request,
+            timeout=invocation.timeout_s,
+        )
+    return await pool.arun_sync(
+        invocation.lane_id, executor.limits, executor.execute, invocation.request,
+        timeout=invocation.timeout_s,
+    )
+
+
+async def run_agentic_action_stream(
+    action: str,
+    payload: Dict[str, Any],
+    trace_id: str,
+    executor_id: str = "unknown",
+    executor_version: str = "unknown",
+    payload_report: Optional[PayloadReport] = None,
+) -> AsyncIterator[Union[str, ActionResult]]:
+    """
+    Streaming variant of run_agentic_action_async (/process/stream).
+
+    Yields the output text chunks of a StreamingExecutor as they arrive, then
+    the ActionResult (always last). Same governance steps and audit records:
+    output_digest is computed incrementally (StreamingJSONDigest), so the
+    SUCCESS record is written once the stream completes. The executor timeout
+    applies per chunk (idle time); the executor keeps its async lane slot for
+    the whole stream. Non-streaming executors run as in the async pipeline
+    (no chunks, result only: raw output never returned).
+
+    A stream closed by the consumer (client disconnect) is audited as
+    FAILED / STREAM_ABORTED.
+    """
+    flow = _agentic_action_flow(
+        action, payload, trace_id, executor_id, executor_version, payload_report
+    )
+    invocation = None
+    try:
+        with canonical_scope():
+            invocation = next(flow)
+        while True:
+            executor = invocation.executor
+            try:
+                if is_streaming_executor(executor):
+                    digest = StreamingJSONDigest(getattr(executor, "stream_field", "text"))
+                    async with get_executor_pool().aslot(
+                        invocation.lane_id, executor.limits, timeout=invocation.timeout_s
+                    ):
+                        stream = executor.astream(invocation.request)
+                        try:
+                            while True:
+                                # Not held across yields: the consumer's context stays clean
+                                with execution_reasons(invocation.reasons):
+                                    chunk = await asyncio.wait_for(anext(stream, None), invocation.timeout_s)
+                                if chunk is None:
+                                    break
+                                if chunk.fields:
+                                    digest.add_fields(chunk.fields)
+                                if chunk.text:
+                                    digest.update(chunk.text)
+                                    yield chunk.text
+                        finally:
+                            await stream.aclose()
+                    output = StreamedOutput(digest.digest())
+                else:
+                    with execution_reasons(invocation.reasons):
+                        output = await _invoke_async(invocation)
+            except Exception as exc:
+                with canonical_scope():
+                    invocation = flow.throw(exc)
+            else:
+                with canonical_scope():
+                    invocation = flow.send(output)
+    except StopIteration as stop:
+        invocation = None
+        result, _ = stop.value
+        yield result
+    except (GeneratorExit, asyncio.CancelledError):
+        if invocation is not None:
+            # Consumer went away mid-stream: audit the attempt's outcome
+            try:
+                flow.throw(StreamAborted())
+            except StopIteration:
+                pass
+        raise
+    finally:
+        flow.close()
+
+
+class StreamAborted(Exception):
+    """Stream consumer closed before the executor output was complete."""
+
+
+class StreamedOutput(NamedTuple):
+    """Executor output delivered as a stream: only its digest is kept."""
+
+    output_digest: Optional[str]
+
+
+class _Invocation(NamedTuple):
+    """Executor call requested by the pipeline flow (run by the sync or async driver)."""
+
+    lane_id: str
+    executor: Any
+    request: ActionRequest
+    timeout_s: float
+    # Informational reason codes added by the executor (add_execution_reason)
+    reasons: List[str]
+
+
+def _agentic_action_flow(
+    action: str,
+    payload: Dict[str, Any],
+    trace_id: str,
+    executor_id: str,
+    executor_version: str,
+    payload_report: Optional[PayloadReport],
+) -> Generator["_Invocation", Any, Tuple[ActionResult, Optional[Any]]]:
+    """Pipeline steps 1-7 as a generator.
+
+    Yields the executor invocation (step 6) and receives its output, or the
+    exception it raised; returns (ActionResult, output).
+    """
     # F8.6.1: Create root span for entire pipeline execution (fail-closed, wrapper-only)
     with observed_span(
         "agentic_action",
@@ -196,7 +393,9 @@ def run_agentic_action(
         
         # Step 2: Compute input digest for audit (returns None if not JSON-serializable)
         with observed_span("compute_digests"):
-            input_digest = _compute_input_digest(payload)
+            if payload_report is None:
+                payload_report = inspect_payload(payload)
+            input_digest = payload_report.sha256
             output_digest = None
             output = None
         
@@ -422,9 +621,7 @@ def run_agentic_action(
         # Step 5: Enforce payload limits
         with observed_span("enforce_limits"):
             try:
-                from app.payload_limits import check_payload_limits, LimitExceeded
-                check_payload_limits(
-                    payload,
+                payload_report.check_limits(
                     max_bytes=executor.limits.max_payload_bytes,
                     max_depth_limit=executor.limits.max_depth,
                     max_list_limit=executor.limits.max_list_items,
@@ -483,10 +680,6 @@ def run_agentic_action(
             # Get executor timeout
             timeout_seconds = _get_executor_timeout()
             
-            # Create ThreadPoolExecutor explicitly (not with context manager)
-            # to avoid blocking on thread cleanup after timeout
-            pool = ThreadPoolExecutor(max_workers=1)
-            
             try:
                 # Create ActionRequest
                 action_req = ActionRequest(
@@ -495,21 +688,59 @@ def run_agentic_action(
                     trace_id=trace_id,
                 )
                 
-                # Execute with timeout
-                future = pool.submit(executor.execute, action_req)
-                output = future.result(timeout=timeout_seconds)
-                
-                # Success: clean shutdown (wait for thread to complete)
-                pool.shutdown(wait=True)
+                # Execute with timeout: driver runs it on the shared pool
+                # (sync) or awaits it (async); errors are thrown back here
+                # Lane per executor implementation (routed id may be an alias)
+                lane_id = getattr(executor, "executor_id", None)
+                execution_reason_codes: List[str] = []
+                output = yield _Invocation(
+                    lane_id=lane_id if isinstance(lane_id, str) else executor_id,
+                    executor=executor,
+                    request=action_req,
+                    timeout_s=timeout_seconds,
+                    reasons=execution_reason_codes,
+                )
                     
-            except (FuturesTimeoutError, TimeoutError):
+            except PoolSaturated:
+                # Executor lane full (saturation policy): fail-closed, never ran
+                status = "BLOCKED"
+                reason_codes = ["EXECUTOR_SATURATED"]
+                result = ActionResult(
+                    action=action,
+                    executor_id=executor_id,
+                    executor_version=executor_version,
+                    status=status,
+                    reason_codes=reason_codes,
+                    input_digest=input_digest,
+                    output_digest=output_digest,
+                    trace_id=trace_id,
+                    ts_utc=datetime.now(timezone.utc),
+                )
+                result = _safe_log_action_result(result)
+                return (result, None)
+            except StreamAborted:
+                # /process/stream consumer disconnected (partial output sent)
+                status = "FAILED"
+                reason_codes = ["STREAM_ABORTED"]
+                result = ActionResult(
+                    action=action,
+                    executor_id=executor_id,
+                    executor_version=executor_version,
+                    status=status,
+                    reason_codes=reason_codes,
+                    input_digest=input_digest,
+                    output_digest=output_digest,
+                    trace_id=trace_id,
+                    ts_utc=datetime.now(timezone.utc),
+                )
+                result = _safe_log_action_result(result)
+                return (result, None)
+            except (FuturesTimeoutError, asyncio.TimeoutError, TimeoutError):
                 # Executor exceeded timeout (fail-safe)
-                # Catches both:
-                # - FuturesTimeoutError: ThreadPoolExecutor timeout
+                # Catches (distinct classes before Python 3.11):
+                # - FuturesTimeoutError: pool wait timed out (call abandoned, see executor_pool)
+                # - asyncio.TimeoutError: async pool / stream chunk wait_for timed out
                 # - TimeoutError: Executor raises TimeoutError directly
-                # Shutdown immediately without waiting (don't block on orphan thread)
-                pool.shutdown(wait=False)
-                
                 status = "BLOCKED"
                 reason_codes = ["EXECUTOR_TIMEOUT"]
                 result = ActionResult(
@@ -527,9 +758,6 @@ def run_agentic_action(
                 return (result, None)
             except Exception as e:
                 # Any other exception during execution
-                # Shutdown pool without waiting
-                pool.shutdown(wait=False)
-                
                 logger = logging.getLogger(__name__)
                 logger.exception("Executor exception during execution")
                 
@@ -551,9 +779,14 @@ def run_agentic_action(
 
         # Step 7: Success — Compute output digest and return
         with observed_span("audit_result"):
-            output_digest = _compute_output_digest(output)
+            if isinstance(output, StreamedOutput):
+                # Streamed: running digest over the same canonical form
+                output_digest = output.output_digest
+            else:
+                output_digest = _compute_output_digest(output)
             status = "SUCCESS"
-            reason_codes = []
+            # Informational only (e.g. LLM_CACHE_HIT); never set on failures
+            reason_codes = list(execution_reason_codes)
             result = ActionResult(
                 action=action,
                 executor_id=executor_id,
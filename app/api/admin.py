@@ -1,15 +1,18 @@
 """Admin API endpoints (POST/GET /admin/*)."""
 
+import asyncio
 import os
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import text
 
-from app.db.database import get_db
-from app.db.session_repository import SessionRepository
+from app.db.async_database import get_async_db
+from app.db.session_cache import get_session_cache
+from app.db.session_repository import AsyncSessionRepository
+from app.session_backend import get_session_backend
 from app.guards.admin_guard import AdminGuard
 from app.gates.admin_rate_limit import AdminRateLimit
 from app.error_envelope import http_error_detail
@@ -159,7 +162,7 @@ class HealthResponse(BaseModel):
 async def revoke_session(
     req: RevokeSessionRequest,
     admin_key: str = Depends(require_admin_rate_limit),
-    db: Session = Depends(get_db),
+    db: Any = Depends(get_async_db),
     request: Request = None,
 ) -> RevokeSessionResponse:
     """
@@ -176,8 +179,9 @@ async def revoke_session(
     # Generate fresh trace_id (ensure it's a valid UUID)
     trace_id = str(uuid4())
     
-    repo = SessionRepository(db)
-    session = repo.get_by_id(req.session_id)
+    # Cache-aware: revocation denied here at once and fanned out to other workers
+    repo = AsyncSessionRepository(db, cache=get_session_cache())
+    session = await repo.get_by_id(req.session_id)
     
     # Not found
     if not session:
@@ -213,11 +217,15 @@ async def revoke_session(
     
     # Revoke
     try:
-        revoked_session = repo.revoke(session.session_id)
+        revoked_session = await repo.revoke(session.session_id)
         
         if not revoked_session:
             raise Exception("Revocation returned None")
         
+        # F2.3 session tiers (L1/L2) must not keep serving the session
+        # (tiered backend re-reads SQL: off the loop)
+        await asyncio.to_thread(get_session_backend().mark_revoked, revoked_session.session_id)
+        
         result = ActionResult(
             action="revoke_session",
             status="SUCCESS",
@@ -264,7 +272,7 @@ async def revoke_session(
 async def get_session(
     session_id: str,
     admin_key: str = Depends(require_admin_rate_limit),
-    db: Session = Depends(get_db),
+    db: Any = Depends(get_async_db),
     request: Request = None,
 ) -> SessionDetailResponse:
     """
@@ -274,8 +282,8 @@ async def get_session(
     
     trace_id = str(uuid4())
     
-    repo = SessionRepository(db)
-    session = repo.get_by_id(session_id)
+    repo = AsyncSessionRepository(db)
+    session = await repo.get_by_id(session_id)
     
     if not session:
         raise HTTPException(
@@ -332,7 +340,7 @@ async def audit_summary(
 @router.get("/health")
 async def admin_health(
     admin_key: str = Depends(require_admin_rate_limit),
-    db: Session = Depends(get_db),
+    db: Any = Depends(get_async_db),
     request: Request = None,
 ) -> HealthResponse:
     """
@@ -345,7 +353,7 @@ async def admin_health(
     # Check DB
     db_status = "disconnected"
     try:
-        db.execute("SELECT 1")
+        await db.execute(text("SELECT 1"))
         db_status = "connected"
     except Exception:
         db_status = "disconnected"
@@ -0,0 +1,481 @@
+"""
+Incremental audit summary aggregator (per-minute rollups + checkpoint).
+
+GET /admin/audit/summary used to re-read the audit log from the start on every
+call. The aggregator instead tails the audit sink (legacy file + segments, see
+app.audit_segments) and keeps per-minute rollups in memory:
+
+- allow/deny counts (decision_audit)
+- deny_breakdown by reason code
+- events_by_type
+
+A summary for a 1–7 day window is then a sum over the minutes in the window.
+
+Checkpoint (JSON, written atomically via a per-process temp file, since
+every worker checkpoints the same path): read cursor per source file
+(inode + byte offset + head fingerprint) plus the rollups, so a restart resumes where it left
+off instead of rescanning the log.
+
+Semantics vs. the scanning parser:
+- Window edges are minute-aligned (the first minute of the window is included whole)
+- `limit` counts events, oldest minutes first: whole minutes come from the
+  rollups, the minute where the limit falls is re-read from the log (from
+  the position of its first line) up to the limit
+- parse_errors is cumulative since the checkpoint was created
+
+Catch-up: the first poll of a fresh aggregator (no checkpoint: the whole
+retained log) runs on the background thread; until it is done (or while
+the thread is not started) AuditParser.summarize starts the thread and
+answers with the scan, so no request waits on it.
+
+Environment:
+- VERITTA_AUDIT_AGGREGATOR: "on" (default) | "off" (AuditParser scans the log)
+- VERITTA_AUDIT_AGG_CHECKPOINT: checkpoint path (default <log dir>/<stem>.summary-checkpoint.json)
+- VERITTA_AUDIT_AGG_POLL_MS: background tail period (default 1000)
+- VERITTA_AUDIT_AGG_CHECKPOINT_S: checkpoint period (default 30)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.audit_segments import AuditTailer, iter_audit_lines, parse_ts
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+# Longest window served by /admin/audit/summary (days=7) + one bucket of slack
+MAX_WINDOW_DAYS = 7
+_RETENTION_MINUTES = MAX_WINDOW_DAYS * 24 * 60 + 1
+
+
+def get_aggregator_mode() -> str:
+    """Get aggregator mode from VERITTA_AUDIT_AGGREGATOR ("on" or "off")."""
+    mode = os.environ.get("VERITTA_AUDIT_AGGREGATOR", "on").strip().lower()
+    return "off" if mode in ("off", "false", "0") else "on"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.environ.get(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def get_checkpoint_path(audit_log_path: str) -> str:
+    """Checkpoint path (VERITTA_AUDIT_AGG_CHECKPOINT or next to the audit log)."""
+    configured = os.environ.get("VERITTA_AUDIT_AGG_CHECKPOINT")
+    if configured:
+        return configured
+    directory = os.path.dirname(audit_log_path) or "."
+    stem = Path(audit_log_path).stem or "audit"
+    return os.path.join(directory, f"{stem}.summary-checkpoint.json")
+
+
+def _epoch_minute(dt: datetime) -> int:
+    return int(dt.timestamp()) // 60
+
+
+class MinuteRollup:
+    """Aggregated counters for one UTC minute."""
+
+    __slots__ = ("allow", "deny", "deny_breakdown", "events_by_type", "events", "first")
+
+    def __init__(self):
+        self.allow = 0
+        self.deny = 0
+        self.deny_breakdown: Dict[str, int] = {}
+        self.events_by_type: Dict[str, int] = {}
+        self.events = 0  # All events with a valid ts (any event_type)
+        # (file basename, byte offset) of the first line seen for this minute
+        self.first: Optional[Tuple[str, int]] = None
+
+    def matched(self, event_type: Optional[str]) -> int:
+        return self.events_by_type.get(event_type, 0) if event_type else self.events
+
+    def add(self, event: Dict[str, Any]) -> None:
+        self.events += 1
+        evt_type = event.get("event_type")
+        if not evt_type:
+            return
+        self.events_by_type[evt_type] = self.events_by_type.get(evt_type, 0) + 1
+
+        if evt_type == "decision_audit":
+            decision = event.get("decision")
+            if decision == "ALLOW":
+                self.allow += 1
+            elif decision == "DENY":
+                self.deny += 1
+                for code in event.get("reason_codes", []) or []:
+                    self.deny_breakdown[code] = self.deny_breakdown.get(code, 0) + 1
+
+    def to_list(self) -> list:
+        return [self.allow, self.deny, self.deny_breakdown, self.events_by_type, self.events,
+                list(self.first) if self.first else None]
+
+    @classmethod
+    def from_list(cls, data: list) -> "MinuteRollup":
+        r = cls()
+        r.allow, r.deny, r.deny_breakdown, r.events_by_type, r.events = data[:5]
+        # Checkpoints written before positions were kept have 5 fields
+        if len(data) > 5 and data[5]:
+            r.first = (str(data[5][0]), int(data[5][1]))
+        return r
+
+
+class AuditAggregator:
+    """
+    Tails one audit log (legacy file + segments) into per-minute rollups.
+
+    poll() is incremental and thread-safe; summarize() polls first so answers
+    include every record committed before the call. With the background
+    thread running, `ready` stays False until its catch-up poll is done.
+    """
+
+    def __init__(self, audit_log_path: str, checkpoint_path: Optional[str] = None):
+        self.audit_log_path = audit_log_path
+        self.checkpoint_path = checkpoint_path or get_checkpoint_path(audit_log_path)
+
+        self._lock = threading.Lock()
+        self._minutes: Dict[int, MinuteRollup] = {}
+        self._tailer = AuditTailer(audit_log_path)
+        self.parse_errors = 0
+        self.lines_read = 0  # Since this instance started (observability/tests)
+        self._dirty = False
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._caught_up = threading.Event()
+
+        self._load_checkpoint()
+
+    @property
+    def ready(self) -> bool:
+        """False until the background thread has caught up (callers start it and scan instead)."""
+        return self._caught_up.is_set()
+
+    # ------------------------------------------------------------------
+    # Tail
+    # ------------------------------------------------------------------
+
+    def poll(self, now: Optional[datetime] = None) -> int:
+        """
+        Consume records appended since the last poll.
+
+        Returns:
+            Number of lines consumed.
+        """
+        now = now or datetime.now(timezone.utc)
+        oldest = _epoch_minute(now) - _RETENTION_MINUTES
+        consumed = 0
+
+        with self._lock:
+            skip_before = datetime.fromtimestamp(oldest * 60, tz=timezone.utc)
+            for raw in self._tailer.read_new(skip_before=skip_before):
+                consumed += 1
+                self._ingest(raw, oldest, self._tailer.last_line)
+
+            if self._tailer.changed:
+                self._tailer.changed = False
+                self._dirty = True
+
+            for minute in [m for m in self._minutes if m < oldest]:
+                del self._minutes[minute]
+                self._dirty = True
+
+            self.lines_read += consumed
+
+        return consumed
+
+    def _ingest(self, raw: bytes, oldest: int, position: Optional[Tuple[str, int]] = None) -> None:
+        line = raw.strip()
+        if not line:
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            self.parse_errors += 1
+            return
+        if not isinstance(event, dict):
+            self.parse_errors += 1
+            return
+
+        ts_str = event.get("ts_utc")
+        if not ts_str:
+            return
+        ts = parse_ts(ts_str)
+        if ts is None:
+            self.parse_errors += 1
+            return
+
+        minute = _epoch_minute(ts)
+        if minute < oldest:
+            return
+        rollup = self._minutes.get(minute)
+        if rollup is None:
+            rollup = self._minutes[minute] = MinuteRollup()
+        if rollup.first is None:
+            rollup.first = position
+        rollup.add(event)
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def summarize(
+        self,
+        days: int = 1,
+        limit: int = 10000,
+        event_type: Optional[str] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Summary for the last `days` days (same shape as AuditParser.summarize).
+
+        Cost is O(minutes in window), independent of log size.
+        """
+        now = now or datetime.now(timezone.utc)
+        self.poll(now=now)
+
+        first = _epoch_minute(now - timedelta(days=days))
+        last = _epoch_minute(now)
+
+        allow_count = 0
+        deny_count = 0
+        deny_breakdown: Dict[str, int] = {}
+        events_by_type: Dict[str, int] = {"decision_audit": 0, "action_audit": 0}
+        events_processed = 0
+        # Minute where `limit` falls: (minute, first line position, events still allowed)
+        boundary: Optional[Tuple[int, Optional[Tuple[str, int]], int]] = None
+        rollups = []
+
+        with self._lock:
+            for minute in range(first, last + 1):
+                rollup = self._minutes.get(minute)
+                if rollup is None:
+                    continue
+                matched = rollup.matched(event_type)
+                if not matched:
+                    continue
+                if events_processed + matched > limit:
+                    boundary = (minute, rollup.first, limit - events_processed)
+                    break
+                events_processed += matched
+                rollups.append(rollup)
+
+            parse_errors = self.parse_errors
+
+        if boundary is not None:
+            # Outside the lock: a bounded read of one minute of log
+            minute, position, remaining = boundary
+            rollups.append(self._read_minute(minute, position, remaining, event_type))
+            events_processed += remaining
+
+        for rollup in rollups:
+            if event_type in (None, "decision_audit"):
+                events_by_type["decision_audit"] += rollup.events_by_type.get("decision_audit", 0)
+                allow_count += rollup.allow
+                deny_count += rollup.deny
+                for code, count in rollup.deny_breakdown.items():
+                    deny_breakdown[code] = deny_breakdown.get(code, 0) + count
+            if event_type in (None, "action_audit"):
+                events_by_type["action_audit"] += rollup.events_by_type.get("action_audit", 0)
+
+        return {
+            "window": {"days": days, "limit": limit},
+            "decisions": {"allow": allow_count, "deny": deny_count},
+            "deny_breakdown": deny_breakdown,
+            "events_by_type": events_by_type,
+            "ts_utc": now.isoformat(),
+            "events_processed": events_processed,
+            "parse_errors": parse_errors,
+        }
+
+    def _read_minute(
+        self, minute: int, position: Optional[Tuple[str, int]], count: int, event_type: Optional[str]
+    ) -> MinuteRollup:
+        """Rollup of the first `count` matching events of `minute`, in log order."""
+        partial = MinuteRollup()
+        if count <= 0:
+            return partial
+        for raw in self._lines_from(position, minute):
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                continue
+            if not isinstance(event, dict):
+                continue
+            ts = parse_ts(event.get("ts_utc")) if event.get("ts_utc") else None
+            if ts is None or _epoch_minute(ts) != minute:
+                continue
+            if event_type and event.get("event_type") != event_type:
+                continue
+            partial.add(event)
+            if partial.matched(event_type) >= count:
+                break
+        return partial
+
+    def _lines_from(self, position: Optional[Tuple[str, int]], minute: int) -> Iterator[str]:
+        """Log lines from `position` on; without it, from the minute via the segment index."""
+        if position is not None:
+            try:
+                return self._tailer.lines_from(position)
+            except FileNotFoundError:
+                pass
+        # Position unknown (old checkpoint) or file gone
+        return iter_audit_lines(self.audit_log_path, since=datetime.fromtimestamp(minute * 60, timezone.utc))
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+
+    def save_checkpoint(self) -> None:
+        """Persist cursors + rollups atomically (no-op if nothing changed)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": CHECKPOINT_VERSION,
+                "audit_log_path": os.path.abspath(self.audit_log_path),
+                "cursors": {name: list(c) for name, c in self._tailer.cursors.items()},
+                "minutes": {str(m): r.to_list() for m, r in self._minutes.items()},
+                "parse_errors": self.parse_errors,
+            }
+            self._dirty = False
+
+        directory = os.path.dirname(self.checkpoint_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # Own temp file per writer: workers checkpoint the same path concurrently
+        fd, tmp = tempfile.mkstemp(
+            dir=directory, prefix=os.path.basename(self.checkpoint_path) + ".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.checkpoint_path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _load_checkpoint(self) -> None:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("audit aggregator: ignoring unreadable checkpoint %s (%s)", self.checkpoint_path, e)
+            return
+
+        if data.get("version") != CHECKPOINT_VERSION:
+            return
+        if data.get("audit_log_path") != os.path.abspath(self.audit_log_path):
+            return
+
+        try:
+            cursors = {name: tuple(int(v) for v in c) for name, c in data.get("cursors", {}).items()}
+            if any(len(c) != 4 for c in cursors.values()):
+                raise ValueError("bad cursor")
+            self._tailer.cursors = cursors
+            self._minutes = {int(m): MinuteRollup.from_list(r) for m, r in data.get("minutes", {}).items()}
+            self.parse_errors = int(data.get("parse_errors", 0))
+        except (TypeError, ValueError, IndexError):
+            # Corrupt checkpoint: rebuild from scratch
+            self._tailer.cursors, self._minutes, self.parse_errors = {}, {}, 0
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background tail thread (idempotent, also from concurrent requests)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-aggregator", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, drain pending lines and write a final checkpoint."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        try:
+            self.poll()
+            self.save_checkpoint()
+        except OSError as e:
+            logger.warning("audit aggregator: final checkpoint failed (%s)", e)
+
+    def _run(self) -> None:
+        poll_s = _env_float("VERITTA_AUDIT_AGG_POLL_MS", 1000.0) / 1000.0
+        checkpoint_s = _env_float("VERITTA_AUDIT_AGG_CHECKPOINT_S", 30.0)
+        last_checkpoint = time.monotonic()
+
+        # Catch-up (whole retained log without a checkpoint) here, not in a request
+        try:
+            self.poll()
+            self._caught_up.set()
+        except Exception as e:
+            logger.warning("audit aggregator: catch-up failed, retrying (%s)", e)
+
+        while not self._stop.wait(poll_s):
+            try:
+                self.poll()
+                self._caught_up.set()
+                if time.monotonic() - last_checkpoint >= checkpoint_s:
+                    self.save_checkpoint()
+                    last_checkpoint = time.monotonic()
+            except Exception as e:
+                # Summary is observability only: never crash the thread
+                logger.warning("audit aggregator: poll failed (%s)", e)
+
+
+# Global aggregator (one per audit log path)
+_aggregator: Optional[AuditAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_audit_aggregator(audit_log_path: Optional[str] = None) -> AuditAggregator:
+    """Get (or create) the aggregator for the current audit log path."""
+    global _aggregator
+    path = audit_log_path or os.environ.get("VERITTA_AUDIT_LOG_PATH", "./audit.log")
+    with _aggregator_lock:
+        if _aggregator is None or _aggregator.audit_log_path != path:
+            previous, _aggregator = _aggregator, AuditAggregator(path)
+            if previous is not None and previous._thread is not None:
+                previous.stop()
+                _aggregator.start()
+        return _aggregator
+
+
+def start_audit_aggregator() -> Optional[AuditAggregator]:
+    """Start background aggregation (FastAPI lifespan); None when disabled."""
+    if get_aggregator_mode() != "on":
+        return None
+    aggregator = get_audit_aggregator()
+    aggregator.start()
+    return aggregator
+
+
+def stop_audit_aggregator() -> None:
+    """Stop background aggregation and checkpoint (FastAPI lifespan shutdown)."""
+    global _aggregator
+    with _aggregator_lock:
+        aggregator, _aggregator = _aggregator, None
+    if aggregator is not None:
+        aggregator.stop()
@@ -0,0 +1,528 @@
+"""
+Segmented audit log (size/time rotation + per-segment sparse index).
+
+Layout (next to VERITTA_AUDIT_LOG_PATH, e.g. ./audit.log):
+- ./audit-YYYYMMDDHH-N.jsonl        rolling segments (UTC hour of write, sequence N)
+- ./audit-YYYYMMDDHH-N.jsonl.idx    sidecar index for closed segments
+
+Rotation (writer side, VERITTA_AUDIT_ROTATION=segments):
+- New segment at every UTC hour boundary
+- New segment when the active one would exceed VERITTA_AUDIT_SEGMENT_MAX_BYTES
+
+Sidecar index (JSON, written atomically when a segment is closed):
+- min_ts_utc / max_ts_utc of the records in the segment
+- event_types: count per event_type
+- offsets: [line_no, byte_offset, max_ts_before] every K lines
+  (max_ts_before = newest ts seen before that offset, so a reader can seek
+  past every line older than a cutoff even if writes were slightly out of order)
+
+Readers (AuditParser, OrphanReconciler) use iter_audit_lines(), which reads the
+legacy single file (if present) and then all segments in order, skipping whole
+segments (and index-guided prefixes) older than `since`. Long-running readers
+(summary aggregator, reconcile_cli --follow) use AuditTailer, which resumes from
+a per-file cursor.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_INDEX_EVERY = 1000
+
+
+def get_rotation_mode() -> str:
+    """Get rotation mode from VERITTA_AUDIT_ROTATION ("none" or "segments")."""
+    mode = os.environ.get("VERITTA_AUDIT_ROTATION", "none").strip().lower()
+    return "segments" if mode == "segments" else "none"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.environ.get(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def get_segment_max_bytes() -> int:
+    """Max bytes per segment (VERITTA_AUDIT_SEGMENT_MAX_BYTES, default 64 MiB)."""
+    return _env_int("VERITTA_AUDIT_SEGMENT_MAX_BYTES", DEFAULT_SEGMENT_MAX_BYTES)
+
+
+def get_index_every() -> int:
+    """Sparse index density in lines (VERITTA_AUDIT_SEGMENT_INDEX_EVERY, default 1000)."""
+    return _env_int("VERITTA_AUDIT_SEGMENT_INDEX_EVERY", DEFAULT_INDEX_EVERY)
+
+
+def parse_ts(ts_str) -> Optional[datetime]:
+    """Parse ISO 8601 timestamp (Z or offset) to aware UTC datetime; None on failure."""
+    if not ts_str or not isinstance(ts_str, str):
+        return None
+    s = ts_str.strip()
+    if s.endswith("Z"):
+        s = s[:-1] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+# ============================================================================
+# Naming
+# ============================================================================
+
+def _segment_parts(base_path: str) -> Tuple[str, str]:
+    """Return (directory, stem) for a base audit path ("./audit.log" -> (".", "audit"))."""
+    directory = os.path.dirname(base_path) or "."
+    stem = Path(base_path).stem or "audit"
+    return directory, stem
+
+
+def _segment_regex(stem: str) -> "re.Pattern[str]":
+    return re.compile(r"^" + re.escape(stem) + r"-(\d{10})-(\d+)" + re.escape(SEGMENT_SUFFIX) + r"$")
+
+
+def segment_path(base_path: str, hour: str, seq: int) -> str:
+    """Path of segment `seq` for UTC hour `hour` (YYYYMMDDHH)."""
+    directory, stem = _segment_parts(base_path)
+    return os.path.join(directory, f"{stem}-{hour}-{seq}{SEGMENT_SUFFIX}")
+
+
+def index_path(seg_path: str) -> str:
+    """Sidecar index path for a segment."""
+    return seg_path + INDEX_SUFFIX
+
+
+def list_segments(base_path: str) -> List[Tuple[str, int, str]]:
+    """
+    List segments of base_path in write order.
+
+    Returns:
+        List of (hour, seq, path) sorted by (hour, seq).
+    """
+    directory, stem = _segment_parts(base_path)
+    pattern = _segment_regex(stem)
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+
+    found = []
+    for name in names:
+        m = pattern.match(name)
+        if m:
+            found.append((m.group(1), int(m.group(2)), os.path.join(directory, name)))
+    found.sort(key=lambda x: (x[0], x[1]))
+    return found
+
+
+def is_segment_path(path: str) -> bool:
+    """True if path looks like an audit segment (any stem)."""
+    return re.match(r"^.+-\d{10}-\d+" + re.escape(SEGMENT_SUFFIX) + r"$", os.path.basename(path)) is not None
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+def build_segment_index(seg_path: str, every: Optional[int] = None) -> Dict:
+    """
+    Scan a closed segment once and build its sparse index.
+
+    Args:
+        seg_path: segment path
+        every: checkpoint density in lines (default from env)
+
+    Returns:
+        Index dict (see module docstring)
+    """
+    every = every or get_index_every()
+    offsets: List[list] = []
+    event_types: Dict[str, int] = {}
+    min_ts: Optional[datetime] = None
+    max_ts: Optional[datetime] = None
+    lines = 0
+    offset = 0
+
+    with open(seg_path, "rb") as f:
+        for raw in f:
+            if lines % every == 0:
+                offsets.append([lines, offset, max_ts.isoformat() if max_ts else None])
+            lines += 1
+            offset += len(raw)
+
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                continue
+            if not isinstance(event, dict):
+                continue
+
+            evt_type = event.get("event_type")
+            if evt_type:
+                event_types[evt_type] = event_types.get(evt_type, 0) + 1
+
+            ts = parse_ts(event.get("ts_utc"))
+            if ts is not None:
+                if min_ts is None or ts < min_ts:
+                    min_ts = ts
+                if max_ts is None or ts > max_ts:
+                    max_ts = ts
+
+    return {
+        "version": INDEX_VERSION,
+        "segment": os.path.basename(seg_path),
+        "lines": lines,
+        "bytes": offset,
+        "min_ts_utc": min_ts.isoformat() if min_ts else None,
+        "max_ts_utc": max_ts.isoformat() if max_ts else None,
+        "event_types": event_types,
+        "every": every,
+        "offsets": offsets,
+    }
+
+
+def write_segment_index(seg_path: str, every: Optional[int] = None) -> Dict:
+    """Build and atomically persist the sidecar index of a closed segment."""
+    index = build_segment_index(seg_path, every=every)
+    target = index_path(seg_path)
+    tmp = target + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp, target)
+    return index
+
+
+def load_segment_index(seg_path: str) -> Optional[Dict]:
+    """
+    Load sidecar index; None if missing, unreadable or stale (segment grew since).
+    """
+    try:
+        with open(index_path(seg_path), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != INDEX_VERSION:
+            return None
+        if os.path.getsize(seg_path) != index.get("bytes"):
+            return None
+        return index
+    except (OSError, ValueError):
+        return None
+
+
+def seal_segment(seg_path: str) -> None:
+    """Write the index of a just-closed segment (best effort; readers fall back to scanning)."""
+    if not is_segment_path(seg_path) or not os.path.exists(seg_path):
+        return
+    try:
+        write_segment_index(seg_path)
+    except OSError:
+        pass
+
+
+def seal_segments_async(seg_paths: List[str]) -> None:
+    """Seal segments off the write path (index build scans each whole segment)."""
+    seg_paths = [p for p in seg_paths if is_segment_path(p)]
+    if not seg_paths:
+        return
+
+    def _seal_all():
+        for p in seg_paths:
+            seal_segment(p)
+
+    threading.Thread(target=_seal_all, name="audit-seal", daemon=True).start()
+
+
+# ============================================================================
+# Writer-side rotation
+# ============================================================================
+
+class SegmentManager:
+    """
+    Tracks the active segment and decides rotation (size or UTC hour).
+
+    `lock` must be held across reserve() + handing the line to the writer so that
+    records reach the writer in reservation order (a closed segment is never
+    written again by this process).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._base_path: Optional[str] = None
+        self._hour: Optional[str] = None
+        self._seq = 0
+        self._size = 0
+        self._path: Optional[str] = None
+
+    def reserve(self, base_path: str, nbytes: int, now: Optional[datetime] = None) -> Tuple[str, Optional[str]]:
+        """
+        Account nbytes against the active segment, rotating if needed.
+
+        Returns:
+            (segment_path_to_write, closed_segment_path_or_None)
+        """
+        now = now or datetime.now(timezone.utc)
+        hour = now.strftime("%Y%m%d%H")
+        max_bytes = get_segment_max_bytes()
+        closed = None
+
+        if self._path is None or base_path != self._base_path:
+            closed = self._path
+            self._open_for(base_path, hour, max_bytes)
+        elif hour != self._hour:
+            closed = self._path
+            self._open_for(base_path, hour, max_bytes)
+        elif self._size > 0 and self._size + nbytes > max_bytes:
+            closed = self._path
+            self._seq += 1
+            self._size = 0
+            self._path = segment_path(base_path, hour, self._seq)
+
+        self._size += nbytes
+        return self._path, closed
+
+    def _open_for(self, base_path: str, hour: str, max_bytes: int) -> None:
+        # Resume the newest segment of this hour if it still has room (restart)
+        existing = [s for s in list_segments(base_path) if s[0] == hour]
+        seq, size = 0, 0
+        if existing:
+            seq = existing[-1][1]
+            try:
+                size = os.path.getsize(existing[-1][2])
+            except OSError:
+                size = 0
+            if size >= max_bytes:
+                seq, size = seq + 1, 0
+
+        # Segments closed by a previous process (crash/restart) may lack an index
+        seal_segments_async([
+            p for h, n, p in list_segments(base_path)
+            if (h, n) < (hour, seq) and not os.path.exists(index_path(p))
+        ])
+
+        self._base_path = base_path
+        self._hour = hour
+        self._seq = seq
+        self._size = size
+        self._path = segment_path(base_path, hour, seq)
+
+
+_manager = SegmentManager()
+
+
+def get_segment_manager() -> SegmentManager:
+    """Get process-wide segment manager."""
+    return _manager
+
+
+# ============================================================================
+# Reader side
+# ============================================================================
+
+def _seek_offset(index: Dict, since: datetime) -> int:
+    """Largest checkpoint offset whose preceding lines are all older than since."""
+    best = 0
+    for _line_no, offset, max_ts_before in index.get("offsets", []):
+        ts = parse_ts(max_ts_before)
+        if ts is None or ts < since:
+            best = offset
+        else:
+            break
+    return best
+
+
+def _iter_file(path: str, start: int = 0) -> Iterator[str]:
+    # Binary mode: index offsets are byte offsets
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start)
+        for raw in f:
+            yield raw.decode("utf-8", errors="replace")
+
+
+def has_audit_data(base_path: str) -> bool:
+    """True if the legacy file or any segment exists for base_path."""
+    return os.path.exists(base_path) or bool(list_segments(base_path))
+
+
+def audit_sources(base_path: str, since: Optional[datetime] = None) -> List[Tuple[str, int]]:
+    """
+    Files to read for base_path, in read order, with their start byte offset.
+
+    Same selection as iter_audit_lines(): legacy file first, then segments;
+    with `since`, indexed segments entirely older than it are dropped and the
+    others start at the last checkpoint preceding the cutoff.
+
+    Returns:
+        List of (path, start_offset)
+    """
+    sources: List[Tuple[str, int]] = []
+    if os.path.exists(base_path):
+        sources.append((base_path, 0))
+
+    for _hour, _seq, seg in list_segments(base_path):
+        start = 0
+        if since is not None:
+            index = load_segment_index(seg)
+            if index is not None:
+                max_ts = parse_ts(index.get("max_ts_utc"))
+                if max_ts is not None and max_ts < since:
+                    continue
+                start = _seek_offset(index, since)
+        sources.append((seg, start))
+    return sources
+
+
+def iter_audit_lines(base_path: str, since: Optional[datetime] = None) -> Iterator[str]:
+    """
+    Yield raw audit lines (legacy file first, then segments in write order).
+
+    Args:
+        base_path: VERITTA_AUDIT_LOG_PATH
+        since: optional aware UTC cutoff; closed segments entirely older than
+               since are skipped and indexed segments are entered at the last
+               checkpoint preceding the cutoff. Lines older than since MAY
+               still be yielded (callers keep filtering by ts).
+    """
+    for path, start in audit_sources(base_path, since=since):
+        try:
+            yield from _iter_file(path, start)
+        except FileNotFoundError:
+            # Segment removed by retention between listing and reading
+            continue
+
+
+# Bytes of the file head fingerprinted in tail cursors (inode numbers get reused)
+_HEAD_BYTES = 64
+
+TailCursor = Tuple[int, int, int, int]  # (inode, offset, head_len, head_crc)
+
+
+class AuditTailer:
+    """
+    Incremental reader over the legacy file + segments of one audit log.
+
+    Keeps a cursor per source file (basename -> (inode, offset of next unread
+    line, head_len, head_crc)); cursors are plain tuples so callers can
+    checkpoint them. A file that was replaced or truncated is re-read from the
+    start. Partial trailing lines (writer mid-append) are left for the next read.
+    """
+
+    def __init__(self, base_path: str, cursors: Optional[Dict[str, TailCursor]] = None):
+        self.base_path = base_path
+        self.cursors: Dict[str, TailCursor] = dict(cursors or {})
+        self.changed = False  # Set when any cursor moved (callers reset it)
+        # (file basename, byte offset) of the line last yielded by read_new()
+        self.last_line: Optional[Tuple[str, int]] = None
+
+    def _sources(self) -> List[str]:
+        sources = []
+        if os.path.exists(self.base_path):
+            sources.append(self.base_path)
+        sources.extend(path for _h, _s, path in list_segments(self.base_path))
+        return sources
+
+    def lines_from(self, position: Tuple[str, int]) -> Iterator[str]:
+        """
+        Lines from a last_line position to the end of the log (tail order).
+
+        Raises:
+            FileNotFoundError: the position's file is no longer a source
+        """
+        sources = self._sources()
+        names = [os.path.basename(path) for path in sources]
+        if position[0] not in names:
+            raise FileNotFoundError(position[0])
+        i = names.index(position[0])
+        return self._iter_sources([(sources[i], position[1])] + [(path, 0) for path in sources[i + 1:]])
+
+    @staticmethod
+    def _iter_sources(sources: List[Tuple[str, int]]) -> Iterator[str]:
+        for path, start in sources:
+            try:
+                yield from _iter_file(path, start)
+            except FileNotFoundError:
+                continue
+
+    def read_new(self, skip_before: Optional[datetime] = None) -> Iterator[bytes]:
+        """
+        Yield complete lines appended since the last read (write order).
+
+        Args:
+            skip_before: sealed segments first seen with max_ts older than this
+                         are skipped without reading
+
+        The cursor of a file advances as its lines are yielded, so stopping
+        early loses nothing.
+        """
+        seen = set()
+        for path in self._sources():
+            name = os.path.basename(path)
+            seen.add(name)
+            try:
+                yield from self._tail(path, name, skip_before)
+            except FileNotFoundError:
+                # Removed by retention/cleanup between listing and reading
+                continue
+
+        # Forget cursors of files that no longer exist
+        for name in list(self.cursors):
+            if name not in seen:
+                del self.cursors[name]
+                self.changed = True
+
+    def _tail(self, path: str, name: str, skip_before: Optional[datetime]) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            head = f.read(_HEAD_BYTES)
+            head_crc = zlib.crc32(head)
+            cursor = self.cursors.get(name)
+            offset = 0
+
+            if cursor is not None:
+                inode, offset, head_len, expected_crc = cursor
+                # File replaced or truncated underneath us: start over
+                if (
+                    inode != st.st_ino
+                    or st.st_size < offset
+                    or zlib.crc32(head[:head_len]) != expected_crc
+                ):
+                    offset = 0
+            elif skip_before is not None and path != self.base_path:
+                index = load_segment_index(path)
+                max_ts = parse_ts(index.get("max_ts_utc")) if index else None
+                if max_ts is not None and max_ts < skip_before:
+                    self.cursors[name] = (st.st_ino, index["bytes"], len(head), head_crc)
+                    self.changed = True
+                    return
+
+            if cursor != (st.st_ino, offset, len(head), head_crc):
+                self.cursors[name] = (st.st_ino, offset, len(head), head_crc)
+                self.changed = True
+
+            if st.st_size <= offset:
+                return
+
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Partial line (writer mid-append): retry next read
+                self.last_line = (name, offset)
+                offset += len(raw)
+                self.cursors[name] = (st.st_ino, offset, len(head), head_crc)
+                self.changed = True
+                yield raw
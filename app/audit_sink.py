@@ -3,43 +3,355 @@ Audit sink for persistent audit trail (JSONL append-only).
 
 Writes audit records to file in JSONL format (one JSON per line).
 Fail-closed: any write failure propagates as exception.
+
+Group commit (default):
+- A dedicated writer thread keeps the audit file open and writes queued
+  records in batches (one write + flush per batch instead of per record).
+- Callers block on a per-record future until the batch containing their
+  record has been written (and fsynced, depending on policy), so the
+  fail-closed contract of log_decision/log_action_result is preserved.
+- The file is reopened when VERITTA_AUDIT_LOG_PATH changes or the file is
+  replaced/removed underneath the writer (rotation, cleanup).
+
+Environment:
+- VERITTA_AUDIT_SINK_MODE: "group" (default) | "direct" (open/write/close per record)
+- VERITTA_AUDIT_FSYNC: "never" (default, flush only) | "batch" | "interval"
+- VERITTA_AUDIT_FSYNC_INTERVAL_MS: fsync period for "interval" policy (default 100)
+- VERITTA_AUDIT_ROTATION: "none" (default, single file) | "segments" (see app.audit_segments)
 """
 
 import json
+import logging
 import os
-from typing import Dict, Any
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app import audit_segments
+
+logger = logging.getLogger(__name__)
+
+FSYNC_NEVER = "never"
+FSYNC_BATCH = "batch"
+FSYNC_INTERVAL = "interval"
+
+_FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_BATCH, FSYNC_INTERVAL)
+
+# Upper bound on records written per batch (bounds latency of the first caller)
+_MAX_BATCH_RECORDS = 512
+
+# Max time a caller waits for its batch to be committed (fail-closed on expiry)
+_COMMIT_TIMEOUT_S = 10.0
 
 
 def get_audit_log_path() -> str:
     """
     Get audit log file path from environment variable.
-    
+
     Returns:
         Path from VERITTA_AUDIT_LOG_PATH env var, or "./audit.log" if not set.
     """
     return os.environ.get("VERITTA_AUDIT_LOG_PATH", "./audit.log")
 
 
-def append_audit_record(record: Dict[str, Any]) -> None:
+def get_sink_mode() -> str:
+    """Get sink mode from VERITTA_AUDIT_SINK_MODE ("group" or "direct")."""
+    mode = os.environ.get("VERITTA_AUDIT_SINK_MODE", "group").strip().lower()
+    return "direct" if mode == "direct" else "group"
+
+
+def get_fsync_policy() -> Tuple[str, float]:
     """
-    Append audit record to JSONL file (fail-closed).
-    
-    Args:
-        record: Dictionary to serialize as JSON line
-    
-    Raises:
-        Any exception during file write (fail-closed: do not suppress)
+    Get fsync policy from environment.
+
+    Returns:
+        (policy, interval_s) where policy is one of "never", "batch", "interval".
+        Unknown values fall back to "never" (same durability as direct mode).
     """
-    log_path = get_audit_log_path()
-    
+    policy = os.environ.get("VERITTA_AUDIT_FSYNC", FSYNC_NEVER).strip().lower()
+    if policy not in _FSYNC_POLICIES:
+        policy = FSYNC_NEVER
+
+    try:
+        interval_ms = float(os.environ.get("VERITTA_AUDIT_FSYNC_INTERVAL_MS", "100"))
+        if interval_ms <= 0:
+            interval_ms = 100.0
+    except ValueError:
+        interval_ms = 100.0
+
+    return policy, interval_ms / 1000.0
+
+
+def _serialize(record: Dict[str, Any]) -> str:
+    """Serialize record to compact JSON line (no whitespace)."""
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+class GroupCommitWriter:
+    """
+    Single writer thread that batches audit lines into one write per batch.
+
+    - submit() enqueues a line and returns a Future resolved after commit
+    - Write errors are propagated to every future in the failed batch
+    - Idle fsync errors (interval policy, shutdown) are logged and counted;
+      the file is reopened on the next batch and the thread keeps running
+    - Counters (records_written, batches_written, fsyncs) for observability/tests
+    """
+
+    def __init__(
+        self,
+        fsync_policy: str = FSYNC_NEVER,
+        fsync_interval_s: float = 0.1,
+        on_file_switch: Optional[Callable[[str], None]] = None,
+    ):
+        self.fsync_policy = fsync_policy
+        self.fsync_interval_s = fsync_interval_s
+        # Called with the previous path once the writer moves to another file
+        self._on_file_switch = on_file_switch
+
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Future]]]" = queue.Queue()
+        self._file = None
+        self._file_path: Optional[str] = None
+        self._dirty = False  # Written but not yet fsynced (interval policy)
+        self._last_fsync = time.monotonic()
+
+        self.records_written = 0
+        self.batches_written = 0
+        self.fsyncs = 0
+        self.fsync_errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, line: str) -> Future:
+        """Enqueue one serialized line for path; returns Future (None on success)."""
+        fut: Future = Future()
+        self._queue.put((path, line, fut))
+        return fut
+
+    def close(self) -> None:
+        """Drain pending records, fsync (if configured) and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join(timeout=_COMMIT_TIMEOUT_S)
+
+    def _run(self) -> None:
+        while True:
+            timeout = self.fsync_interval_s if (self._dirty and self.fsync_policy == FSYNC_INTERVAL) else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._idle_fsync()
+                continue
+
+            batch: List[Tuple[str, str, Future]] = []
+            stop = item is None
+            if item is not None:
+                batch.append(item)
+
+            # Drain whatever is already queued (group commit)
+            while not stop and len(batch) < _MAX_BATCH_RECORDS:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            if batch:
+                self._commit(batch)
+
+            if stop:
+                self._idle_fsync()
+                self._close_file()
+                return
+
+    def _commit(self, batch: List[Tuple[str, str, Future]]) -> None:
+        # Group consecutive records by path (path may change between requests, e.g. tests)
+        start = 0
+        while start < len(batch):
+            path = batch[start][0]
+            end = start
+            while end < len(batch) and batch[end][0] == path:
+                end += 1
+            self._commit_group(path, batch[start:end])
+            start = end
+
+    def _commit_group(self, path: str, group: List[Tuple[str, str, Future]]) -> None:
+        try:
+            f = self._ensure_open(path)
+            f.write("".join(line for _, line, _ in group))
+            f.flush()
+            self._dirty = True
+            self._maybe_fsync(force=self.fsync_policy == FSYNC_BATCH)
+        except BaseException as e:
+            # Fail-closed: every caller in this group sees the error
+            self._close_file()
+            for _, _, fut in group:
+                fut.set_exception(e)
+            return
+
+        self.records_written += len(group)
+        self.batches_written += 1
+        for _, _, fut in group:
+            fut.set_result(None)
+
+    def _ensure_open(self, path: str):
+        """Return open handle for path, reopening if path changed or file was replaced."""
+        if self._file is not None and self._file_path == path:
+            try:
+                disk = os.stat(path)
+                fd = os.fstat(self._file.fileno())
+                if (disk.st_dev, disk.st_ino) == (fd.st_dev, fd.st_ino):
+                    return self._file
+            except OSError:
+                pass  # Removed underneath us: reopen below
+
+        previous_path = self._file_path
+        self._maybe_fsync(force=True)
+        self._close_file()
+        # Ensure directory exists (fail-closed: if mkdir fails, open will fail with clear error)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_path = path
+
+        if previous_path and previous_path != path and self._on_file_switch is not None:
+            try:
+                self._on_file_switch(previous_path)
+            except Exception:
+                pass  # Post-switch hooks never affect the write path
+        return self._file
+
+    def _maybe_fsync(self, force: bool = False) -> None:
+        if not self._dirty or self._file is None or self.fsync_policy == FSYNC_NEVER:
+            return
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_interval_s:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+            self._last_fsync = now
+            self.fsyncs += 1
+
+    def _idle_fsync(self) -> None:
+        """fsync outside a batch: no caller to fail, so log and reopen on the next batch."""
+        try:
+            self._maybe_fsync(force=True)
+        except OSError as e:
+            self.fsync_errors += 1
+            logger.error("Audit fsync failed for %s: %s", self._file_path, e)
+            self._close_file()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._file_path = None
+        self._dirty = False
+
+
+# Global writer (lazy, one per process)
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> GroupCommitWriter:
+    """Get (or start) the process-wide group-commit writer."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                policy, interval_s = get_fsync_policy()
+                _writer = GroupCommitWriter(
+                    fsync_policy=policy,
+                    fsync_interval_s=interval_s,
+                    # Closed segments get their sidecar index once fully written
+                    on_file_switch=lambda path: audit_segments.seal_segments_async([path]),
+                )
+    return _writer
+
+
+def shutdown_audit_writer() -> None:
+    """Drain and stop the global writer (next append starts a fresh one)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+def _reset_after_fork() -> None:
+    # Writer thread does not survive fork(); child starts its own on first append
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _append_direct(log_path: str, json_line: str) -> None:
     # Ensure directory exists (fail-closed: if mkdir fails, open will fail with clear error)
-    import os
     os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
-    
-    # Serialize to compact JSON (no whitespace)
-    json_line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
-    
+
     # Append to file (fail-closed: exceptions propagate)
     with open(log_path, "a", encoding="utf-8") as f:
         f.write(json_line)
         f.flush()
+
+
+def _append_segmented(base_path: str, json_line: str) -> None:
+    manager = audit_segments.get_segment_manager()
+    nbytes = len(json_line.encode("utf-8"))
+
+    if get_sink_mode() == "direct":
+        with manager.lock:
+            seg_path, closed = manager.reserve(base_path, nbytes)
+            _append_direct(seg_path, json_line)
+        if closed:
+            audit_segments.seal_segments_async([closed])
+        return
+
+    # Reserve + submit under one lock: records reach the writer in segment order,
+    # so the writer's file switch means the previous segment is complete.
+    writer = get_audit_writer()
+    with manager.lock:
+        seg_path, _closed = manager.reserve(base_path, nbytes)
+        future = writer.submit(seg_path, json_line)
+    future.result(timeout=_COMMIT_TIMEOUT_S)
+
+
+def append_audit_record(record: Dict[str, Any]) -> None:
+    """
+    Append audit record to JSONL file (fail-closed).
+
+    Blocks until the record is committed (group mode) or written (direct mode).
+
+    Args:
+        record: Dictionary to serialize as JSON line
+
+    Raises:
+        Any exception during serialization or file write (fail-closed: do not suppress)
+    """
+    log_path = get_audit_log_path()
+
+    # Serialize on caller thread (serialization errors surface immediately)
+    json_line = _serialize(record)
+
+    if audit_segments.get_rotation_mode() == "segments":
+        _append_segmented(log_path, json_line)
+        return
+
+    if get_sink_mode() == "direct":
+        _append_direct(log_path, json_line)
+        return
+
+    future = get_audit_writer().submit(log_path, json_line)
+    # Fail-closed: write errors and commit timeouts propagate to caller
+    future.result(timeout=_COMMIT_TIMEOUT_S)
@@ -0,0 +1,310 @@
+"""
+CANONICAL JSON — single encoder + request-scoped encoding cache.
+
+Canonical form (P1.4): sort_keys=True, separators=(",", ":"),
+ensure_ascii=False, UTF-8 bytes. Every digest/size helper (sha256_json_or_none,
+canonical_json_bytes, make_input_digest, PayloadInspector, composite executor,
+registry fingerprint) goes through canonical_bytes()/canonical_sha256().
+
+Cache:
+- canonical_scope() activates a CanonicalCache in a contextvar (one per
+  request: CanonicalScopeMiddleware, and run_agentic_action when called
+  directly); outside a scope nothing is cached
+- Entries are keyed by id(obj) and guarded against id reuse: a weakref when
+  the object supports it, otherwise a strong reference held until the scope
+  ends (dict/list payloads)
+- Each container is encoded and hashed at most once per scope; serialization
+  errors (TypeError/ValueError) are cached as well
+- Objects must not be mutated in place while a scope is active (the request
+  pipeline builds new containers instead of mutating encoded ones)
+
+Counters: per-scope hits/misses (CanonicalCache.stats()) and process-wide
+totals (canonical_cache_stats()).
+
+Backends (VERITTA_CANONICAL_JSON_BACKEND = auto | orjson | stdlib):
+- stdlib: json.dumps (reference encoding, P1.4)
+- orjson: orjson.dumps(OPT_SORT_KEYS), used only when its output is provably
+  the stdlib output; otherwise the stdlib encodes (counted as a fallback):
+  * types orjson would encode but json rejects (subclasses, datetime,
+    dataclass) are passed through -> orjson raises -> stdlib
+  * a type walk over the containers detects the rest: Enum, UUID (any
+    non-JSON type orjson encodes natively), NaN/Infinity (orjson emits
+    null) and floats json.dumps writes in exponent form (|x| < 1e-4 or
+    >= 1e16, where orjson's notation differs)
+- auto (default): orjson if installed, else stdlib
+Digests are byte-identical across backends (tests/test_canonical_json_backends.py),
+so stored audit input_digest values stay valid. Encode cost per backend and
+payload shape: python -m app.tools.bench_canonical_json
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Scalars are cheap to encode and their ids are shared (interning); never cached
+_SCALARS = (str, int, float, bool, type(None))
+
+# Exact leaf types both backends encode identically (floats: see _diverges)
+_LEAVES = frozenset((str, int, bool, type(None)))
+
+_totals = {"hits": 0, "misses": 0}
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson as _orjson
+except ImportError:  # Optional dependency
+    _orjson = None
+
+
+class StdlibCanonicalBackend:
+    """Reference canonical encoder (json.dumps)."""
+
+    name = "stdlib"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(
+            obj,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+
+class OrjsonCanonicalBackend:
+    """orjson fast path with stdlib fallback whenever the bytes could differ."""
+
+    name = "orjson"
+
+    def __init__(self):
+        if _orjson is None:
+            raise RuntimeError("orjson is not installed")
+        self._options = (
+            _orjson.OPT_SORT_KEYS
+            | _orjson.OPT_PASSTHROUGH_SUBCLASS
+            | _orjson.OPT_PASSTHROUGH_DATETIME
+            | _orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        self._stdlib = StdlibCanonicalBackend()
+        self.fallbacks = 0
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            blob = _orjson.dumps(obj, option=self._options)
+        except TypeError:
+            # Unsupported type, non-str key, int > 64 bits, depth > 255, cycle
+            self.fallbacks += 1
+            return self._stdlib.encode(obj)
+
+        if _diverges((obj,)):
+            self.fallbacks += 1
+            return self._stdlib.encode(obj)
+        return blob
+
+
+def _diverges(values) -> bool:
+    """True if values hold anything orjson encodes differently from json.dumps.
+
+    Exact types only: subclasses never reach here (orjson passes them through
+    and raises). Depth is bounded by orjson's limit (255).
+    """
+    for value in values:
+        kind = type(value)
+        if kind in _LEAVES:
+            continue
+        if kind is float:
+            # json.dumps: "1e-05", "1e+16", "NaN"; orjson: "0.00001", "1e16", null.
+            # In range both write the same shortest round-trip digits.
+            if not (1e-4 <= abs(value) < 1e16 or value == 0.0):
+                return True
+        elif kind is dict:
+            if _diverges(value.values()):
+                return True
+        elif kind is list or kind is tuple:
+            if _diverges(value):
+                return True
+        else:
+            return True  # Enum, UUID, ...
+    return False
+
+
+def _make_backend(name: str):
+    name = (name or "auto").strip().lower()
+    if name == "stdlib":
+        return StdlibCanonicalBackend()
+    if name in ("auto", "orjson"):
+        if _orjson is not None:
+            return OrjsonCanonicalBackend()
+        if name == "orjson":
+            logger.warning("VERITTA_CANONICAL_JSON_BACKEND=orjson but orjson is not installed; using stdlib")
+        return StdlibCanonicalBackend()
+    logger.warning("Unknown VERITTA_CANONICAL_JSON_BACKEND=%r; using stdlib", name)
+    return StdlibCanonicalBackend()
+
+
+_backend = _make_backend(os.getenv("VERITTA_CANONICAL_JSON_BACKEND", "auto"))
+
+
+def get_canonical_backend():
+    """Active canonical encoder backend (.name: 'orjson' | 'stdlib')."""
+    return _backend
+
+
+def set_canonical_backend(name: str):
+    """Select backend by name ('auto' | 'orjson' | 'stdlib'); returns the active backend."""
+    global _backend
+    _backend = _make_backend(name)
+    return _backend
+
+
+def _encode(obj: Any) -> bytes:
+    return _backend.encode(obj)
+
+
+class _Entry:
+    __slots__ = ("guard", "weak", "blob", "sha256", "error")
+
+    def __init__(self, obj: Any):
+        try:
+            self.guard = weakref.ref(obj)
+            self.weak = True
+        except TypeError:
+            self.guard = obj
+            self.weak = False
+        self.blob: Optional[bytes] = None
+        self.sha256: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+    def holds(self, obj: Any) -> bool:
+        return (self.guard() if self.weak else self.guard) is obj
+
+
+class CanonicalCache:
+    """Identity-keyed canonical encodings for one scope (request)."""
+
+    __slots__ = ("_entries", "hits", "misses")
+
+    def __init__(self):
+        self._entries: Dict[int, _Entry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, obj: Any) -> _Entry:
+        entry = self._entries.get(id(obj))
+        if entry is not None and entry.holds(obj):
+            self.hits += 1
+            _totals["hits"] += 1
+            return entry
+
+        self.misses += 1
+        _totals["misses"] += 1
+        entry = _Entry(obj)
+        try:
+            entry.blob = _encode(obj)
+        except (TypeError, ValueError) as e:
+            entry.error = e
+        self._entries[id(obj)] = entry
+        return entry
+
+    def encode(self, obj: Any) -> bytes:
+        entry = self._entry(obj)
+        if entry.error is not None:
+            raise type(entry.error)(*entry.error.args)
+        return entry.blob
+
+    def sha256(self, obj: Any) -> str:
+        return self.encode_with_digest(obj)[1]
+
+    def encode_with_digest(self, obj: Any) -> Tuple[bytes, str]:
+        entry = self._entry(obj)
+        if entry.error is not None:
+            raise type(entry.error)(*entry.error.args)
+        if entry.sha256 is None:
+            entry.sha256 = hashlib.sha256(entry.blob).hexdigest()
+        return entry.blob, entry.sha256
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_current: ContextVar[Optional[CanonicalCache]] = ContextVar("veritta_canonical_cache", default=None)
+
+
+@contextmanager
+def canonical_scope() -> Iterator[CanonicalCache]:
+    """Activate a canonical cache for the enclosed block (re-entrant: nested scopes share it)."""
+    cache = _current.get()
+    if cache is not None:
+        yield cache
+        return
+
+    cache = CanonicalCache()
+    token = _current.set(cache)
+    try:
+        yield cache
+    finally:
+        _current.reset(token)
+
+
+def get_canonical_cache() -> Optional[CanonicalCache]:
+    """Active cache (None outside canonical_scope)."""
+    return _current.get()
+
+
+def canonical_bytes(obj: Any) -> bytes:
+    """Canonical JSON bytes of obj (cached within a scope).
+
+    Raises:
+        TypeError / ValueError: if obj is not JSON-serializable (as json.dumps)
+    """
+    cache = _current.get()
+    if cache is None or isinstance(obj, _SCALARS):
+        return _encode(obj)
+    return cache.encode(obj)
+
+
+def canonical_sha256(obj: Any) -> str:
+    """Hex SHA256 of canonical_bytes(obj) (cached within a scope).
+
+    Raises:
+        TypeError / ValueError: if obj is not JSON-serializable (as json.dumps)
+    """
+    cache = _current.get()
+    if cache is None or isinstance(obj, _SCALARS):
+        return hashlib.sha256(_encode(obj)).hexdigest()
+    return cache.sha256(obj)
+
+
+def canonical_encode(obj: Any) -> Tuple[bytes, str]:
+    """(canonical_bytes(obj), canonical_sha256(obj)) with a single encode."""
+    cache = _current.get()
+    if cache is None or isinstance(obj, _SCALARS):
+        blob = _encode(obj)
+        return blob, hashlib.sha256(blob).hexdigest()
+    return cache.encode_with_digest(obj)
+
+
+def canonical_cache_stats() -> Dict[str, int]:
+    """Process-wide hit/miss totals (best-effort counters, no lock)."""
+    return dict(_totals)
+
+
+class CanonicalScopeMiddleware:
+    """ASGI middleware: one canonical cache per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with canonical_scope():
+            await self.app(scope, receive, send)
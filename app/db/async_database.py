@@ -0,0 +1,186 @@
+"""Async database access for async endpoints (preferences, admin).
+
+The async def routes used the sync Session (app.db.database.get_db) and ran
+db.query(...) on the event loop: every DB round trip stalled all other
+requests of the worker.
+
+get_async_db() yields an awaitable session on DATABASE_URL (app.db.database);
+open_async_session(url, name) opens one on another URL (preferences keep
+app.env.get_database_url, pool "preferences"):
+- driver mode: AsyncSession on the registry's async engine (app.db.engines;
+  DATABASE_URL mapped to postgresql+asyncpg / sqlite+aiosqlite)
+- thread mode: ThreadedAsyncSession — the sync Session from
+  app.db.database.SessionLocal, each call run in a worker thread
+
+sqlalchemy[asyncio], asyncpg and aiosqlite are optional: in auto mode
+without them the thread mode is used (the loop stays free either way).
+Both expose the AsyncSession subset used by the async repositories:
+add, execute, scalar, get, commit, rollback, refresh, close.
+
+Environment:
+- VERITTA_DB_ASYNC_MODE: auto | driver | thread (default auto)
+  driver fails closed (RuntimeError) when the async driver is missing
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import engines
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    "postgresql": ("postgresql+asyncpg", "asyncpg"),
+    "sqlite": ("sqlite+aiosqlite", "aiosqlite"),
+}
+
+_session_factories: Dict[str, Callable] = {}
+
+
+def to_async_url(url: str) -> Optional[str]:
+    """Map a sync DATABASE_URL to its async driver URL (None if unsupported)."""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return None
+    dialect = scheme.split("+", 1)[0]
+    if dialect == "postgres":
+        dialect = "postgresql"
+    driver = ASYNC_DRIVERS.get(dialect)
+    if driver is None:
+        return None
+    return f"{driver[0]}://{rest}"
+
+
+def async_driver_available(url: str) -> bool:
+    """True when sqlalchemy[asyncio] (greenlet) and the URL's async driver are importable."""
+    dialect = url.partition("://")[0].split("+", 1)[0]
+    driver = ASYNC_DRIVERS.get("postgresql" if dialect == "postgres" else dialect)
+    if driver is None:
+        return False
+    return all(importlib.util.find_spec(name) is not None for name in ("greenlet", driver[1]))
+
+
+def async_mode(url: Optional[str] = None) -> str:
+    """Resolved mode for url (default DATABASE_URL): 'driver' or 'thread'."""
+    if url is None:
+        from app.db.database import DATABASE_URL as url
+
+    mode = os.getenv("VERITTA_DB_ASYNC_MODE", "auto").strip().lower()
+    if mode == "thread":
+        return "thread"
+    if async_driver_available(url):
+        return "driver"
+    if mode == "driver":
+        raise RuntimeError("VERITTA_DB_ASYNC_MODE=driver but async driver not installed (fail-closed)")
+    return "thread"
+
+
+class ThreadedAsyncSession:
+    """Awaitable facade over a sync Session; every DB call runs in a worker thread.
+
+    Calls are sequential (one request, one session), so the Session is never
+    used by two threads at once. Row results are buffered in the worker thread.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def _run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    async def execute(self, statement: Any, params: Any = None, **kwargs: Any) -> Any:
+        def run():
+            result = self.sync_session.execute(statement, params, **kwargs)
+            if isinstance(result, CursorResult) and not result.returns_rows:
+                return result  # DML: rowcount only
+            # Buffer rows here: the caller iterates on the loop thread
+            return result.freeze()()
+        return await self._run(run)
+
+    async def scalar(self, statement: Any, params: Any = None, **kwargs: Any) -> Any:
+        return await self._run(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any) -> Any:
+        return await self._run(self.sync_session.get, entity, ident, **kwargs)
+
+    async def commit(self) -> None:
+        await self._run(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await self._run(self.sync_session.rollback)
+
+    async def refresh(self, instance: Any, **kwargs: Any) -> None:
+        await self._run(self.sync_session.refresh, instance, **kwargs)
+
+    async def close(self) -> None:
+        await self._run(self.sync_session.close)
+
+
+def get_async_engine(url: Optional[str] = None, name: str = "default"):
+    """Async engine for url (default DATABASE_URL) from the shared registry (driver mode only)."""
+    if url is None:
+        from app.db.database import DATABASE_URL as url
+
+    async_url = to_async_url(url)
+    if async_url is None:
+        raise RuntimeError("DATABASE_URL has no async driver mapping (fail-closed)")
+    return engines.get_async_engine(async_url, name=name)
+
+
+def _session_factory(url: Optional[str] = None, name: str = "default") -> Callable:
+    from app.db.database import DATABASE_URL, SessionLocal
+
+    url = url or DATABASE_URL
+    factory = _session_factories.get(url)
+    if factory is None:
+        if async_mode(url) == "driver":
+            from sqlalchemy.ext.asyncio import async_sessionmaker
+
+            # expire_on_commit=False: attribute access after commit must not lazy-load
+            factory = async_sessionmaker(get_async_engine(url, name), expire_on_commit=False)
+            logger.info("Async DB: driver mode")
+        else:
+            sync_factory = SessionLocal if url == DATABASE_URL else sessionmaker(
+                autocommit=False, autoflush=False, bind=engines.get_engine(url, name=name)
+            )
+
+            def factory() -> ThreadedAsyncSession:
+                return ThreadedAsyncSession(sync_factory())
+
+            logger.info("Async DB: thread mode")
+        _session_factories[url] = factory
+    return factory
+
+
+def open_async_session(url: Optional[str] = None, name: str = "default") -> Any:
+    """New awaitable session on url (default DATABASE_URL); caller awaits close().
+
+    name labels the pool metrics of url's engine (the first caller for a URL names it).
+    """
+    return _session_factory(url, name)()
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    """Dependency for async FastAPI routes (AsyncSession or ThreadedAsyncSession)."""
+    db = open_async_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def close_async_engine() -> None:
+    """Dispose the async engines (FastAPI lifespan shutdown); next use rebuilds."""
+    _session_factories.clear()
+    await engines.dispose_async_engines()
@@ -1,36 +1,20 @@
-"""Database configuration and SQLAlchemy setup."""
+"""Database configuration and SQLAlchemy setup.
+
+The engine comes from the shared registry (app.db.engines): pool size,
+overflow, recycle and pre-ping are configured there.
+"""
 
 import os
-from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+
+from app.db.engines import get_engine
 
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "sqlite:///./app.db"  # Dev/test default
 )
 
-# SQLite-specific configuration (pragma for dev)
-if DATABASE_URL.startswith("sqlite://"):
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    # Enable foreign keys for SQLite
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_conn, connection_record):
-        cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
-else:
-    # PostgreSQL or other DB
-    engine = create_engine(
-        DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
-        pool_pre_ping=True,  # Verify connections before using
-    )
+engine = get_engine(DATABASE_URL, name="default")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,267 @@
+"""Engine registry: one engine (and one pool) per database URL per process.
+
+Every module gets its engine here (app.db.database, app.db.async_database);
+pool configuration lives in one place, so workers × (size + overflow) can be
+sized against PostgreSQL max_connections.
+
+Pools (PostgreSQL, SQLite files) are instrumented for /metrics:
+- db_pool_checkout_seconds{pool}: time to get a connection (wait + pre-ping)
+- db_pool_checked_out{pool}, db_pool_overflow{pool}: connections in use / beyond pool_size
+- db_pool_wait_timeouts_total{pool}: checkouts that gave up after pool_timeout
+In-memory SQLite uses one shared connection (StaticPool, not instrumented).
+
+Environment:
+- VERITTA_DB_POOL_SIZE: persistent connections per engine (default 10)
+- VERITTA_DB_MAX_OVERFLOW: extra connections under load (default 20, 0 = none)
+- VERITTA_DB_POOL_TIMEOUT_S: wait for a free connection before failing (default 30)
+- VERITTA_DB_POOL_RECYCLE_S: reconnect connections older than this (default 1800, 0 = never)
+- VERITTA_DB_POOL_PRE_PING: on | off — verify connections before use (default on)
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 20
+DEFAULT_POOL_TIMEOUT_S = 30.0
+DEFAULT_POOL_RECYCLE_S = 1800
+
+db_pool_checkout_seconds = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to check out a pooled DB connection (wait + pre-ping)",
+    labelnames=["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "DB connections currently checked out of the pool",
+    labelnames=["pool"],
+)
+db_pool_overflow = Gauge(
+    "db_pool_overflow",
+    "DB connections open beyond pool_size",
+    labelnames=["pool"],
+)
+db_pool_wait_timeouts_total = Counter(
+    "db_pool_wait_timeouts_total",
+    "Checkouts that timed out waiting for a free DB connection",
+    labelnames=["pool"],
+)
+
+
+def _env_count(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value >= 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    pool_size: int = DEFAULT_POOL_SIZE
+    max_overflow: int = DEFAULT_MAX_OVERFLOW
+    pool_timeout_s: float = DEFAULT_POOL_TIMEOUT_S
+    pool_recycle_s: int = DEFAULT_POOL_RECYCLE_S
+    pre_ping: bool = True
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        return cls(
+            pool_size=_env_count("VERITTA_DB_POOL_SIZE", DEFAULT_POOL_SIZE) or DEFAULT_POOL_SIZE,
+            max_overflow=_env_count("VERITTA_DB_MAX_OVERFLOW", DEFAULT_MAX_OVERFLOW),
+            pool_timeout_s=_env_float("VERITTA_DB_POOL_TIMEOUT_S", DEFAULT_POOL_TIMEOUT_S),
+            pool_recycle_s=_env_count("VERITTA_DB_POOL_RECYCLE_S", DEFAULT_POOL_RECYCLE_S),
+            pre_ping=os.getenv("VERITTA_DB_POOL_PRE_PING", "on").strip().lower() not in ("off", "0", "false", "no"),
+        )
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout_s,
+            "pool_recycle": self.pool_recycle_s or -1,  # 0 = never recycle
+            "pool_pre_ping": self.pre_ping,
+        }
+
+
+class _InstrumentedPoolMixin:
+    """Pool metrics; label = pool logging_name (kept by recreate() on dispose)."""
+
+    def _metrics_label(self) -> str:
+        return self._orig_logging_name or "default"
+
+    def _update_usage(self) -> None:
+        pool = self._metrics_label()
+        db_pool_checked_out.labels(pool=pool).set(self.checkedout())
+        db_pool_overflow.labels(pool=pool).set(max(self.overflow(), 0))
+
+    def connect(self):
+        pool = self._metrics_label()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except sa_exc.TimeoutError:
+            db_pool_wait_timeouts_total.labels(pool=pool).inc()
+            raise
+        finally:
+            db_pool_checkout_seconds.labels(pool=pool).observe(time.perf_counter() - start)
+
+    # Pool subclass hooks: gauges reflect the pool after each get / return
+    def _do_get(self):
+        try:
+            return super()._do_get()
+        finally:
+            self._update_usage()
+
+    def _do_return_conn(self, record) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._update_usage()
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _sqlite_pragmas(engine: Engine) -> None:
+    # Enable foreign keys for SQLite
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+_engines: Dict[Tuple[str, str], Any] = {}
+_lock = threading.Lock()
+
+
+def _pool_name(name: str, kind: str) -> str:
+    return name if kind == "sync" else f"{name}_{kind}"
+
+
+def get_engine(url: str, name: str = "default", config: Optional[PoolConfig] = None) -> Engine:
+    """Shared sync engine for url (created once per process).
+
+    name labels the pool metrics; call sites on different URLs pass distinct
+    names (app.db.database: "default", preferences: "preferences").
+    """
+    key = ("sync", url)
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _create_engine(url, _pool_name(name, "sync"), config or PoolConfig.from_env())
+            _engines[key] = engine
+    return engine
+
+
+def _create_engine(url: str, pool_name: str, config: PoolConfig) -> Engine:
+    if _is_memory_sqlite(url):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        kwargs: Dict[str, Any] = {}
+        if url.startswith("sqlite"):
+            kwargs["connect_args"] = {"check_same_thread": False}
+        engine = create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_logging_name=pool_name,
+            **config.engine_kwargs(),
+            **kwargs,
+        )
+    if url.startswith("sqlite"):
+        _sqlite_pragmas(engine)
+    return engine
+
+
+def get_async_engine(url: str, name: str = "default", config: Optional[PoolConfig] = None):
+    """Shared async engine for an async driver url (postgresql+asyncpg, sqlite+aiosqlite)."""
+    key = ("async", url)
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            pool_name = _pool_name(name, "async")
+            config = config or PoolConfig.from_env()
+            if _is_memory_sqlite(url):
+                engine = create_async_engine(url, poolclass=StaticPool)
+            else:
+                engine = create_async_engine(
+                    url,
+                    poolclass=InstrumentedAsyncQueuePool,
+                    pool_logging_name=pool_name,
+                    **config.engine_kwargs(),
+                )
+            _engines[key] = engine
+    return engine
+
+
+def dispose_engines() -> None:
+    """Close pooled connections of the sync engines (engines stay usable).
+
+    In-memory SQLite is skipped: its one connection is the database.
+    """
+    for (kind, _), engine in list(_engines.items()):
+        if kind == "sync" and not isinstance(engine.pool, StaticPool):
+            engine.dispose()
+
+
+async def dispose_async_engines() -> None:
+    """Dispose and forget the async engines (FastAPI lifespan shutdown)."""
+    with _lock:
+        engines = [(key, e) for key, e in _engines.items() if key[0] == "async"]
+        for key, _ in engines:
+            del _engines[key]
+    for _, engine in engines:
+        await engine.dispose()
+
+
+def _reset_after_fork() -> None:
+    # Pooled connections belong to the parent: drop them without closing
+    global _lock
+    _lock = threading.Lock()
+    for key, engine in list(_engines.items()):
+        if key[0] == "sync":
+            engine.dispose(close=False)
+        else:
+            del _engines[key]
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
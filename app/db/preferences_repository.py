@@ -0,0 +1,71 @@
+"""Preferences data access for async routes (F9.9-A).
+
+db is an AsyncSession or ThreadedAsyncSession (app.db.async_database.get_async_db).
+Values are never logged (privacy-by-design).
+"""
+
+from typing import Any, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.models.user_preference import UserPreference
+
+
+class AsyncPreferencesRepository:
+    """Read and upsert the 1:1 preference row of a user."""
+
+    def __init__(self, db: Any):
+        self.db = db
+
+    async def get(self, user_id: str) -> Optional[UserPreference]:
+        """Preferences of user_id, or None if never set."""
+        result = await self.db.execute(
+            select(UserPreference).where(UserPreference.user_id == user_id)
+        )
+        return result.scalars().first()
+
+    async def upsert(
+        self,
+        user_id: str,
+        tone: Optional[str] = None,
+        output_format: Optional[str] = None,
+        language: Optional[str] = None,
+    ) -> Tuple[UserPreference, str]:
+        """
+        Create or partially update preferences (None = keep current value).
+
+        Returns:
+            (preference, action_type) with action_type "create" | "update"
+
+        Raises:
+            SQLAlchemyError: caller rolls back (fail-closed)
+        """
+        pref = await self.get(user_id)
+
+        if pref is None:
+            pref = UserPreference(
+                preference_id=str(uuid4()),
+                user_id=user_id,
+                tone_preference=tone,
+                output_format=output_format,
+                language=language,
+            )
+            self.db.add(pref)
+            action_type = "create"
+        else:
+            if tone is not None:
+                pref.tone_preference = tone
+            if output_format is not None:
+                pref.output_format = output_format
+            if language is not None:
+                pref.language = language
+            action_type = "update"
+
+        await self.db.commit()
+        await self.db.refresh(pref)
+
+        return pref, action_type
+
+    async def rollback(self) -> None:
+        await self.db.rollback()
@@ -0,0 +1,529 @@
+"""Read-through session validation cache (F2.3, in front of SessionRepository).
+
+Sessions are immutable after creation except for revocation, and expire at
+an absolute expires_at: the Bearer hot path (GateF23SessionDB.evaluate)
+does not need a SQL round trip per request.
+
+- Key: session_id; value: SessionRecord (__slots__: user_id, api_key_hash,
+  expires_at, revoked, cached_until) — no ORM object kept
+- Positive entries live min(VERITTA_SESSION_CACHE_TTL_S, expires_at):
+  an expired session is never served as valid from the cache
+- Unknown session ids are cached as misses (negative cache,
+  VERITTA_SESSION_CACHE_NEGATIVE_TTL_S) so random Bearer tokens cannot
+  hammer SQL; a session created by this process clears its negative entry
+- Revocation (SessionRepository.revoke, /admin/sessions/revoke) marks the
+  local entry revoked at once and is published on the revocation channel;
+  other workers mark their entries revoked on receipt, then notify their
+  revocation listeners (app.session_backend tiered L1/L2)
+- Revocation is monotonic: a revoked id leaves a tombstone (also when it
+  was not cached) and put() never turns a revoked entry valid again, so a
+  validator that read SQL just before the revoke committed cannot cache
+  a stale valid record afterwards
+- Revoke-to-deny delay: channel latency while the channel works, never more
+  than the positive TTL if a notification is lost or no channel is set
+  (entries re-read SQL); measured on receipt as
+  session_revocation_propagation_seconds
+
+Channels (VERITTA_SESSION_REVOKE_CHANNEL):
+- none (default): single worker; other processes deny within the TTL
+  (default 5 s) — set uds/postgres when running several workers
+- uds: one host — each worker binds a datagram socket in
+  VERITTA_SESSION_REVOKE_UDS_DIR and a revocation is sent to every socket
+  there (stale sockets removed)
+- postgres: NOTIFY / LISTEN on channel veritta_session_revoked (DATABASE_URL,
+  psycopg2); a listener thread reconnects with backoff
+
+Environment:
+- VERITTA_SESSION_CACHE: on | off (default on)
+- VERITTA_SESSION_CACHE_MAX_ENTRIES: LRU bound (default 100000)
+- VERITTA_SESSION_CACHE_TTL_S: positive entry lifetime (default 5)
+- VERITTA_SESSION_CACHE_NEGATIVE_TTL_S: unknown id lifetime (default 5)
+- VERITTA_SESSION_REVOKE_CHANNEL: none | uds | postgres (default none)
+- VERITTA_SESSION_REVOKE_UDS_DIR: socket directory (default <tmp>/veritta-session-revoke)
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import select
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_TTL_S = 5.0
+DEFAULT_NEGATIVE_TTL_S = 5.0
+PG_CHANNEL = "veritta_session_revoked"
+
+session_cache_requests_total = Counter(
+    "session_cache_requests_total",
+    "Session validation cache lookups",
+    labelnames=["result"],  # hit, negative_hit, miss
+)
+session_cache_entries = Gauge(
+    "session_cache_entries",
+    "Entries in the session validation cache (positive + negative)",
+)
+session_revocations_published_total = Counter(
+    "session_revocations_published_total",
+    "Session revocations published on the revocation channel",
+    labelnames=["channel"],
+)
+session_revocation_propagation_seconds = Histogram(
+    "session_revocation_propagation_seconds",
+    "Delay from revocation (revoked_at) to receipt by another worker",
+    labelnames=["channel"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def utc_epoch(value: datetime) -> float:
+    """Epoch seconds of a naive-UTC DB timestamp (SessionModel convention)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SessionRecord:
+    """Validation view of one session (what F2.3 needs, nothing else)."""
+
+    __slots__ = ("user_id", "api_key_hash", "expires_at", "revoked", "cached_until")
+
+    def __init__(self, user_id: str, api_key_hash: str, expires_at: float, revoked: bool):
+        self.user_id = user_id
+        self.api_key_hash = api_key_hash
+        self.expires_at = expires_at
+        self.revoked = revoked
+        self.cached_until = 0.0
+
+    @classmethod
+    def from_model(cls, session) -> "SessionRecord":
+        return cls(
+            user_id=session.user_id,
+            api_key_hash=session.api_key_hash,
+            expires_at=utc_epoch(session.expires_at),
+            revoked=session.revoked_at is not None,
+        )
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return self.expires_at <= (time.time() if now is None else now)
+
+
+# Negative entry: (None, cached_until)
+_Entry = Tuple[Optional[SessionRecord], float]
+
+
+class SessionCache:
+    """LRU of session_id -> SessionRecord (or known-missing)."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        negative_ttl_s: Optional[float] = None,
+        channel: Optional["RevocationChannel"] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries or _env_int("VERITTA_SESSION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        self.ttl_s = ttl_s or _env_float("VERITTA_SESSION_CACHE_TTL_S", DEFAULT_TTL_S)
+        self.negative_ttl_s = negative_ttl_s or _env_float(
+            "VERITTA_SESSION_CACHE_NEGATIVE_TTL_S", DEFAULT_NEGATIVE_TTL_S
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # session_id -> tombstone expiry: revoked ids (cached or not)
+        self._revoked: "OrderedDict[str, float]" = OrderedDict()
+        self._listeners: List[Callable[[str], None]] = []
+        self.channel = channel
+        if channel is not None:
+            channel.start(self.apply_revocation)
+
+    def get(self, session_id: str) -> Tuple[bool, Optional[SessionRecord]]:
+        """(found, record): found False => read SQL; record None => unknown id."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                record, cached_until = entry
+                if cached_until > now:
+                    self._entries.move_to_end(session_id)
+                    session_cache_requests_total.labels(result="hit" if record else "negative_hit").inc()
+                    return True, record
+                del self._entries[session_id]
+        session_cache_requests_total.labels(result="miss").inc()
+        return False, None
+
+    def put(self, session_id: str, record: Optional[SessionRecord]) -> None:
+        """Cache a SQL read (None: session does not exist)."""
+        now = self._clock()
+        if record is None:
+            cached_until = now + self.negative_ttl_s
+        elif record.revoked:
+            # Revocation is terminal
+            cached_until = now + self.ttl_s
+        else:
+            # Never outlive the session itself
+            cached_until = min(now + self.ttl_s, record.expires_at)
+            if cached_until <= now:
+                return
+        if record is not None:
+            record.cached_until = cached_until
+        with self._lock:
+            current = self._entries.get(session_id)
+            revoked_here = self._revoked.get(session_id, 0.0) > now or (
+                current is not None and current[0] is not None and current[0].revoked
+            )
+            if record is None:
+                if revoked_here:
+                    return  # stale miss: the session exists (it was revoked)
+            elif revoked_here and not record.revoked:
+                # Read SQL before the revoke committed: revocation wins
+                record.revoked = True
+                cached_until = now + self.ttl_s
+                record.cached_until = cached_until
+            self._entries[session_id] = (record, cached_until)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            session_cache_entries.set(len(self._entries))
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+            session_cache_entries.set(len(self._entries))
+
+    def revoke(self, session_id: str, revoked_at: float) -> None:
+        """Local revocation: deny here at once, then tell the other workers."""
+        self._mark_revoked(session_id)
+        if self.channel is not None:
+            try:
+                self.channel.publish(session_id, revoked_at)
+                session_revocations_published_total.labels(channel=self.channel.name).inc()
+            except Exception as e:
+                # Revocation is committed in SQL; other workers converge within the TTL
+                logger.warning("Session revocation publish failed (%s): %s", self.channel.name, type(e).__name__)
+
+    def apply_revocation(self, session_id: str, revoked_at: float) -> None:
+        """Revocation received from another worker."""
+        self._mark_revoked(session_id)
+        for listener in list(self._listeners):
+            try:
+                listener(session_id)
+            except Exception as e:
+                logger.warning("Session revocation listener failed: %s", type(e).__name__)
+        if self.channel is not None:
+            session_revocation_propagation_seconds.labels(channel=self.channel.name).observe(
+                max(0.0, self._clock() - revoked_at)
+            )
+
+    def add_revocation_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(session_id) for every revocation received on the channel."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_revocation_listener(self, listener: Callable[[str], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _mark_revoked(self, session_id: str) -> None:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[0] is not None:
+                entry[0].revoked = True
+            elif entry is not None:
+                # Known-missing here but revoked elsewhere: re-read SQL
+                del self._entries[session_id]
+            # Tombstone, also when not cached: a SQL read already in flight
+            # must not cache the session as valid
+            self._revoked[session_id] = now + self.ttl_s
+            self._revoked.move_to_end(session_id)
+            while len(self._revoked) > self.max_entries:
+                self._revoked.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+            session_cache_entries.set(0)
+
+    def close(self) -> None:
+        if self.channel is not None:
+            self.channel.close()
+            self.channel = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# ============================================================================
+# Revocation channels
+# ============================================================================
+
+class RevocationChannel:
+    """Fan-out of (session_id, revoked_at) to the other workers."""
+
+    name = "none"
+
+    def __init__(self):
+        # Messages carry their origin: a worker skips its own revocations
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def start(self, handler: Callable[[str, float], None]) -> None:
+        raise NotImplementedError
+
+    def publish(self, session_id: str, revoked_at: float) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def _encode(self, session_id: str, revoked_at: float) -> str:
+        return json.dumps({"sid": session_id, "at": revoked_at, "origin": self.origin}, separators=(",", ":"))
+
+    def _decode(self, payload, handler: Callable[[str, float], None]) -> None:
+        try:
+            msg = json.loads(payload)
+            if msg.get("origin") == self.origin:
+                return  # own revocation, already applied
+            handler(str(msg["sid"]), float(msg["at"]))
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed session revocation message ignored")
+
+
+class UnixSocketRevocationChannel(RevocationChannel):
+    """One host: one datagram socket per worker in a shared directory."""
+
+    name = "uds"
+
+    def __init__(self, directory: Optional[str] = None):
+        super().__init__()
+        self.directory = directory or os.getenv("VERITTA_SESSION_REVOKE_UDS_DIR") or os.path.join(
+            tempfile.gettempdir(), "veritta-session-revoke"
+        )
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{self.origin}.sock")
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, handler: Callable[[str, float], None]) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._thread = threading.Thread(
+            target=self._listen, args=(handler,), name="session-revoke-uds", daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, handler: Callable[[str, float], None]) -> None:
+        sock = self._sock
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([sock], [], [], 0.5)
+                if ready:
+                    self._decode(sock.recv(4096), handler)
+            except (OSError, ValueError):
+                if self._stop.is_set():
+                    return
+                time.sleep(0.1)
+
+    def publish(self, session_id: str, revoked_at: float) -> None:
+        data = self._encode(session_id, revoked_at).encode("utf-8")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as out:
+            for path in glob.glob(os.path.join(self.directory, "*.sock")):
+                if path == self.path:
+                    continue
+                try:
+                    out.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Worker gone: stale socket file
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                except OSError as e:
+                    logger.warning("Session revocation not delivered to %s: %s", path, type(e).__name__)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class PostgresRevocationChannel(RevocationChannel):
+    """NOTIFY / LISTEN on veritta_session_revoked (psycopg2, DATABASE_URL)."""
+
+    name = "postgres"
+
+    def __init__(self, dsn: Optional[str] = None):
+        super().__init__()
+        # Publishing goes through the shared pool when on DATABASE_URL
+        self._database_url = None if dsn else os.getenv("DATABASE_URL", "")
+        self.dsn = dsn or _libpq_dsn(os.getenv("DATABASE_URL", ""))
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, handler: Callable[[str, float], None]) -> None:
+        self._thread = threading.Thread(
+            target=self._listen, args=(handler,), name="session-revoke-pg", daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, handler: Callable[[str, float], None]) -> None:
+        # Dedicated connection: LISTEN is bound to the session, never pooled
+        import psycopg2
+
+        backoff = 0.5
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_session(autocommit=True)
+                conn.cursor().execute(f"LISTEN {PG_CHANNEL}")
+                backoff = 0.5
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 0.5)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            self._decode(conn.notifies.pop(0).payload, handler)
+            except Exception as e:
+                # Lost notifications are bounded by the cache TTL
+                logger.warning("Session revocation listener reconnecting: %s", type(e).__name__)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 10.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def publish(self, session_id: str, revoked_at: float) -> None:
+        payload = self._encode(session_id, revoked_at)
+        if self._database_url:
+            from sqlalchemy import text
+
+            from app.db.engines import get_engine
+
+            with get_engine(self._database_url).begin() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": PG_CHANNEL, "payload": payload})
+            return
+
+        import psycopg2
+
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.set_session(autocommit=True)
+            conn.cursor().execute("SELECT pg_notify(%s, %s)", (PG_CHANNEL, payload))
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+def _libpq_dsn(database_url: str) -> str:
+    """SQLAlchemy URL (postgresql+psycopg2://...) -> libpq URI."""
+    from sqlalchemy.engine import make_url
+
+    url = make_url(database_url)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def create_revocation_channel(kind: Optional[str] = None) -> Optional[RevocationChannel]:
+    kind = (kind or os.getenv("VERITTA_SESSION_REVOKE_CHANNEL", "none")).strip().lower()
+    if kind == "uds":
+        return UnixSocketRevocationChannel()
+    if kind == "postgres":
+        return PostgresRevocationChannel()
+    if kind != "none":
+        logger.warning("Unknown VERITTA_SESSION_REVOKE_CHANNEL=%r; using none", kind)
+    return None
+
+
+# ============================================================================
+# Process-wide cache
+# ============================================================================
+
+def session_cache_enabled() -> bool:
+    return os.getenv("VERITTA_SESSION_CACHE", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+_cache: Optional[SessionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_session_cache() -> Optional[SessionCache]:
+    """Process-wide cache built from env (None when VERITTA_SESSION_CACHE=off)."""
+    global _cache
+    if not session_cache_enabled():
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SessionCache(channel=create_revocation_channel())
+    return _cache
+
+
+def set_session_cache(cache: Optional[SessionCache]) -> None:
+    """Replace the global cache (None: rebuild from env on next use)."""
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+    if previous is not None and previous is not cache:
+        previous.close()
+
+
+def close_session_cache() -> None:
+    """Lifespan shutdown: stop the revocation listener."""
+    set_session_cache(None)
+
+
+def _reset_after_fork() -> None:
+    # Listener thread and socket belong to the parent; child builds its own
+    global _cache, _cache_lock
+    _cache = None
+    _cache_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
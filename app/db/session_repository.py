@@ -1,18 +1,32 @@
-"""Session repository for database CRUD operations."""
+"""Session repository for database CRUD operations.
 
+SessionRepository: sync Session (gates, sweeper, scripts).
+AsyncSessionRepository: awaitable session from app.db.async_database
+(async routes), same semantics.
+"""
+
+import asyncio
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Any, Optional
+from sqlalchemy import DateTime, bindparam, func, select, text
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.db.session_cache import SessionCache, SessionRecord, utc_epoch
 from app.models.session import SessionModel
 
 
 class SessionRepository:
-    """CRUD operations for sessions with fail-closed semantics."""
+    """CRUD operations for sessions with fail-closed semantics.
+
+    With a SessionCache (app.db.session_cache), validation reads go through
+    the cache (read-through) and revocations are applied to it and fanned out
+    to the other workers. Without one, every read hits SQL.
+    """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: Optional[SessionCache] = None):
         self.db = db
+        self.cache = cache
     
     def create(
         self,
@@ -50,6 +64,10 @@ class SessionRepository:
         self.db.commit()
         self.db.refresh(session)
         
+        if self.cache is not None:
+            # Also clears a negative entry for this id
+            self.cache.put(session.session_id, SessionRecord.from_model(session))
+        
         return session
     
     def get_by_id(self, session_id: str) -> Optional[SessionModel]:
@@ -62,6 +80,25 @@ class SessionRepository:
             SessionModel.session_id == session_id
         ).first()
     
+    def get_record(self, session_id: str) -> Optional[SessionRecord]:
+        """
+        Validation view of a session (read-through cache when configured).
+        
+        Fails-closed: Returns None if not found (no exception).
+        """
+        if self.cache is not None:
+            found, record = self.cache.get(session_id)
+            if found:
+                return record
+        
+        session = self.get_by_id(session_id)
+        record = SessionRecord.from_model(session) if session else None
+        
+        if self.cache is not None:
+            self.cache.put(session_id, record)
+        
+        return record
+    
     def get_by_user_and_key(
         self,
         user_id: str,
@@ -95,6 +132,10 @@ class SessionRepository:
         self.db.commit()
         self.db.refresh(session)
         
+        if self.cache is not None:
+            # After commit: a worker re-reading SQL already sees revoked_at
+            self.cache.revoke(session_id, utc_epoch(now))
+        
         return session
     
     def validate(self, session_id: str) -> tuple[bool, Optional[str]]:
@@ -110,12 +151,12 @@ class SessionRepository:
             - SESSION_EXPIRED: Session expired
             - None: Session is valid
         """
-        session = self.get_by_id(session_id)
+        session = self.get_record(session_id)
         
         if not session:
             return False, "SESSION_INVALID"
         
-        if session.is_revoked():
+        if session.revoked:
             return False, "SESSION_REVOKED"
         
         if session.is_expired():
@@ -123,24 +164,66 @@ class SessionRepository:
         
         return True, None
     
-    def cleanup_expired(self) -> int:
+    def cleanup_expired(self, batch_size: Optional[int] = None) -> int:
         """
         Delete all expired, non-revoked sessions.
         
+        With batch_size: bounded batches, one commit each (short locks),
+        until a batch comes back short.
+        
         Returns:
             Number of sessions deleted
         """
-        # Store as naive UTC (same as model)
-        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if batch_size is None:
+            # Store as naive UTC (same as model)
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            
+            result = self.db.query(SessionModel).filter(
+                SessionModel.expires_at <= now,
+                SessionModel.revoked_at.is_(None),
+            ).delete()
+            
+            self.db.commit()
+            
+            return result
         
-        result = self.db.query(SessionModel).filter(
-            SessionModel.expires_at <= now,
-            SessionModel.revoked_at.is_(None),
-        ).delete()
+        total = 0
+        while True:
+            deleted = self.delete_expired_batch(batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+    
+    def delete_expired_batch(self, limit: int, now: Optional[datetime] = None) -> int:
+        """
+        Delete at most `limit` expired, non-revoked sessions (oldest expiry first).
         
+        Walks ix_sessions_expires_at and deletes by physical row id:
+        ctid on PostgreSQL, rowid on SQLite, primary key elsewhere.
+        One commit per batch.
+        
+        Returns:
+            Number of sessions deleted
+        """
+        if now is None:
+            # Store as naive UTC (same as model)
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+        
+        dialect = self.db.get_bind().dialect.name
+        row_id = {"postgresql": "ctid", "sqlite": "rowid"}.get(dialect, "session_id")
+        
+        result = self.db.execute(
+            text(
+                f"DELETE FROM sessions WHERE {row_id} IN ("
+                f"SELECT {row_id} FROM sessions "
+                "WHERE expires_at <= :now AND revoked_at IS NULL "
+                "ORDER BY expires_at LIMIT :limit)"
+            ).bindparams(bindparam("now", type_=DateTime())),
+            {"now": now, "limit": limit},
+        )
         self.db.commit()
         
-        return result
+        return result.rowcount
     
     def get_active_count(self) -> int:
         """Get count of active (valid) sessions."""
@@ -157,3 +240,111 @@ class SessionRepository:
         return self.db.query(SessionModel).filter(
             SessionModel.user_id == user_id,
         ).all()
+
+
+class AsyncSessionRepository:
+    """Async counterpart of SessionRepository for async routes.
+
+    db is an AsyncSession or ThreadedAsyncSession (app.db.async_database.get_async_db).
+    Cache semantics are the same as SessionRepository.
+    """
+    
+    def __init__(self, db: Any, cache: Optional[SessionCache] = None):
+        self.db = db
+        self.cache = cache
+    
+    async def create(
+        self,
+        user_id: str,
+        api_key_hash: str,
+        ttl_hours: int = 8,
+    ) -> SessionModel:
+        """Create a new session (see SessionRepository.create)."""
+        # Store as naive UTC (same as model)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        
+        session = SessionModel(
+            user_id=user_id,
+            api_key_hash=api_key_hash,
+            created_at=now,
+            expires_at=now + timedelta(hours=ttl_hours),
+            updated_at=now,
+        )
+        
+        self.db.add(session)
+        await self.db.commit()
+        await self.db.refresh(session)
+        
+        if self.cache is not None:
+            self.cache.put(session.session_id, SessionRecord.from_model(session))
+        
+        return session
+    
+    async def get_by_id(self, session_id: str) -> Optional[SessionModel]:
+        """Get session by ID. Fails-closed: Returns None if not found."""
+        result = await self.db.execute(
+            select(SessionModel).where(SessionModel.session_id == session_id)
+        )
+        return result.scalars().first()
+    
+    async def get_record(self, session_id: str) -> Optional[SessionRecord]:
+        """Validation view of a session (read-through cache when configured)."""
+        if self.cache is not None:
+            found, record = self.cache.get(session_id)
+            if found:
+                return record
+        
+        session = await self.get_by_id(session_id)
+        record = SessionRecord.from_model(session) if session else None
+        
+        if self.cache is not None:
+            self.cache.put(session_id, record)
+        
+        return record
+    
+    async def revoke(self, session_id: str) -> Optional[SessionModel]:
+        """Revoke a session by setting revoked_at (see SessionRepository.revoke)."""
+        session = await self.get_by_id(session_id)
+        if not session:
+            return None
+        
+        # Store as naive UTC (same as model)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        session.revoked_at = now
+        session.updated_at = now
+        
+        await self.db.commit()
+        await self.db.refresh(session)
+        
+        if self.cache is not None:
+            # Fan-out may be a network round trip (postgres channel): off the loop
+            await asyncio.to_thread(self.cache.revoke, session_id, utc_epoch(now))
+        
+        return session
+    
+    async def validate(self, session_id: str) -> tuple[bool, Optional[str]]:
+        """Validate a session; reason codes as SessionRepository.validate."""
+        session = await self.get_record(session_id)
+        
+        if not session:
+            return False, "SESSION_INVALID"
+        
+        if session.revoked:
+            return False, "SESSION_REVOKED"
+        
+        if session.is_expired():
+            return False, "SESSION_EXPIRED"
+        
+        return True, None
+    
+    async def get_active_count(self) -> int:
+        """Get count of active (valid) sessions."""
+        # Store as naive UTC (same as model)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        
+        return await self.db.scalar(
+            select(func.count()).select_from(SessionModel).where(
+                SessionModel.expires_at > now,
+                SessionModel.revoked_at.is_(None),
+            )
+        )
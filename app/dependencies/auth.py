@@ -2,10 +2,18 @@
 
 Dependencies extract user_id from validated F2.3 auth headers.
 No JWT claims parsing - user_id comes from X-VERITTA-USER-ID header.
+get_user_from_session also checks the F2.3 session on the same backend as
+the gate chain (app.session_backend), so a session revoked on any worker is
+refused here too.
 """
 
+import asyncio
+
 from fastapi import HTTPException, Request
 
+from app.session_backend import get_session_backend
+from app.session_store import sha256_str
+
 
 async def get_user_from_gate(request: Request) -> str:
     """
@@ -40,3 +48,49 @@ async def get_user_from_gate(request: Request) -> str:
         )
     
     return user_id
+
+
+def _session_denied(request: Request, status_code: int, message: str, reason_code: str) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "error": "unauthorized" if status_code == 401 else "forbidden",
+            "message": message,
+            "trace_id": getattr(request.state, "trace_id", "unknown"),
+            "reason_codes": [reason_code],
+        }
+    )
+
+
+async def get_user_from_session(request: Request) -> str:
+    """
+    user_id of a live F2.3 session (preferences routes).
+
+    Same checks as G5 in app.gates_f23, against get_session_backend(): the
+    session exists, is neither expired nor revoked, and is bound to this
+    user_id and Bearer key. The lookup runs in a worker thread (the tiered
+    backend may read SQL).
+
+    Raises:
+        HTTPException 401: missing Bearer / session, unknown, expired or revoked session
+        HTTPException 403: session bound to another user or API key
+        HTTPException 500: gate bypass (see get_user_from_gate)
+    """
+    user_id = await get_user_from_gate(request)
+    auth_header = request.headers.get("Authorization", "").strip()
+    session_id = request.headers.get("X-VERITTA-SESSION-ID", "").strip()
+    if not auth_header.startswith("Bearer ") or not session_id:
+        raise _session_denied(request, 401, "F2.3 session required", "G5_session_not_found")
+
+    backend = get_session_backend()
+    record = await asyncio.to_thread(backend.get, session_id)
+    if record is None:
+        raise _session_denied(request, 401, "Session not found", "G5_session_not_found")
+    if not record.is_valid():
+        raise _session_denied(request, 401, "Session expired or revoked", "G5_session_expired")
+    if record.user_id != user_id:
+        raise _session_denied(request, 403, "Session user ID mismatch", "G5_session_user_mismatch")
+    if record.api_key_sha256 != sha256_str(auth_header[7:]):
+        raise _session_denied(request, 403, "Session API key mismatch", "G5_session_key_mismatch")
+    backend.touch(session_id)
+    return user_id
@@ -3,11 +3,14 @@ Canonical digest computation for privacy-first audit logging.
 
 Rule: JSON-serializable payloads get SHA256 digest; non-JSON get None.
 No fallback to str() representation (privacy by design).
+Streamed outputs are hashed incrementally (StreamingJSONDigest), same digest.
 """
 
 import hashlib
 import json
-from typing import Any, Optional
+from typing import Any, Dict, Optional
+
+from app.canonical_json import canonical_bytes, canonical_sha256
 
 
 def sha256_json_or_none(obj: Any) -> Optional[str]:
@@ -25,16 +28,79 @@ def sha256_json_or_none(obj: Any) -> Optional[str]:
         - If successful, return hex digest
         - If TypeError or ValueError (non-JSON-serializable), return None
         - NO FALLBACK to str() representation (privacy by design)
+        - Encoded/hashed at most once per request (app.canonical_json scope cache)
     """
     try:
-        canonical = json.dumps(
-            obj,
-            sort_keys=True,
-            separators=(",", ":"),
-            ensure_ascii=False,
-        )
-        blob = canonical.encode("utf-8")
-        return hashlib.sha256(blob).hexdigest()
+        return canonical_sha256(obj)
     except (TypeError, ValueError):
         # Non-JSON-serializable: return None (privacy-first)
         return None
+
+
+class StreamingJSONDigest:
+    """
+    Running SHA256 of canonical JSON for an output whose `field` string is
+    produced in chunks (streamed LLM text).
+
+    Equals sha256_json_or_none(output) of the assembled output without
+    holding the streamed text:
+    - fields sorting before `field` (e.g. "model" < "text") must be known
+      before the first chunk: they form the hashed prefix
+    - fields sorting after it (e.g. "usage") are kept until digest()
+    - each chunk is hashed as its canonical JSON string escape (P1.4:
+      ensure_ascii=False, UTF-8)
+    """
+
+    def __init__(self, field: str):
+        self._field = field
+        self._hash = hashlib.sha256()
+        self._leading: Dict[str, Any] = {}
+        self._trailing: Dict[str, Any] = {}
+        self._started = False
+        self._valid = True
+
+    def add_fields(self, fields: Dict[str, Any]) -> None:
+        """Record non-streamed output fields."""
+        for key, value in fields.items():
+            if key < self._field:
+                if self._started:
+                    raise ValueError(f"output field {key!r} must precede the streamed {self._field!r}")
+                self._leading[key] = value
+            elif key > self._field:
+                self._trailing[key] = value
+            else:
+                raise ValueError(f"output field {key!r} is the streamed field")
+
+    def update(self, text: str) -> None:
+        """Hash the next chunk of the streamed field."""
+        if not self._started:
+            self._start()
+        if self._valid:
+            try:
+                self._hash.update(json.dumps(text, ensure_ascii=False)[1:-1].encode("utf-8"))
+            except (TypeError, ValueError):
+                self._valid = False
+
+    def digest(self) -> Optional[str]:
+        """Hex digest of the complete output, or None if not JSON-serializable."""
+        if not self._started:
+            self._start()
+        if not self._valid:
+            return None
+        try:
+            # {"<field>":"<suffix...>: everything after the streamed string's opening quote
+            opening = len(canonical_bytes({self._field: ""})) - 2
+            suffix = canonical_bytes({self._field: "", **self._trailing})[opening:]
+        except (TypeError, ValueError):
+            return None
+        final = self._hash.copy()
+        final.update(suffix)
+        return final.hexdigest()
+
+    def _start(self) -> None:
+        self._started = True
+        try:
+            # ...,"<field>":"}  minus the closing quote and brace
+            self._hash.update(canonical_bytes({**self._leading, self._field: ""})[:-2])
+        except (TypeError, ValueError):
+            self._valid = False
@@ -0,0 +1,424 @@
+"""
+EXECUTOR POOL — long-lived, bounded pool for executor invocation.
+
+Replaces the ThreadPoolExecutor(max_workers=1) created per action in
+run_agentic_action (thread creation + shutdown per request, orphan threads
+on timeout).
+
+- One shared set of worker threads (VERITTA_EXECUTOR_POOL_WORKERS, default 32)
+- Per-executor lanes: at most `max_concurrency` calls of one executor run at
+  once (ExecutorLimits.max_concurrency, else VERITTA_EXECUTOR_POOL_PER_EXECUTOR,
+  default 8), extra calls wait in the lane queue (VERITTA_EXECUTOR_POOL_MAX_QUEUE,
+  default 64)
+- Saturation (VERITTA_EXECUTOR_POOL_SATURATION):
+    queue (default): wait for a slot while the lane queue has room
+    reject: no free slot => PoolSaturated immediately
+  A full lane queue always rejects (bounded memory). The pipeline maps
+  PoolSaturated to BLOCKED / EXECUTOR_SATURATED.
+- Cooperative timeout: the caller stops waiting and cancels the call; a call
+  still queued never runs, a running call sees cancellation_requested() and
+  keeps its lane slot until it returns (a hung executor can only exhaust its
+  own lane, never the pool). No pool is created or torn down per timeout.
+- Metrics: queue depth, running, wait time, rejections, timeouts per
+  executor (Prometheus, exposed on /metrics) + stats() snapshot.
+
+Async (run_agentic_action_async):
+- arun_sync: sync executor offloaded to the worker threads, awaited with
+  asyncio.wait_for (same lanes and policy as run)
+- arun: AsyncExecutor.aexecute awaited on the event loop; per-loop lanes
+  (asyncio.Semaphore, ExecutorLimits.max_concurrency else
+  VERITTA_EXECUTOR_POOL_ASYNC_PER_EXECUTOR, default 256: awaiting I/O costs
+  no thread), same policy; timeout cancels the coroutine (CancelledError at
+  its next await)
+- aslot: holds an async lane slot for the lifetime of a streamed call
+  (StreamingExecutor.astream, /process/stream)
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 32
+DEFAULT_PER_EXECUTOR = 8
+DEFAULT_ASYNC_PER_EXECUTOR = 256
+DEFAULT_MAX_QUEUE = 64
+SATURATION_POLICIES = ("queue", "reject")
+
+executor_pool_queue_depth = Gauge(
+    "executor_pool_queue_depth",
+    "Executor calls waiting for a lane slot",
+    labelnames=["executor_id"],
+)
+executor_pool_running = Gauge(
+    "executor_pool_running",
+    "Executor calls holding a lane slot (includes timed-out calls still running)",
+    labelnames=["executor_id"],
+)
+executor_pool_wait_seconds = Histogram(
+    "executor_pool_wait_seconds",
+    "Time from submit to start of executor call",
+    labelnames=["executor_id"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+executor_pool_rejected_total = Counter(
+    "executor_pool_rejected_total",
+    "Executor calls rejected by saturation policy",
+    labelnames=["executor_id"],
+)
+executor_pool_timeouts_total = Counter(
+    "executor_pool_timeouts_total",
+    "Executor calls abandoned by caller timeout",
+    labelnames=["executor_id"],
+)
+
+# Set in the worker while a pooled call runs
+_current_call: contextvars.ContextVar[Optional["PooledCall"]] = contextvars.ContextVar(
+    "executor_pool_current_call", default=None
+)
+
+
+class PoolSaturated(Exception):
+    """No lane slot and no queue room for this executor."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def get_saturation_policy() -> str:
+    policy = os.getenv("VERITTA_EXECUTOR_POOL_SATURATION", "queue").strip().lower()
+    if policy not in SATURATION_POLICIES:
+        logger.warning("Unknown VERITTA_EXECUTOR_POOL_SATURATION=%r, using queue", policy)
+        return "queue"
+    return policy
+
+
+def cancellation_requested() -> bool:
+    """True inside an executor whose caller already gave up (timeout)."""
+    call = _current_call.get()
+    return call is not None and call.cancel_event.is_set()
+
+
+class PooledCall(Future):
+    """Future for one executor call (runs in the submitter's context copy)."""
+
+    def __init__(self, lane: "_Lane", fn: Callable[..., Any], args: tuple):
+        super().__init__()
+        self.lane = lane
+        self.fn = fn
+        self.args = args
+        self.context = contextvars.copy_context()
+        self.cancel_event = threading.Event()
+        self.enqueued_at = time.perf_counter()
+
+    def abandon(self) -> None:
+        """Caller stopped waiting: drop if queued, signal if running."""
+        self.cancel_event.set()
+        self.cancel()
+
+
+class _Lane:
+    __slots__ = ("executor_id", "limit", "running", "pending")
+
+    def __init__(self, executor_id: str, limit: int):
+        self.executor_id = executor_id
+        self.limit = limit
+        self.running = 0
+        self.pending: Deque[PooledCall] = deque()
+
+
+class _AsyncLane:
+    __slots__ = ("executor_id", "limit", "semaphore", "running", "waiting")
+
+    def __init__(self, executor_id: str, limit: int):
+        self.executor_id = executor_id
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.running = 0
+        self.waiting = 0
+
+
+class ExecutorPool:
+    """Shared worker threads + per-executor concurrency lanes."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        per_executor: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        saturation_policy: Optional[str] = None,
+        per_executor_async: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or _env_int("VERITTA_EXECUTOR_POOL_WORKERS", DEFAULT_WORKERS)
+        self.per_executor = per_executor or _env_int("VERITTA_EXECUTOR_POOL_PER_EXECUTOR", DEFAULT_PER_EXECUTOR)
+        self.per_executor_async = per_executor_async or _env_int(
+            "VERITTA_EXECUTOR_POOL_ASYNC_PER_EXECUTOR", DEFAULT_ASYNC_PER_EXECUTOR
+        )
+        self.max_queue = max_queue or _env_int("VERITTA_EXECUTOR_POOL_MAX_QUEUE", DEFAULT_MAX_QUEUE)
+        self.saturation_policy = saturation_policy or get_saturation_policy()
+        self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="executor-pool")
+        self._lock = threading.Lock()
+        self._lanes: Dict[str, _Lane] = {}
+        # event loop -> async lanes (asyncio primitives are bound to one loop)
+        self._async_lanes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _AsyncLane]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._rejected = 0
+        self._timeouts = 0
+
+    def _lane_limit(self, limits: Any, default: int) -> int:
+        limit = getattr(limits, "max_concurrency", None)
+        # Mocks / missing attribute => pool default
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit <= 0:
+            return default
+        return limit
+
+    def _lane(self, executor_id: str, limits: Any) -> _Lane:
+        lane = self._lanes.get(executor_id)
+        if lane is None:
+            lane = self._lanes[executor_id] = _Lane(executor_id, self._lane_limit(limits, self.per_executor))
+        return lane
+
+    def _reject(self, executor_id: str, running: int, queued: int) -> PoolSaturated:
+        self._rejected += 1
+        executor_pool_rejected_total.labels(executor_id).inc()
+        return PoolSaturated(f"executor {executor_id}: {running} running, {queued} queued")
+
+    def _timed_out(self, executor_id: str) -> None:
+        with self._lock:
+            self._timeouts += 1
+        executor_pool_timeouts_total.labels(executor_id).inc()
+
+    def submit(self, executor_id: str, limits: Any, fn: Callable[..., Any], *args: Any) -> PooledCall:
+        """Schedule fn(*args) in executor_id's lane; raises PoolSaturated."""
+        executor_id = str(executor_id)
+        with self._lock:
+            lane = self._lane(executor_id, limits)
+            call = PooledCall(lane, fn, args)
+            if lane.running < lane.limit:
+                lane.running += 1
+                executor_pool_running.labels(executor_id).inc()
+                dispatch = True
+            elif self.saturation_policy == "reject" or len(lane.pending) >= self.max_queue:
+                raise self._reject(executor_id, lane.running, len(lane.pending))
+            else:
+                lane.pending.append(call)
+                executor_pool_queue_depth.labels(executor_id).inc()
+                dispatch = False
+        if dispatch:
+            self._threads.submit(self._run, call)
+        return call
+
+    def run(self, executor_id: str, limits: Any, fn: Callable[..., Any], *args: Any, timeout: float) -> Any:
+        """submit + wait; TimeoutError after `timeout` seconds (call abandoned)."""
+        call = self.submit(executor_id, limits, fn, *args)
+        try:
+            return call.result(timeout=timeout)
+        except FuturesTimeoutError:
+            # Distinct from the builtin TimeoutError before Python 3.11
+            if not call.done():
+                call.abandon()
+                self._timed_out(call.lane.executor_id)
+            raise
+
+    async def arun_sync(self, executor_id: str, limits: Any, fn: Callable[..., Any], *args: Any, timeout: float) -> Any:
+        """run() for the event loop: awaits the pooled call with asyncio.wait_for."""
+        call = self.submit(executor_id, limits, fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(call), timeout)
+        except asyncio.TimeoutError:
+            # wait_for cancelled the wrapper (and a still-queued call with it)
+            if call.cancelled() or not call.done():
+                call.abandon()
+                self._timed_out(call.lane.executor_id)
+            raise
+
+    def _async_lane(self, executor_id: str, limits: Any) -> _AsyncLane:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            lanes = self._async_lanes.get(loop)
+            if lanes is None:
+                lanes = self._async_lanes[loop] = {}
+            lane = lanes.get(executor_id)
+            if lane is None:
+                lane = lanes[executor_id] = _AsyncLane(executor_id, self._lane_limit(limits, self.per_executor_async))
+        return lane
+
+    def _check_async_capacity(self, executor_id: str, lane: _AsyncLane) -> None:
+        if lane.semaphore.locked() and (self.saturation_policy == "reject" or lane.waiting >= self.max_queue):
+            with self._lock:
+                raise self._reject(executor_id, lane.running, lane.waiting)
+
+    async def _acquire_async(self, lane: _AsyncLane, enqueued_at: float) -> None:
+        executor_id = lane.executor_id
+        lane.waiting += 1
+        executor_pool_queue_depth.labels(executor_id).inc()
+        try:
+            await lane.semaphore.acquire()
+        finally:
+            lane.waiting -= 1
+            executor_pool_queue_depth.labels(executor_id).dec()
+        lane.running += 1
+        executor_pool_running.labels(executor_id).inc()
+        executor_pool_wait_seconds.labels(executor_id).observe(time.perf_counter() - enqueued_at)
+
+    def _release_async(self, lane: _AsyncLane) -> None:
+        lane.running -= 1
+        executor_pool_running.labels(lane.executor_id).dec()
+        lane.semaphore.release()
+
+    async def arun(self, executor_id: str, limits: Any, afn: Callable[..., Any], *args: Any, timeout: float) -> Any:
+        """Await afn(*args) on the event loop within executor_id's async lane."""
+        executor_id = str(executor_id)
+        lane = self._async_lane(executor_id, limits)
+        self._check_async_capacity(executor_id, lane)
+
+        enqueued_at = time.perf_counter()
+        finished = False
+
+        async def call() -> Any:
+            nonlocal finished
+            await self._acquire_async(lane, enqueued_at)
+            try:
+                result = await afn(*args)
+                finished = True
+                return result
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                finished = True
+                raise
+            finally:
+                self._release_async(lane)
+
+        try:
+            return await asyncio.wait_for(call(), timeout)
+        except asyncio.TimeoutError:
+            if not finished:
+                self._timed_out(executor_id)
+            raise
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, executor_id: str, limits: Any, *, timeout: float) -> AsyncIterator[None]:
+        """Hold one slot of executor_id's async lane (streaming executors).
+
+        Same policy as arun; only the wait for the slot is bounded by
+        `timeout` (the stream itself is timed per chunk by the caller).
+        """
+        executor_id = str(executor_id)
+        lane = self._async_lane(executor_id, limits)
+        self._check_async_capacity(executor_id, lane)
+        try:
+            await asyncio.wait_for(self._acquire_async(lane, time.perf_counter()), timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(executor_id)
+            raise
+        try:
+            yield
+        finally:
+            self._release_async(lane)
+
+    def _run(self, call: PooledCall) -> None:
+        lane = call.lane
+        try:
+            if call.set_running_or_notify_cancel():
+                executor_pool_wait_seconds.labels(lane.executor_id).observe(time.perf_counter() - call.enqueued_at)
+                try:
+                    result = call.context.run(self._invoke, call)
+                except BaseException as exc:
+                    call.set_exception(exc)
+                else:
+                    call.set_result(result)
+        finally:
+            self._release(lane)
+
+    @staticmethod
+    def _invoke(call: PooledCall) -> Any:
+        _current_call.set(call)
+        return call.fn(*call.args)
+
+    def _release(self, lane: _Lane) -> None:
+        """Hand the slot to the next live queued call, else free it."""
+        with self._lock:
+            while lane.pending:
+                nxt = lane.pending.popleft()
+                executor_pool_queue_depth.labels(lane.executor_id).dec()
+                if not nxt.cancelled():
+                    break
+            else:
+                lane.running -= 1
+                executor_pool_running.labels(lane.executor_id).dec()
+                return
+        self._threads.submit(self._run, nxt)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "saturation_policy": self.saturation_policy,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "lanes": {
+                    eid: {"limit": lane.limit, "running": lane.running, "queued": len(lane.pending)}
+                    for eid, lane in self._lanes.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            for lane in self._lanes.values():
+                while lane.pending:
+                    lane.pending.popleft().cancel()
+                    executor_pool_queue_depth.labels(lane.executor_id).dec()
+        self._threads.shutdown(wait=wait)
+
+
+# Global instance (singleton, created on first executor call)
+_pool: Optional[ExecutorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_executor_pool() -> ExecutorPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ExecutorPool()
+    return _pool
+
+
+def shutdown_executor_pool(wait: bool = False) -> None:
+    """Stop the global pool (FastAPI lifespan shutdown); next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+
+def _reset_after_fork() -> None:
+    # Worker threads do not survive fork(); child starts its own pool on first call
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -5,7 +5,11 @@ Executors MAY raise exceptions; the pipeline maps them to FAILED status.
 """
 from __future__ import annotations
 
-from typing import Any, List, Optional, Protocol
+import contextvars
+import inspect
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Protocol
 
 from app.action_contracts import ActionRequest
 
@@ -17,6 +21,8 @@ class ExecutorLimits:
     - max_payload_bytes: max size of canonical JSON payload
     - max_depth: max nesting depth of payload structures
     - max_list_items: max items in any list within payload
+    - max_concurrency: max concurrent calls in the executor pool
+      (None: VERITTA_EXECUTOR_POOL_PER_EXECUTOR)
     """
 
     def __init__(
@@ -25,11 +31,13 @@ class ExecutorLimits:
         max_payload_bytes: int,
         max_depth: int,
         max_list_items: int,
+        max_concurrency: Optional[int] = None,
     ):
         self.timeout_ms = timeout_ms
         self.max_payload_bytes = max_payload_bytes
         self.max_depth = max_depth
         self.max_list_items = max_list_items
+        self.max_concurrency = max_concurrency
 
 
 class Executor(Protocol):
@@ -65,3 +73,87 @@ class Executor(Protocol):
 
         """
         ...
+
+
+class AsyncExecutor(Executor, Protocol):
+    """Optional async extension of the executor contract.
+
+    Executors doing I/O (e.g. LLM calls) MAY implement aexecute(); the async
+    pipeline (run_agentic_action_async) awaits it on the event loop instead
+    of offloading execute() to the executor pool. execute() stays mandatory
+    for the sync pipeline.
+    """
+
+    async def aexecute(self, req: ActionRequest) -> Any:
+        """Async equivalent of execute() (same output, same exceptions)."""
+        ...
+
+
+def is_async_executor(executor: Any) -> bool:
+    """True if executor implements AsyncExecutor.aexecute as a coroutine function."""
+    return inspect.iscoroutinefunction(getattr(executor, "aexecute", None))
+
+
+@dataclass(frozen=True)
+class OutputChunk:
+    """One piece of a streamed executor output.
+
+    - text: next chunk of the streamed string field (StreamingExecutor.stream_field)
+    - fields: other output fields, sent once (e.g. {"model": ...} first,
+      {"usage": ...} last); fields sorting before stream_field must arrive
+      before the first text (incremental output_digest)
+    """
+
+    text: str = ""
+    fields: Optional[Dict[str, Any]] = None
+
+
+class StreamingExecutor(Executor, Protocol):
+    """Optional streaming extension of the executor contract.
+
+    astream() yields the output as OutputChunk pieces; assembled, they equal
+    execute()'s output ({stream_field: "".join(texts), **fields}). Used by
+    run_agentic_action_stream (/process/stream); output_digest is computed
+    incrementally over the same canonical form.
+    """
+
+    stream_field: str
+
+    def astream(self, req: ActionRequest) -> AsyncIterator[OutputChunk]:
+        """Async generator of OutputChunk (same exceptions as execute())."""
+        ...
+
+
+def is_streaming_executor(executor: Any) -> bool:
+    """True if executor implements StreamingExecutor.astream as an async generator."""
+    return inspect.isasyncgenfunction(getattr(executor, "astream", None))
+
+
+# Informational reason codes of the running executor call (see execution_reasons)
+_execution_reasons: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "execution_reasons", default=None
+)
+
+
+@contextmanager
+def execution_reasons(reasons: List[str]) -> Iterator[List[str]]:
+    """Collect reason codes added by the executor call made inside the block.
+
+    The pipeline drivers wrap each executor invocation; the list is shared
+    with pool threads and tasks (they run in a copy of this context).
+    """
+    token = _execution_reasons.set(reasons)
+    try:
+        yield reasons
+    finally:
+        _execution_reasons.reset(token)
+
+
+def add_execution_reason(code: str) -> None:
+    """Annotate the SUCCESS ActionResult of the running execution (e.g. LLM_CACHE_HIT).
+
+    No-op outside the pipeline (direct execute() calls).
+    """
+    reasons = _execution_reasons.get()
+    if reasons is not None and code not in reasons:
+        reasons.append(code)
@@ -1,23 +1,20 @@
 from __future__ import annotations
 
-import json
 from typing import Any, Dict, List, Optional
 
 from packaging.version import Version, InvalidVersion
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from app.action_contracts import ActionRequest
+from app.canonical_json import canonical_bytes
 from app.digests import sha256_json_or_none
 from app.executors.base import Executor, ExecutorLimits
 from app.executors.registry import get_executor
 
 
-def _canonical_json(obj: Any) -> str:
-    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-
-
 def _bytes_of(obj: Any) -> int:
-    return len(_canonical_json(obj).encode("utf-8"))
+    # Request-scoped cache: objects already encoded by the pipeline are not re-encoded
+    return len(canonical_bytes(obj))
 
 
 def _sanitize(obj: Any, strip_keys: List[str]) -> Any:
@@ -76,8 +73,8 @@ class CompositeExecutorV1(Executor):
         try:
             plan_obj = req.payload.get("plan")
             plan_digest = sha256_json_or_none(plan_obj) or ""
-            declared_plan_canonical = _canonical_json(plan_obj)
-            declared_input_canonical = _canonical_json(req.payload.get("input"))
+            declared_plan_bytes = _bytes_of(plan_obj)
+            declared_input_bytes = _bytes_of(req.payload.get("input"))
         except Exception:
             raise ValueError("PLAN_VALIDATION")
 
@@ -91,7 +88,7 @@ class CompositeExecutorV1(Executor):
             max_llm_calls = payload.limits.get("max_llm_calls")
 
         # Validate declared sizes
-        declared_bytes = len((declared_plan_canonical + declared_input_canonical).encode("utf-8"))
+        declared_bytes = declared_plan_bytes + declared_input_bytes
         if declared_bytes > max_total_payload_bytes:
             raise ValueError("PLAN_VALIDATION")
 
@@ -121,7 +118,7 @@ class CompositeExecutorV1(Executor):
         # Validate each step input serializability and min_executor_version BEFORE running any step
         for step in steps:
             try:
-                _ = _canonical_json(step.input)
+                _ = _bytes_of(step.input)
             except Exception:
                 raise ValueError("PLAN_VALIDATION")
 
@@ -180,12 +177,11 @@ class CompositeExecutorV1(Executor):
 
             # Check serializability
             try:
-                canonical = _canonical_json(step_output_sanitized)
+                output_bytes = _bytes_of(step_output_sanitized)
             except Exception:
                 raise RuntimeError(f"COMPOSITE_STEP_FAILED:{step.name}")
 
             output_digest = sha256_json_or_none(step_output_sanitized)
-            output_bytes = len(canonical.encode("utf-8"))
 
             # Merge semantics
             if step.merge == "replace":
@@ -232,11 +228,10 @@ class CompositeExecutorV1(Executor):
 
         # Final result digest/bytes
         try:
-            result_canonical = _canonical_json(current_payload)
+            result_bytes = _bytes_of(current_payload)
         except Exception:
             raise RuntimeError("COMPOSITE_STEP_FAILED:finalization")
         result_digest = sha256_json_or_none(current_payload)
-        result_bytes = len(result_canonical.encode("utf-8"))
 
         composite_out = {
             "plan": {"digest": plan_digest or "", "steps_declared": len(steps), "llm_calls_declared": declared_llm_calls},
@@ -1,19 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import logging
 
 logging.basicConfig(level=logging.ERROR)
 
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.action_contracts import ActionRequest
-from app.executors.base import Executor, ExecutorLimits
-from app.llm.client import LLMClient
-from app.llm.factory import create_llm_client
+from app.executors.base import Executor, ExecutorLimits, OutputChunk, add_execution_reason
+from app.llm.client import LLMClient, StreamChunk
+from app.llm.factory import create_async_llm_client, create_llm_client
 from app.llm.policy import Policy
-from app.llm.retry import with_retry
+from app.llm.response_cache import REASON_LLM_CACHE_HIT, get_llm_response_cache, llm_cache_key
+from app.llm.retry import with_retry, with_retry_async
+from app.llm.single_flight import REASON_LLM_COALESCED, get_single_flight
 from app.llm.circuit_breaker_singleton import get_circuit_breaker
 from app.tracing import observed_span
 
@@ -29,6 +33,7 @@ class LLMExecutorV1(Executor):
     def __init__(self, *, client: LLMClient | None = None):
         self.executor_id = "llm_executor_v1"
         self.version = "1.0.0"
+        self.stream_field = "text"
         self.capabilities: list[str] = []
         self.limits = ExecutorLimits(
             timeout_ms=int(Policy.TIMEOUT_S * 1000),
@@ -38,6 +43,8 @@ class LLMExecutorV1(Executor):
         )
         # Usar factory se client não injetado (respeita LLM_PROVIDER env)
         self._client = client if client is not None else create_llm_client()
+        # Pooled async client (shared httpx.AsyncClient per provider) for aexecute
+        self._async_client = client if client is not None else create_async_llm_client()
         # F9.9-C: Circuit breaker singleton
         self._circuit_breaker = get_circuit_breaker()
 
@@ -53,43 +60,225 @@ class LLMExecutorV1(Executor):
                 "trace_id": getattr(req, "trace_id", "unknown"),
             }
         ):
-            # Strict payload validation
-            try:
-                p = _Payload.model_validate(req.payload)
-            except Exception as e:
-                raise ValueError("INVALID_PAYLOAD") from e
-
-            # Policy validation (hard governance)
-            try:
-                Policy.validate(prompt=p.prompt, model=p.model, max_tokens=p.max_tokens, timeout_s=Policy.TIMEOUT_S)
-            except ValueError:
-                raise ValueError("POLICY_VIOLATION")
-
-            # F9.9-C: Call client with retry + circuit breaker
-            try:
-                # Circuit breaker wrapper
-                resp = self._circuit_breaker.call(
-                    self._call_llm_with_retry,
-                    prompt=p.prompt,
-                    model=p.model,
-                    max_tokens=p.max_tokens,
-                )
-            except TimeoutError:
-                raise
-            except RuntimeError:
-                raise
-            except Exception as e:
-                # Any unexpected errors should surface as runtime error
-                print(f"[LLM_EXECUTOR_ERROR] type={type(e).__name__} msg={str(e)[:200]}", flush=True)
-                import traceback
-                print("".join(traceback.format_exc().splitlines(True)[-20:]), flush=True)
-                logger = logging.getLogger(__name__)
-                logger.info(f"LLM provider error: {type(e).__name__}: {str(e)}")
-                print(f"LLM provider error: {type(e).__name__}: {str(e)}")
-                raise RuntimeError("PROVIDER_ERROR") from e
-
-            # Return only the allowed fields
-            return {"text": resp.get("text"), "model": resp.get("model"), "usage": resp.get("usage")}
+            p = self._validate(req)
+
+            # Governed response cache (temperature 0.0: deterministic reuse)
+            key = self._request_key(self._client, p)
+            resp = self._cache_get(key)
+            if resp is not None:
+                return resp
+
+            # Single-flight: identical in-flight generations share one provider call
+            flights = get_single_flight()
+            if flights is None:
+                return self._generate(p, key)
+            output, coalesced = flights.call(key, lambda: self._generate(p, key), label=p.model)
+            if coalesced:
+                add_execution_reason(REASON_LLM_COALESCED)
+            return output
+
+    def _generate(self, p: _Payload, key: Optional[str]) -> Dict:
+        logger = logging.getLogger(__name__)
+        # F9.9-C: Call client with retry + circuit breaker
+        try:
+            # Circuit breaker wrapper
+            resp = self._circuit_breaker.call(
+                self._call_llm_with_retry,
+                prompt=p.prompt,
+                model=p.model,
+                max_tokens=p.max_tokens,
+            )
+        except TimeoutError:
+            raise
+        except RuntimeError:
+            raise
+        except Exception as e:
+            # Any unexpected errors should surface as runtime error
+            print(f"[LLM_EXECUTOR_ERROR] type={type(e).__name__} msg={str(e)[:200]}", flush=True)
+            import traceback
+            print("".join(traceback.format_exc().splitlines(True)[-20:]), flush=True)
+            logger.info(f"LLM provider error: {type(e).__name__}: {str(e)}")
+            print(f"LLM provider error: {type(e).__name__}: {str(e)}")
+            raise RuntimeError("PROVIDER_ERROR") from e
+
+        # Return only the allowed fields
+        output = {"text": resp.get("text"), "model": resp.get("model"), "usage": resp.get("usage")}
+        self._cache_store(key, output)
+        return output
+
+    async def aexecute(self, req: ActionRequest) -> Any:
+        """Async execute (AsyncExecutor): awaited by run_agentic_action_async.
+
+        Same validation, retry and circuit breaker as execute(); the provider
+        call goes through the pooled async client (generate_async).
+        """
+        with observed_span(
+            f"executor.{self.executor_id}",
+            attributes={
+                "executor_name": self.executor_id,
+                "action": getattr(req, "action", "unknown"),
+                "trace_id": getattr(req, "trace_id", "unknown"),
+            }
+        ):
+            p = self._validate(req)
+
+            key = self._request_key(self._async_client, p)
+            resp = self._cache_get(key)
+            if resp is not None:
+                return resp
+
+            flights = get_single_flight()
+            if flights is None:
+                return await self._agenerate(p, key)
+            output, coalesced = await flights.acall(key, lambda: self._agenerate(p, key), label=p.model)
+            if coalesced:
+                add_execution_reason(REASON_LLM_COALESCED)
+            return output
+
+    async def _agenerate(self, p: _Payload, key: Optional[str]) -> Dict:
+        try:
+            resp = await self._circuit_breaker.acall(
+                self._call_llm_with_retry_async,
+                prompt=p.prompt,
+                model=p.model,
+                max_tokens=p.max_tokens,
+            )
+        except TimeoutError:
+            raise
+        except RuntimeError:
+            raise
+        except Exception as e:
+            logging.getLogger(__name__).info(f"LLM provider error: {type(e).__name__}: {str(e)}")
+            raise RuntimeError("PROVIDER_ERROR") from e
+
+        output = {"text": resp.get("text"), "model": resp.get("model"), "usage": resp.get("usage")}
+        self._cache_store(key, output)
+        return output
+
+    async def astream(self, req: ActionRequest) -> AsyncIterator[OutputChunk]:
+        """Streamed execute (StreamingExecutor): /process/stream.
+
+        Yields {"model"} first (the client-reported model, as execute()),
+        then text chunks, then {"usage"}: assembled, the same output as
+        execute(). Same validation and circuit breaker; retry only until the
+        first chunk (text already sent cannot be replayed).
+        """
+        with observed_span(
+            f"executor.{self.executor_id}",
+            attributes={
+                "executor_name": self.executor_id,
+                "action": getattr(req, "action", "unknown"),
+                "trace_id": getattr(req, "trace_id", "unknown"),
+            }
+        ):
+            p = self._validate(req)
+
+            stream = None
+            usage = None
+            # Failure also on cancellation (pipeline idle timeout: provider hung)
+            async with self._circuit_breaker.guard():
+                try:
+                    stream, first = await self._open_stream_with_retry(
+                        prompt=p.prompt, model=p.model, max_tokens=p.max_tokens
+                    )
+                    # "model" sorts before "text": sent before any text
+                    model = first.model if first is not None and first.model else p.model
+                    yield OutputChunk(fields={"model": model})
+                    chunk = first
+                    while chunk is not None:
+                        if chunk.usage is not None:
+                            usage = chunk.usage
+                        if chunk.text:
+                            yield OutputChunk(text=chunk.text)
+                        chunk = await anext(stream, None)
+                except (TimeoutError, RuntimeError):
+                    raise
+                except Exception as e:
+                    logging.getLogger(__name__).info(f"LLM provider error: {type(e).__name__}: {str(e)}")
+                    raise RuntimeError("PROVIDER_ERROR") from e
+                finally:
+                    if stream is not None:
+                        await stream.aclose()
+
+            yield OutputChunk(fields={"usage": usage})
+
+    @with_retry_async(max_retries=2)
+    async def _open_stream_with_retry(
+        self, *, prompt: str, model: str, max_tokens: int
+    ) -> Tuple[AsyncIterator[StreamChunk], Optional[StreamChunk]]:
+        """Start the provider stream and wait for its first chunk (retryable until then)."""
+        stream = self._async_client.generate_stream(
+            prompt=prompt,
+            model=model,
+            temperature=Policy.TEMPERATURE,
+            max_tokens=max_tokens,
+            timeout_s=Policy.TIMEOUT_S,
+        )
+        try:
+            first = await anext(stream, None)
+        except BaseException:
+            await stream.aclose()
+            raise
+        return stream, first
+
+    @staticmethod
+    def _request_key(client: Any, p: _Payload) -> Optional[str]:
+        """Canonical request digest (cache + single-flight key); None: never shared."""
+        provider = getattr(client, "provider", None)
+        if not isinstance(provider, str):
+            # Client without a declared provider (test doubles): never cached/coalesced
+            return None
+        return llm_cache_key(
+            provider=provider,
+            model=p.model,
+            prompt=p.prompt,
+            max_tokens=p.max_tokens,
+            temperature=Policy.TEMPERATURE,
+        )
+
+    @staticmethod
+    def _cache_get(key: Optional[str]) -> Optional[Dict]:
+        cache = get_llm_response_cache()
+        output = cache.get(key) if cache is not None else None
+        if output is not None:
+            add_execution_reason(REASON_LLM_CACHE_HIT)
+        return output
+
+    @staticmethod
+    def _cache_store(key: Optional[str], output: Dict) -> None:
+        cache = get_llm_response_cache()
+        if cache is not None:
+            cache.put(key, output)
+
+    @staticmethod
+    def _validate(req: ActionRequest) -> _Payload:
+        # Strict payload validation
+        try:
+            p = _Payload.model_validate(req.payload)
+        except Exception as e:
+            raise ValueError("INVALID_PAYLOAD") from e
+
+        # Policy validation (hard governance)
+        try:
+            Policy.validate(prompt=p.prompt, model=p.model, max_tokens=p.max_tokens, timeout_s=Policy.TIMEOUT_S)
+        except ValueError:
+            raise ValueError("POLICY_VIOLATION")
+        return p
+
+    @with_retry_async(max_retries=2)
+    async def _call_llm_with_retry_async(self, *, prompt: str, model: str, max_tokens: int) -> Dict:
+        """Async _call_llm_with_retry (pooled client; sync clients run in a thread)."""
+        kwargs = dict(
+            prompt=prompt,
+            model=model,
+            temperature=Policy.TEMPERATURE,
+            max_tokens=max_tokens,
+            timeout_s=Policy.TIMEOUT_S,
+        )
+        generate_async = getattr(self._async_client, "generate_async", None)
+        if inspect.iscoroutinefunction(generate_async):
+            return await generate_async(**kwargs)
+        return await asyncio.to_thread(self._async_client.generate, **kwargs)
 
     @with_retry(max_retries=2)
     def _call_llm_with_retry(self, *, prompt: str, model: str, max_tokens: int) -> Dict:
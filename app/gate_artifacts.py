@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.gate_profiles import DEFAULT_PROFILES, PolicyProfile
 
@@ -44,9 +44,35 @@ def export_profiles_json() -> str:
     return json.dumps(data, sort_keys=True, separators=(",", ":"))
 
 
+# Cache do fingerprint: (id do catálogo, versão do catálogo, sha256)
+_fingerprint_cache: Optional[Tuple[int, int, str]] = None
+
+
+def _compute_profiles_fingerprint() -> str:
+    blob = export_profiles_json().encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
 def profiles_fingerprint_sha256() -> str:
     """
     Fingerprint estável do catálogo de profiles.
+
+    Calculado uma vez por versão do catálogo (DEFAULT_PROFILES.version muda a
+    cada mutação), fora do hot path dos DecisionRecords.
     """
-    blob = export_profiles_json().encode("utf-8")
-    return hashlib.sha256(blob).hexdigest()
+    global _fingerprint_cache
+
+    # Versão lida ANTES do cálculo: mutação concorrente => próxima chamada recalcula
+    version = getattr(DEFAULT_PROFILES, "version", None)
+    if version is None:
+        # Catálogo substituído por dict sem versão: sem cache (fail-safe)
+        return _compute_profiles_fingerprint()
+
+    key = (id(DEFAULT_PROFILES), version)
+    cached = _fingerprint_cache
+    if cached is not None and cached[:2] == key:
+        return cached[2]
+
+    fingerprint = _compute_profiles_fingerprint()
+    _fingerprint_cache = (key[0], key[1], fingerprint)
+    return fingerprint
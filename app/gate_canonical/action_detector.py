@@ -15,6 +15,7 @@ from fastapi import Request
 # Template-based action mapping (path normalizado, method) → action
 ACTION_MAP = {
     ("/process", "POST"): "process",
+    ("/process/stream", "POST"): "process",
     ("/preferences/{user_id}", "GET"): "preferences.get",
     ("/preferences/{user_id}", "PUT"): "preferences.put",
     ("/preferences/{user_id}", "DELETE"): "preferences.delete",
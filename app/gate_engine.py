@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Iterable, List, Sequence, Set, Tuple
+from typing import Callable, Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
 
 from app.contracts.gate_v1 import (
     GateDecision,
@@ -11,7 +11,7 @@ from app.contracts.gate_v1 import (
     GateResult,
 )
 from app.gate_artifacts import profiles_fingerprint_sha256
-from app.gate_profiles import PolicyProfile, get_profile
+from app.gate_profiles import DEFAULT_PROFILES, PolicyProfile, get_profile
 from app.tracing import observed_span
 
 FORBIDDEN_ADMIN_KEYS_BASELINE: Set[str] = {
@@ -114,8 +114,13 @@ DEFAULT_RULES: Sequence[Rule] = (
 )
 
 
-def evaluate_gate(inp: GateInput, rules: Iterable[Rule] = DEFAULT_RULES) -> GateResult:
+def evaluate_gate_reference(inp: GateInput, rules: Iterable[Rule] = DEFAULT_RULES) -> GateResult:
     """
+    Interpretador de regras (implementação de referência).
+
+    Usado para regras customizadas e como oráculo dos testes diferenciais do
+    engine compilado (evaluate_gate com DEFAULT_RULES).
+
     Determinístico e fail-closed.
     - Resolve profile por action (se não existir => DENY)
     - Avalia regras em ordem com short-circuit
@@ -201,3 +206,206 @@ def evaluate_gate(inp: GateInput, rules: Iterable[Rule] = DEFAULT_RULES) -> Gate
                 matched_rules=matched_rules,
             )
 
+
+# ============================================================================
+# Engine compilado (DEFAULT_RULES)
+# ============================================================================
+
+_EXTERNAL_KEYS: Tuple[str, ...] = ("external_id", "external_source")
+
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    """
+    PolicyProfile pré-compilado para DEFAULT_RULES.
+
+    Conjuntos congelados uma única vez (forbidden = baseline ∪ profile.forbidden_keys);
+    check() faz uma passada sobre as chaves do payload e reproduz exatamente
+    GateResult/evaluated_keys/matched_rules do interpretador.
+    """
+    profile: PolicyProfile
+    allowed: FrozenSet[str]
+    forbidden: FrozenSet[str]
+    external: FrozenSet[str]
+
+    def check(self, inp: GateInput) -> Tuple[bool, List[GateReason], List[str], str | None]:
+        """
+        Avalia DEFAULT_RULES em uma passada.
+
+        Returns:
+            (ok, reasons, evaluated_keys, matched_rule)
+        """
+        profile = self.profile
+        forbidden = self.forbidden
+        allowed = self.allowed
+        external = self.external
+
+        hit: List[str] = []
+        unknown: List[str] = []
+        has_external = False
+        for k in inp.payload:
+            if k in forbidden:
+                hit.append(k)
+            if k in external:
+                has_external = True
+            if k not in allowed:
+                unknown.append(k)
+
+        # forbidden_admin_keys
+        if hit:
+            hit.sort()
+            return (
+                False,
+                _deny(
+                    GateReasonCode.ADMIN_SIGNAL_FORBIDDEN,
+                    "Administrative keys are forbidden.",
+                    {"keys": hit, "profile": profile.name},
+                ),
+                list(hit),
+                "forbidden_admin_keys",
+            )
+
+        # external_fields_policy
+        present = [k for k in _EXTERNAL_KEYS if k in inp.payload] if has_external else []
+        if present and not _effective_allow_external(inp, profile):
+            return (
+                False,
+                _deny(
+                    GateReasonCode.EXTERNAL_FIELDS_NOT_ALLOWED,
+                    "External fields not allowed by policy.",
+                    {
+                        "present": present,
+                        "profile": profile.name,
+                        "effective_allow_external": False,
+                    },
+                ),
+                list(present),
+                "external_fields_policy",
+            )
+
+        # unknown_fields_fail_closed
+        if unknown and _effective_deny_unknown_fields(inp, profile):
+            unknown.sort()
+            evaluated = list(present)
+            evaluated.extend(k for k in unknown if k not in present)
+            return (
+                False,
+                _deny(
+                    GateReasonCode.UNKNOWN_FIELDS_PRESENT,
+                    "Unknown fields present (fail-closed).",
+                    {
+                        "unknown": unknown,
+                        "profile": profile.name,
+                        "effective_deny_unknown_fields": True,
+                    },
+                ),
+                evaluated,
+                "unknown_fields_fail_closed",
+            )
+
+        evaluated = list(present)
+        evaluated.extend(k for k in sorted(inp.payload) if k not in present)
+        return True, [], evaluated, None
+
+
+def compile_profile(profile: PolicyProfile) -> CompiledProfile:
+    """Pré-compila um PolicyProfile (conjuntos congelados) para o engine compilado."""
+    return CompiledProfile(
+        profile=profile,
+        allowed=frozenset(profile.allowlist),
+        forbidden=frozenset(FORBIDDEN_ADMIN_KEYS_BASELINE).union(profile.forbidden_keys),
+        external=frozenset(_EXTERNAL_KEYS),
+    )
+
+
+# Cache por ação, invalidado quando DEFAULT_PROFILES muda de versão
+_compiled_profiles: Dict[str, CompiledProfile] = {}
+_compiled_version: Tuple[int, int] | None = None
+
+
+def invalidate_compiled_profiles() -> None:
+    """Descarta checkers compilados (ex.: após alterar FORBIDDEN_ADMIN_KEYS_BASELINE)."""
+    global _compiled_version
+    _compiled_profiles.clear()
+    _compiled_version = None
+
+
+def get_compiled_profile(action: str) -> CompiledProfile | None:
+    """Checker compilado da ação (None se a ação não tem profile)."""
+    global _compiled_version
+
+    version = getattr(DEFAULT_PROFILES, "version", None)
+    key = (id(DEFAULT_PROFILES), version)
+    if version is None or key != _compiled_version:
+        _compiled_profiles.clear()
+        _compiled_version = key if version is not None else None
+
+    compiled = _compiled_profiles.get(action)
+    profile = get_profile(action)
+    if profile is None:
+        return None
+    if compiled is None or compiled.profile is not profile:
+        compiled = compile_profile(profile)
+        _compiled_profiles[action] = compiled
+    return compiled
+
+
+def evaluate_gate(inp: GateInput, rules: Iterable[Rule] = DEFAULT_RULES) -> GateResult:
+    """
+    Determinístico e fail-closed.
+    - Resolve profile por action (se não existir => DENY)
+    - Avalia regras em ordem com short-circuit
+    - Qualquer exceção => DENY (com evidência do exception type)
+    - P1.5: Retorna profile_hash e matched_rules (regras que casaram)
+
+    Com DEFAULT_RULES usa o checker compilado do profile (uma passada sobre o
+    payload); regras customizadas usam o interpretador (evaluate_gate_reference).
+    """
+    if rules is not DEFAULT_RULES:
+        return evaluate_gate_reference(inp, rules)
+
+    # P1.5: Always compute profile_hash (never empty)
+    profile_hash = profiles_fingerprint_sha256()
+
+    compiled = get_compiled_profile(inp.action)
+    if compiled is None:
+        return GateResult(
+            decision=GateDecision.DENY,
+            reasons=_deny(
+                GateReasonCode.UNKNOWN_ACTION,
+                "Action is not recognized.",
+                {"action": inp.action},
+            ),
+            action=inp.action,
+            evaluated_keys=[],
+            profile_hash=profile_hash,
+            matched_rules=["UNKNOWN_ACTION"],
+        )
+
+    try:
+        with observed_span("gate.evaluate", attributes={"action": inp.action, "allow_external": inp.allow_external, "deny_unknown_fields": inp.deny_unknown_fields, "request_id": inp.request_id, "profile_hash": profile_hash}):
+            ok, reasons, evaluated_keys, matched_rule = compiled.check(inp)
+            if not ok:
+                with observed_span("gate.decision", attributes={"decision": "DENY", "profile_hash": profile_hash, "action": inp.action}):
+                    return GateResult(
+                        decision=GateDecision.DENY,
+                        reasons=reasons,
+                        action=inp.action,
+                        evaluated_keys=evaluated_keys,
+                        profile_hash=profile_hash,
+                        matched_rules=[matched_rule],
+                    )
+    except Exception:
+        # Caminho raro: o interpretador produz o DENY fail-closed canônico
+        return evaluate_gate_reference(inp, rules)
+
+    reasons = [GateReason(code=GateReasonCode.OK, message="Gate passed.", evidence={"action": inp.action, "profile": compiled.profile.name})]
+    with observed_span("gate.decision", attributes={"decision": "ALLOW", "profile_hash": profile_hash, "action": inp.action}):
+        return GateResult(
+            decision=GateDecision.ALLOW,
+            reasons=reasons,
+            action=inp.action,
+            evaluated_keys=evaluated_keys,
+            profile_hash=profile_hash,
+            matched_rules=[],
+        )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import itertools
 from dataclasses import dataclass
-from typing import Dict, FrozenSet
+from typing import FrozenSet
 
 
 @dataclass(frozen=True)
@@ -21,6 +22,75 @@ class PolicyProfile:
     forbidden_keys: FrozenSet[str] = frozenset()
 
 
+# Versões globais monotônicas (next() em itertools.count é atômico no CPython)
+_catalog_versions = itertools.count(1)
+
+
+class ProfileCatalog(dict):
+    """
+    Catálogo de profiles versionado.
+
+    Toda mutação (register/unregister, item assignment, del, update, pop,
+    clear, setdefault, |=) incrementa `version`, invalidando caches derivados
+    do catálogo (ex.: gate_artifacts.profiles_fingerprint_sha256).
+    PolicyProfile é frozen: alterar um profile exige substituí-lo, o que
+    também passa por __setitem__.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = next(_catalog_versions)
+
+    def _bump(self) -> None:
+        self.version = next(_catalog_versions)
+
+    # API explícita de registro
+    def register(self, action: str, profile: PolicyProfile) -> None:
+        """Registra (ou substitui) o profile de uma ação."""
+        self[action] = profile
+
+    def unregister(self, action: str) -> PolicyProfile | None:
+        """Remove o profile de uma ação (None se inexistente)."""
+        return self.pop(action, None)
+
+    # Mutações do dict
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._bump()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._bump()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._bump()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._bump()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._bump()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._bump()
+        return result
+
+    def setdefault(self, key, default=None):
+        result = super().setdefault(key, default)
+        self._bump()
+        return result
+
+    def clear(self):
+        super().clear()
+        self._bump()
+
+
 ACTION_AGENT_RUN = "AGENT.RUN"
 ACTION_ARCONTE_SIGNAL = "ARCONTE.SIGNAL"
 ACTION_PROCESS = "process"
@@ -31,7 +101,7 @@ ACTION_PREFERENCES_PUT = "preferences.put"
 ACTION_PREFERENCES_DELETE = "preferences.delete"
 ACTION_LLM_GENERATE = "llm_generate"
 
-DEFAULT_PROFILES: Dict[str, PolicyProfile] = {
+DEFAULT_PROFILES: ProfileCatalog = ProfileCatalog({
     ACTION_AGENT_RUN: PolicyProfile(
         name="agent_run.v1",
         allowlist=frozenset({"agent_id", "task", "external_id", "external_source"}),
@@ -82,13 +152,23 @@ DEFAULT_PROFILES: Dict[str, PolicyProfile] = {
         allow_external=False,
         forbidden_keys=frozenset(),
     ),
-}
+})
 
 
 def get_profile(action: str) -> PolicyProfile | None:
     return DEFAULT_PROFILES.get(action)
 
 
+def register_profile(action: str, profile: PolicyProfile) -> None:
+    """Registra/substitui um profile em DEFAULT_PROFILES (invalida o fingerprint)."""
+    DEFAULT_PROFILES.register(action, profile)
+
+
+def unregister_profile(action: str) -> PolicyProfile | None:
+    """Remove um profile de DEFAULT_PROFILES (invalida o fingerprint)."""
+    return DEFAULT_PROFILES.unregister(action)
+
+
 def get_profiles_version() -> str:
     from app.gate_artifacts import profiles_fingerprint_sha256
     return profiles_fingerprint_sha256()
@@ -1,56 +1,107 @@
-"""Admin rate limit gate (100 req/min per admin key)."""
+"""Admin rate limit gate (100 req/min per admin key).
 
+Runs on the shared limiter engine (app.rate_limiter.get_rate_limiter), so the
+limit holds across workers with the shm/redis backends. Admin keys are hashed
+before use as limiter keys (no secret in shared memory / Redis).
+
+Audit:
+- DENY: always audited (one DecisionRecord per denied call)
+- ALLOW: VERITTA_ADMIN_AUDIT_ALLOW_MODE
+    aggregated (default): one "ADMIN_G10 window summary" record per window
+                          (calls allowed, distinct keys), emitted by a
+                          background flusher once the window has closed
+                          (also by the next ALLOW, and on shutdown via
+                          flush_allow_audit); a summary whose write fails
+                          is kept and retried before the next one
+    sampled: first ALLOW per key, then 1 in VERITTA_ADMIN_AUDIT_SAMPLE_EVERY (default 100)
+    every: one record per call (previous behaviour)
+  Unknown mode => every (fail-closed: never less audit than configured).
+
+Dashboards polling /admin/health and /admin/audit/summary no longer add one
+audit line per poll.
+"""
+
+import hashlib
+import logging
 import os
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+import threading
+import time
+from typing import Dict, List, Optional, Set
 
 from app.decision_record import DecisionRecord
 from app.audit_log import log_decision
 from app.gate_artifacts import profiles_fingerprint_sha256
+from app.rate_limiter import get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+ALLOW_AUDIT_MODES = ("aggregated", "sampled", "every")
+DEFAULT_ALLOW_AUDIT_MODE = "aggregated"
+DEFAULT_SAMPLE_EVERY = 100
+WINDOW_SECONDS = 60
+# Flusher wakes this long after a window boundary (clock skew between workers)
+FLUSH_GRACE_S = 1.0
+
+
+def get_allow_audit_mode() -> str:
+    mode = os.getenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", DEFAULT_ALLOW_AUDIT_MODE).strip().lower()
+    if mode not in ALLOW_AUDIT_MODES:
+        logger.warning("Unknown VERITTA_ADMIN_AUDIT_ALLOW_MODE=%r, auditing every ALLOW", mode)
+        return "every"
+    return mode
+
+
+def _sample_every() -> int:
+    try:
+        value = int(os.getenv("VERITTA_ADMIN_AUDIT_SAMPLE_EVERY", str(DEFAULT_SAMPLE_EVERY)))
+        return value if value > 0 else DEFAULT_SAMPLE_EVERY
+    except ValueError:
+        return DEFAULT_SAMPLE_EVERY
 
 
 class AdminRateLimit:
     """
     Rate limit for admin API (100 req/min per admin key).
-    
-    Separate from user rate limits (G10).
-    
-    In-memory implementation for simplicity (suitable for single-instance deployment).
-    For multi-instance, use Redis.
+
+    Separate from user rate limits (G10): own key namespace on the same engine.
     """
-    
+
     PROFILE_ID = "ADMIN_G10"
-    
-    # In-memory store: {admin_key: [(timestamp, count), ...]}
-    _requests = {}
-    
+    KEY_PREFIX = "admin_g10:"
+
+    # Wall clock for audit windows (aligned to minutes); injectable for tests
+    _clock = time.time
+
+    _audit_lock = threading.Lock()
+    # sampled: ALLOW count per limiter key
+    _allow_counts: Dict[str, int] = {}
+    # aggregated: current window
+    _window_start: Optional[int] = None
+    _window_allowed = 0
+    _window_keys: Set[str] = set()
+    _window_trace_id: Optional[str] = None
+    # aggregated: closed-window summaries not yet written (oldest first)
+    _unwritten: List[DecisionRecord] = []
+    _flusher: Optional[threading.Thread] = None
+    _flusher_stop = threading.Event()
+
+    @classmethod
+    def _limiter_key(cls, admin_key: str) -> str:
+        return cls.KEY_PREFIX + hashlib.sha256(admin_key.encode("utf-8")).hexdigest()[:32]
+
     @classmethod
     def check(cls, admin_key: str, trace_id: str) -> tuple[bool, Optional[str], Optional[DecisionRecord]]:
         """
         Check if admin key has exceeded rate limit.
-        
+
         Returns:
-            (allowed: bool, reason_code: Optional[str], decision_record: DecisionRecord)
+            (allowed: bool, reason_code: Optional[str], decision_record: Optional[DecisionRecord])
+            decision_record is None for ALLOWs not audited individually.
         """
         limit_per_min = int(os.getenv("VERITTA_ADMIN_RATE_LIMIT_PER_MIN", "100"))
-        
-        now = datetime.now(timezone.utc).replace(tzinfo=None)
-        minute_ago = now - timedelta(minutes=1)
-        
-        # Initialize tracking for this key if needed
-        if admin_key not in cls._requests:
-            cls._requests[admin_key] = []
-        
-        # Remove old requests (older than 1 minute)
-        cls._requests[admin_key] = [
-            ts for ts in cls._requests[admin_key]
-            if ts > minute_ago
-        ]
-        
-        # Check limit
-        request_count = len(cls._requests[admin_key])
-        
-        if request_count >= limit_per_min:
+        key = cls._limiter_key(admin_key)
+
+        if not get_rate_limiter().check(key, limit_per_min, WINDOW_SECONDS):
             decision_record = DecisionRecord(
                 decision="DENY",
                 profile_id=cls.PROFILE_ID,
@@ -62,18 +113,164 @@ class AdminRateLimit:
             )
             log_decision(decision_record)
             return (False, "RATE_LIMIT_EXCEEDED", decision_record)
-        
-        # Record this request
-        cls._requests[admin_key].append(now)
-        
+
+        return (True, None, cls._audit_allow(key, trace_id, limit_per_min))
+
+    @classmethod
+    def _audit_allow(cls, key: str, trace_id: str, limit_per_min: int) -> Optional[DecisionRecord]:
+        mode = get_allow_audit_mode()
+
+        if mode == "aggregated":
+            cls._ensure_flusher()
+            window = int(cls._clock() // WINDOW_SECONDS)
+            with cls._audit_lock:
+                summary = cls._rotate_window(window)
+                cls._window_allowed += 1
+                cls._window_keys.add(key)
+                if cls._window_trace_id is None:
+                    cls._window_trace_id = trace_id
+            if summary is not None or cls._unwritten:
+                cls._write_summaries(summary)
+            return None
+
+        if mode == "sampled":
+            with cls._audit_lock:
+                n = cls._allow_counts.get(key, 0) + 1
+                cls._allow_counts[key] = n
+            if (n - 1) % _sample_every() != 0:
+                return None
+            rule = f"Admin rate limit OK (sampled 1/{_sample_every()}, call {n}, {limit_per_min}/min)"
+        else:
+            rule = f"Admin rate limit OK ({limit_per_min}/min)"
+
         decision_record = DecisionRecord(
             decision="ALLOW",
             profile_id=cls.PROFILE_ID,
             profile_hash=profiles_fingerprint_sha256(),
-            matched_rules=[f"Admin rate limit OK ({request_count + 1}/{limit_per_min})"],
+            matched_rules=[rule],
             reason_codes=[],
             input_digest=None,
             trace_id=trace_id,
         )
         log_decision(decision_record)
-        return (True, None, decision_record)
+        return decision_record
+
+    @classmethod
+    def _rotate_window(cls, window: Optional[int]) -> Optional[DecisionRecord]:
+        """Close current window if `window` differs (None: close unconditionally). Caller holds _audit_lock."""
+        if cls._window_start == window and window is not None:
+            return None
+        summary = None
+        if cls._window_start is not None and cls._window_allowed:
+            summary = DecisionRecord(
+                decision="ALLOW",
+                profile_id=cls.PROFILE_ID,
+                profile_hash=profiles_fingerprint_sha256(),
+                matched_rules=[
+                    f"ADMIN_G10 window summary: {cls._window_allowed} allowed, "
+                    f"{len(cls._window_keys)} key(s), window_start={cls._window_start * WINDOW_SECONDS}, "
+                    f"window_s={WINDOW_SECONDS}"
+                ],
+                reason_codes=[],
+                input_digest=None,
+                trace_id=cls._window_trace_id,
+            )
+        cls._window_start = window
+        cls._window_allowed = 0
+        cls._window_keys = set()
+        cls._window_trace_id = None
+        return summary
+
+    @classmethod
+    def _write_summaries(cls, summary: Optional[DecisionRecord]) -> None:
+        """Write unwritten summaries (then `summary`) in order.
+
+        On failure the unwritten ones are kept for the next attempt and the
+        error propagates (fail-closed: a window is never silently dropped).
+        """
+        with cls._audit_lock:
+            if summary is not None:
+                cls._unwritten.append(summary)
+            pending, cls._unwritten = cls._unwritten, []
+        for i, record in enumerate(pending):
+            try:
+                log_decision(record)
+            except Exception:
+                with cls._audit_lock:
+                    cls._unwritten[:0] = pending[i:]
+                raise
+
+    @classmethod
+    def flush_due(cls) -> Optional[DecisionRecord]:
+        """Emit the summary of a window that has closed (no-op while it is open)."""
+        window = int(cls._clock() // WINDOW_SECONDS)
+        with cls._audit_lock:
+            summary = None
+            if cls._window_start is not None and cls._window_start != window:
+                summary = cls._rotate_window(None)
+        if summary is not None or cls._unwritten:
+            cls._write_summaries(summary)
+        return summary
+
+    @classmethod
+    def _ensure_flusher(cls) -> None:
+        if cls._flusher is not None and cls._flusher.is_alive():
+            return
+        with cls._audit_lock:
+            if cls._flusher is not None and cls._flusher.is_alive():
+                return
+            cls._flusher_stop = threading.Event()
+            cls._flusher = threading.Thread(target=cls._run_flusher, args=(cls._flusher_stop,),
+                                            name="admin-audit-flusher", daemon=True)
+            cls._flusher.start()
+
+    @classmethod
+    def _run_flusher(cls, stop: threading.Event) -> None:
+        # Quiet admin API: the last busy window is still audited about a minute later
+        while not stop.wait(WINDOW_SECONDS - cls._clock() % WINDOW_SECONDS + FLUSH_GRACE_S):
+            try:
+                cls.flush_due()
+            except Exception as e:
+                # Kept in _unwritten: retried on the next tick / ALLOW / shutdown
+                logger.warning("ADMIN_G10 window summary write failed (%s), will retry", type(e).__name__)
+
+    @classmethod
+    def stop_allow_flusher(cls) -> None:
+        cls._flusher_stop.set()
+        flusher, cls._flusher = cls._flusher, None
+        if flusher is not None:
+            flusher.join(timeout=5.0)
+
+    @classmethod
+    def flush_allow_audit(cls) -> Optional[DecisionRecord]:
+        """Stop the flusher and emit the pending window summary now (FastAPI lifespan shutdown)."""
+        cls.stop_allow_flusher()
+        with cls._audit_lock:
+            summary = cls._rotate_window(None)
+        if summary is not None or cls._unwritten:
+            cls._write_summaries(summary)
+        return summary
+
+    @classmethod
+    def reset(cls, admin_key: Optional[str] = None) -> None:
+        """Reset limiter state for admin_key and pending audit state (for testing)."""
+        cls.stop_allow_flusher()
+        if admin_key is not None:
+            get_rate_limiter().reset(cls._limiter_key(admin_key))
+        with cls._audit_lock:
+            cls._allow_counts = {}
+            cls._window_start = None
+            cls._window_allowed = 0
+            cls._window_keys = set()
+            cls._window_trace_id = None
+            cls._unwritten = []
+
+
+def _reset_after_fork() -> None:
+    # The flusher thread does not survive fork: the child starts its own
+    AdminRateLimit._audit_lock = threading.Lock()
+    AdminRateLimit._flusher = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -5,6 +5,7 @@ import hashlib
 from sqlalchemy.orm import Session
 
 from app.decision_record import DecisionRecord
+from app.db.session_cache import get_session_cache
 from app.db.session_repository import SessionRepository
 
 
@@ -19,13 +20,16 @@ class GateF23SessionDB:
     4. Session binding (user_id + api_key_hash)
     
     Fail-closed: Any validation failure → DENY
+    
+    Session reads go through the process-wide session cache
+    (app.db.session_cache; VERITTA_SESSION_CACHE=off reads SQL every time).
     """
     
     PROFILE_ID = "F2.3"
     
     def __init__(self, db: Session):
         self.db = db
-        self.repo = SessionRepository(db)
+        self.repo = SessionRepository(db, cache=get_session_cache())
     
     def evaluate(
         self,
@@ -97,7 +101,7 @@ class GateF23SessionDB:
             )
         
         # Step 5: Verify session binding (user_id + api_key_hash)
-        session = self.repo.get_by_id(session_id)
+        session = self.repo.get_record(session_id)
         if not session:
             return DecisionRecord(
                 decision="DENY",
@@ -8,10 +8,10 @@ import os
 from fastapi import Request, HTTPException
 from fastapi.background import BackgroundTasks
 
-from app.payload_limits import check_payload_limits, LimitExceeded
+from app.payload_limits import LimitExceeded, get_request_payload_report, inspect_payload
 import app.gate_engine
 from app.audit_log import log_decision
-from app.decision_record import DecisionRecord, make_input_digest
+from app.decision_record import DecisionRecord
 from app.rate_limiter import get_rate_limiter
 from app.contracts.gate_v1 import GateInput, GateDecision
 from datetime import datetime, timezone
@@ -29,21 +29,14 @@ FORBIDDEN_PAYLOAD_FIELDS = {
 
 
 def _contains_forbidden_fields(obj, path=""):
-    """Recursively check if object contains forbidden fields."""
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if key.lower() in FORBIDDEN_PAYLOAD_FIELDS:
-                return key, path
-            if isinstance(value, (dict, list)):
-                result = _contains_forbidden_fields(value, f"{path}.{key}" if path else key)
-                if result:
-                    return result
-    elif isinstance(obj, list):
-        for idx, item in enumerate(obj):
-            result = _contains_forbidden_fields(item, f"{path}[{idx}]")
-            if result:
-                return result
-    return None
+    """Check if object contains forbidden fields (first hit as (key, path), or None)."""
+    hit = inspect_payload(obj, FORBIDDEN_PAYLOAD_FIELDS).first_forbidden
+    if hit and path:
+        key, hit_path = hit
+        if not hit_path:
+            return key, path
+        return key, f"{path}{hit_path}" if hit_path.startswith("[") else f"{path}.{hit_path}"
+    return hit
 
 
 async def run_f21_chain(
@@ -122,8 +115,12 @@ async def run_f21_chain(
         ))
     
     # G7: Payload validation (limits + forbidden fields)
+    # Single inspection pass, shared via request.state (digest, limits, forbidden keys)
+    report = get_request_payload_report(request, body, FORBIDDEN_PAYLOAD_FIELDS)
+    input_digest = report.sha256
+
     # Check forbidden fields first (fail-closed)
-    forbidden_result = _contains_forbidden_fields(body)
+    forbidden_result = report.first_forbidden
     if forbidden_result:
         field_name, field_path = forbidden_result
         decision = "DENY"
@@ -136,7 +133,7 @@ async def run_f21_chain(
                 profile_hash=profiles_fingerprint_sha256(),
                 matched_rules=matched_rules,
                 reason_codes=reason_codes,
-                input_digest=make_input_digest(body),
+                input_digest=input_digest,
                 trace_id=trace_id,
                 ts_utc=ts,
             )
@@ -150,7 +147,7 @@ async def run_f21_chain(
     
     # Check payload size and depth
     try:
-        check_payload_limits(body, max_bytes=256000, max_depth_limit=100, max_list_limit=10000)
+        report.check_limits(max_bytes=256000, max_depth_limit=100, max_list_limit=10000)
     except LimitExceeded as e:
         decision = "DENY"
         reason_codes = ["G7_payload_limit_exceeded"]
@@ -162,7 +159,7 @@ async def run_f21_chain(
                 profile_hash=profile_hash or "",
                 matched_rules=matched_rules,
                 reason_codes=reason_codes,
-                input_digest=make_input_digest(body),
+                input_digest=input_digest,
                 trace_id=trace_id,
                 ts_utc=ts,
             )
@@ -200,7 +197,7 @@ async def run_f21_chain(
                 profile_hash=profiles_fingerprint_sha256(),
                 matched_rules=[str(type(e).__name__)],
                 reason_codes=reason_codes,
-                input_digest=make_input_digest(body),
+                input_digest=input_digest,
                 trace_id=trace_id,
                 ts_utc=ts,
             )
@@ -224,7 +221,7 @@ async def run_f21_chain(
                 profile_hash=profiles_fingerprint_sha256(),
                 matched_rules=getattr(gate_result, 'matched_rules', []),
                 reason_codes=reason_codes,
-                input_digest=make_input_digest(body),
+                input_digest=input_digest,
                 trace_id=trace_id,
                 ts_utc=ts,
             )
@@ -249,7 +246,7 @@ async def run_f21_chain(
                     profile_hash=profiles_fingerprint_sha256(),
                     matched_rules=["Rate limit exceeded for API key"],
                     reason_codes=reason_codes,
-                    input_digest=make_input_digest(body),
+                    input_digest=input_digest,
                     trace_id=trace_id,
                     ts_utc=ts,
                 )
@@ -270,7 +267,7 @@ async def run_f21_chain(
             profile_hash=profiles_fingerprint_sha256(),
             matched_rules=getattr(gate_result, 'matched_rules', []),
             reason_codes=[],
-            input_digest=make_input_digest(body),
+            input_digest=input_digest,
             trace_id=trace_id,
             ts_utc=ts,
         )
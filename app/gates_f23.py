@@ -6,6 +6,7 @@ G5 (session TTL/correlation), G7-G8 (shared), G9 (B1-aware echo-back), G10 (rate
 NOTA: T4 é um esboço mínimo. Muitas funcionalidades abreviadas para deadline.
 """
 
+import asyncio
 import os
 import re
 from datetime import datetime, timezone
@@ -13,13 +14,15 @@ from fastapi import Request, HTTPException
 from fastapi.background import BackgroundTasks
 from fastapi.responses import JSONResponse
 
-from app.payload_limits import check_payload_limits, LimitExceeded
+from app.payload_limits import LimitExceeded, get_request_payload_report
+from app.gates_f21 import FORBIDDEN_PAYLOAD_FIELDS
 import app.gate_engine
 from app.audit_log import log_decision
 from app.rate_limiter import get_rate_limiter
-from app.session_store import get_session_store, sha256_str
+from app.session_backend import get_session_backend
+from app.session_store import sha256_str
 from app.f23_bindings import get_bindings
-from app.decision_record import DecisionRecord, make_input_digest
+from app.decision_record import DecisionRecord
 from app.contracts.gate_v1 import GateInput, GateDecision
 from app.error_envelope import http_error_detail
 from app.gate_artifacts import profiles_fingerprint_sha256
@@ -184,8 +187,9 @@ async def run_f23_chain(
         ))
     
     # G5: Session TTL and correlation check
-    session_store = get_session_store()
-    session_record = session_store.get(session_id_header)
+    session_backend = get_session_backend()
+    # Off the event loop: an L1 miss reads the L2 sqlite file and SQL
+    session_record = await asyncio.to_thread(session_backend.get, session_id_header)
     if not session_record:
         decision = "DENY"
         reason_codes = ["G5_session_not_found"]
@@ -281,8 +285,11 @@ async def run_f23_chain(
     
     # G7-G8: Payload validation and action matrix (shared with F2.1)
     # (Omitted for brevity; reuse from F2.1)
+    # Same request-scoped inspection report as F2.1 (computed once in gate_request)
+    report = get_request_payload_report(request, body, FORBIDDEN_PAYLOAD_FIELDS)
+    input_digest = report.sha256
     try:
-        check_payload_limits(body, max_bytes=256000, max_depth_limit=100, max_list_limit=10000)
+        report.check_limits(max_bytes=256000, max_depth_limit=100, max_list_limit=10000)
     except LimitExceeded as e:
         decision = "DENY"
         reason_codes = ["G7_payload_limit_exceeded"]
@@ -294,7 +301,7 @@ async def run_f23_chain(
                 profile_hash=profile_hash or "",
                 matched_rules=matched_rules,
                 reason_codes=reason_codes,
-                input_digest=make_input_digest(body),
+                input_digest=input_digest,
                 trace_id=trace_id,
                 ts_utc=ts,
             )
@@ -326,7 +333,7 @@ async def run_f23_chain(
                 profile_hash=profiles_fingerprint_sha256(),
                 matched_rules=[str(type(e).__name__)],
                 reason_codes=reason_codes,
-                input_digest=make_input_digest(body),
+                input_digest=input_digest,
                 trace_id=trace_id,
                 ts_utc=ts,
             )
@@ -350,7 +357,7 @@ async def run_f23_chain(
                 profile_hash=profiles_fingerprint_sha256(),
                 matched_rules=getattr(gate_result, 'matched_rules', []),
                 reason_codes=reason_codes,
-                input_digest=make_input_digest(body),
+                input_digest=input_digest,
                 trace_id=trace_id,
                 ts_utc=ts,
             )
@@ -415,6 +422,8 @@ async def run_f23_chain(
     
     # All gates passed
     decision = "ALLOW"
+    # updated_at written in batches by the backend's flusher thread (no I/O here)
+    session_backend.touch(session_id_header)
     log_decision(
         DecisionRecord(
             decision=decision,
@@ -422,7 +431,7 @@ async def run_f23_chain(
             profile_hash=profiles_fingerprint_sha256(),
             matched_rules=getattr(gate_result, 'matched_rules', []),
             reason_codes=[],
-            input_digest=make_input_digest(body),
+            input_digest=input_digest,
             trace_id=trace_id,
             ts_utc=ts,
         )
@@ -8,6 +8,14 @@ from .anthropic_client import AnthropicClient
 from .gemini_client import GeminiClient
 from .grok_client import GrokClient
 from .deepseek_client import DeepSeekClient
+from .async_clients import (
+    AnthropicAsyncClient,
+    DeepSeekAsyncClient,
+    GeminiAsyncClient,
+    GrokAsyncClient,
+    OpenAIAsyncClient,
+)
+from .routing_client import RoutingLLMClient
 
 __all__ = [
     "LLMClient",
@@ -18,4 +26,10 @@ __all__ = [
     "GeminiClient",
     "GrokClient",
     "DeepSeekClient",
+    "OpenAIAsyncClient",
+    "AnthropicAsyncClient",
+    "GeminiAsyncClient",
+    "GrokAsyncClient",
+    "DeepSeekAsyncClient",
+    "RoutingLLMClient",
 ]
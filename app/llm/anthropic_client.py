@@ -18,6 +18,8 @@ from .client import LLMClient
 class AnthropicClient(LLMClient):
     """Anthropic Claude adapter (claude-3-opus, claude-3-sonnet, etc)."""
 
+    provider = "anthropic"
+
     def __init__(self, api_key: str, *, default_timeout_s: float = 10.0):
         """
         Args:
@@ -0,0 +1,401 @@
+"""Pooled async LLM clients (V-COF governed).
+
+Async counterparts of OpenAIClient, AnthropicClient, GeminiClient, GrokClient
+and DeepSeekClient speaking the providers' HTTP APIs directly over the shared
+per-provider httpx pools (app.llm.http_pool):
+- generate_async(): one long-lived AsyncClient per provider (keep-alive,
+  HTTP/2 when available), per-provider concurrency semaphore
+- generate(): same request over the shared sync Client (thread path)
+- generate_stream(): provider SSE stream (stream=true / streamGenerateContent)
+  as StreamChunk text deltas (model first, usage on the last chunk)
+- Same contract as the SDK adapters: dict(text, usage, model, latency_ms),
+  TimeoutError on timeout, ProviderError otherwise (fail-closed)
+- Privacy by design (sem log de prompts); Prometheus metrics (F9.9-B)
+
+Base URL per provider: constructor base_url, else VERITTA_LLM_<PROVIDER>_BASE_URL,
+else the public endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from .client import LLMClient, StreamChunk
+from .errors import ProviderError
+from .http_pool import get_async_http_client, get_provider_semaphore, get_sync_http_client
+from .metrics import llm_errors_total, llm_request_latency_seconds, llm_tokens_total
+
+
+class PooledHTTPClient(LLMClient):
+    """Base adapter: provider request/response mapping over shared pools."""
+
+    PROVIDER = ""
+    DEFAULT_BASE_URL = ""
+
+    def __init__(self, api_key: str, *, default_timeout_s: float = 30.0, base_url: Optional[str] = None):
+        """
+        Args:
+            api_key: provider API key
+            default_timeout_s: Timeout padrão (30s conforme F9.9-B)
+            base_url: override endpoint (tests, proxies)
+        """
+        self._api_key = api_key
+        self._default_timeout_s = default_timeout_s
+        env_url = os.getenv(f"VERITTA_LLM_{self.PROVIDER.upper()}_BASE_URL")
+        self._base_url = (base_url or env_url or self.DEFAULT_BASE_URL).rstrip("/")
+
+    @property
+    def provider(self) -> str:
+        return self.PROVIDER
+
+    def _build_request(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """(path, headers, json body) for one generation."""
+        raise NotImplementedError()
+
+    def _parse_response(self, data: Dict[str, Any], prompt: str) -> Tuple[str, Dict[str, int]]:
+        """(text, usage{prompt, completion, total}) from the provider JSON."""
+        raise NotImplementedError()
+
+    def generate(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> Dict:
+        t = timeout_s or self._default_timeout_s
+        path, headers, body = self._build_request(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+        start = time.perf_counter()
+        try:
+            response = get_sync_http_client(self.PROVIDER, self._base_url).post(
+                path, headers=headers, json=body, timeout=t
+            )
+        except httpx.TimeoutException:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="timeout").inc()
+            raise TimeoutError()
+        except httpx.HTTPError as e:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="provider_error").inc()
+            raise ProviderError("PROVIDER_ERROR") from e
+        return self._finish(response, prompt, model, start)
+
+    async def generate_async(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> Dict:
+        t = timeout_s or self._default_timeout_s
+        path, headers, body = self._build_request(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+        start = time.perf_counter()
+        semaphore = await self._acquire_provider_slot(t)
+        try:
+            remaining = max(0.001, t - (time.perf_counter() - start))
+            response = await get_async_http_client(self.PROVIDER, self._base_url).post(
+                path, headers=headers, json=body, timeout=remaining
+            )
+        except httpx.TimeoutException:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="timeout").inc()
+            raise TimeoutError()
+        except httpx.HTTPError as e:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="provider_error").inc()
+            raise ProviderError("PROVIDER_ERROR") from e
+        finally:
+            semaphore.release()
+        return self._finish(response, prompt, model, start)
+
+    async def generate_stream(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> AsyncIterator[StreamChunk]:
+        """Provider SSE stream: StreamChunk with model, one per text delta, then usage.
+
+        timeout_s bounds the wait for a provider slot and each network read
+        (idle time between chunks), not the whole generation.
+        """
+        t = timeout_s or self._default_timeout_s
+        path, headers, body = self._build_stream_request(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+        start = time.perf_counter()
+        semaphore = await self._acquire_provider_slot(t)
+        usage: Dict[str, int] = {}
+        completion_chars = 0
+        try:
+            async with get_async_http_client(self.PROVIDER, self._base_url).stream(
+                "POST", path, headers=headers, json=body, timeout=t
+            ) as response:
+                if response.status_code >= 400:
+                    llm_errors_total.labels(provider=self.PROVIDER, error_type="provider_error").inc()
+                    raise ProviderError(f"{response.status_code} PROVIDER_ERROR")
+                # Same "model" as generate() (_finish)
+                yield StreamChunk(model=model)
+                async for data in _sse_events(response):
+                    try:
+                        text, usage_part = self._parse_stream_event(data)
+                    except Exception as e:
+                        llm_errors_total.labels(provider=self.PROVIDER, error_type="provider_error").inc()
+                        raise ProviderError("PROVIDER_ERROR") from e
+                    if usage_part:
+                        usage.update(usage_part)
+                    if text:
+                        completion_chars += len(text)
+                        yield StreamChunk(text=text)
+        except httpx.TimeoutException:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="timeout").inc()
+            raise TimeoutError()
+        except httpx.HTTPError as e:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="provider_error").inc()
+            raise ProviderError("PROVIDER_ERROR") from e
+        finally:
+            semaphore.release()
+
+        # Providers omitting usage in the stream: same estimate as GeminiClient (~4 chars/token)
+        prompt_tokens = usage.get("prompt", len(prompt) // 4)
+        completion_tokens = usage.get("completion", completion_chars // 4)
+        final = {
+            "prompt": prompt_tokens,
+            "completion": completion_tokens,
+            "total": usage.get("total", prompt_tokens + completion_tokens),
+        }
+        llm_request_latency_seconds.labels(provider=self.PROVIDER, model=model).observe(time.perf_counter() - start)
+        llm_tokens_total.labels(provider=self.PROVIDER, model=model, type="prompt").inc(final["prompt"])
+        llm_tokens_total.labels(provider=self.PROVIDER, model=model, type="completion").inc(final["completion"])
+        yield StreamChunk(usage=final)
+
+    def _build_stream_request(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """_build_request with streaming enabled."""
+        path, headers, body = self._build_request(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+        return path, headers, {**body, "stream": True}
+
+    def _parse_stream_event(self, data: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, int]]]:
+        """(text delta, partial usage) from one SSE event."""
+        raise NotImplementedError()
+
+    async def _acquire_provider_slot(self, timeout_s: float) -> asyncio.Semaphore:
+        semaphore = get_provider_semaphore(self.PROVIDER)
+        try:
+            # Waiting for a provider slot counts against the same timeout
+            await asyncio.wait_for(semaphore.acquire(), timeout_s)
+        except asyncio.TimeoutError:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="timeout").inc()
+            raise TimeoutError()
+        return semaphore
+
+    def _finish(self, response: httpx.Response, prompt: str, model: str, start: float) -> Dict:
+        latency_ms = (time.perf_counter() - start) * 1000
+        if response.status_code >= 400:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="provider_error").inc()
+            # Status first: retry heuristic (app.llm.retry) recognizes 429 / 5xx
+            raise ProviderError(f"{response.status_code} PROVIDER_ERROR")
+        try:
+            text, usage = self._parse_response(response.json(), prompt)
+        except Exception as e:
+            llm_errors_total.labels(provider=self.PROVIDER, error_type="provider_error").inc()
+            raise ProviderError("PROVIDER_ERROR") from e
+
+        llm_request_latency_seconds.labels(provider=self.PROVIDER, model=model).observe(latency_ms / 1000)
+        llm_tokens_total.labels(provider=self.PROVIDER, model=model, type="prompt").inc(usage["prompt"])
+        llm_tokens_total.labels(provider=self.PROVIDER, model=model, type="completion").inc(usage["completion"])
+        return {"text": text, "usage": usage, "model": model, "latency_ms": latency_ms}
+
+
+class _OpenAICompatibleClient(PooledHTTPClient):
+    """Chat Completions API (OpenAI, xAI, DeepSeek)."""
+
+    def _build_request(self, *, prompt, model, temperature, max_tokens):
+        headers = {"Authorization": f"Bearer {self._api_key}"}
+        body = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        return "/chat/completions", headers, body
+
+    def _parse_response(self, data, prompt):
+        text = data["choices"][0]["message"]["content"] or ""
+        usage = data["usage"]
+        return text, {
+            "prompt": int(usage["prompt_tokens"]),
+            "completion": int(usage["completion_tokens"]),
+            "total": int(usage["total_tokens"]),
+        }
+
+    def _build_stream_request(self, *, prompt, model, temperature, max_tokens):
+        path, headers, body = super()._build_stream_request(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+        # Final chunk carries usage (choices empty)
+        body["stream_options"] = {"include_usage": True}
+        return path, headers, body
+
+    def _parse_stream_event(self, data):
+        usage = data.get("usage")
+        choices = data.get("choices") or []
+        delta = (choices[0].get("delta") or {}) if choices else {}
+        text = delta.get("content") or ""
+        if not usage:
+            return text, None
+        return text, {
+            "prompt": int(usage["prompt_tokens"]),
+            "completion": int(usage["completion_tokens"]),
+            "total": int(usage["total_tokens"]),
+        }
+
+
+class OpenAIAsyncClient(_OpenAICompatibleClient):
+    """OpenAI GPT adapter over the shared pool."""
+
+    PROVIDER = "openai"
+    DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+
+class GrokAsyncClient(_OpenAICompatibleClient):
+    """xAI Grok adapter over the shared pool (OpenAI-compatible)."""
+
+    PROVIDER = "grok"
+    DEFAULT_BASE_URL = "https://api.x.ai/v1"
+
+
+class DeepSeekAsyncClient(_OpenAICompatibleClient):
+    """DeepSeek adapter over the shared pool (OpenAI-compatible)."""
+
+    PROVIDER = "deepseek"
+    DEFAULT_BASE_URL = "https://api.deepseek.com/v1"
+
+
+class AnthropicAsyncClient(PooledHTTPClient):
+    """Anthropic Messages API adapter over the shared pool."""
+
+    PROVIDER = "anthropic"
+    DEFAULT_BASE_URL = "https://api.anthropic.com"
+    API_VERSION = "2023-06-01"
+
+    def _build_request(self, *, prompt, model, temperature, max_tokens):
+        headers = {"x-api-key": self._api_key, "anthropic-version": self.API_VERSION}
+        body = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        return "/v1/messages", headers, body
+
+    def _parse_response(self, data, prompt):
+        text = data["content"][0]["text"]
+        usage = data["usage"]
+        prompt_tokens = int(usage["input_tokens"])
+        completion_tokens = int(usage["output_tokens"])
+        return text, {
+            "prompt": prompt_tokens,
+            "completion": completion_tokens,
+            "total": prompt_tokens + completion_tokens,
+        }
+
+    def _parse_stream_event(self, data):
+        kind = data.get("type")
+        if kind == "content_block_delta":
+            delta = data["delta"]
+            if delta.get("type") != "text_delta":
+                return "", None
+            return delta.get("text") or "", None
+        if kind == "message_start":
+            usage = data["message"].get("usage") or {}
+            return "", {"prompt": int(usage.get("input_tokens", 0))}
+        if kind == "message_delta":
+            usage = data.get("usage") or {}
+            return "", {"completion": int(usage.get("output_tokens", 0))}
+        if kind == "error":
+            raise ProviderError("PROVIDER_ERROR")
+        # ping, content_block_start/stop, message_stop
+        return "", None
+
+
+class GeminiAsyncClient(PooledHTTPClient):
+    """Google Gemini generateContent adapter over the shared pool."""
+
+    PROVIDER = "gemini"
+    DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+
+    def _build_request(self, *, prompt, model, temperature, max_tokens):
+        headers = {"x-goog-api-key": self._api_key}
+        body = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {"maxOutputTokens": max_tokens, "temperature": temperature},
+        }
+        return f"/v1beta/models/{model}:generateContent", headers, body
+
+    def _parse_response(self, data, prompt):
+        text = data["candidates"][0]["content"]["parts"][0]["text"]
+        meta = data.get("usageMetadata")
+        if meta:
+            prompt_tokens = int(meta.get("promptTokenCount", 0))
+            completion_tokens = int(meta.get("candidatesTokenCount", 0))
+            return text, {
+                "prompt": prompt_tokens,
+                "completion": completion_tokens,
+                "total": int(meta.get("totalTokenCount", prompt_tokens + completion_tokens)),
+            }
+        # Same estimate as GeminiClient (~4 chars/token)
+        return text, {
+            "prompt": len(prompt) // 4,
+            "completion": len(text) // 4,
+            "total": (len(prompt) + len(text)) // 4,
+        }
+
+    def _build_stream_request(self, *, prompt, model, temperature, max_tokens):
+        path, headers, body = self._build_request(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens
+        )
+        return path.replace(":generateContent", ":streamGenerateContent?alt=sse"), headers, body
+
+    def _parse_stream_event(self, data):
+        candidates = data.get("candidates") or []
+        content = (candidates[0].get("content") or {}) if candidates else {}
+        parts = content.get("parts") or []
+        text = "".join(part.get("text", "") for part in parts)
+        meta = data.get("usageMetadata")
+        if not meta:
+            return text, None
+        # Cumulative counts: the last event holds the totals
+        usage = {
+            "prompt": int(meta.get("promptTokenCount", 0)),
+            "completion": int(meta.get("candidatesTokenCount", 0)),
+        }
+        if "totalTokenCount" in meta:
+            usage["total"] = int(meta["totalTokenCount"])
+        return text, usage
+
+
+async def _sse_events(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """JSON payloads of a text/event-stream response (data: lines; [DONE] ends it)."""
+    data_lines = []
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            data_lines.append(line[5:].strip())
+            continue
+        if line or not data_lines:
+            # event:/id:/comments, or blank line without pending data
+            continue
+        data = "\n".join(data_lines)
+        data_lines = []
+        if data == "[DONE]":
+            return
+        yield _load_event(data)
+    if data_lines and data_lines != ["[DONE]"]:
+        yield _load_event("\n".join(data_lines))
+
+
+def _load_event(data: str) -> Dict[str, Any]:
+    try:
+        return json.loads(data)
+    except ValueError as e:
+        raise ProviderError("PROVIDER_ERROR") from e
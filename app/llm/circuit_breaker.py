@@ -4,6 +4,8 @@ Implementa circuit breaker para proteger sistema de falhas em cascata.
 - 3 falhas consecutivas → open (60s cooldown)
 - Estados: CLOSED, OPEN, HALF_OPEN
 - Thread-safe (threading.Lock)
+- Async: acall() / guard(); cancelamento (asyncio.wait_for do pipeline
+  antes do timeout do cliente) conta como falha
 """
 
 from __future__ import annotations
@@ -12,10 +14,12 @@ import logging
 
 logging.basicConfig(level=logging.ERROR)
 
+import asyncio
 import time
+from contextlib import asynccontextmanager
 from enum import Enum
 from threading import Lock
-from typing import Any, Callable
+from typing import Any, AsyncIterator, Callable
 
 from .errors import ProviderError
 
@@ -64,6 +68,43 @@ class CircuitBreaker:
         Raises:
             ProviderError: Se circuito aberto ou função falhar
         """
+        self._before_call()
+
+        # Executar função
+        try:
+            result = func(*args, **kwargs)
+            self._on_success()
+            return result
+        except Exception as e:
+            self._on_failure()
+            raise
+
+    async def acall(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """call() para coroutine functions (mesmo estado compartilhado)."""
+        async with self.guard():
+            return await func(*args, **kwargs)
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """Bloco async protegido (ex.: um stream inteiro).
+
+        Falha: exceção ou cancelamento (timeout do chamador: provider travado).
+        Sucesso: saída normal. GeneratorExit (consumidor fechou o stream)
+        não conta.
+
+        Raises:
+            ProviderError: Se circuito aberto
+        """
+        self._before_call()
+        try:
+            yield
+        except (Exception, asyncio.CancelledError):
+            self._on_failure()
+            raise
+        self._on_success()
+
+    def _before_call(self) -> None:
+        """Raise ProviderError se circuito aberto (thread-safe)."""
         with self._lock:
             if self._state == CircuitState.OPEN:
                 # Verificar se cooldown expirou
@@ -75,15 +116,6 @@ class CircuitBreaker:
                     print(f"Circuit breaker open: too many failures, retry later")
                     raise ProviderError("CIRCUIT_OPEN: Too many failures, retry later")
 
-        # Executar função
-        try:
-            result = func(*args, **kwargs)
-            self._on_success()
-            return result
-        except Exception as e:
-            self._on_failure()
-            raise
-
     def _on_success(self) -> None:
         """Callback de sucesso (thread-safe)."""
         with self._lock:
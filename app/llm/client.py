@@ -1,6 +1,21 @@
 from __future__ import annotations
 
-from typing import Protocol
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Protocol
+
+
+@dataclass(frozen=True)
+class StreamChunk:
+    """Piece of a streamed generation: text delta; usage on the last chunk.
+
+    model: the model the client reports (generate()'s "model"), set on a
+    chunk before the first text.
+    """
+
+    text: str = ""
+    usage: Optional[Dict[str, int]] = None
+    model: Optional[str] = None
 
 
 class LLMClient(Protocol):
@@ -19,3 +34,52 @@ class LLMClient(Protocol):
         May raise TimeoutError or RuntimeError("PROVIDER_ERROR").
         """
         raise NotImplementedError()
+
+    async def generate_async(
+        self,
+        *,
+        prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        timeout_s: float,
+    ) -> dict:
+        """Async generate (same contract as generate).
+
+        Default: generate() in a worker thread. Pooled clients
+        (app.llm.async_clients) override with a native async request.
+        """
+        return await asyncio.to_thread(
+            self.generate,
+            prompt=prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout_s=timeout_s,
+        )
+
+    async def generate_stream(
+        self,
+        *,
+        prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        timeout_s: float,
+    ) -> AsyncIterator[StreamChunk]:
+        """Streamed generate: StreamChunk with model, text deltas, then one with usage.
+
+        Default: generate_async() as a single chunk. Pooled clients
+        (app.llm.async_clients) stream the provider's SSE response.
+        """
+        resp = await self.generate_async(
+            prompt=prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout_s=timeout_s,
+        )
+        yield StreamChunk(model=resp.get("model"))
+        if resp.get("text"):
+            yield StreamChunk(text=resp["text"])
+        yield StreamChunk(usage=resp.get("usage"))
@@ -18,6 +18,8 @@ from .client import LLMClient
 class DeepSeekClient(LLMClient):
     """DeepSeek adapter (deepseek-chat, deepseek-coder, etc)."""
 
+    provider = "deepseek"
+
     def __init__(self, api_key: str, *, default_timeout_s: float = 10.0):
         """
         Args:
@@ -4,7 +4,7 @@ F9.9-B: Factory endurecida com allowlists obrigatórias e fail-closed.
 """
 
 import os
-from typing import Optional
+from typing import Callable, Optional, Tuple
 
 from .client import LLMClient
 from .openai_client import OpenAIClient
@@ -13,7 +13,18 @@ from .gemini_client import GeminiClient
 from .grok_client import GrokClient
 from .deepseek_client import DeepSeekClient
 from .fake_client import FakeLLMClient
+from .async_clients import (
+    AnthropicAsyncClient,
+    DeepSeekAsyncClient,
+    GeminiAsyncClient,
+    GrokAsyncClient,
+    OpenAIAsyncClient,
+)
 from .errors import ConfigurationError
+from .routing_client import RoutingLLMClient, router_providers
+
+# LLM_PROVIDER=router: routed over VERITTA_LLM_ROUTER_PROVIDERS (app.llm.routing_client)
+ROUTER_PROVIDER = "router"
 
 
 def create_llm_client(
@@ -39,6 +50,86 @@ def create_llm_client(
     Raises:
         ConfigurationError: ENV ausente, provider bloqueado, api_key ausente
     """
+    if _is_router(provider):
+        return _create_router(create_llm_client, timeout_s)
+
+    provider, api_key = _resolve_provider(provider, api_key)
+
+    # Fake client para desenvolvimento/testes
+    if provider == "fake":
+        return FakeLLMClient()
+
+    # Instanciar client
+    clients = {
+        "openai": OpenAIClient,
+        "anthropic": AnthropicClient,
+        "gemini": GeminiClient,
+        "grok": GrokClient,
+        "deepseek": DeepSeekClient,
+    }
+    
+    client_class = clients.get(provider)
+    if not client_class:
+        raise ConfigurationError(f"Unknown LLM provider: {provider}")
+    
+    return client_class(api_key=api_key, default_timeout_s=timeout_s)
+
+
+def create_async_llm_client(
+    provider: Optional[str] = None,
+    api_key: Optional[str] = None,
+    timeout_s: float = 30.0,
+) -> LLMClient:
+    """
+    Factory para LLM client pooled/async (mesma governança de create_llm_client).
+
+    Clients de app.llm.async_clients: generate_async sobre um httpx.AsyncClient
+    compartilhado por provider (keep-alive, HTTP/2 quando disponível).
+    Mesma allowlist e resolução de api_key (fail-closed).
+    """
+    if _is_router(provider):
+        return _create_router(create_async_llm_client, timeout_s)
+
+    provider, api_key = _resolve_provider(provider, api_key)
+
+    if provider == "fake":
+        return FakeLLMClient()
+
+    clients = {
+        "openai": OpenAIAsyncClient,
+        "anthropic": AnthropicAsyncClient,
+        "gemini": GeminiAsyncClient,
+        "grok": GrokAsyncClient,
+        "deepseek": DeepSeekAsyncClient,
+    }
+
+    client_class = clients.get(provider)
+    if not client_class:
+        raise ConfigurationError(f"Unknown LLM provider: {provider}")
+
+    return client_class(api_key=api_key, default_timeout_s=timeout_s)
+
+
+def _is_router(provider: Optional[str]) -> bool:
+    return (provider or os.getenv("LLM_PROVIDER", "fake")).lower() == ROUTER_PROVIDER
+
+
+def _create_router(factory: Callable[..., LLMClient], timeout_s: float) -> LLMClient:
+    """RoutingLLMClient over member clients built by the same factory.
+
+    Each member goes through the allowlist / api_key resolution: one blocked
+    or unconfigured provider fails the whole router (fail-closed).
+    """
+    providers = router_providers()
+    if not providers:
+        raise ConfigurationError("VERITTA_LLM_ROUTER_PROVIDERS not configured (fail-closed)")
+    if ROUTER_PROVIDER in providers:
+        raise ConfigurationError("Router cannot route to itself (fail-closed)")
+    return RoutingLLMClient({p: factory(provider=p, timeout_s=timeout_s) for p in providers})
+
+
+def _resolve_provider(provider: Optional[str], api_key: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Allowlist + api_key resolution shared by both factories (fail-closed)."""
     # F9.9-B: Validar allowlist obrigatória (fail-closed)
     allowed_providers_raw = os.getenv("VERITTA_LLM_ALLOWED_PROVIDERS")
     if not allowed_providers_raw:
@@ -58,10 +149,9 @@ def create_llm_client(
             f"Provider '{provider}' not in allowlist {allowed_providers} (fail-closed)"
         )
     
-    # Fake client para desenvolvimento/testes
     if provider == "fake":
-        return FakeLLMClient()
-    
+        return provider, api_key
+
     # Resolver API key por provider
     if api_key is None:
         key_map = {
@@ -79,17 +169,4 @@ def create_llm_client(
         if not api_key:
             raise ConfigurationError(f"Missing {env_var} for provider {provider}")
     
-    # Instanciar client
-    clients = {
-        "openai": OpenAIClient,
-        "anthropic": AnthropicClient,
-        "gemini": GeminiClient,
-        "grok": GrokClient,
-        "deepseek": DeepSeekClient,
-    }
-    
-    client_class = clients.get(provider)
-    if not client_class:
-        raise ConfigurationError(f"Unknown LLM provider: {provider}")
-    
-    return client_class(api_key=api_key, default_timeout_s=timeout_s)
+    return provider, api_key
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from hashlib import sha256
-from typing import Dict
+from typing import AsyncIterator, Dict
 
-from .client import LLMClient
+from .client import LLMClient, StreamChunk
 
 
 class FakeLLMClient(LLMClient):
@@ -20,3 +20,23 @@ class FakeLLMClient(LLMClient):
         text = f"FAKE::{digest}"
         usage = {"prompt": 0, "completion": 1, "total": 1}
         return {"text": text, "usage": usage, "model": model, "latency_ms": 1}
+
+    async def generate_async(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> Dict:
+        return self.generate(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens, timeout_s=timeout_s
+        )
+
+    async def generate_stream(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> AsyncIterator[StreamChunk]:
+        resp = self.generate(
+            prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens, timeout_s=timeout_s
+        )
+        # Deterministic pieces (streaming path exercised without a provider)
+        text = resp["text"]
+        yield StreamChunk(model=resp["model"])
+        for i in range(0, len(text), 4):
+            yield StreamChunk(text=text[i:i + 4])
+        yield StreamChunk(usage=resp["usage"])
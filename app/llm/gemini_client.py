@@ -18,6 +18,8 @@ from .client import LLMClient
 class GeminiClient(LLMClient):
     """Google Gemini adapter (gemini-pro, gemini-1.5-pro, etc)."""
 
+    provider = "gemini"
+
     def __init__(self, api_key: str, *, default_timeout_s: float = 10.0):
         """
         Args:
@@ -18,6 +18,8 @@ from .client import LLMClient
 class GrokClient(LLMClient):
     """xAI Grok adapter (grok-beta, grok-1, etc)."""
 
+    provider = "grok"
+
     def __init__(self, api_key: str, *, default_timeout_s: float = 10.0):
         """
         Args:
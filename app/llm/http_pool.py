@@ -0,0 +1,161 @@
+"""Shared HTTP connection pools for LLM providers (async + sync).
+
+One long-lived httpx client per provider instead of an SDK client per
+LLMExecutorV1 / per call:
+- AsyncClient per (event loop, provider): keep-alive connections reused by
+  every request on that loop (httpx pools are bound to their loop)
+- Client (sync) per provider: same pooling for the thread-based path
+- Per-provider concurrency semaphore (asyncio) caps in-flight requests
+- HTTP/2 when the `h2` package is installed (VERITTA_LLM_HTTP2=auto), else
+  HTTP/1.1 keep-alive (fail-safe: performance option only)
+
+Environment:
+- VERITTA_LLM_POOL_MAX_CONNECTIONS: max connections per provider (default 100)
+- VERITTA_LLM_POOL_MAX_KEEPALIVE: idle keep-alive connections kept (default 64)
+- VERITTA_LLM_POOL_KEEPALIVE_EXPIRY_S: idle connection lifetime (default 30)
+- VERITTA_LLM_PROVIDER_CONCURRENCY: in-flight requests per provider (default 64)
+- VERITTA_LLM_HTTP2: auto | on | off (default auto)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 64
+DEFAULT_KEEPALIVE_EXPIRY_S = 30.0
+DEFAULT_PROVIDER_CONCURRENCY = 64
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 per VERITTA_LLM_HTTP2 (auto: only if h2 is installed)."""
+    mode = os.getenv("VERITTA_LLM_HTTP2", "auto").strip().lower()
+    if mode in ("off", "0", "false", "no"):
+        return False
+    available = importlib.util.find_spec("h2") is not None
+    if mode in ("on", "1", "true", "yes") and not available:
+        logger.warning("VERITTA_LLM_HTTP2=%s but h2 is not installed; using HTTP/1.1 keep-alive", mode)
+    return available
+
+
+def pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_env_int("VERITTA_LLM_POOL_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=_env_int("VERITTA_LLM_POOL_MAX_KEEPALIVE", DEFAULT_MAX_KEEPALIVE),
+        keepalive_expiry=_env_float("VERITTA_LLM_POOL_KEEPALIVE_EXPIRY_S", DEFAULT_KEEPALIVE_EXPIRY_S),
+    )
+
+
+class _LoopPools:
+    """Async clients + semaphores owned by one event loop."""
+
+    __slots__ = ("clients", "semaphores")
+
+    def __init__(self):
+        self.clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+_lock = threading.Lock()
+_loop_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopPools]" = weakref.WeakKeyDictionary()
+_sync_clients: Dict[Tuple[str, str], httpx.Client] = {}
+
+
+def _pools_for_running_loop() -> _LoopPools:
+    loop = asyncio.get_running_loop()
+    with _lock:
+        pools = _loop_pools.get(loop)
+        if pools is None:
+            pools = _loop_pools[loop] = _LoopPools()
+        return pools
+
+
+def get_async_http_client(provider: str, base_url: str) -> httpx.AsyncClient:
+    """Shared AsyncClient for provider on the running loop (created on first use)."""
+    pools = _pools_for_running_loop()
+    key = (provider, base_url)
+    client = pools.clients.get(key)
+    if client is None or client.is_closed:
+        client = pools.clients[key] = httpx.AsyncClient(
+            base_url=base_url, http2=http2_enabled(), limits=pool_limits()
+        )
+    return client
+
+
+def get_provider_semaphore(provider: str) -> asyncio.Semaphore:
+    """In-flight request cap for provider on the running loop."""
+    pools = _pools_for_running_loop()
+    semaphore = pools.semaphores.get(provider)
+    if semaphore is None:
+        semaphore = pools.semaphores[provider] = asyncio.Semaphore(
+            _env_int("VERITTA_LLM_PROVIDER_CONCURRENCY", DEFAULT_PROVIDER_CONCURRENCY)
+        )
+    return semaphore
+
+
+def get_sync_http_client(provider: str, base_url: str) -> httpx.Client:
+    """Shared sync Client for provider (thread-safe, keep-alive)."""
+    key = (provider, base_url)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None or client.is_closed:
+            client = _sync_clients[key] = httpx.Client(
+                base_url=base_url, http2=http2_enabled(), limits=pool_limits()
+            )
+        return client
+
+
+async def close_async_http_clients() -> None:
+    """Close the running loop's provider clients (FastAPI lifespan shutdown)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        pools: Optional[_LoopPools] = _loop_pools.pop(loop, None)
+    if pools is not None:
+        for client in pools.clients.values():
+            await client.aclose()
+
+
+def close_sync_http_clients() -> None:
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.close()
+
+
+def _reset_after_fork() -> None:
+    # Sockets/locks must not be shared with the parent; child opens its own
+    global _lock, _loop_pools, _sync_clients
+    _lock = threading.Lock()
+    _loop_pools = weakref.WeakKeyDictionary()
+    _sync_clients = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -4,11 +4,13 @@ Métricas Prometheus para LLM calls:
 - llm_request_latency_seconds: Histogram de latência (p50, p95, p99)
 - llm_tokens_total: Counter de tokens consumidos
 - llm_errors_total: Counter de erros por tipo
+- llm_coalesced_requests_total / llm_single_flight_inflight: single-flight
+- llm_cache_*: response cache hits/misses, evictions, memory bytes
 """
 
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # F9.9-B: Métricas LLM obrigatórias
 
@@ -27,9 +29,64 @@ llm_tokens_total = Counter(
     labelnames=["provider", "model", "type"],  # type: prompt, completion
 )
 
+# Single-flight (app.llm.single_flight): chamadas idênticas em voo coalescidas
+llm_coalesced_requests_total = Counter(
+    "llm_coalesced_requests_total",
+    "LLM generations served by an identical in-flight call (no provider request)",
+    labelnames=["model"],
+)
+
+llm_single_flight_inflight = Gauge(
+    "llm_single_flight_inflight",
+    "Distinct LLM generations in flight (single-flight leaders)",
+)
+
 # Erros LLM (counter por tipo de erro)
 llm_errors_total = Counter(
     "llm_errors_total",
     "Total LLM errors",
     labelnames=["provider", "error_type"],  # error_type: timeout, provider_error, etc
 )
+
+# Response cache (app.llm.response_cache)
+llm_cache_requests_total = Counter(
+    "llm_cache_requests_total",
+    "LLM response cache lookups",
+    labelnames=["tier", "result"],  # tier: memory, disk; result: hit, miss
+)
+
+llm_cache_evictions_total = Counter(
+    "llm_cache_evictions_total",
+    "LLM response cache evictions",
+    labelnames=["tier", "reason"],  # reason: expired, budget
+)
+
+llm_cache_bytes = Gauge(
+    "llm_cache_bytes",
+    "Bytes held by the LLM response cache memory tier",
+)
+
+# Routing (app.llm.routing_client): provider escolhido por latência / saúde
+llm_router_selected_total = Counter(
+    "llm_router_selected_total",
+    "LLM calls routed to a provider (hedge duplicates included)",
+    labelnames=["provider"],
+)
+
+llm_hedged_requests_total = Counter(
+    "llm_hedged_requests_total",
+    "Hedged LLM calls (duplicate sent to a second provider)",
+    labelnames=["winner"],  # winner: primary, hedge
+)
+
+llm_router_latency_ewma_seconds = Gauge(
+    "llm_router_latency_ewma_seconds",
+    "EWMA of successful LLM call latency used for routing",
+    labelnames=["provider"],
+)
+
+llm_router_error_rate = Gauge(
+    "llm_router_error_rate",
+    "EWMA of the LLM call error rate used for routing",
+    labelnames=["provider"],
+)
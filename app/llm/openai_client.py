@@ -22,6 +22,8 @@ from .metrics import llm_request_latency_seconds, llm_tokens_total, llm_errors_t
 class OpenAIClient(LLMClient):
     """OpenAI GPT adapter (gpt-4, gpt-3.5-turbo, etc)."""
 
+    provider = "openai"
+
     def __init__(self, api_key: str, *, default_timeout_s: float = 30.0):
         """
         Args:
@@ -0,0 +1,328 @@
+"""Governed LLM response cache (V-COF, privacy-first).
+
+Policy.TEMPERATURE is 0.0: identical (provider, model, prompt, max_tokens)
+generations are reused instead of paying tokens and latency again.
+
+- Key: SHA256 of the canonical request (provider, model, prompt, max_tokens,
+  temperature); the raw prompt is never stored, only the digest (app.digests)
+- Value: the response fields returned by LLMExecutorV1 (text, model, usage)
+  as canonical JSON bytes
+- Memory tier: LRU + TTL + byte budget (OrderedDict, one lock)
+- Disk tier (optional, VERITTA_LLM_CACHE_DISK_PATH): sqlite (WAL), survives
+  restarts and is shared by workers on one host; TTL + byte budget (oldest
+  expiry evicted first); hits are promoted to memory
+- Only temperature 0.0 requests are cached (deterministic candidates)
+- Hits: reason code LLM_CACHE_HIT on the SUCCESS ActionResult; Prometheus
+  llm_cache_requests_total / llm_cache_evictions_total / llm_cache_bytes
+
+Environment:
+- VERITTA_LLM_CACHE: on | off (default on)
+- VERITTA_LLM_CACHE_MAX_ENTRIES: memory entries (default 4096)
+- VERITTA_LLM_CACHE_MAX_BYTES: memory byte budget (default 32 MiB)
+- VERITTA_LLM_CACHE_TTL_S: entry lifetime, both tiers (default 3600)
+- VERITTA_LLM_CACHE_DISK_PATH: sqlite file for the disk tier (default: none)
+- VERITTA_LLM_CACHE_DISK_MAX_BYTES: disk byte budget (default 256 MiB)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.canonical_json import canonical_bytes, canonical_sha256
+
+from .metrics import llm_cache_bytes, llm_cache_evictions_total, llm_cache_requests_total
+
+logger = logging.getLogger(__name__)
+
+REASON_LLM_CACHE_HIT = "LLM_CACHE_HIT"
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL_S = 3600.0
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+
+# Response fields kept (same as LLMExecutorV1 output)
+_CACHED_FIELDS = ("text", "model", "usage")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def llm_cache_key(*, provider: str, model: str, prompt: str, max_tokens: int, temperature: float) -> Optional[str]:
+    """SHA256 of the canonical generation request, or None if not cacheable."""
+    if temperature != 0.0:
+        # Sampling: same request, different answers
+        return None
+    try:
+        return canonical_sha256({
+            "provider": provider,
+            "model": model,
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        })
+    except (TypeError, ValueError):
+        return None
+
+
+class _DiskTier:
+    """
+    sqlite store: key -> (expires_at, size, value).
+
+    Bytes stored are tracked in a running total (loaded at open, updated on
+    insert/delete), so put() does not scan the table; the total is re-read
+    from sqlite only when it exceeds the budget (also corrects drift when
+    several processes share the file).
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, size INTEGER NOT NULL, value BLOB NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_llm_response_cache_expires ON llm_response_cache (expires_at)")
+        self._bytes = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_response_cache").fetchone()[0]
+
+    def get(self, key: str, now: float) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                self._bytes -= len(row[0])
+                llm_cache_evictions_total.labels(tier="disk", reason="expired").inc()
+                return None
+            return bytes(row[0]), row[1]
+
+    def put(self, key: str, value: bytes, expires_at: float, now: float) -> None:
+        with self._lock:
+            old = self._db.execute("SELECT size FROM llm_response_cache WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, expires_at, size, value) VALUES (?, ?, ?, ?)",
+                (key, expires_at, len(value), value),
+            )
+            self._bytes += len(value) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._enforce_budget(now)
+
+    def _enforce_budget(self, now: float) -> None:
+        self._bytes = total = self._stored_bytes()
+        if total <= self.max_bytes:
+            return
+        expired = self._db.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (now,)).rowcount
+        if expired:
+            llm_cache_evictions_total.labels(tier="disk", reason="expired").inc(expired)
+            total = self._stored_bytes()
+        evicted = 0
+        rows = self._db.execute("SELECT key, size FROM llm_response_cache ORDER BY expires_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        if evicted:
+            llm_cache_evictions_total.labels(tier="disk", reason="budget").inc(evicted)
+        self._bytes = total
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_response_cache")
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class LLMResponseCache:
+    """Memory LRU (+ optional sqlite tier) of LLM responses keyed by request digest."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries or _env_int("VERITTA_LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        self.max_bytes = max_bytes or _env_int("VERITTA_LLM_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self.ttl_s = ttl_s or _env_float("VERITTA_LLM_CACHE_TTL_S", DEFAULT_TTL_S)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, value bytes); LRU order (most recent last)
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._disk: Optional[_DiskTier] = None
+        if disk_path:
+            try:
+                self._disk = _DiskTier(
+                    disk_path,
+                    disk_max_bytes or _env_int("VERITTA_LLM_CACHE_DISK_MAX_BYTES", DEFAULT_DISK_MAX_BYTES),
+                )
+            except sqlite3.Error as e:
+                # Performance tier only: memory cache keeps working
+                logger.warning("LLM cache disk tier disabled (%s): %s", disk_path, type(e).__name__)
+
+    @property
+    def disk_enabled(self) -> bool:
+        return self._disk is not None
+
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached response (fresh dict) or None."""
+        if key is None:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    llm_cache_requests_total.labels(tier="memory", result="hit").inc()
+                    return json.loads(entry[1])
+                self._remove(key)
+                llm_cache_evictions_total.labels(tier="memory", reason="expired").inc()
+
+        if self._disk is not None:
+            try:
+                found = self._disk.get(key, now)
+            except sqlite3.Error:
+                found = None
+            if found is not None:
+                value, expires_at = found
+                with self._lock:
+                    self._insert(key, value, expires_at)
+                llm_cache_requests_total.labels(tier="disk", result="hit").inc()
+                return json.loads(value)
+
+        # Miss counted on the last tier consulted
+        llm_cache_requests_total.labels(tier="disk" if self._disk else "memory", result="miss").inc()
+        return None
+
+    def put(self, key: Optional[str], response: Any) -> bool:
+        """Store the response fields; False if not cacheable."""
+        if key is None or not isinstance(response, dict) or not isinstance(response.get("text"), str):
+            return False
+        try:
+            value = canonical_bytes({f: response.get(f) for f in _CACHED_FIELDS})
+        except (TypeError, ValueError):
+            return False
+        if len(value) > self.max_bytes:
+            return False
+        now = self._clock()
+        expires_at = now + self.ttl_s
+        with self._lock:
+            self._insert(key, value, expires_at)
+        if self._disk is not None:
+            try:
+                self._disk.put(key, value, expires_at, now)
+            except sqlite3.Error as e:
+                logger.warning("LLM cache disk write failed: %s", type(e).__name__)
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            llm_cache_bytes.set(0)
+        if self._disk is not None:
+            self._disk.clear()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+    def _insert(self, key: str, value: bytes, expires_at: float) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, value)
+        self._bytes += len(value)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            llm_cache_evictions_total.labels(tier="memory", reason="budget").inc()
+        llm_cache_bytes.set(self._bytes)
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+        llm_cache_bytes.set(self._bytes)
+
+
+def cache_enabled() -> bool:
+    return os.getenv("VERITTA_LLM_CACHE", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache built from env (None when VERITTA_LLM_CACHE=off)."""
+    global _cache
+    if not cache_enabled():
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(disk_path=os.getenv("VERITTA_LLM_CACHE_DISK_PATH") or None)
+    return _cache
+
+
+def set_llm_response_cache(cache: Optional[LLMResponseCache]) -> None:
+    """Replace the global cache (None: rebuild from env on next use)."""
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+    if previous is not None and previous is not cache:
+        previous.close()
+
+
+def _reset_after_fork() -> None:
+    # sqlite connections must not cross fork; child reopens lazily
+    global _cache, _cache_lock
+    _cache = None
+    _cache_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -8,6 +8,7 @@ Retry automático para erros temporários (429, 5xx).
 
 from __future__ import annotations
 
+import asyncio
 import functools
 import time
 from typing import Any, Callable
@@ -64,6 +65,30 @@ def with_retry(max_retries: int = 2) -> Callable:
     return decorator
 
 
+def with_retry_async(max_retries: int = 2) -> Callable:
+    """with_retry para coroutines (backoff com asyncio.sleep, não bloqueia o loop)."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except TimeoutError:
+                    # Timeout: não faz retry (fail-fast)
+                    raise
+                except ProviderError as e:
+                    if _is_retryable(e) and attempt < max_retries:
+                        await asyncio.sleep(2**attempt)  # Exponential backoff: 1s, 2s
+                        continue
+                    raise
+            raise ProviderError("MAX_RETRIES_EXCEEDED")
+
+        return wrapper
+
+    return decorator
+
+
 def _is_retryable(error: ProviderError) -> bool:
     """Verifica se erro é retryable (429, 5xx)."""
     msg = str(error).lower()
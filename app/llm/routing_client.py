@@ -0,0 +1,333 @@
+"""Latency-aware routing across allowed LLM providers, with hedged requests.
+
+RoutingLLMClient holds one client per provider (LLM_PROVIDER=router) and
+picks, per call, the currently fastest healthy provider:
+
+- Per provider: EWMA of call latency and of the error rate, measured on the
+  same calls that feed llm_request_latency_seconds / llm_errors_total, plus
+  a window of recent latencies for p95
+- Healthy: error rate EWMA below VERITTA_LLM_ROUTER_MAX_ERROR_RATE; an
+  unhealthy provider is probed again after VERITTA_LLM_ROUTER_RETRY_AFTER_S
+- Providers without samples yet are tried first (explore), then lowest EWMA
+- Hedging (async path, VERITTA_LLM_ROUTER_HEDGE=on): if the primary has not
+  answered after max(p95 of the primary, VERITTA_LLM_ROUTER_HEDGE_MIN_DELAY_S),
+  a duplicate goes to the second provider; the first success wins and the
+  loser is cancelled. A primary failing before the delay hands over at once.
+  The sync path (threads cannot be cancelled) and streams are not hedged.
+
+Governance (V-COF, fail-closed), on every routed call:
+- the provider must still be in VERITTA_LLM_ALLOWED_PROVIDERS
+- Policy.validate() on the requested model / prompt / max_tokens
+- optional model translation per provider (VERITTA_LLM_ROUTER_MODEL_MAP,
+  JSON {"deepseek": {"gpt-4": "gpt-4o-mini"}}); without an entry the
+  requested model is sent as is
+- the model actually sent to each provider must be in Policy.ALLOWED_MODELS:
+  checked on the map when the router is built (ConfigurationError) and on
+  every routed call (POLICY_VIOLATION, before any provider is called)
+
+Environment:
+- VERITTA_LLM_ROUTER_PROVIDERS: routed providers in preference order
+  (default: VERITTA_LLM_ALLOWED_PROVIDERS)
+- VERITTA_LLM_ROUTER_HEDGE: on | off (default off: a hedge may cost tokens twice)
+- VERITTA_LLM_ROUTER_HEDGE_MIN_DELAY_S: minimum hedge delay (default 0.5)
+- VERITTA_LLM_ROUTER_EWMA_ALPHA: EWMA weight of the newest sample (default 0.2)
+- VERITTA_LLM_ROUTER_MAX_ERROR_RATE: healthy threshold (default 0.5)
+- VERITTA_LLM_ROUTER_RETRY_AFTER_S: probe delay for unhealthy providers (default 30)
+- VERITTA_LLM_ROUTER_MODEL_MAP: see above (default none)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from .client import LLMClient, StreamChunk
+from .errors import ConfigurationError
+from .metrics import (
+    llm_hedged_requests_total,
+    llm_router_error_rate,
+    llm_router_latency_ewma_seconds,
+    llm_router_selected_total,
+)
+from .policy import Policy
+
+DEFAULT_HEDGE_MIN_DELAY_S = 0.5
+DEFAULT_EWMA_ALPHA = 0.2
+DEFAULT_MAX_ERROR_RATE = 0.5
+DEFAULT_RETRY_AFTER_S = 30.0
+# Latencies kept per provider for the p95 hedge delay
+LATENCY_WINDOW = 64
+# Fewer samples: p95 not meaningful, hedge after the minimum delay
+MIN_P95_SAMPLES = 5
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _allowed_providers() -> List[str]:
+    raw = os.getenv("VERITTA_LLM_ALLOWED_PROVIDERS") or ""
+    return [p.strip().lower() for p in raw.split(",") if p.strip()]
+
+
+class ProviderStats:
+    """Routing state of one provider (guarded by the router lock)."""
+
+    __slots__ = ("provider", "latency_ewma", "error_rate", "latencies", "last_failure", "calls")
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.last_failure = float("-inf")
+        self.calls = 0
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_P95_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class RoutingLLMClient(LLMClient):
+    """LLMClient over several providers: fastest healthy first, optional hedge."""
+
+    def __init__(
+        self,
+        clients: Dict[str, LLMClient],
+        *,
+        hedge: Optional[bool] = None,
+        hedge_min_delay_s: Optional[float] = None,
+        ewma_alpha: Optional[float] = None,
+        max_error_rate: Optional[float] = None,
+        retry_after_s: Optional[float] = None,
+        model_map: Optional[Dict[str, Dict[str, str]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not clients:
+            raise ConfigurationError("RoutingLLMClient needs at least one provider (fail-closed)")
+        self._clients = dict(clients)
+        self._order = list(clients)
+        if hedge is None:
+            hedge = os.getenv("VERITTA_LLM_ROUTER_HEDGE", "off").strip().lower() in ("on", "1", "true", "yes")
+        self.hedge = hedge
+        self.hedge_min_delay_s = hedge_min_delay_s or _env_float(
+            "VERITTA_LLM_ROUTER_HEDGE_MIN_DELAY_S", DEFAULT_HEDGE_MIN_DELAY_S
+        )
+        self.ewma_alpha = ewma_alpha or _env_float("VERITTA_LLM_ROUTER_EWMA_ALPHA", DEFAULT_EWMA_ALPHA)
+        self.max_error_rate = max_error_rate or _env_float("VERITTA_LLM_ROUTER_MAX_ERROR_RATE", DEFAULT_MAX_ERROR_RATE)
+        self.retry_after_s = retry_after_s or _env_float("VERITTA_LLM_ROUTER_RETRY_AFTER_S", DEFAULT_RETRY_AFTER_S)
+        self._model_map = model_map if model_map is not None else _env_model_map()
+        for provider, models in self._model_map.items():
+            if any(target not in Policy.ALLOWED_MODELS for target in models.values()):
+                raise ConfigurationError(
+                    f"VERITTA_LLM_ROUTER_MODEL_MAP for {provider} maps to a model outside Policy.ALLOWED_MODELS (fail-closed)"
+                )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stats = {p: ProviderStats(p) for p in self._order}
+
+    @property
+    def provider(self) -> str:
+        # Cache / single-flight key: answers of any routed provider are interchangeable
+        return "router:" + ",".join(self._order)
+
+    @property
+    def providers(self) -> List[str]:
+        return list(self._order)
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        with self._lock:
+            return {
+                p: {"latency_ewma": s.latency_ewma, "error_rate": s.error_rate, "p95": s.p95(), "calls": s.calls}
+                for p, s in self._stats.items()
+            }
+
+    # -- routing ---------------------------------------------------------
+
+    def ranked(self) -> List[str]:
+        """Routable providers, best first (allowlist re-checked: fail-closed)."""
+        allowed = set(_allowed_providers())
+        now = self._clock()
+        with self._lock:
+            candidates = [self._stats[p] for p in self._order if p in allowed]
+            healthy = [
+                s for s in candidates
+                if s.error_rate < self.max_error_rate or now - s.last_failure >= self.retry_after_s
+            ]
+            # No healthy provider: least failing first rather than refusing outright
+            pool = healthy or sorted(candidates, key=lambda s: s.error_rate)
+            order = {p: i for i, p in enumerate(self._order)}
+            return [
+                s.provider for s in sorted(
+                    pool,
+                    key=lambda s: (s.latency_ewma is not None, s.latency_ewma or 0.0, order[s.provider]),
+                )
+            ]
+
+    def _record(self, provider: str, latency_s: Optional[float]) -> None:
+        """latency_s None: failed call."""
+        alpha = self.ewma_alpha
+        with self._lock:
+            s = self._stats[provider]
+            s.calls += 1
+            failed = latency_s is None
+            s.error_rate = (1 - alpha) * s.error_rate + alpha * (1.0 if failed else 0.0)
+            if failed:
+                s.last_failure = self._clock()
+            else:
+                s.latencies.append(latency_s)
+                s.latency_ewma = latency_s if s.latency_ewma is None else (
+                    (1 - alpha) * s.latency_ewma + alpha * latency_s
+                )
+                llm_router_latency_ewma_seconds.labels(provider=provider).set(s.latency_ewma)
+            llm_router_error_rate.labels(provider=provider).set(s.error_rate)
+
+    def _route(self, prompt: str, model: str, max_tokens: int) -> List[str]:
+        # Policy on every routed call: requested model, then the model each
+        # candidate provider would receive (hedge target included)
+        Policy.validate(prompt=prompt, model=model, max_tokens=max_tokens, timeout_s=Policy.TIMEOUT_S)
+        providers = self.ranked()
+        if not providers:
+            raise ConfigurationError("No routed provider in VERITTA_LLM_ALLOWED_PROVIDERS (fail-closed)")
+        if any(self._provider_model(p, model) not in Policy.ALLOWED_MODELS for p in providers):
+            raise ValueError("POLICY_VIOLATION")
+        return providers
+
+    def _provider_model(self, provider: str, model: str) -> str:
+        return self._model_map.get(provider, {}).get(model, model)
+
+    # -- calls -----------------------------------------------------------
+
+    def generate(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> Dict:
+        provider = self._route(prompt, model, max_tokens)[0]
+        llm_router_selected_total.labels(provider=provider).inc()
+        start = time.perf_counter()
+        try:
+            resp = self._clients[provider].generate(
+                prompt=prompt,
+                model=self._provider_model(provider, model),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout_s=timeout_s,
+            )
+        except Exception:
+            self._record(provider, None)
+            raise
+        self._record(provider, time.perf_counter() - start)
+        return resp
+
+    async def generate_async(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> Dict:
+        providers = self._route(prompt, model, max_tokens)
+        kwargs = dict(prompt=prompt, model=model, temperature=temperature, max_tokens=max_tokens, timeout_s=timeout_s)
+        primary = providers[0]
+        llm_router_selected_total.labels(provider=primary).inc()
+        if not self.hedge or len(providers) < 2:
+            return await self._call_async(primary, kwargs)
+        return await self._hedged(primary, providers[1], kwargs)
+
+    async def generate_stream(
+        self, *, prompt: str, model: str, temperature: float, max_tokens: int, timeout_s: float
+    ) -> AsyncIterator[StreamChunk]:
+        provider = self._route(prompt, model, max_tokens)[0]
+        llm_router_selected_total.labels(provider=provider).inc()
+        start = time.perf_counter()
+        stream = self._clients[provider].generate_stream(
+            prompt=prompt,
+            model=self._provider_model(provider, model),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout_s=timeout_s,
+        )
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception:
+            self._record(provider, None)
+            raise
+        finally:
+            await stream.aclose()
+        self._record(provider, time.perf_counter() - start)
+
+    async def _call_async(self, provider: str, kwargs: Dict) -> Dict:
+        start = time.perf_counter()
+        try:
+            resp = await self._clients[provider].generate_async(
+                **{**kwargs, "model": self._provider_model(provider, kwargs["model"])}
+            )
+        except asyncio.CancelledError:
+            # Hedge loser (or caller timeout): no signal about the provider
+            raise
+        except Exception:
+            self._record(provider, None)
+            raise
+        self._record(provider, time.perf_counter() - start)
+        return resp
+
+    def _hedge_delay(self, provider: str) -> float:
+        with self._lock:
+            p95 = self._stats[provider].p95()
+        return max(self.hedge_min_delay_s, p95 or 0.0)
+
+    async def _hedged(self, primary: str, secondary: str, kwargs: Dict) -> Dict:
+        loop = asyncio.get_running_loop()
+        pending: Dict[asyncio.Future, str] = {asyncio.ensure_future(self._call_async(primary, kwargs)): primary}
+        hedge_at = loop.time() + self._hedge_delay(primary)
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                timeout = None if hedged else max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        if hedged:
+                            llm_hedged_requests_total.labels(
+                                winner="hedge" if provider == secondary else "primary"
+                            ).inc()
+                        return task.result()
+                    error = task.exception()
+                if not hedged:
+                    # Primary slower than its p95 (or already failed): duplicate to the next provider
+                    hedged = True
+                    llm_router_selected_total.labels(provider=secondary).inc()
+                    pending[asyncio.ensure_future(self._call_async(secondary, kwargs))] = secondary
+            raise error
+        finally:
+            # Loser cancelled: its provider request is dropped
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _env_model_map() -> Dict[str, Dict[str, str]]:
+    raw = os.getenv("VERITTA_LLM_ROUTER_MODEL_MAP")
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+        return {str(p).lower(): {str(k): str(v) for k, v in models.items()} for p, models in data.items()}
+    except (ValueError, AttributeError) as e:
+        raise ConfigurationError("VERITTA_LLM_ROUTER_MODEL_MAP must be a JSON object (fail-closed)") from e
+
+
+def router_providers() -> List[str]:
+    """Providers routed by LLM_PROVIDER=router (must be allowed: checked by the factory)."""
+    raw = os.getenv("VERITTA_LLM_ROUTER_PROVIDERS") or os.getenv("VERITTA_LLM_ALLOWED_PROVIDERS") or ""
+    return [p.strip().lower() for p in raw.split(",") if p.strip()]
@@ -0,0 +1,160 @@
+"""Single-flight coalescing of identical in-flight LLM generations.
+
+When many requests trigger the same templated llm_generate at once, only the
+first (leader) calls the provider; identical concurrent callers (followers)
+wait for the leader's result instead of sending their own request.
+
+- Key: the canonical request digest (llm_cache_key: provider, model, prompt,
+  max_tokens, temperature 0.0); None => never coalesced
+- One table for both paths: sync callers (executor pool threads) and async
+  callers (event loop) coalesce with each other (concurrent.futures.Future)
+- Each follower gets its own copy of the result (or of the exception); every
+  caller still produces its own ActionResult / audit record / trace_id
+- An async leader cancelled mid-call (timeout) hands over: waiting followers
+  retry, one of them becomes the new leader
+- Followers are marked LLM_COALESCED in the ActionResult reason_codes;
+  Prometheus llm_coalesced_requests_total / llm_single_flight_inflight
+
+Environment:
+- VERITTA_LLM_SINGLE_FLIGHT: on | off (default on)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .metrics import llm_coalesced_requests_total, llm_single_flight_inflight
+
+REASON_LLM_COALESCED = "LLM_COALESCED"
+
+
+class _LeaderAbandoned(Exception):
+    """Async leader cancelled before producing a result."""
+
+
+class SingleFlight:
+    """In-flight call table: key -> Future of the leader's result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """(future, is_leader) for key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Future()
+            llm_single_flight_inflight.inc()
+            return flight, True
+
+    def _land(self, key: str, flight: Future) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+                llm_single_flight_inflight.dec()
+
+    def call(self, key: Optional[str], fn: Callable[[], Any], *, label: str = "") -> Tuple[Any, bool]:
+        """fn() once per key among concurrent callers; returns (result, coalesced)."""
+        if key is None:
+            return fn(), False
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                return _lead(self, key, flight, fn), False
+            llm_coalesced_requests_total.labels(model=label).inc()
+            try:
+                return _copy_result(flight.result()), True
+            except _LeaderAbandoned:
+                continue
+            except Exception as e:
+                raise _copy_error(e) from e
+
+    async def acall(
+        self, key: Optional[str], afn: Callable[[], Awaitable[Any]], *, label: str = ""
+    ) -> Tuple[Any, bool]:
+        """call() for coroutines; followers never block the event loop."""
+        if key is None:
+            return await afn(), False
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                try:
+                    result = await afn()
+                except asyncio.CancelledError:
+                    flight.set_exception(_LeaderAbandoned())
+                    self._land(key, flight)
+                    raise
+                except BaseException as e:
+                    flight.set_exception(e)
+                    self._land(key, flight)
+                    raise
+                flight.set_result(result)
+                self._land(key, flight)
+                return result, False
+            llm_coalesced_requests_total.labels(model=label).inc()
+            try:
+                # shield: a follower timing out must not cancel the leader's future
+                result = await asyncio.shield(asyncio.wrap_future(flight))
+                return _copy_result(result), True
+            except _LeaderAbandoned:
+                continue
+            except Exception as e:
+                raise _copy_error(e) from e
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+def _lead(table: SingleFlight, key: str, flight: Future, fn: Callable[[], Any]) -> Any:
+    try:
+        result = fn()
+    except BaseException as e:
+        flight.set_exception(e)
+        table._land(key, flight)
+        raise
+    flight.set_result(result)
+    table._land(key, flight)
+    return result
+
+
+def _copy_result(result: Any) -> Any:
+    # Followers must not share mutable output with the leader
+    return copy.deepcopy(result)
+
+
+def _copy_error(error: Exception) -> Exception:
+    # Same exception instance raised in several threads would share its traceback
+    try:
+        return copy.copy(error)
+    except Exception:
+        return RuntimeError("PROVIDER_ERROR")
+
+
+def single_flight_enabled() -> bool:
+    return os.getenv("VERITTA_LLM_SINGLE_FLIGHT", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Process-wide table (None when VERITTA_LLM_SINGLE_FLIGHT=off)."""
+    return _single_flight if single_flight_enabled() else None
+
+
+def _reset_after_fork() -> None:
+    # Parent's in-flight calls do not exist in the child
+    global _single_flight
+    _single_flight = SingleFlight()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,7 +2,7 @@
 
 Wires:
 - Gate (evaluate_gate) for action validation
-- Agentic pipeline (run_agentic_action) for execution
+- Agentic pipeline (run_agentic_action_async) for execution
 - Audit logging (gate_audit, action_audit)
 
 Endpoint POST /process:
@@ -10,6 +10,9 @@ Endpoint POST /process:
 - Validates via gate
 - Executes via pipeline if gate allows
 - Returns ActionResult JSON (status, trace_id, action, etc.)
+
+Endpoint POST /process/stream: same gates, Server-Sent Events (output chunks
+of streaming executors, then the ActionResult).
 """
 
 import json
@@ -20,36 +23,60 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.agentic_pipeline import run_agentic_action
+from app.action_contracts import ActionResult
+from app.agentic_pipeline import run_agentic_action_async, run_agentic_action_stream
 from app.auth import detect_auth_mode
 from app.action_audit_log import log_action_result
 from app.action_matrix import get_action_matrix
 from app.audit_log import log_decision
+from app.audit_aggregator import start_audit_aggregator, stop_audit_aggregator
 from app.tracing import init_tracing, observed_span
 from app.audit_log import AuditLogError
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 from app.contracts.gate_v1 import GateDecision, GateInput
 from app.decision_record import DecisionRecord, make_input_digest
-from app.digests import sha256_json_or_none
 from app.error_handler import register_error_handlers
 from app.error_envelope import http_error_detail
 from app.gate_engine import evaluate_gate as evaluate_gate
 from app.gate_canonical import detect_action, parse_body_by_method
+from app.payload_limits import get_request_payload_report
 from app.gate_errors import GateError
 from app.middleware_trace import TraceCorrelationMiddleware
-from app.gates_f21 import run_f21_chain
+from app.canonical_json import CanonicalScopeMiddleware
+from app.gates_f21 import FORBIDDEN_PAYLOAD_FIELDS, run_f21_chain
 from app.gates_f23 import run_f23_chain
 from app.api.admin import router as admin_router
+from app.gates.admin_rate_limit import AdminRateLimit
+from app.executor_pool import shutdown_executor_pool
+from app.db.async_database import close_async_engine
+from app.db.engines import dispose_engines
+from app.db.session_cache import close_session_cache
+from app.session_backend import close_session_backend
+from app.session_sweeper import start_session_sweeper, stop_session_sweeper
+from app.llm.http_pool import close_async_http_clients, close_sync_http_clients
 from app.routes.preferences import router as preferences_router
 from app.routes.notion import router as notion_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize tracing on app startup (F8.6.1 fail-closed)."""
+    """Initialize tracing on app startup (F8.6.1 fail-closed) and audit summary aggregation."""
     init_tracing(service_name="techno-os-backend")
+    start_audit_aggregator()
+    start_session_sweeper()
     logging.info("✅ Startup complete (tracing initialized)")
     yield
+    AdminRateLimit.flush_allow_audit()
+    stop_audit_aggregator()
+    shutdown_executor_pool()
+    await stop_session_sweeper()
+    close_session_cache()
+    close_session_backend()
+    await close_async_engine()
+    dispose_engines()
+    await close_async_http_clients()
+    close_sync_http_clients()
 
 
 from fastapi.middleware.cors import CORSMiddleware
@@ -79,6 +106,9 @@ app.include_router(notion_router)
 # Register middleware (T1: G6 trace correlation)
 app.add_middleware(TraceCorrelationMiddleware)
 
+# Request-scoped canonical JSON cache (outermost: visible to every handler/dependency)
+app.add_middleware(CanonicalScopeMiddleware)
+
 # Register exception handlers (T1: G11 error normalization)
 register_error_handlers(app)
 
@@ -242,8 +272,9 @@ async def gate_request(request: Request, background_tasks: BackgroundTasks) -> D
     
     # Body already parsed above
     
-    # Compute input digest using canonical rule (None for non-JSON, privacy-first)
-    input_digest = sha256_json_or_none(body)
+    # Single-pass payload inspection (canonical bytes, sha256, limits, forbidden keys),
+    # cached on request.state and reused by the F2.1/F2.3 gate chains
+    get_request_payload_report(request, body, FORBIDDEN_PAYLOAD_FIELDS)
     
     # T3: F2.1 chain execution for X-API-Key
     if auth_mode == "F2.1":
@@ -271,6 +302,60 @@ async def gate_request(request: Request, background_tasks: BackgroundTasks) -> D
         return {"payload": body, "action": action, "trace_id": trace_id}
 
 
+def _ensure_action_in_matrix(action: str, trace_id: str) -> None:
+    """403 (audited PROFILE_ACTION_MISMATCH) if action is not in the action matrix."""
+    matrix = get_action_matrix()
+    if action not in matrix.allowed_actions:
+        # Persist PROFILE_ACTION_MISMATCH ActionResult BLOCKED before returning 403
+        mismatch_result = ActionResult(
+            action=action,
+            executor_id="unknown",
+            executor_version="unknown",
+            status="BLOCKED",
+            reason_codes=["PROFILE_ACTION_MISMATCH"],
+            input_digest="",
+            output_digest=None,
+            trace_id=trace_id,
+            ts_utc=datetime.now(timezone.utc),
+        )
+        try:
+            log_action_result(mismatch_result)
+        except AuditLogError:
+            # Audit logging failed — emit BLOCKED with AUDIT_LOG_FAILED marker (best effort)
+            fallback_result = ActionResult(
+                action=action,
+                executor_id="unknown",
+                executor_version="unknown",
+                status="BLOCKED",
+                reason_codes=["PROFILE_ACTION_MISMATCH", "AUDIT_LOG_FAILED"],
+                input_digest="",
+                output_digest=None,
+                trace_id=trace_id,
+                ts_utc=datetime.now(timezone.utc),
+            )
+            try:
+                log_action_result(fallback_result)
+            except AuditLogError:
+                pass  # Last resort: logging is completely down
+        
+        raise HTTPException(status_code=403, detail="Action not allowed in profile")
+
+
+def _action_result_body(result: ActionResult) -> Dict[str, Any]:
+    """ActionResult JSON returned by /process (and the /process/stream result event)."""
+    return {
+        "status": result.status,
+        "action": result.action,
+        "executor_id": result.executor_id,
+        "executor_version": result.executor_version,
+        "reason_codes": result.reason_codes,
+        "input_digest": result.input_digest,
+        "output_digest": result.output_digest,
+        "trace_id": result.trace_id,
+        "ts_utc": result.ts_utc.isoformat() if result.ts_utc else None,
+    }
+
+
 @app.post("/process", tags=["processing"])
 async def process(
     request: Request,
@@ -303,61 +388,74 @@ async def process(
     ):
 
         # Check if action is allowed in action matrix (PROFILE_ACTION_MISMATCH)
-        matrix = get_action_matrix()
-        if action not in matrix.allowed_actions:
-            # Persist PROFILE_ACTION_MISMATCH ActionResult BLOCKED before returning 403
-            from datetime import datetime, timezone
-            from app.action_contracts import ActionResult
-            
-            mismatch_result = ActionResult(
-                action=action,
-                executor_id="unknown",
-                executor_version="unknown",
-                status="BLOCKED",
-                reason_codes=["PROFILE_ACTION_MISMATCH"],
-                input_digest="",
-                output_digest=None,
-                trace_id=trace_id,
-                ts_utc=datetime.now(timezone.utc),
-            )
-            try:
-                log_action_result(mismatch_result)
-            except AuditLogError:
-                # Audit logging failed — emit BLOCKED with AUDIT_LOG_FAILED marker (best effort)
-                fallback_result = ActionResult(
-                    action=action,
-                    executor_id="unknown",
-                    executor_version="unknown",
-                    status="BLOCKED",
-                    reason_codes=["PROFILE_ACTION_MISMATCH", "AUDIT_LOG_FAILED"],
-                    input_digest="",
-                    output_digest=None,
-                    trace_id=trace_id,
-                    ts_utc=datetime.now(timezone.utc),
-                )
-                try:
-                    log_action_result(fallback_result)
-                except AuditLogError:
-                    pass  # Last resort: logging is completely down
-            
-            raise HTTPException(status_code=403, detail="Action not allowed in profile")
-
-        # Run pipeline
-        result, output = run_agentic_action(
+        _ensure_action_in_matrix(action, trace_id)
+
+        # Run pipeline (executor awaited/offloaded: event loop stays free for /health, /metrics)
+        result, output = await run_agentic_action_async(
             action=action,
             payload=inner_payload,
             trace_id=trace_id,
+            payload_report=get_request_payload_report(request, inner_payload),
         )
 
         # Return ActionResult JSON
-        return {
-            "status": result.status,
-            "action": result.action,
-            "executor_id": result.executor_id,
-            "executor_version": result.executor_version,
-            "reason_codes": result.reason_codes,
-            "input_digest": result.input_digest,
-            "output_digest": result.output_digest,
-            "trace_id": result.trace_id,
-            "ts_utc": result.ts_utc.isoformat() if result.ts_utc else None,
-        }
+        return _action_result_body(result)
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/process/stream", tags=["processing"])
+async def process_stream(
+    request: Request,
+    gate_data: Dict[str, Any] = Depends(gate_request),
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+):
+    """Process action with gate + streaming pipeline (Server-Sent Events).
+
+    Same gate chain and audit as /process. Streaming executors (LLM) send
+    `event: chunk` ({"text": ...}) as the output is produced; the stream
+    always ends with `event: result` (the /process ActionResult JSON).
+    """
+    if hasattr(request.state, "f23_response") and request.state.f23_response:
+        return request.state.f23_response
+
+    payload = gate_data.get("payload", {})
+    action = gate_data.get("action", "process")
+    trace_id = gate_data.get("trace_id", str(uuid.uuid4()))
+    if isinstance(payload, dict) and "payload" in payload:
+        inner_payload = payload.get("payload", {})
+    else:
+        inner_payload = payload
+
+    # Before the response starts: a 403 is still possible
+    _ensure_action_in_matrix(action, trace_id)
+    payload_report = get_request_payload_report(request, inner_payload)
+
+    async def events():
+        with observed_span(
+            "process_action_stream",
+            attributes={
+                "trace_id": trace_id,
+                "action": action,
+                "context_id": gate_data.get("context_id", "unknown"),
+            }
+        ):
+            async for item in run_agentic_action_stream(
+                action=action,
+                payload=inner_payload,
+                trace_id=trace_id,
+                payload_report=payload_report,
+            ):
+                if isinstance(item, ActionResult):
+                    yield _sse_event("result", _action_result_body(item))
+                else:
+                    yield _sse_event("chunk", {"text": item})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # No proxy buffering: time-to-first-byte is the point of streaming
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
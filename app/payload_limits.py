@@ -2,11 +2,23 @@
 
 All checks use iterative traversal or strict depth ceilings to prevent
 unbounded recursion and stack overflow attacks.
+
+PayloadInspector: one iterative traversal (depth, max list length,
+forbidden keys) plus one canonical serialization (bytes, size, sha256).
+The resulting PayloadReport is checked against any set of limits without
+walking the payload again, and is shared per request via request.state
+(get_request_payload_report) by the gate chains and run_agentic_action.
 """
 from __future__ import annotations
 
-import json
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, FrozenSet, Iterable, Optional, Tuple
+
+from app.canonical_json import canonical_bytes, canonical_encode
+
+# Traversal ceiling: bounds work on cyclic/pathological objects; deeper
+# payloads are reported as depth violations (json would hit RecursionError)
+DEFAULT_MAX_SAFE_DEPTH = 1000
 
 
 class LimitExceeded(Exception):
@@ -27,13 +39,7 @@ def canonical_json_bytes(payload: Any) -> int:
         TypeError: if payload is not JSON-serializable
     """
     try:
-        canonical = json.dumps(
-            payload,
-            sort_keys=True,
-            separators=(",", ":"),
-            ensure_ascii=False,
-        )
-        return len(canonical.encode("utf-8"))
+        return len(canonical_bytes(payload))
     except (TypeError, ValueError) as e:
         raise TypeError(f"Payload is not JSON-serializable: {e}")
 
@@ -137,17 +143,201 @@ def check_payload_limits(
         TypeError: if payload is not JSON-serializable
         LimitExceeded: if any limit is violated
     """
-    # Check JSON serializability and byte size
-    byte_size = canonical_json_bytes(payload)
-    if byte_size > max_bytes:
-        raise LimitExceeded(f"Payload size {byte_size} exceeds max_bytes ({max_bytes})")
-
-    # Check depth
-    depth = max_depth(payload, max_safe_depth=max_depth_limit + 10)
-    if depth > max_depth_limit:
-        raise LimitExceeded(f"Payload depth {depth} exceeds max_depth ({max_depth_limit})")
-
-    # Check list items
-    list_items = max_list_items(payload, max_safe_items=max_list_limit + 100)
-    if list_items > max_list_limit:
-        raise LimitExceeded(f"Max list items {list_items} exceeds max_list_items ({max_list_limit})")
+    inspect_payload(payload).check_limits(max_bytes, max_depth_limit, max_list_limit)
+
+
+@dataclass(frozen=True)
+class PayloadReport:
+    """Result of a single PayloadInspector pass.
+
+    Attributes:
+        canonical: canonical JSON bytes (sorted keys, compact, UTF-8) or None
+        byte_size: len(canonical) (0 if not serializable)
+        depth: max nesting depth (same definition as max_depth())
+        max_list_len: largest list length (same definition as max_list_items())
+        forbidden_hits: (key, container_path) pairs, in depth-first order
+        sha256: hex digest of canonical bytes (sha256_json_or_none() equivalent)
+        json_error: serialization error message when canonical is None
+        depth_exceeded: traversal ceiling hit (or json recursion limit)
+        forbidden_keys: lowercase key set this report was computed for
+    """
+
+    canonical: Optional[bytes]
+    byte_size: int
+    depth: int
+    max_list_len: int
+    forbidden_hits: Tuple[Tuple[str, str], ...]
+    sha256: Optional[str]
+    json_error: Optional[str] = None
+    depth_exceeded: bool = False
+    forbidden_keys: FrozenSet[str] = frozenset()
+
+    @property
+    def first_forbidden(self) -> Optional[Tuple[str, str]]:
+        """First forbidden (key, path) hit, as _contains_forbidden_fields() reports it."""
+        return self.forbidden_hits[0] if self.forbidden_hits else None
+
+    def check_limits(self, max_bytes: int, max_depth_limit: int, max_list_limit: int) -> None:
+        """Same contract as check_payload_limits(), without re-walking the payload.
+
+        Raises:
+            TypeError: if payload is not JSON-serializable
+            LimitExceeded: if any limit is violated (checked in size, depth, list order)
+        """
+        if self.canonical is None:
+            if self.depth_exceeded and self.json_error is None:
+                raise LimitExceeded(f"Max depth exceeded during traversal (>{self.depth - 1})")
+            raise TypeError(f"Payload is not JSON-serializable: {self.json_error}")
+
+        if self.byte_size > max_bytes:
+            raise LimitExceeded(f"Payload size {self.byte_size} exceeds max_bytes ({max_bytes})")
+
+        if self.depth > max_depth_limit:
+            raise LimitExceeded(f"Payload depth {self.depth} exceeds max_depth ({max_depth_limit})")
+
+        if self.max_list_len > max_list_limit:
+            raise LimitExceeded(
+                f"Max list items {self.max_list_len} exceeds max_list_items ({max_list_limit})"
+            )
+
+
+class PayloadInspector:
+    """Single-pass payload inspection (see PayloadReport).
+
+    Args:
+        forbidden_keys: dict keys to report (matched case-insensitively)
+        max_safe_depth: traversal ceiling (cycles / absurd nesting)
+    """
+
+    def __init__(
+        self,
+        forbidden_keys: Iterable[str] = (),
+        max_safe_depth: int = DEFAULT_MAX_SAFE_DEPTH,
+    ):
+        self.forbidden_keys = frozenset(k.lower() for k in forbidden_keys)
+        self.max_safe_depth = max_safe_depth
+
+    def inspect(self, payload: Any) -> PayloadReport:
+        depth, max_list_len, hits, depth_exceeded = self._walk(payload)
+
+        canonical = None
+        digest = None
+        json_error = None
+        try:
+            canonical, digest = canonical_encode(payload)
+        except RecursionError:
+            depth_exceeded = True
+        except (TypeError, ValueError) as e:
+            json_error = str(e)
+
+        if depth_exceeded:
+            depth = max(depth, self.max_safe_depth + 1)
+
+        return PayloadReport(
+            canonical=canonical,
+            byte_size=len(canonical) if canonical is not None else 0,
+            depth=depth,
+            max_list_len=max_list_len,
+            forbidden_hits=tuple(hits),
+            sha256=digest,
+            json_error=json_error,
+            depth_exceeded=depth_exceeded,
+            forbidden_keys=self.forbidden_keys,
+        )
+
+    def _walk(self, payload: Any):
+        """Iterative pre-order walk (same visiting order as a recursive walk)."""
+        if isinstance(payload, dict):
+            frame = (iter(payload.items()), True, "", 1)
+        elif isinstance(payload, list):
+            frame = (iter(enumerate(payload)), False, "", 1)
+        else:
+            return 0, 0, [], False
+
+        forbidden = self.forbidden_keys
+        ceiling = self.max_safe_depth
+        max_list_len = len(payload) if isinstance(payload, list) else 0
+        max_found = 1
+        hits = []
+        depth_exceeded = False
+
+        # Stack of (items iterator, is_dict, path, depth)
+        stack = [frame]
+        while stack:
+            items, is_dict, path, depth = stack[-1]
+            entry = next(items, None)
+            if entry is None:
+                stack.pop()
+                continue
+            key, value = entry
+
+            if is_dict and forbidden and isinstance(key, str) and key.lower() in forbidden:
+                hits.append((key, path))
+
+            if isinstance(value, dict):
+                children = iter(value.items())
+                child_is_dict = True
+            elif isinstance(value, list):
+                children = iter(enumerate(value))
+                child_is_dict = False
+                if len(value) > max_list_len:
+                    max_list_len = len(value)
+            else:
+                continue
+
+            child_depth = depth + 1
+            if child_depth > ceiling:
+                depth_exceeded = True
+                continue
+            if child_depth > max_found:
+                max_found = child_depth
+
+            if is_dict:
+                child_path = f"{path}.{key}" if path else key
+            else:
+                child_path = f"{path}[{key}]"
+            stack.append((children, child_is_dict, child_path, child_depth))
+
+        return max_found, max_list_len, hits, depth_exceeded
+
+
+_default_inspector = PayloadInspector()
+
+
+def inspect_payload(payload: Any, forbidden_keys: Iterable[str] = ()) -> PayloadReport:
+    """Inspect payload once (convenience wrapper around PayloadInspector)."""
+    inspector = PayloadInspector(forbidden_keys) if forbidden_keys else _default_inspector
+    return inspector.inspect(payload)
+
+
+def get_request_payload_report(
+    request: Any,
+    payload: Any,
+    forbidden_keys: Iterable[str] = (),
+) -> PayloadReport:
+    """Report for payload, computed at most once per request (request.state cache).
+
+    Cache entries are keyed by id(payload) and keep a reference to the payload,
+    so an id can not be recycled while the request is alive. A report computed
+    for a different forbidden key set is recomputed.
+    """
+    wanted = frozenset(k.lower() for k in forbidden_keys)
+    state = getattr(request, "state", None)
+    reports = getattr(state, "payload_reports", None) if state is not None else None
+
+    if reports is not None:
+        entry = reports.get(id(payload))
+        if entry is not None and entry[0] is payload and entry[1].forbidden_keys == wanted:
+            return entry[1]
+
+    report = inspect_payload(payload, wanted)
+
+    if state is not None:
+        if reports is None:
+            reports = {}
+            try:
+                state.payload_reports = reports
+            except AttributeError:
+                return report
+        reports[id(payload)] = (payload, report)
+    return report
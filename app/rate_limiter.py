@@ -1,73 +1,221 @@
-"""Rate limiter with per-minute bucketing.
+"""Rate limiter with O(1) sliding-window counters.
 
-Tracks requests per key (api_key or session_id) with rolling window.
+Tracks requests per key (api_key or session_id) with a rolling window
+approximated by two fixed windows (previous + current, weighted by overlap):
+
+    estimate = prev_count * (1 - elapsed / window) + curr_count
+    allow if estimate < limit
+
+- O(1) per check (no per-request timestamps), time.monotonic() based
+- Buckets are slotted (WindowCounter) and live in N striped shards, each with
+  its own lock (no global lock)
+- Each shard keeps buckets in LRU order; idle buckets (no request for 2
+  windows, i.e. state equal to a fresh bucket) are swept on access, and
+  VERITTA_RATE_LIMIT_MAX_KEYS bounds memory: a full shard makes room by
+  dropping idle buckets only; with none idle, new keys are denied
+  (fail-closed: evicting a live bucket would reset its count), counted in
+  rate_limit_table_full_total{backend}
+
+Backends (VERITTA_RATE_LIMIT_BACKEND, see app.rate_limiter_backends):
+- memory (default): RateLimiter below, per process
+- shm: SharedMemoryRateLimiter, mmap'd counter table shared by workers on one host
+- redis: RedisRateLimiter, one Lua call per check (shared across hosts)
+All backends implement RateLimiterBackend with the same counter semantics.
+
+Environment:
+- VERITTA_RATE_LIMIT_STRIPES: lock stripes / shards (default 64)
+- VERITTA_RATE_LIMIT_MAX_KEYS: max tracked keys (default 100000)
 """
 
-from datetime import datetime, timezone
-from typing import Dict
-
-
-class RateLimiterBucket:
-    """Per-key rate limit bucket."""
-    
-    def __init__(self, limit: int, window_seconds: int = 60):
-        self.limit = limit
-        self.window_seconds = window_seconds
-        self.requests: list[tuple[datetime]] = []
-    
-    def check(self) -> bool:
-        """Check if request is allowed (returns True if within limit)."""
-        now = datetime.now(timezone.utc)
-        cutoff = now.timestamp() - self.window_seconds
-        
-        # Remove old requests outside window
-        self.requests = [
-            ts for ts in self.requests
-            if ts[0].timestamp() > cutoff
-        ]
-        
-        if len(self.requests) < self.limit:
-            self.requests.append((now,))
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Protocol
+
+from prometheus_client import Counter
+
+DEFAULT_STRIPES = 64
+DEFAULT_MAX_KEYS = 100_000
+
+# Idle buckets swept per check (amortized O(1))
+_SWEEP_BATCH = 4
+
+rate_limit_table_full_total = Counter(
+    "rate_limit_table_full_total",
+    "New rate-limit keys denied because every bucket they could use is live",
+    labelnames=["backend"],
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+class RateLimiterBackend(Protocol):
+    """Limiter interface used by G10 (gates_f21/gates_f23)."""
+
+    def check(self, key: str, limit: int, window_seconds: int = 60) -> bool: ...
+
+    def reset(self, key: str) -> None: ...
+
+    def reset_all(self) -> None: ...
+
+
+class WindowCounter:
+    """Per-key sliding-window counter state."""
+
+    __slots__ = ("window_s", "start", "prev", "curr", "last_seen")
+
+    def __init__(self, window_s: float, now: float):
+        self.window_s = window_s
+        self.start = now
+        self.prev = 0
+        self.curr = 0
+        self.last_seen = now
+
+    def hit(self, limit: int, window_s: float, now: float) -> bool:
+        """Count one request if allowed (returns True if within limit)."""
+        if window_s != self.window_s or now < self.start:
+            # Window changed for this key (or clock went back): restart
+            self.window_s = window_s
+            self.start = now
+            self.prev = 0
+            self.curr = 0
+
+        elapsed = now - self.start
+        if elapsed >= window_s:
+            periods = int(elapsed // window_s)
+            self.prev = self.curr if periods == 1 else 0
+            self.curr = 0
+            self.start += periods * window_s
+            elapsed = now - self.start
+
+        self.last_seen = now
+        estimate = self.prev * (1.0 - elapsed / window_s) + self.curr
+        if estimate < limit:
+            self.curr += 1
             return True
         return False
 
+    def is_idle(self, now: float) -> bool:
+        """No request for 2 windows: indistinguishable from a fresh bucket."""
+        return now - self.last_seen >= 2 * self.window_s
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: "OrderedDict[str, WindowCounter]" = OrderedDict()
+
 
 class RateLimiter:
     """Rate limiter: check(key, limit, window_s) -> bool."""
-    
-    def __init__(self):
-        self._buckets: Dict[str, RateLimiterBucket] = {}
-    
+
+    def __init__(
+        self,
+        stripes: Optional[int] = None,
+        max_keys: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        stripes = stripes or _env_int("VERITTA_RATE_LIMIT_STRIPES", DEFAULT_STRIPES)
+        max_keys = max_keys or _env_int("VERITTA_RATE_LIMIT_MAX_KEYS", DEFAULT_MAX_KEYS)
+        self._shards: List[_Shard] = [_Shard() for _ in range(stripes)]
+        self._per_shard_max = max(1, -(-max_keys // stripes))
+        self._clock = clock
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
     def check(self, key: str, limit: int, window_seconds: int = 60) -> bool:
         """Check if request is allowed.
-        
+
         Returns True if under limit, False if rate limited.
         Bucket is created on first check for this key.
         """
-        if key not in self._buckets:
-            self._buckets[key] = RateLimiterBucket(limit, window_seconds)
-        
-        bucket = self._buckets[key]
-        # Update bucket limits in case they changed
-        bucket.limit = limit
-        bucket.window_seconds = window_seconds
-        
-        return bucket.check()
-    
+        shard = self._shard(key)
+        with shard.lock:
+            now = self._clock()
+            buckets = shard.buckets
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self._per_shard_max:
+                    # Memory bound: LRU order is last_seen order, so if the
+                    # oldest bucket is live, every bucket is
+                    oldest_key = next(iter(buckets))
+                    if not buckets[oldest_key].is_idle(now):
+                        rate_limit_table_full_total.labels(backend="memory").inc()
+                        return False
+                    del buckets[oldest_key]
+                bucket = buckets[key] = WindowCounter(window_seconds, now)
+            else:
+                buckets.move_to_end(key)
+
+            allowed = bucket.hit(limit, window_seconds, now)
+
+            # Sweep idle buckets from the LRU end (amortized O(1))
+            for _ in range(_SWEEP_BATCH):
+                oldest_key = next(iter(buckets))
+                if oldest_key == key or not buckets[oldest_key].is_idle(now):
+                    break
+                del buckets[oldest_key]
+
+            return allowed
+
+    def sweep(self) -> int:
+        """Remove all idle buckets; returns number removed."""
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                now = self._clock()
+                idle = [k for k, b in shard.buckets.items() if b.is_idle(now)]
+                for k in idle:
+                    del shard.buckets[k]
+                removed += len(idle)
+        return removed
+
+    def key_count(self) -> int:
+        """Number of tracked keys."""
+        return sum(len(shard.buckets) for shard in self._shards)
+
     def reset(self, key: str) -> None:
         """Reset bucket for key."""
-        if key in self._buckets:
-            self._buckets[key].requests.clear()
-    
+        shard = self._shard(key)
+        with shard.lock:
+            shard.buckets.pop(key, None)
+
     def reset_all(self) -> None:
         """Clear all buckets (for testing)."""
-        self._buckets.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
 
 
-# Global instance (singleton)
-_rate_limiter = RateLimiter()
+# Global instance (singleton, backend chosen by env on first use)
+_rate_limiter: Optional[RateLimiterBackend] = None
+_rate_limiter_lock = threading.Lock()
 
 
-def get_rate_limiter() -> RateLimiter:
+def get_rate_limiter() -> RateLimiterBackend:
     """Get global rate limiter instance."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                from app.rate_limiter_backends import create_rate_limiter
+
+                _rate_limiter = create_rate_limiter()
     return _rate_limiter
+
+
+def set_rate_limiter(limiter: Optional[RateLimiterBackend]) -> None:
+    """Replace global limiter (None: rebuild from env on next use)."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = limiter
@@ -0,0 +1,406 @@
+"""Shared-state rate limiter backends (G10 across uvicorn workers / containers).
+
+Same sliding-window counter semantics as app.rate_limiter.WindowCounter:
+window starts at the key's first request, previous window weighted by
+overlap, idle after 2 windows.
+
+Backends (VERITTA_RATE_LIMIT_BACKEND):
+- memory: app.rate_limiter.RateLimiter (per process, default)
+- shm: SharedMemoryRateLimiter — fixed table of 40-byte slots in an mmap'd
+  file (VERITTA_RATE_LIMIT_SHM_PATH, default /dev/shm/veritta-ratelimit).
+  Keys hash (blake2b-64) to a group of 8 slots; a check locks only that
+  group (threading stripe + fcntl byte-range lock), so updates are atomic
+  across processes. Empty and idle slots are reused; a new key in a group
+  of 8 live keys is denied (fail-closed, as the memory limiter: evicting
+  would reset a live count). Clock: time.monotonic() (system-wide on Linux)
+- redis: RedisRateLimiter — minimal RESP client, one EVALSHA per check
+  (script below, server clock via TIME, PEXPIRE 2 windows for idle keys).
+  VERITTA_RATE_LIMIT_REDIS_URL, e.g. redis://:password@host:6379/0.
+  Fail-closed: connection/protocol errors deny the request.
+  A local stand-in server lives in app.tools.fake_redis.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from app.rate_limiter import (
+    RateLimiter,
+    RateLimiterBackend,
+    WindowCounter,
+    _env_int,
+    rate_limit_table_full_total,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHM_SLOTS = 65536
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+REDIS_KEY_PREFIX = "veritta:rl:"
+
+
+def create_rate_limiter(backend: Optional[str] = None) -> RateLimiterBackend:
+    """Build the limiter selected by VERITTA_RATE_LIMIT_BACKEND (memory | shm | redis)."""
+    backend = (backend or os.getenv("VERITTA_RATE_LIMIT_BACKEND", "memory")).strip().lower()
+    if backend == "shm":
+        return SharedMemoryRateLimiter()
+    if backend == "redis":
+        return RedisRateLimiter()
+    if backend != "memory":
+        logger.warning("Unknown VERITTA_RATE_LIMIT_BACKEND=%r; using memory", backend)
+    return RateLimiter()
+
+
+def _key_hash(key: str) -> int:
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1  # 0 marks an empty slot
+
+
+# ============================================================================
+# Shared memory (one host, N processes)
+# ============================================================================
+
+_MAGIC = b"VRTLIM01"
+_HEADER = struct.Struct("<8sI")  # magic, slot count
+_HEADER_SIZE = 64
+# key_hash, window_s, start, last_seen, prev, curr
+_SLOT = struct.Struct("<QdddII")
+_GROUP = 8
+
+
+def _default_shm_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "veritta-ratelimit")
+
+
+class SharedMemoryRateLimiter:
+    """Cross-process limiter over an mmap'd counter table."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        slots: Optional[int] = None,
+        stripes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = path or os.getenv("VERITTA_RATE_LIMIT_SHM_PATH") or _default_shm_path()
+        wanted = slots or _env_int("VERITTA_RATE_LIMIT_SHM_SLOTS", DEFAULT_SHM_SLOTS)
+        wanted = max(_GROUP, -(-wanted // _GROUP) * _GROUP)
+        self._clock = clock
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Exclusive header lock while sizing/initializing (first worker wins)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _HEADER_SIZE, 0, os.SEEK_SET)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            if len(header) == _HEADER.size and header[:8] == _MAGIC:
+                self.slots = _HEADER.unpack(header)[1]
+            else:
+                self.slots = wanted
+                os.ftruncate(self._fd, _HEADER_SIZE + self.slots * _SLOT.size)
+                os.pwrite(self._fd, _HEADER.pack(_MAGIC, self.slots), 0)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _HEADER_SIZE, 0, os.SEEK_SET)
+
+        self._mm = mmap.mmap(self._fd, _HEADER_SIZE + self.slots * _SLOT.size)
+        self._groups = self.slots // _GROUP
+        stripes = stripes or _env_int("VERITTA_RATE_LIMIT_STRIPES", 64)
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def _group_offset(self, group: int) -> int:
+        return _HEADER_SIZE + group * _GROUP * _SLOT.size
+
+    def _locked_group(self, group: int):
+        return _GroupLock(self, group)
+
+    def check(self, key: str, limit: int, window_seconds: int = 60) -> bool:
+        """Check if request is allowed (shared across processes)."""
+        h = _key_hash(key)
+        group = h % self._groups
+        base = self._group_offset(group)
+        mm = self._mm
+
+        with self._locked_group(group):
+            now = self._clock()
+            found = free = None
+            for i in range(_GROUP):
+                off = base + i * _SLOT.size
+                slot_hash, window_s, start, last_seen, prev, curr = _SLOT.unpack_from(mm, off)
+                if slot_hash == h:
+                    found = (off, window_s, start, last_seen, prev, curr)
+                    break
+                if free is None and (slot_hash == 0 or now - last_seen >= 2 * window_s or now < last_seen):
+                    free = off
+
+            if found is not None:
+                off, window_s, start, last_seen, prev, curr = found
+                counter = WindowCounter(window_s, start)
+                counter.prev, counter.curr, counter.last_seen = prev, curr, last_seen
+            elif free is not None:
+                # New key: empty or idle slot only
+                off = free
+                counter = WindowCounter(window_seconds, now)
+            else:
+                rate_limit_table_full_total.labels(backend="shm").inc()
+                return False
+
+            allowed = counter.hit(limit, window_seconds, now)
+            _SLOT.pack_into(
+                mm, off, h, counter.window_s, counter.start, counter.last_seen,
+                counter.prev, min(counter.curr, 0xFFFFFFFF),
+            )
+            return allowed
+
+    def reset(self, key: str) -> None:
+        """Reset bucket for key."""
+        h = _key_hash(key)
+        group = h % self._groups
+        base = self._group_offset(group)
+        with self._locked_group(group):
+            for i in range(_GROUP):
+                off = base + i * _SLOT.size
+                if _SLOT.unpack_from(self._mm, off)[0] == h:
+                    self._mm[off:off + _SLOT.size] = bytes(_SLOT.size)
+
+    def reset_all(self) -> None:
+        """Clear the whole table (for testing).
+
+        Group by group under its usual lock: fcntl locks belong to the
+        process, so one unlock over the whole table would also release
+        group locks held by other threads of this worker.
+        """
+        size = _GROUP * _SLOT.size
+        for group in range(self._groups):
+            base = self._group_offset(group)
+            with self._locked_group(group):
+                self._mm[base:base + size] = bytes(size)
+
+    def key_count(self) -> int:
+        """Occupied slots (including idle ones not reused yet)."""
+        return sum(
+            1 for i in range(self.slots)
+            if _SLOT.unpack_from(self._mm, _HEADER_SIZE + i * _SLOT.size)[0] != 0
+        )
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
+class _GroupLock:
+    """Thread stripe lock + fcntl byte-range lock on one slot group."""
+
+    __slots__ = ("_owner", "_lock", "_start")
+
+    def __init__(self, owner: SharedMemoryRateLimiter, group: int):
+        self._owner = owner
+        self._lock = owner._locks[group % len(owner._locks)]
+        self._start = owner._group_offset(group)
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            fcntl.lockf(self._owner._fd, fcntl.LOCK_EX, _GROUP * _SLOT.size, self._start, os.SEEK_SET)
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.lockf(self._owner._fd, fcntl.LOCK_UN, _GROUP * _SLOT.size, self._start, os.SEEK_SET)
+        finally:
+            self._lock.release()
+
+
+# ============================================================================
+# Redis protocol (shared across hosts)
+# ============================================================================
+
+# KEYS[1] = bucket key; ARGV[1] = limit; ARGV[2] = window (ms). Returns 1 (allow) / 0.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local h = redis.call('HMGET', KEYS[1], 'w', 's', 'p', 'c')
+local w = tonumber(h[1])
+local s = tonumber(h[2])
+local p = tonumber(h[3]) or 0
+local c = tonumber(h[4]) or 0
+if w ~= window or s == nil or now < s then
+  s = now
+  p = 0
+  c = 0
+end
+local elapsed = now - s
+if elapsed >= window then
+  local periods = math.floor(elapsed / window)
+  if periods == 1 then p = c else p = 0 end
+  c = 0
+  s = s + periods * window
+  elapsed = now - s
+end
+local allowed = 0
+if p * (1 - elapsed / window) + c < limit then
+  c = c + 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'w', window, 's', s, 'p', p, 'c', c)
+redis.call('PEXPIRE', KEYS[1], 2 * window)
+return allowed
+"""
+SLIDING_WINDOW_SHA = hashlib.sha1(SLIDING_WINDOW_SCRIPT.encode("utf-8")).hexdigest()
+
+
+class RedisError(Exception):
+    """Error reply from the server (-ERR ...)."""
+
+
+def encode_command(*args) -> bytes:
+    """RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def read_reply(reader):
+    """Read one RESP reply from a buffered binary reader."""
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        raise RedisError(body.decode("utf-8", errors="replace"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        n = int(body)
+        if n < 0:
+            return None
+        data = reader.read(n + 2)
+        if len(data) != n + 2:
+            raise ConnectionError("Connection closed by server")
+        return data[:-2]
+    if kind == b"*":
+        n = int(body)
+        return None if n < 0 else [read_reply(reader) for _ in range(n)]
+    raise RedisError(f"Unexpected reply type: {line!r}")
+
+
+class _RedisConnection:
+    __slots__ = ("sock", "reader")
+
+    def __init__(self, host: str, port: int, timeout_s: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout_s)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def call(self, *args):
+        self.sock.sendall(encode_command(*args))
+        return read_reply(self.reader)
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+        finally:
+            self.sock.close()
+
+
+def _parse_redis_url(url: str) -> Tuple[str, int, Optional[str], int]:
+    parsed = urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme!r}")
+    db = int(parsed.path.lstrip("/") or 0)
+    password = unquote(parsed.password) if parsed.password else None
+    return parsed.hostname or "localhost", parsed.port or 6379, password, db
+
+
+class RedisRateLimiter:
+    """Limiter state in Redis (or any RESP server running the script)."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        prefix: str = REDIS_KEY_PREFIX,
+        timeout_s: float = 0.5,
+    ):
+        self.url = url or os.getenv("VERITTA_RATE_LIMIT_REDIS_URL", DEFAULT_REDIS_URL)
+        self._host, self._port, self._password, self._db = _parse_redis_url(self.url)
+        self._prefix = prefix
+        self._timeout_s = timeout_s
+        self._local = threading.local()
+
+    def _connection(self) -> _RedisConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _RedisConnection(self._host, self._port, self._timeout_s)
+            if self._password:
+                conn.call("AUTH", self._password)
+            if self._db:
+                conn.call("SELECT", self._db)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def _call(self, *args):
+        try:
+            return self._connection().call(*args)
+        except (OSError, ConnectionError):
+            self._drop_connection()
+            raise
+
+    def check(self, key: str, limit: int, window_seconds: int = 60) -> bool:
+        """Check if request is allowed (one round trip; fail-closed on errors)."""
+        args = (self._prefix + key, limit, int(window_seconds * 1000))
+        try:
+            try:
+                reply = self._call("EVALSHA", SLIDING_WINDOW_SHA, 1, *args)
+            except RedisError as e:
+                if not str(e).startswith("NOSCRIPT"):
+                    raise
+                reply = self._call("EVAL", SLIDING_WINDOW_SCRIPT, 1, *args)
+            return reply == 1
+        except (OSError, ConnectionError, RedisError, ValueError) as e:
+            logger.warning("Rate limiter backend unavailable, denying (fail-closed): %s", type(e).__name__)
+            return False
+
+    def reset(self, key: str) -> None:
+        """Reset bucket for key."""
+        self._call("DEL", self._prefix + key)
+
+    def reset_all(self) -> None:
+        """Remove all limiter keys (for testing)."""
+        cursor = b"0"
+        while True:
+            cursor, keys = self._call("SCAN", cursor, "MATCH", self._prefix + "*", "COUNT", 1000)
+            if keys:
+                self._call("DEL", *keys)
+            if cursor in (b"0", "0"):
+                break
+
+    def close(self) -> None:
+        self._drop_connection()
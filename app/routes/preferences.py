@@ -5,25 +5,28 @@ Endpoints:
 - PUT /api/v1/preferences: Update user's preferences (partial update)
 
 Governance:
-- user_id extracted from F2.3 auth (never from request body)
+- user_id extracted from F2.3 auth (never from request body), session
+  checked on the F2.3 session backend (get_user_from_session)
 - Fail-closed validation (enum allowlists)
 - No-log policy (preference values never logged)
 - Privacy-by-design (explicit state only)
+
+Data access: AsyncPreferencesRepository over get_preferences_db (DB calls
+never block the event loop). Database: app.env.get_database_url.
 """
 
 import hashlib
 import logging
-from typing import Optional
+from typing import Any
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.dependencies.auth import get_user_from_gate
+from app.db.async_database import open_async_session
+from app.db.preferences_repository import AsyncPreferencesRepository
+from app.dependencies.auth import get_user_from_session
 from app.env import get_database_url
-from app.models.user_preference import UserPreference, Base
 from app.schemas.preferences import (
     PreferencesGetResponse,
     PreferencesPutRequest,
@@ -33,18 +36,14 @@ from app.schemas.preferences import (
 # Router configuration
 router = APIRouter(prefix="/api/v1", tags=["preferences"])
 
-# Database setup (reuse connection from main app if available)
-engine = create_engine(get_database_url())
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 
-def get_db():
-    """Database session dependency."""
-    db = SessionLocal()
+async def get_preferences_db():
+    """Database session dependency (awaitable; shared engine for get_database_url())."""
+    db = open_async_session(get_database_url(), name="preferences")
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
 
 def hash_user_id(user_id: str) -> str:
@@ -63,8 +62,8 @@ def hash_user_id(user_id: str) -> str:
 )
 async def get_preferences(
     request: Request,
-    user_id: str = Depends(get_user_from_gate),
-    db: Session = Depends(get_db),
+    user_id: str = Depends(get_user_from_session),
+    db: Any = Depends(get_preferences_db),
 ):
     """
     GET /api/v1/preferences
@@ -72,15 +71,13 @@ async def get_preferences(
     Returns user's current preferences.
     Null values indicate preference not set.
     
-    Auth: Requires F2.3 Bearer token + X-VERITTA-USER-ID header.
+    Auth: Requires F2.3 Bearer token + X-VERITTA-USER-ID + X-VERITTA-SESSION-ID headers.
     """
     trace_id = getattr(request.state, "trace_id", str(uuid4()))
     
     try:
         # Query existing preferences
-        pref = db.query(UserPreference).filter(
-            UserPreference.user_id == user_id
-        ).first()
+        pref = await AsyncPreferencesRepository(db).get(user_id)
         
         if pref is None:
             # No preferences set yet - return defaults (all null)
@@ -133,8 +130,8 @@ async def get_preferences(
 async def put_preferences(
     request: Request,
     body: PreferencesPutRequest,
-    user_id: str = Depends(get_user_from_gate),
-    db: Session = Depends(get_db),
+    user_id: str = Depends(get_user_from_session),
+    db: Any = Depends(get_preferences_db),
 ):
     """
     PUT /api/v1/preferences
@@ -142,7 +139,7 @@ async def put_preferences(
     Updates user preferences (partial update - only specified fields).
     Creates preference record if it doesn't exist (upsert).
     
-    Auth: Requires F2.3 Bearer token + X-VERITTA-USER-ID header.
+    Auth: Requires F2.3 Bearer token + X-VERITTA-USER-ID + X-VERITTA-SESSION-ID headers.
     
     Fail-closed:
     - Invalid enum value → HTTP 400
@@ -167,35 +164,15 @@ async def put_preferences(
             }
         )
     
+    repo = AsyncPreferencesRepository(db)
     try:
-        # Query existing preferences
-        pref = db.query(UserPreference).filter(
-            UserPreference.user_id == user_id
-        ).first()
-        
-        if pref is None:
-            # Create new preference record (upsert)
-            pref = UserPreference(
-                preference_id=str(uuid4()),
-                user_id=user_id,
-                tone_preference=body.tone.value if body.tone else None,
-                output_format=body.output_format.value if body.output_format else None,
-                language=body.language.value if body.language else None,
-            )
-            db.add(pref)
-            action_type = "create"
-        else:
-            # Update existing preferences (partial update)
-            if body.tone is not None:
-                pref.tone_preference = body.tone.value
-            if body.output_format is not None:
-                pref.output_format = body.output_format.value
-            if body.language is not None:
-                pref.language = body.language.value
-            action_type = "update"
-        
-        db.commit()
-        db.refresh(pref)
+        # Upsert (partial update: unset fields keep their value)
+        pref, action_type = await repo.upsert(
+            user_id,
+            tone=body.tone.value if body.tone else None,
+            output_format=body.output_format.value if body.output_format else None,
+            language=body.language.value if body.language else None,
+        )
         
         # Log success (NO preference values)
         logging.info(
@@ -212,7 +189,7 @@ async def put_preferences(
         )
     
     except SQLAlchemyError as e:
-        db.rollback()
+        await repo.rollback()
         logging.error(
             f"action=preferences_put user_id_hash={hash_user_id(user_id)} "
             f"status=db_error trace_id={trace_id} error={type(e).__name__}"
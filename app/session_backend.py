@@ -0,0 +1,645 @@
+"""Tiered session backend for F2.3 (one API over memory, shared and SQL tiers).
+
+Before: gates_f23 validated against the per-process SessionStore while
+SessionRepository persisted sessions in SQL — a session created on one
+worker was invisible to the others.
+
+SessionBackend API (gates_f23.run_f23_chain, preferences routes via
+app.dependencies.auth.get_user_from_session, /admin/sessions/revoke, seed_session):
+- get(session_id) -> SessionRecord | None
+- create(user_id, api_key_sha256, ttl_s=None, session_id=None) -> (session_id, record)
+- put(session_id, record): import / seed an existing record
+- revoke(session_id) -> SessionRecord | None
+- mark_revoked(session_id): SQL already revoked elsewhere, refresh the tiers
+- touch(session_id): record use (updated_at), written in batches
+- flush(), close(), clear_all()
+
+Backends (VERITTA_SESSION_BACKEND):
+- memory (default): app.session_store.SessionStore, per process (beta;
+  single worker only — sessions and revocations never leave the process)
+- tiered: TieredSessionBackend
+    L1: per-process LRU (VERITTA_SESSION_L1_MAX_ENTRIES), entries live
+        VERITTA_SESSION_L1_TTL_S so revocations by other workers are seen
+        within that bound (and never past expires_at)
+    L2: optional sqlite file in WAL mode shared by the workers of one host
+        (VERITTA_SESSION_L2_PATH); rows re-read from SQL after
+        VERITTA_SESSION_L2_TTL_S
+    Revocations made by other workers / hosts: mark_revoked is subscribed
+    to the session cache revocation channel (app.db.session_cache,
+    VERITTA_SESSION_REVOKE_CHANNEL); without a channel the L2 TTL is
+    capped at the L1 TTL, so a revoked session is denied within that bound.
+    mark_revoked leaves a tombstone (as SessionCache): a read already in
+    flight fills L1/L2 with the session as revoked, never as valid
+    SQL: sessions table (app.db.database.SessionLocal) — source of truth
+  Reads go L1 -> L2 -> SQL and fill the tiers above; creation and
+  revocation write SQL first, then L2, then L1 (write-through).
+  touch() collects updated_at per session (no I/O); the flusher thread
+  writes them with one executemany UPDATE per VERITTA_SESSION_TOUCH_FLUSH_S
+  (woken early at VERITTA_SESSION_TOUCH_BATCH pending sessions) instead of
+  one UPDATE per request.
+
+Fail-closed: an L2 error degrades to SQL; an SQL error on a read fails the
+request, never serves an unverified session.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import secrets
+import sqlite3
+import string
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+from sqlalchemy import text
+
+from app.session_store import SessionRecord, SessionStore, get_session_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_HOURS = 8
+DEFAULT_L1_MAX_ENTRIES = 100_000
+DEFAULT_L1_TTL_S = 5.0
+DEFAULT_L2_TTL_S = 60.0
+DEFAULT_TOUCH_FLUSH_S = 5.0
+DEFAULT_TOUCH_BATCH = 500
+
+_SESSION_ID_ALPHABET = string.ascii_lowercase + string.digits
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def new_session_id() -> str:
+    """F2.3 session id (G4 format: sess_[a-z0-9]{16})."""
+    return "sess_" + "".join(secrets.choice(_SESSION_ID_ALPHABET) for _ in range(16))
+
+
+def _default_ttl_s() -> float:
+    return _env_float("VERITTA_SESSION_TTL_HOURS", DEFAULT_TTL_HOURS) * 3600.0
+
+
+def _utc(value: datetime) -> datetime:
+    """Naive-UTC DB timestamp -> aware UTC (SessionRecord convention)."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _naive(value: datetime) -> datetime:
+    """Aware -> naive UTC (SessionModel convention)."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+class SessionBackend(Protocol):
+    """Session interface used by F2.3 (gates_f23), admin routes and seeding."""
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        """Session record, or None if unknown."""
+        ...
+
+    def create(
+        self,
+        user_id: str,
+        api_key_sha256: str,
+        ttl_s: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ) -> Tuple[str, SessionRecord]:
+        """Create a session; returns (session_id, record)."""
+        ...
+
+    def put(self, session_id: str, record: SessionRecord) -> None:
+        """Store record under session_id (seeding, tests)."""
+        ...
+
+    def revoke(self, session_id: str) -> Optional[SessionRecord]:
+        """Revoke a session; returns the updated record, or None if unknown."""
+        ...
+
+    def mark_revoked(self, session_id: str) -> None:
+        """Apply a revocation made elsewhere (another worker) to local caches."""
+        ...
+
+    def touch(self, session_id: str) -> None:
+        """Record activity (updated_at); may be batched until flush()."""
+        ...
+
+    def flush(self) -> int:
+        """Write pending touches; returns the number of sessions updated."""
+        ...
+
+    def sweep_expired(self, limit: int = 1000) -> int:
+        """Delete up to limit expired sessions; returns the number deleted."""
+        ...
+
+    def clear_all(self) -> None:
+        """Drop every session (tests)."""
+        ...
+
+    def close(self) -> None:
+        """Flush and release resources."""
+        ...
+
+
+class MemorySessionBackend:
+    """Per-process SessionStore behind the SessionBackend API (beta default)."""
+
+    def __init__(self, store: Optional[SessionStore] = None):
+        self.store = store if store is not None else get_session_store()
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        return self.store.get(session_id)
+
+    def create(
+        self,
+        user_id: str,
+        api_key_sha256: str,
+        ttl_s: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ) -> Tuple[str, SessionRecord]:
+        session_id = session_id or new_session_id()
+        now = datetime.now(timezone.utc)
+        record = SessionRecord(
+            user_id=user_id,
+            api_key_sha256=api_key_sha256,
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl_s or _default_ttl_s()),
+        )
+        self.store.put(session_id, record)
+        return session_id, record
+
+    def put(self, session_id: str, record: SessionRecord) -> None:
+        self.store.put(session_id, record)
+
+    def revoke(self, session_id: str) -> Optional[SessionRecord]:
+        self.store.revoke(session_id)
+        return self.store.get(session_id)
+
+    def mark_revoked(self, session_id: str) -> None:
+        self.store.revoke(session_id)
+
+    def touch(self, session_id: str) -> None:
+        pass
+
+    def flush(self) -> int:
+        return 0
+
+    def sweep_expired(self, limit: int = 1000) -> int:
+        return self.store.sweep_expired(limit=limit)
+
+    def clear_all(self) -> None:
+        self.store.clear_all()
+
+    def close(self) -> None:
+        pass
+
+
+class _SharedTier:
+    """L2: sqlite (WAL) file shared by the workers of one host."""
+
+    def __init__(self, path: str, ttl_s: float):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS session_l2 ("
+            "session_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, api_key_sha256 TEXT NOT NULL, "
+            "created_at REAL NOT NULL, expires_at REAL NOT NULL, revoked INTEGER NOT NULL, cached_until REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_session_l2_cached_until ON session_l2 (cached_until)")
+
+    def get(self, session_id: str, now: float) -> Optional[SessionRecord]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT user_id, api_key_sha256, created_at, expires_at, revoked, cached_until FROM session_l2 "
+                "WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[5] <= now:
+                self._db.execute("DELETE FROM session_l2 WHERE session_id = ?", (session_id,))
+                return None
+        return SessionRecord(
+            user_id=row[0],
+            api_key_sha256=row[1],
+            created_at=datetime.fromtimestamp(row[2], timezone.utc),
+            expires_at=datetime.fromtimestamp(row[3], timezone.utc),
+            revoked=bool(row[4]),
+        )
+
+    def put(self, session_id: str, record: SessionRecord, now: float) -> None:
+        # Same bound as L1: re-read SQL after ttl_s, never past expires_at
+        cached_until = now + self.ttl_s
+        if not record.revoked:
+            cached_until = min(cached_until, record.expires_at.timestamp())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO session_l2 "
+                "(session_id, user_id, api_key_sha256, created_at, expires_at, revoked, cached_until) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    record.user_id,
+                    record.api_key_sha256,
+                    record.created_at.timestamp(),
+                    record.expires_at.timestamp(),
+                    int(record.revoked),
+                    cached_until,
+                ),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM session_l2 WHERE session_id = ?", (session_id,))
+
+    def prune(self, now: float, limit: int) -> int:
+        """Drop up to `limit` rows past cached_until (rowid batch)."""
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM session_l2 WHERE rowid IN ("
+                "SELECT rowid FROM session_l2 WHERE cached_until <= ? ORDER BY cached_until LIMIT ?)",
+                (now, limit),
+            ).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM session_l2")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class TieredSessionBackend:
+    """L1 memory -> L2 shared sqlite -> SQL (source of truth)."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        l2_path: Optional[str] = None,
+        l2_ttl_s: Optional[float] = None,
+        l1_max_entries: Optional[int] = None,
+        l1_ttl_s: Optional[float] = None,
+        touch_flush_s: Optional[float] = None,
+        touch_batch: Optional[int] = None,
+        revocations: Optional[Any] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if session_factory is None:
+            from app.db.database import SessionLocal as session_factory
+        self._session_factory = session_factory
+        self.l1_max_entries = l1_max_entries or _env_int("VERITTA_SESSION_L1_MAX_ENTRIES", DEFAULT_L1_MAX_ENTRIES)
+        self.l1_ttl_s = l1_ttl_s or _env_float("VERITTA_SESSION_L1_TTL_S", DEFAULT_L1_TTL_S)
+        self.touch_flush_s = touch_flush_s or _env_float("VERITTA_SESSION_TOUCH_FLUSH_S", DEFAULT_TOUCH_FLUSH_S)
+        self.touch_batch = touch_batch or _env_int("VERITTA_SESSION_TOUCH_BATCH", DEFAULT_TOUCH_BATCH)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # session_id -> (record, cached_until)
+        self._l1: "OrderedDict[str, Tuple[SessionRecord, float]]" = OrderedDict()
+        # session_id -> tombstone expiry (revoked while a read may be in flight)
+        self._revoked: "OrderedDict[str, float]" = OrderedDict()
+        self._l2: Optional[_SharedTier] = None
+        # revocations: SessionCache whose channel fans out revocations
+        self._revocations = revocations if revocations is not None and revocations.channel is not None else None
+        l2_ttl_s = l2_ttl_s or _env_float("VERITTA_SESSION_L2_TTL_S", DEFAULT_L2_TTL_S)
+        if self._revocations is None and l2_ttl_s > self.l1_ttl_s:
+            # Nobody tells this host about remote revocations: keep validity re-reads short
+            l2_ttl_s = self.l1_ttl_s
+        self._tombstone_ttl_s = max(self.l1_ttl_s, l2_ttl_s)
+        if l2_path:
+            try:
+                self._l2 = _SharedTier(l2_path, l2_ttl_s)
+            except sqlite3.Error as e:
+                # Performance tier only: L1 + SQL keep working
+                logger.warning("Session L2 tier disabled (%s): %s", l2_path, type(e).__name__)
+        self._touch_lock = threading.Lock()
+        self._pending_touch: Dict[str, datetime] = {}
+        self._stop = threading.Event()
+        self._flush_now = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-touch-flush", daemon=True)
+        self._flusher.start()
+        if self._revocations is not None:
+            self._revocations.add_revocation_listener(self.mark_revoked)
+
+    @property
+    def l2_enabled(self) -> bool:
+        return self._l2 is not None
+
+    # -- reads -----------------------------------------------------------
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        now = self._clock()
+        with self._lock:
+            entry = self._l1.get(session_id)
+            if entry is not None:
+                if entry[1] > now:
+                    self._l1.move_to_end(session_id)
+                    return entry[0]
+                del self._l1[session_id]
+
+        record = self._l2_get(session_id, now)
+        if record is None:
+            record = self._sql_get(session_id)
+            if record is None:
+                return None
+            self._apply_tombstone(session_id, record)
+            self._l2_put(session_id, record)
+        else:
+            self._apply_tombstone(session_id, record)
+        self._l1_put(session_id, record, now)
+        return record
+
+    # -- writes (SQL first, then L2, then L1) ----------------------------
+
+    def create(
+        self,
+        user_id: str,
+        api_key_sha256: str,
+        ttl_s: Optional[float] = None,
+        session_id: Optional[str] = None,
+    ) -> Tuple[str, SessionRecord]:
+        session_id = session_id or new_session_id()
+        now = datetime.now(timezone.utc)
+        record = SessionRecord(
+            user_id=user_id,
+            api_key_sha256=api_key_sha256,
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl_s or _default_ttl_s()),
+        )
+        self.put(session_id, record)
+        return session_id, record
+
+    def put(self, session_id: str, record: SessionRecord) -> None:
+        from app.models.session import SessionModel
+
+        db = self._session_factory()
+        try:
+            db.merge(SessionModel(
+                session_id=session_id,
+                user_id=record.user_id,
+                api_key_hash=record.api_key_sha256,
+                created_at=_naive(record.created_at),
+                expires_at=_naive(record.expires_at),
+                revoked_at=_naive(datetime.now(timezone.utc)) if record.revoked else None,
+                updated_at=_naive(datetime.now(timezone.utc)),
+            ))
+            db.commit()
+        finally:
+            db.close()
+        self._l2_put(session_id, record)
+        self._l1_put(session_id, record, self._clock())
+
+    def revoke(self, session_id: str) -> Optional[SessionRecord]:
+        from app.db.session_cache import get_session_cache
+        from app.db.session_repository import SessionRepository
+
+        cache = self._revocations if self._revocations is not None else get_session_cache()
+        db = self._session_factory()
+        try:
+            # Publishes on the revocation channel: other workers' tiers mark_revoked
+            session = SessionRepository(db, cache=cache).revoke(session_id)
+            record = self._from_model(session) if session is not None else None
+        finally:
+            db.close()
+        if record is None:
+            return None
+        self._tombstone(session_id)
+        self._l2_put(session_id, record)
+        self._l1_put(session_id, record, self._clock())
+        return record
+
+    def mark_revoked(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._l1.get(session_id)
+            if entry is not None:
+                entry[0].revoked = True
+        self._tombstone(session_id)
+        if self._l2 is not None:
+            try:
+                # Next L2 miss re-reads SQL (revoked_at set there)
+                self._l2.delete(session_id)
+            except sqlite3.Error as e:
+                logger.warning("Session L2 delete failed: %s", type(e).__name__)
+
+    # -- batched updated_at ----------------------------------------------
+
+    def touch(self, session_id: str) -> None:
+        """Record use; never writes inline (called on the event loop by gates_f23)."""
+        with self._touch_lock:
+            self._pending_touch[session_id] = datetime.now(timezone.utc)
+            full = len(self._pending_touch) >= self.touch_batch
+        if full:
+            self._flush_now.set()
+
+    def flush(self) -> int:
+        """Write pending updated_at values (one executemany); returns sessions written."""
+        with self._touch_lock:
+            pending, self._pending_touch = self._pending_touch, {}
+        if not pending:
+            return 0
+        db = self._session_factory()
+        try:
+            db.execute(
+                text("UPDATE sessions SET updated_at = :ts WHERE session_id = :sid"),
+                [{"sid": sid, "ts": _naive(ts)} for sid, ts in pending.items()],
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # Bookkeeping only (validation never reads updated_at): dropped, not retried
+            logger.warning("Session touch flush failed (%d sessions): %s", len(pending), type(e).__name__)
+            return 0
+        finally:
+            db.close()
+        return len(pending)
+
+    def sweep_expired(self, limit: int = 1000) -> int:
+        """Drop up to `limit` stale L1 entries and L2 rows (app.session_sweeper)."""
+        now = self._clock()
+        with self._lock:
+            stale = [sid for sid, (_, until) in self._l1.items() if until <= now][:limit]
+            for sid in stale:
+                del self._l1[sid]
+        removed = len(stale)
+        if self._l2 is not None:
+            try:
+                removed += self._l2.prune(now, limit)
+            except sqlite3.Error as e:
+                logger.warning("Session L2 prune failed: %s", type(e).__name__)
+        return removed
+
+    def _flush_loop(self) -> None:
+        while not self._stop.is_set():
+            self._flush_now.wait(self.touch_flush_s)
+            self._flush_now.clear()
+            if self._stop.is_set():
+                break
+            self.flush()
+
+    # -- lifecycle -------------------------------------------------------
+
+    def clear_all(self) -> None:
+        with self._lock:
+            self._l1.clear()
+            self._revoked.clear()
+        if self._l2 is not None:
+            self._l2.clear()
+
+    def close(self) -> None:
+        if self._revocations is not None:
+            self._revocations.remove_revocation_listener(self.mark_revoked)
+        self._stop.set()
+        self._flush_now.set()
+        self._flusher.join(timeout=2)
+        self.flush()
+        if self._l2 is not None:
+            self._l2.close()
+            self._l2 = None
+
+    # -- tiers -----------------------------------------------------------
+
+    def _tombstone(self, session_id: str) -> None:
+        # Also when not cached: a read in flight (SQL before the revoke
+        # committed) must not write the session back as valid
+        until = self._clock() + self._tombstone_ttl_s
+        with self._lock:
+            self._revoked[session_id] = until
+            self._revoked.move_to_end(session_id)
+            while len(self._revoked) > self.l1_max_entries:
+                self._revoked.popitem(last=False)
+
+    def _apply_tombstone(self, session_id: str, record: SessionRecord) -> None:
+        if record.revoked:
+            return
+        with self._lock:
+            until = self._revoked.get(session_id)
+            if until is not None and until <= self._clock():
+                del self._revoked[session_id]
+                until = None
+        if until is not None:
+            # Read before the revoke committed: revocation wins
+            record.revoked = True
+
+    def _l1_put(self, session_id: str, record: SessionRecord, now: float) -> None:
+        if record.revoked:
+            # Revocation is terminal
+            cached_until = now + self.l1_ttl_s
+        else:
+            # Never outlive the session itself
+            cached_until = min(now + self.l1_ttl_s, record.expires_at.timestamp())
+            if cached_until <= now:
+                return
+        with self._lock:
+            self._l1[session_id] = (record, cached_until)
+            self._l1.move_to_end(session_id)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l2_get(self, session_id: str, now: float) -> Optional[SessionRecord]:
+        if self._l2 is None:
+            return None
+        try:
+            return self._l2.get(session_id, now)
+        except sqlite3.Error as e:
+            logger.warning("Session L2 read failed: %s", type(e).__name__)
+            return None
+
+    def _l2_put(self, session_id: str, record: SessionRecord) -> None:
+        if self._l2 is None:
+            return
+        try:
+            self._l2.put(session_id, record, self._clock())
+        except sqlite3.Error as e:
+            logger.warning("Session L2 write failed: %s", type(e).__name__)
+
+    def _sql_get(self, session_id: str) -> Optional[SessionRecord]:
+        from app.db.session_repository import SessionRepository
+
+        db = self._session_factory()
+        try:
+            session = SessionRepository(db).get_by_id(session_id)
+            return self._from_model(session) if session is not None else None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _from_model(session) -> SessionRecord:
+        return SessionRecord(
+            user_id=session.user_id,
+            api_key_sha256=session.api_key_hash,
+            created_at=_utc(session.created_at),
+            expires_at=_utc(session.expires_at),
+            revoked=session.revoked_at is not None,
+        )
+
+
+def create_session_backend(kind: Optional[str] = None) -> SessionBackend:
+    """Build the backend selected by VERITTA_SESSION_BACKEND (memory | tiered)."""
+    kind = (kind or os.getenv("VERITTA_SESSION_BACKEND", "memory")).strip().lower()
+    if kind == "tiered":
+        from app.db.session_cache import get_session_cache
+
+        return TieredSessionBackend(
+            l2_path=os.getenv("VERITTA_SESSION_L2_PATH") or None, revocations=get_session_cache()
+        )
+    if kind != "memory":
+        logger.warning("Unknown VERITTA_SESSION_BACKEND=%r; using memory", kind)
+    return MemorySessionBackend()
+
+
+_backend: Optional[SessionBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_session_backend() -> SessionBackend:
+    """Process-wide session backend built from env."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_session_backend()
+    return _backend
+
+
+def set_session_backend(backend: Optional[SessionBackend]) -> None:
+    """Replace the global backend (None: rebuild from env on next use)."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    if previous is not None and previous is not backend:
+        previous.close()
+
+
+def close_session_backend() -> None:
+    """Lifespan shutdown: flush pending updated_at writes, close L2."""
+    set_session_backend(None)
+
+
+def _reset_after_fork() -> None:
+    # Flusher thread and sqlite handle belong to the parent
+    global _backend, _backend_lock
+    _backend = None
+    _backend_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,12 +2,16 @@
 
 SessionRecord: holds user_id, api_key_sha256 (binding), timestamps, revoked flag.
 TTL: absolute 4 hours (no sliding window).
+Expired records are removed by sweep_expired() (min-heap of expirations,
+driven by app.session_sweeper).
 """
 
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import hashlib
+import heapq
+import threading
 
 
 @dataclass
@@ -40,6 +44,9 @@ class SessionStore:
     
     def __init__(self):
         self._store: Dict[str, SessionRecord] = {}
+        # (expires_at epoch, session_id); stale entries skipped on pop
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
     
     def get(self, session_id: str) -> Optional[SessionRecord]:
         """Get session record; returns None if not found."""
@@ -47,12 +54,14 @@ class SessionStore:
     
     def put(self, session_id: str, record: SessionRecord) -> None:
         """Store session record."""
-        self._store[session_id] = record
+        with self._lock:
+            self._store[session_id] = record
+            heapq.heappush(self._expiry_heap, (record.expires_at.timestamp(), session_id))
     
     def delete(self, session_id: str) -> None:
         """Delete session record."""
-        if session_id in self._store:
-            del self._store[session_id]
+        with self._lock:
+            self._store.pop(session_id, None)
     
     def revoke(self, session_id: str) -> None:
         """Mark session as revoked (soft delete)."""
@@ -60,9 +69,26 @@ class SessionStore:
         if record:
             record.revoked = True
     
+    def sweep_expired(self, now: Optional[datetime] = None, limit: int = 1000) -> int:
+        """Remove up to `limit` expired records (earliest first); returns count removed."""
+        now_ts = (now or datetime.now(timezone.utc)).timestamp()
+        removed = 0
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now_ts and removed < limit:
+                expires_ts, session_id = heapq.heappop(heap)
+                record = self._store.get(session_id)
+                # Replaced (re-put with a new expiry) or already deleted: stale heap entry
+                if record is not None and record.expires_at.timestamp() == expires_ts:
+                    del self._store[session_id]
+                    removed += 1
+        return removed
+    
     def clear_all(self) -> None:
         """Clear all sessions (for testing)."""
-        self._store.clear()
+        with self._lock:
+            self._store.clear()
+            self._expiry_heap.clear()
 
 
 # Global instance (singleton)
@@ -95,5 +121,7 @@ def seed_session(
         expires_at=expires_at,
         revoked=False,
     )
-    _session_store.put(session_id, record)
+    # Through the configured backend (memory: this store; tiered: SQL + L2 + L1)
+    from app.session_backend import get_session_backend
+    get_session_backend().put(session_id, record)
     return record
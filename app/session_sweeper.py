@@ -0,0 +1,198 @@
+"""Background expiry sweeper for sessions (started from the FastAPI lifespan).
+
+SessionRepository.cleanup_expired was one unbounded DELETE that nothing
+scheduled, and the in-memory SessionStore never dropped expired records:
+dead rows accumulated and slowed session lookups.
+
+Every VERITTA_SESSION_SWEEP_INTERVAL_S the sweeper:
+- SQL: deletes expired, non-revoked sessions in batches of
+  VERITTA_SESSION_SWEEP_BATCH (SessionRepository.delete_expired_batch:
+  ix_sessions_expires_at + ctid on PostgreSQL / rowid on SQLite), one short
+  transaction per batch in a worker thread, sleeping
+  VERITTA_SESSION_SWEEP_PAUSE_S between batches so other writers get the
+  table; at most VERITTA_SESSION_SWEEP_MAX_BATCHES per run
+- memory: the session backend's sweep_expired in a worker thread — SessionStore
+  min-heap of expirations (earliest first), or the tiered backend's stale L1/L2 entries
+
+Several workers may sweep at once: batches are idempotent deletes.
+Errors are logged and counted; the next run retries (sessions past
+expires_at are already denied by validation).
+
+Metrics: session_sweep_duration_seconds{store}, session_sweep_rows_removed_total{store},
+session_sweep_runs_total{store,result}.
+
+Environment:
+- VERITTA_SESSION_SWEEPER: on | off (default on)
+- VERITTA_SESSION_SWEEP_INTERVAL_S: seconds between runs (default 300)
+- VERITTA_SESSION_SWEEP_BATCH: rows per DELETE (default 1000)
+- VERITTA_SESSION_SWEEP_PAUSE_S: pause between batches (default 0.05)
+- VERITTA_SESSION_SWEEP_MAX_BATCHES: batches per run (default 1000)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Histogram
+
+from app.session_backend import SessionBackend, get_session_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_S = 300.0
+DEFAULT_BATCH = 1000
+DEFAULT_PAUSE_S = 0.05
+DEFAULT_MAX_BATCHES = 1000
+
+session_sweep_duration_seconds = Histogram(
+    "session_sweep_duration_seconds",
+    "Duration of one session expiry sweep",
+    labelnames=["store"],  # sql, memory
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0),
+)
+session_sweep_rows_removed_total = Counter(
+    "session_sweep_rows_removed_total",
+    "Expired sessions removed by the sweeper",
+    labelnames=["store"],
+)
+session_sweep_runs_total = Counter(
+    "session_sweep_runs_total",
+    "Session expiry sweeps",
+    labelnames=["store", "result"],  # result: ok, error
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+def sweeper_enabled() -> bool:
+    return os.getenv("VERITTA_SESSION_SWEEPER", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+class SessionSweeper:
+    """Periodic batched removal of expired sessions (SQL + in-memory store)."""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        backend: Optional[SessionBackend] = None,
+        interval_s: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        pause_s: Optional[float] = None,
+        max_batches: Optional[int] = None,
+    ):
+        if session_factory is None:
+            from app.db.database import SessionLocal as session_factory
+        self._session_factory = session_factory
+        self._backend = backend
+        self.interval_s = interval_s or _env_float("VERITTA_SESSION_SWEEP_INTERVAL_S", DEFAULT_INTERVAL_S)
+        self.batch_size = batch_size or _env_int("VERITTA_SESSION_SWEEP_BATCH", DEFAULT_BATCH)
+        self.pause_s = pause_s if pause_s is not None else _env_float("VERITTA_SESSION_SWEEP_PAUSE_S", DEFAULT_PAUSE_S)
+        self.max_batches = max_batches or _env_int("VERITTA_SESSION_SWEEP_MAX_BATCHES", DEFAULT_MAX_BATCHES)
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep_once(self) -> int:
+        """One run over both stores; returns rows removed."""
+        return await self.sweep_sql() + await self.sweep_memory()
+
+    async def sweep_sql(self) -> int:
+        start = time.perf_counter()
+        removed = 0
+        try:
+            for _ in range(self.max_batches):
+                deleted = await asyncio.to_thread(self._delete_batch)
+                removed += deleted
+                session_sweep_rows_removed_total.labels(store="sql").inc(deleted)
+                if deleted < self.batch_size:
+                    break
+                # Yield between batches: no long lock on sessions
+                await asyncio.sleep(self.pause_s)
+        except Exception as e:
+            session_sweep_runs_total.labels(store="sql", result="error").inc()
+            logger.warning("Session sweep (sql) failed after %d rows: %s", removed, type(e).__name__)
+            return removed
+        finally:
+            session_sweep_duration_seconds.labels(store="sql").observe(time.perf_counter() - start)
+        session_sweep_runs_total.labels(store="sql", result="ok").inc()
+        return removed
+
+    async def sweep_memory(self) -> int:
+        start = time.perf_counter()
+        removed = 0
+        backend = self._backend if self._backend is not None else get_session_backend()
+        for _ in range(self.max_batches):
+            # Tiered backend deletes from the sqlite L2: off the loop, like sweep_sql
+            deleted = await asyncio.to_thread(backend.sweep_expired, limit=self.batch_size)
+            removed += deleted
+            if deleted < self.batch_size:
+                break
+        session_sweep_rows_removed_total.labels(store="memory").inc(removed)
+        session_sweep_duration_seconds.labels(store="memory").observe(time.perf_counter() - start)
+        session_sweep_runs_total.labels(store="memory", result="ok").inc()
+        return removed
+
+    def _delete_batch(self) -> int:
+        from app.db.session_repository import SessionRepository
+
+        db = self._session_factory()
+        try:
+            return SessionRepository(db).delete_expired_batch(self.batch_size)
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            await self.sweep_once()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="session-sweeper")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+_sweeper: Optional[SessionSweeper] = None
+
+
+def start_session_sweeper() -> Optional[SessionSweeper]:
+    """Start the sweeper on the running loop (FastAPI lifespan); None when disabled."""
+    global _sweeper
+    if not sweeper_enabled():
+        return None
+    if _sweeper is None:
+        _sweeper = SessionSweeper()
+    _sweeper.start()
+    return _sweeper
+
+
+async def stop_session_sweeper() -> None:
+    """Cancel the sweeper task (FastAPI lifespan shutdown)."""
+    global _sweeper
+    sweeper, _sweeper = _sweeper, None
+    if sweeper is not None:
+        await sweeper.stop()
@@ -3,8 +3,23 @@
 import json
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Any
-from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from app.audit_aggregator import get_aggregator_mode, get_audit_aggregator
+from app.audit_segments import has_audit_data, iter_audit_lines
+
+
+def get_scan_workers() -> int:
+    """
+    Worker processes for CLI/tool batch scans (VERITTA_AUDIT_SCAN_WORKERS, default 1 = serial).
+
+    Not used by summarize(): the request path stays serial (or aggregator-backed)
+    so an admin call never forks a process pool inside a server worker.
+    """
+    try:
+        return max(1, int(os.getenv("VERITTA_AUDIT_SCAN_WORKERS", "1")))
+    except ValueError:
+        return 1
 
 
 class AuditParser:
@@ -39,7 +54,7 @@ class AuditParser:
         
         audit_log_path = os.getenv("VERITTA_AUDIT_LOG_PATH", "./audit.log")
         
-        if not Path(audit_log_path).exists():
+        if not has_audit_data(audit_log_path):
             return {
                 "window": {"days": days, "limit": limit},
                 "decisions": {"allow": 0, "deny": 0},
@@ -49,84 +64,135 @@ class AuditParser:
                 "note": "Audit log not found",
             }
         
+        # Incremental per-minute rollups (O(minutes in window)); the scan below
+        # is kept for VERITTA_AUDIT_AGGREGATOR=off and while the aggregator
+        # thread is not started or still catching up
+        if get_aggregator_mode() == "on":
+            aggregator = get_audit_aggregator(audit_log_path)
+            if aggregator.ready:
+                return aggregator.summarize(days=days, limit=limit, event_type=event_type)
+            # Catch-up on the aggregator thread, never on this request
+            aggregator.start()
+        
         cutoff_time = (
             datetime.now(timezone.utc) - timedelta(days=days)
         ).replace(tzinfo=None)
         
-        # Aggregate counters
-        allow_count = 0
-        deny_count = 0
-        deny_breakdown: Dict[str, int] = {}
-        events_by_type: Dict[str, int] = {"decision_audit": 0, "action_audit": 0}
+        state = AuditParser.new_scan_state()
         
-        events_processed = 0
-        parse_errors = 0
-        
-        # Stream parse (line by line)
+        # Stream parse (line by line); segments older than the window are skipped via their index
+        since = cutoff_time.replace(tzinfo=timezone.utc)
         try:
-            with open(audit_log_path, "r") as f:
-                for line_num, line in enumerate(f, 1):
-                    if events_processed >= limit:
-                        break
-                    
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        event = json.loads(line)
-                    except json.JSONDecodeError:
-                        parse_errors += 1
-                        continue
-                    
-                    # Check timestamp
-                    ts_str = event.get("ts_utc")
-                    if not ts_str:
-                        continue
-                    
-                    try:
-                        # Parse ISO format timestamp
-                        ts = datetime.fromisoformat(ts_str.replace("+00:00", ""))
-                        if ts < cutoff_time:
-                            continue  # Outside window
-                    except (ValueError, AttributeError):
-                        parse_errors += 1
-                        continue
-                    
-                    # Filter by event type if specified
-                    evt_type = event.get("event_type")
-                    if event_type and evt_type != event_type:
-                        continue
-                    
-                    events_processed += 1
-                    
-                    # Aggregate decision_audit
-                    if evt_type == "decision_audit":
-                        events_by_type["decision_audit"] += 1
-                        decision = event.get("decision")
-                        if decision == "ALLOW":
-                            allow_count += 1
-                        elif decision == "DENY":
-                            deny_count += 1
-                            # Breakdown by reason_code
-                            reason_codes = event.get("reason_codes", [])
-                            for code in reason_codes:
-                                deny_breakdown[code] = deny_breakdown.get(code, 0) + 1
-                    
-                    # Aggregate action_audit
-                    elif evt_type == "action_audit":
-                        events_by_type["action_audit"] += 1
-        
+            AuditParser.scan_lines(
+                state, iter_audit_lines(audit_log_path, since=since), cutoff_time, event_type, limit
+            )
         except OSError as e:
             # File read error
-            parse_errors += 1
+            state["parse_errors"] += 1
+        
+        return AuditParser._summary_response(days, limit, state)
+    
+    @staticmethod
+    def new_scan_state() -> Dict[str, Any]:
+        """Empty aggregate for scan_lines()."""
+        return {
+            "allow": 0,
+            "deny": 0,
+            "deny_breakdown": {},
+            "events_by_type": {"decision_audit": 0, "action_audit": 0},
+            "events_processed": 0,
+            "parse_errors": 0,
+        }
+    
+    @staticmethod
+    def scan_lines(
+        state: Dict[str, Any],
+        lines: Iterable[str],
+        cutoff_time: datetime,
+        event_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Aggregate raw JSONL lines into state (in place).
+        
+        Shared by the serial scan and the app.tools.audit_scan workers, so both
+        paths apply exactly the same parsing and filtering rules.
+        
+        Args:
+            state: Aggregate from new_scan_state() (updated in place)
+            lines: Raw lines (str)
+            cutoff_time: Naive UTC cutoff (events older are outside the window)
+            event_type: Filter by type (optional)
+            limit: Stop once state["events_processed"] reaches limit (None = no limit)
+        
+        Returns:
+            state
+        """
+        events_by_type = state["events_by_type"]
+        deny_breakdown = state["deny_breakdown"]
         
+        for line in lines:
+            if limit is not None and state["events_processed"] >= limit:
+                break
+            
+            line = line.strip()
+            if not line:
+                continue
+            
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                state["parse_errors"] += 1
+                continue
+            
+            # Check timestamp
+            ts_str = event.get("ts_utc")
+            if not ts_str:
+                continue
+            
+            try:
+                # Parse ISO format timestamp
+                ts = datetime.fromisoformat(ts_str.replace("+00:00", ""))
+                if ts < cutoff_time:
+                    continue  # Outside window
+            except (ValueError, AttributeError):
+                state["parse_errors"] += 1
+                continue
+            
+            # Filter by event type if specified
+            evt_type = event.get("event_type")
+            if event_type and evt_type != event_type:
+                continue
+            
+            state["events_processed"] += 1
+            
+            # Aggregate decision_audit
+            if evt_type == "decision_audit":
+                events_by_type["decision_audit"] += 1
+                decision = event.get("decision")
+                if decision == "ALLOW":
+                    state["allow"] += 1
+                elif decision == "DENY":
+                    state["deny"] += 1
+                    # Breakdown by reason_code
+                    reason_codes = event.get("reason_codes", [])
+                    for code in reason_codes:
+                        deny_breakdown[code] = deny_breakdown.get(code, 0) + 1
+            
+            # Aggregate action_audit
+            elif evt_type == "action_audit":
+                events_by_type["action_audit"] += 1
+        
+        return state
+    
+    @staticmethod
+    def _summary_response(days: int, limit: int, state: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "window": {"days": days, "limit": limit},
-            "decisions": {"allow": allow_count, "deny": deny_count},
-            "deny_breakdown": deny_breakdown,
-            "events_by_type": events_by_type,
+            "decisions": {"allow": state["allow"], "deny": state["deny"]},
+            "deny_breakdown": state["deny_breakdown"],
+            "events_by_type": state["events_by_type"],
             "ts_utc": datetime.now(timezone.utc).isoformat(),
-            "events_processed": events_processed,
-            "parse_errors": parse_errors,
+            "events_processed": state["events_processed"],
+            "parse_errors": state["parse_errors"],
         }
@@ -0,0 +1,296 @@
+"""
+PARALLEL AUDIT SCAN — multi-process map/reduce over JSONL audit data.
+
+Objetivo:
+Nightly reconciliation / summaries over large audit logs (legacy file and/or
+rolling segments) without being bound to one core. CLI/tools only: the
+request path (AuditParser.summarize) never uses the process pool.
+
+Engine:
+1. plan_ranges(): split each source file into newline-aligned byte ranges
+   (~VERITTA_AUDIT_SCAN_CHUNK_BYTES each), starting at the same offsets the
+   serial reader uses (app.audit_segments.audit_sources)
+2. Map: each range is parsed in a ProcessPoolExecutor worker from mmap'd input
+3. Reduce: partial aggregates are merged in file order, so the result is
+   identical to the serial path (AuditParser.summarize / OrphanReconciler)
+
+Environment:
+- VERITTA_AUDIT_SCAN_WORKERS: worker processes for CLI/tool scans (default 1 = serial)
+- VERITTA_AUDIT_SCAN_CHUNK_BYTES: target range size (default 16 MiB)
+"""
+
+import json
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.audit_segments import audit_sources, has_audit_data
+from app.tools.audit_parser import AuditParser
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+# (path, start, end) — end exclusive, always just after a newline or at EOF
+ByteRange = Tuple[str, int, int]
+
+
+def get_chunk_bytes() -> int:
+    """Target range size (VERITTA_AUDIT_SCAN_CHUNK_BYTES, default 16 MiB)."""
+    try:
+        value = int(os.getenv("VERITTA_AUDIT_SCAN_CHUNK_BYTES", str(DEFAULT_CHUNK_BYTES)))
+        return value if value > 0 else DEFAULT_CHUNK_BYTES
+    except ValueError:
+        return DEFAULT_CHUNK_BYTES
+
+
+def plan_ranges(sources: List[Tuple[str, int]], chunk_bytes: Optional[int] = None) -> List[ByteRange]:
+    """
+    Split sources into newline-aligned byte ranges (in read order).
+
+    Args:
+        sources: (path, start_offset) list from audit_sources()
+        chunk_bytes: target range size
+
+    Returns:
+        List of (path, start, end); concatenating the ranges of a file
+        reproduces file[start_offset:] exactly.
+    """
+    chunk_bytes = chunk_bytes or get_chunk_bytes()
+    ranges: List[ByteRange] = []
+
+    for path, start in sources:
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size <= start:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    pos = start
+                    while pos < size:
+                        end = pos + chunk_bytes
+                        if end >= size:
+                            end = size
+                        else:
+                            # Extend to just after the next newline
+                            nl = mm.find(b"\n", end - 1)
+                            end = size if nl == -1 else nl + 1
+                        ranges.append((path, pos, end))
+                        pos = end
+        except FileNotFoundError:
+            # Segment removed by retention between listing and planning
+            continue
+
+    return ranges
+
+
+def _iter_range(path: str, start: int, end: int) -> Iterator[str]:
+    """Yield lines of a byte range (decoded like app.audit_segments._iter_file)."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos < end:
+                nl = mm.find(b"\n", pos, end)
+                stop = end if nl == -1 else nl + 1
+                yield mm[pos:stop].decode("utf-8", errors="replace")
+                pos = stop
+
+
+def _run(tasks: List[tuple], fn, workers: int) -> List[Any]:
+    if workers <= 1 or len(tasks) <= 1:
+        return [fn(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(fn, tasks))
+
+
+# ============================================================================
+# Summary (AuditParser.summarize)
+# ============================================================================
+
+def _summary_task(task: tuple) -> Dict[str, Any]:
+    path, start, end, cutoff_time, event_type = task
+    state = AuditParser.new_scan_state()
+    try:
+        AuditParser.scan_lines(state, _iter_range(path, start, end), cutoff_time, event_type)
+    except OSError:
+        state["parse_errors"] += 1
+    return state
+
+
+def _merge_summary(acc: Dict[str, Any], part: Dict[str, Any]) -> None:
+    for key in ("allow", "deny", "events_processed", "parse_errors"):
+        acc[key] += part[key]
+    for evt_type, count in part["events_by_type"].items():
+        acc["events_by_type"][evt_type] = acc["events_by_type"].get(evt_type, 0) + count
+    for code, count in part["deny_breakdown"].items():
+        acc["deny_breakdown"][code] = acc["deny_breakdown"].get(code, 0) + count
+
+
+def parallel_summarize(
+    audit_log_path: str,
+    cutoff_time: datetime,
+    limit: int,
+    event_type: Optional[str] = None,
+    workers: int = 2,
+    chunk_bytes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Summary aggregate (AuditParser.new_scan_state() shape), computed in parallel.
+
+    Workers aggregate whole ranges without the limit; the reduce step merges
+    them in file order and re-scans (in-process) only the range where the
+    limit is reached, so the result matches the serial loop exactly.
+
+    Args:
+        audit_log_path: Audit log base path
+        cutoff_time: Naive UTC cutoff (same value the serial path uses)
+        limit: Max events to process
+        event_type: Filter by type (optional)
+        workers: Worker processes
+        chunk_bytes: Target range size
+
+    Returns:
+        Aggregate dict for AuditParser._summary_response()
+    """
+    since = cutoff_time.replace(tzinfo=timezone.utc)
+    ranges = plan_ranges(audit_sources(audit_log_path, since=since), chunk_bytes)
+    tasks = [(path, start, end, cutoff_time, event_type) for path, start, end in ranges]
+    partials = _run(tasks, _summary_task, workers)
+
+    acc = AuditParser.new_scan_state()
+    for (path, start, end), part in zip(ranges, partials):
+        if acc["events_processed"] + part["events_processed"] < limit:
+            _merge_summary(acc, part)
+            continue
+        # Limit reached inside this range: replay it serially up to the limit
+        try:
+            AuditParser.scan_lines(acc, _iter_range(path, start, end), cutoff_time, event_type, limit)
+        except OSError:
+            acc["parse_errors"] += 1
+        break
+
+    return acc
+
+
+# ============================================================================
+# Reconciliation (OrphanReconciler)
+# ============================================================================
+
+# Per-trace partial: [opened_ts_utc, last_ts_utc, decision, action_result, has_ts]
+_OPENED, _LAST, _DECISION, _ACTION, _HAS_TS = range(5)
+
+
+def _reconcile_task(task: tuple) -> Tuple[Dict[str, list], bool]:
+    """
+    Per-trace partials for one range (same rules as OrphanReconciler._process_event).
+
+    Returns:
+        (traces, failed) — failed mirrors the serial loader, which stops at the
+        first line it cannot process (non-JSONDecodeError exception).
+    """
+    path, start, end = task
+    traces: Dict[str, list] = {}
+    try:
+        for line in _iter_range(path, start, end):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            trace_id = event.get("trace_id")
+            if not trace_id:
+                continue
+            event_type = event.get("event_type")
+            ts_utc = event.get("ts_utc")
+
+            t = traces.get(trace_id)
+            if t is None:
+                t = traces[trace_id] = [ts_utc, ts_utc, None, None, False]
+            if ts_utc:
+                if not t[_OPENED]:
+                    t[_OPENED] = ts_utc
+                t[_LAST] = ts_utc
+                t[_HAS_TS] = True
+
+            if event_type == "decision_audit":
+                decision = event.get("decision")
+                if decision:
+                    t[_DECISION] = decision
+            elif event_type == "action_audit":
+                status = event.get("status")
+                if status:
+                    t[_ACTION] = status
+    except Exception:
+        return traces, True
+    return traces, False
+
+
+def _merge_traces(acc: Dict[str, list], part: Dict[str, list]) -> None:
+    """Merge a later range's partials into acc (earlier ranges)."""
+    for trace_id, p in part.items():
+        a = acc.get(trace_id)
+        if a is None:
+            acc[trace_id] = p
+            continue
+        if not a[_OPENED] and p[_HAS_TS]:
+            a[_OPENED] = p[_OPENED]
+        if p[_HAS_TS]:
+            a[_LAST] = p[_LAST]
+            a[_HAS_TS] = True
+        if p[_DECISION]:
+            a[_DECISION] = p[_DECISION]
+        if p[_ACTION]:
+            a[_ACTION] = p[_ACTION]
+
+
+def parallel_reconcile(
+    audit_log_path: str,
+    sla_s: int,
+    workers: int = 2,
+    chunk_bytes: Optional[int] = None,
+    since: Optional[datetime] = None,
+) -> List[Dict]:
+    """
+    Same result as OrphanReconciler(...).load_audit_log() + reconcile(), in parallel.
+
+    Args:
+        audit_log_path: Audit log base path
+        sla_s: SLA in seconds for orphan detection
+        workers: Worker processes
+        chunk_bytes: Target range size
+        since: Optional aware UTC cutoff (segment skipping, as in OrphanReconciler)
+
+    Returns:
+        List of trace status dicts (sorted by trace_id)
+    """
+    # Local import: orphan_reconciler reads env at import time (CLI convention)
+    from app.tools.orphan_reconciler import OrphanReconciler
+
+    reconciler = OrphanReconciler(audit_log_path=audit_log_path, sla_s=sla_s, since=since)
+    if not has_audit_data(audit_log_path):
+        return reconciler.reconcile()
+
+    ranges = plan_ranges(audit_sources(audit_log_path, since=since), chunk_bytes)
+    partials = _run(ranges, _reconcile_task, workers)
+
+    acc: Dict[str, list] = {}
+    for traces, failed in partials:
+        _merge_traces(acc, traces)
+        if failed:
+            break
+
+    reconciler.traces = {
+        trace_id: {
+            "trace_id": trace_id,
+            "opened_ts_utc": t[_OPENED],
+            "last_ts_utc": t[_LAST],
+            "decision": t[_DECISION],
+            "action_result": t[_ACTION],
+            "events": [],  # Not materialized in parallel mode
+        }
+        for trace_id, t in acc.items()
+    }
+    return reconciler.reconcile()
@@ -0,0 +1,113 @@
+"""
+CANONICAL JSON BENCHMARK — encode cost per backend and payload shape.
+
+Times canonical encoding (bytes identical on both backends) for:
+- stdlib: StdlibCanonicalBackend (json.dumps reference)
+- orjson: OrjsonCanonicalBackend, including its divergence checks
+  (float-token scan + type walk), i.e. the cost actually paid per encode
+
+Shapes: small request, text-heavy prompt, medium nested payload, dense
+numeric rows. The orjson backend (auto default) is justified when it is not
+slower than stdlib on any shape.
+
+Usage:
+    python -m app.tools.bench_canonical_json [--backends stdlib,orjson] [--min-time 0.2]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from app.canonical_json import OrjsonCanonicalBackend, StdlibCanonicalBackend
+
+BACKENDS = ("stdlib", "orjson")
+
+SHAPES: Dict[str, Any] = {
+    "small": {
+        "action": "process",
+        "input": {"text": "resuma o documento", "lang": "pt-BR"},
+        "user_id": "u_12345678",
+        "trace_id": "t" * 32,
+        "n": 3,
+        "ok": True,
+        "parent": None,
+    },
+    "text": {
+        "action": "llm_generate",
+        "input": {"prompt": "governança de ação " * 800, "system": "x" * 2000},
+        "model": "gpt-4o-mini",
+        "temperature": 0.2,
+    },
+    "medium": {
+        "action": "process",
+        "payload": {
+            "text": "olá mundo " * 20,
+            "items": [{"id": i, "score": i * 0.5, "tags": ["a", "b"]} for i in range(20)],
+        },
+        "meta": {"trace_id": "abc", "n": 3, "ok": True},
+    },
+    "numeric": {"rows": [[i, i * 1.5, f"r{i}"] for i in range(1000)]},
+}
+
+
+def _make(name: str):
+    if name == "stdlib":
+        return StdlibCanonicalBackend()
+    if name == "orjson":
+        return OrjsonCanonicalBackend()
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def time_encode(encode: Callable[[Any], bytes], obj: Any, min_time: float) -> float:
+    """Best-of-3 microseconds per encode (each round runs for about min_time)."""
+    encode(obj)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            encode(obj)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / max(elapsed, 1e-9) / 10))
+
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            encode(obj)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def benchmark(backends: List[str], min_time: float = 0.2) -> Dict[str, Dict[str, float]]:
+    """{shape: {backend: microseconds per encode}}."""
+    encoders = {name: _make(name) for name in backends}
+    results: Dict[str, Dict[str, float]] = {}
+    for shape, obj in SHAPES.items():
+        results[shape] = {name: time_encode(enc.encode, obj, min_time) for name, enc in encoders.items()}
+    for name, enc in encoders.items():
+        if getattr(enc, "fallbacks", 0):
+            raise RuntimeError(f"{name}: benchmark shapes must stay on the fast path")
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Canonical JSON encode cost per backend")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    results = benchmark(backends, args.min_time)
+
+    sizes = {shape: len(StdlibCanonicalBackend().encode(obj)) for shape, obj in SHAPES.items()}
+    print(f"{'shape':<10} {'bytes':>8} " + " ".join(f"{name + ' us':>12}" for name in backends))
+    for shape, timings in results.items():
+        print(f"{shape:<10} {sizes[shape]:>8} " + " ".join(f"{timings[name]:>12.1f}" for name in backends))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
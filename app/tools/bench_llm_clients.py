@@ -0,0 +1,101 @@
+"""
+LLM CLIENT BENCHMARK — sync vs pooled async throughput.
+
+Sends N generations to a FakeLLMServer with simulated provider latency:
+- sync: generate() from a bounded thread pool (the executor pool lane size,
+  VERITTA_EXECUTOR_POOL_PER_EXECUTOR, default 8: what the sync pipeline can run)
+- async: generate_async() gathered on one event loop (shared AsyncClient,
+  per-provider semaphore VERITTA_LLM_PROVIDER_CONCURRENCY)
+
+Usage:
+    python -m app.tools.bench_llm_clients [--requests 200] [--latency-ms 500]
+                                          [--threads 8] [--provider openai]
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from app.executor_pool import DEFAULT_PER_EXECUTOR
+from app.llm.async_clients import (
+    AnthropicAsyncClient,
+    GeminiAsyncClient,
+    OpenAIAsyncClient,
+)
+from app.llm.http_pool import close_async_http_clients
+from app.tools.fake_llm_server import FakeLLMServer
+
+_CLIENTS = {
+    "openai": (OpenAIAsyncClient, "/v1"),
+    "anthropic": (AnthropicAsyncClient, ""),
+    "gemini": (GeminiAsyncClient, ""),
+}
+
+
+def _kwargs(i: int) -> Dict:
+    return dict(prompt=f"bench prompt {i}", model="gpt-4o-mini", temperature=0.0, max_tokens=16, timeout_s=30.0)
+
+
+def bench_sync(client, requests: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda i: client.generate(**_kwargs(i)), range(requests)))
+    return time.perf_counter() - start
+
+
+async def _bench_async(client, requests: int) -> float:
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.generate_async(**_kwargs(i)) for i in range(requests)))
+        return time.perf_counter() - start
+    finally:
+        await close_async_http_clients()
+
+
+def bench_async(client, requests: int) -> float:
+    return asyncio.run(_bench_async(client, requests))
+
+
+def benchmark(requests: int = 200, latency_s: float = 0.5, threads: int = DEFAULT_PER_EXECUTOR,
+              provider: str = "openai") -> Dict[str, Dict[str, float]]:
+    """{path: {seconds, rps, connections}} for sync and async."""
+    client_class, suffix = _CLIENTS[provider]
+    results: Dict[str, Dict[str, float]] = {}
+    for name in ("sync", "async"):
+        server = FakeLLMServer(latency_s=latency_s).start()
+        try:
+            client = client_class("bench-key", base_url=server.url + suffix)
+            if name == "sync":
+                elapsed = bench_sync(client, requests, threads)
+            else:
+                elapsed = bench_async(client, requests)
+            results[name] = {
+                "seconds": elapsed,
+                "rps": requests / elapsed if elapsed > 0 else float("inf"),
+                "connections": server.connections,
+            }
+        finally:
+            server.stop()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync vs pooled async LLM client throughput")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--threads", type=int, default=DEFAULT_PER_EXECUTOR)
+    parser.add_argument("--provider", choices=sorted(_CLIENTS), default="openai")
+    args = parser.parse_args()
+
+    results = benchmark(args.requests, args.latency_ms / 1000, args.threads, args.provider)
+    print(f"{args.requests} requests, {args.latency_ms:.0f} ms simulated provider latency")
+    print(f"{'path':<8} {'seconds':>9} {'req/s':>9} {'connections':>12}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['seconds']:>9.2f} {r['rps']:>9.1f} {r['connections']:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+"""
+RATE LIMITER BENCHMARK — checks/sec per backend.
+
+Runs the same workload (N checks over K keys from T threads) against:
+- memory: in-process RateLimiter
+- shm: SharedMemoryRateLimiter on a temporary mmap file
+- redis: RedisRateLimiter against --redis-url, or a local FakeRedisServer
+
+Usage:
+    python -m app.tools.bench_rate_limiter [--checks 200000] [--keys 1000] [--threads 4]
+                                           [--backends memory,shm,redis] [--redis-url URL]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.rate_limiter import RateLimiter
+from app.rate_limiter_backends import RedisRateLimiter, SharedMemoryRateLimiter
+
+BACKENDS = ("memory", "shm", "redis")
+
+
+def run_workload(limiter, checks: int, keys: int, threads: int) -> float:
+    """Return checks/sec for `checks` calls split across `threads`."""
+    per_thread = max(1, checks // threads)
+    key_names = [f"bench-{i}" for i in range(keys)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset: int):
+        check = limiter.check
+        barrier.wait()
+        for i in range(per_thread):
+            check(key_names[(offset + i) % keys], 1_000_000, 60)
+
+    workers = [threading.Thread(target=worker, args=(t * 7919,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    return (per_thread * threads) / elapsed if elapsed > 0 else float("inf")
+
+
+def benchmark(
+    backends: List[str],
+    checks: int = 200_000,
+    keys: int = 1000,
+    threads: int = 4,
+    redis_url: Optional[str] = None,
+) -> Dict[str, float]:
+    """checks/sec per backend name."""
+    results: Dict[str, float] = {}
+    for name in backends:
+        if name == "memory":
+            results[name] = run_workload(RateLimiter(), checks, keys, threads)
+        elif name == "shm":
+            with tempfile.TemporaryDirectory() as tmp:
+                limiter = SharedMemoryRateLimiter(path=os.path.join(tmp, "ratelimit"), slots=max(keys * 4, 1024))
+                try:
+                    results[name] = run_workload(limiter, checks, keys, threads)
+                finally:
+                    limiter.close()
+        elif name == "redis":
+            server = None
+            url = redis_url
+            if url is None:
+                from app.tools.fake_redis import FakeRedisServer
+
+                server = FakeRedisServer().start()
+                url = server.url
+            limiter = RedisRateLimiter(url=url)
+            try:
+                results[name] = run_workload(limiter, checks, keys, threads)
+            finally:
+                limiter.close()
+                if server is not None:
+                    server.stop()
+        else:
+            raise ValueError(f"Unknown backend: {name}")
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rate limiter checks/sec per backend")
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--redis-url", default=None, help="Real server (default: local fake server)")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    results = benchmark(backends, args.checks, args.keys, args.threads, args.redis_url)
+
+    print(f"{'backend':<10} {'checks/sec':>14}")
+    for name, rate in results.items():
+        suffix = " (fake server)" if name == "redis" and args.redis_url is None else ""
+        print(f"{name:<10} {rate:>14,.0f}{suffix}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,215 @@
+"""
+FAKE LLM SERVER — local HTTP stand-in for the pooled LLM provider clients.
+
+Answers the three wire formats used by app.llm.async_clients with a
+deterministic text (same FAKE::<sha256[:8]> as FakeLLMClient):
+- POST .../chat/completions            (OpenAI, xAI Grok, DeepSeek)
+- POST /v1/messages                    (Anthropic)
+- POST /v1beta/models/<m>:generateContent (Gemini)
+Streaming variants ("stream": true, :streamGenerateContent?alt=sse) answer
+text/event-stream in the provider's event format, chunked, one event per
+4-char piece of the text.
+
+Knobs for tests/benchmarks: latency_s (simulated provider latency, before
+the first byte), chunk_delay_s (between stream events), fail_statuses
+(queue of HTTP error statuses for the next responses).
+Counters: requests, connections (new TCP connections: keep-alive reuse).
+
+Usage:
+    python -m app.tools.fake_llm_server --port 8399 --latency-ms 500
+    VERITTA_LLM_OPENAI_BASE_URL=http://127.0.0.1:8399/v1
+"""
+
+import argparse
+import json
+import socket
+import threading
+import time
+from collections import deque
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Tuple, Union
+
+
+def fake_text(prompt: str) -> str:
+    return f"FAKE::{sha256(prompt.encode('utf-8')).hexdigest()[:8]}"
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """Threaded HTTP/1.1 keep-alive server (one thread per connection)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 512
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0), latency_s: float = 0.0):
+        super().__init__(address, _Handler)
+        self.latency_s = latency_s
+        self.chunk_delay_s = 0.0
+        self.fail_statuses: Deque[int] = deque()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.last_headers: Dict[str, str] = {}
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, name="fake-llm", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def respond(self, path: str, body: Dict[str, Any]) -> Tuple[int, Union[Dict[str, Any], List[bytes]]]:
+        """(status, JSON payload) or (200, SSE frames) for streaming requests."""
+        with self.lock:
+            self.requests += 1
+            status = self.fail_statuses.popleft() if self.fail_statuses else 200
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if status != 200:
+            return status, {"error": {"message": "injected failure", "code": status}}
+        if body.get("stream") or path.endswith(":streamGenerateContent"):
+            return 200, self._stream_frames(path, body)
+
+        if path.endswith("/chat/completions"):
+            prompt = body["messages"][0]["content"]
+            return 200, {
+                "choices": [{"message": {"role": "assistant", "content": fake_text(prompt)}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": 1,
+                          "total_tokens": len(prompt) // 4 + 1},
+                "model": body["model"],
+            }
+        if path.endswith("/v1/messages"):
+            prompt = body["messages"][0]["content"]
+            return 200, {
+                "content": [{"type": "text", "text": fake_text(prompt)}],
+                "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 1},
+                "model": body["model"],
+            }
+        if path.endswith(":generateContent"):
+            prompt = body["contents"][0]["parts"][0]["text"]
+            return 200, {
+                "candidates": [{"content": {"parts": [{"text": fake_text(prompt)}]}}],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": 1,
+                                  "totalTokenCount": len(prompt) // 4 + 1},
+            }
+        return 404, {"error": {"message": f"unknown path {path}"}}
+
+    def _stream_frames(self, path: str, body: Dict[str, Any]) -> List[bytes]:
+        if path.endswith(":streamGenerateContent"):
+            prompt = body["contents"][0]["parts"][0]["text"]
+        else:
+            prompt = body["messages"][0]["content"]
+        text = fake_text(prompt)
+        pieces = [text[i:i + 4] for i in range(0, len(text), 4)]
+        prompt_tokens = len(prompt) // 4
+
+        if path.endswith("/chat/completions"):
+            events = [{"choices": [{"index": 0, "delta": {"content": p}}]} for p in pieces]
+            if (body.get("stream_options") or {}).get("include_usage"):
+                events.append({"choices": [], "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 1,
+                                                         "total_tokens": prompt_tokens + 1}})
+            return [_sse(e) for e in events] + [b"data: [DONE]\n\n"]
+        if path.endswith("/v1/messages"):
+            events = [("message_start", {"type": "message_start", "message": {
+                "model": body["model"], "usage": {"input_tokens": prompt_tokens, "output_tokens": 0}}})]
+            events += [("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": p}}) for p in pieces]
+            events += [("message_delta", {"type": "message_delta", "usage": {"output_tokens": 1}}),
+                       ("message_stop", {"type": "message_stop"})]
+            return [_sse(data, event) for event, data in events]
+        frames = [_sse({"candidates": [{"content": {"parts": [{"text": p}]}}]}) for p in pieces[:-1]]
+        frames.append(_sse({
+            "candidates": [{"content": {"parts": [{"text": pieces[-1]}]}}],
+            "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": 1,
+                              "totalTokenCount": prompt_tokens + 1},
+        }))
+        return frames
+
+
+def _sse(data: Dict[str, Any], event: str = "") -> bytes:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Small request/response pairs: no Nagle delay on keep-alive connections
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+        self.server.last_headers = {k.lower(): v for k, v in self.headers.items()}
+        try:
+            status, payload = self.server.respond(self.path.split("?", 1)[0], body)
+        except (KeyError, IndexError, TypeError):
+            status, payload = 400, {"error": {"message": "malformed request"}}
+        try:
+            if isinstance(payload, list):
+                self._send_stream(payload)
+                return
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up (timeout test): nothing to answer
+            self.close_connection = True
+
+    def _send_stream(self, frames: List[bytes]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, frame in enumerate(frames):
+            if i and self.server.chunk_delay_s:
+                time.sleep(self.server.chunk_delay_s)
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(frame), frame))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local HTTP stand-in for LLM providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8399)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeLLMServer((args.host, args.port), latency_s=args.latency_ms / 1000)
+    print(f"fake LLM server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
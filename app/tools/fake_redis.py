@@ -0,0 +1,192 @@
+"""
+FAKE REDIS — local RESP stand-in for the redis rate limiter backend.
+
+Speaks enough of the Redis protocol for app.rate_limiter_backends.RedisRateLimiter
+(tests, benchmarks, local multi-worker runs without a Redis server):
+PING, AUTH, SELECT, SCRIPT LOAD, EVALSHA/EVAL (sliding-window script only,
+executed natively with identical semantics), DEL, SCAN, DBSIZE, FLUSHDB,
+FLUSHALL, QUIT. Keys expire 2 windows after their last check (PEXPIRE).
+
+Usage:
+    python -m app.tools.fake_redis --port 6390
+    VERITTA_RATE_LIMIT_BACKEND=redis VERITTA_RATE_LIMIT_REDIS_URL=redis://127.0.0.1:6390/0
+"""
+
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from app.rate_limiter import WindowCounter
+from app.rate_limiter_backends import (
+    SLIDING_WINDOW_SCRIPT,
+    SLIDING_WINDOW_SHA,
+    RedisError,
+    read_reply,
+)
+
+
+def _encode_reply(value) -> bytes:
+    if isinstance(value, RedisError):
+        return b"-%s\r\n" % str(value).encode("utf-8")
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode("utf-8")
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode_reply(v) for v in value)
+    raise TypeError(type(value))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Threaded RESP server holding limiter buckets in memory."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        password: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(address, _Handler)
+        self.password = password
+        self.clock = clock
+        self.lock = threading.Lock()
+        # key -> (bucket, expires_at)
+        self.buckets: Dict[bytes, Tuple[WindowCounter, float]] = {}
+        self.scripts = {SLIDING_WINDOW_SHA: SLIDING_WINDOW_SCRIPT}
+        self.commands = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-redis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def _live(self, now: float) -> Dict[bytes, Tuple[WindowCounter, float]]:
+        expired = [k for k, (_, exp) in self.buckets.items() if exp <= now]
+        for k in expired:
+            del self.buckets[k]
+        return self.buckets
+
+    def run_sliding_window(self, key: bytes, limit: int, window_ms: int) -> int:
+        window_s = window_ms / 1000.0
+        with self.lock:
+            now = self.clock()
+            entry = self.buckets.get(key)
+            if entry is None or entry[1] <= now:
+                bucket = WindowCounter(window_s, now)
+            else:
+                bucket = entry[0]
+            allowed = bucket.hit(limit, window_s, now)
+            self.buckets[key] = (bucket, now + 2 * window_s)
+            return int(allowed)
+
+    def execute(self, args, state) -> object:
+        self.commands += 1
+        name = args[0].decode("utf-8").upper() if args else ""
+
+        if self.password and not state["authed"] and name not in ("AUTH", "QUIT"):
+            return RedisError("NOAUTH Authentication required.")
+        if name == "AUTH":
+            if args[-1].decode("utf-8") != (self.password or ""):
+                return RedisError("WRONGPASS invalid username-password pair")
+            state["authed"] = True
+            return "OK"
+        if name == "PING":
+            return "PONG"
+        if name in ("SELECT", "QUIT"):
+            return "OK"
+        if name == "SCRIPT" and len(args) == 3 and args[1].upper() == b"LOAD":
+            body = args[2].decode("utf-8")
+            if body != SLIDING_WINDOW_SCRIPT:
+                return RedisError("ERR fake server only runs the rate limiter script")
+            return SLIDING_WINDOW_SHA.encode("ascii")
+        if name in ("EVAL", "EVALSHA"):
+            script = args[1].decode("utf-8")
+            if name == "EVALSHA":
+                if script not in self.scripts:
+                    return RedisError("NOSCRIPT No matching script. Please use EVAL.")
+            elif script != SLIDING_WINDOW_SCRIPT:
+                return RedisError("ERR fake server only runs the rate limiter script")
+            if int(args[2]) != 1 or len(args) != 6:
+                return RedisError("ERR wrong number of arguments")
+            return self.run_sliding_window(args[3], int(args[4]), int(args[5]))
+        if name == "DEL":
+            with self.lock:
+                return sum(1 for k in args[1:] if self.buckets.pop(k, None) is not None)
+        if name == "SCAN":
+            pattern = b"*"
+            if b"MATCH" in [a.upper() for a in args]:
+                pattern = args[[a.upper() for a in args].index(b"MATCH") + 1]
+            with self.lock:
+                keys = [k for k in self._live(self.clock()) if fnmatch.fnmatchcase(k, pattern)]
+            return [b"0", keys]
+        if name == "DBSIZE":
+            with self.lock:
+                return len(self._live(self.clock()))
+        if name in ("FLUSHDB", "FLUSHALL"):
+            with self.lock:
+                self.buckets.clear()
+            return "OK"
+        return RedisError(f"ERR unknown command '{name}'")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        state = {"authed": False}
+        while True:
+            try:
+                args = read_reply(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            if not isinstance(args, list) or not args:
+                self.wfile.write(_encode_reply(RedisError("ERR protocol error")))
+                return
+            reply = self.server.execute(args, state)
+            self.wfile.write(_encode_reply(reply))
+            self.wfile.flush()
+            if args[0].upper() == b"QUIT":
+                return
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local RESP stand-in for the Redis rate limiter backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--password", default=None)
+    args = parser.parse_args()
+
+    server = FakeRedisServer((args.host, args.port), password=args.password)
+    print(f"fake redis listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,16 +8,22 @@ e gerar um relatório determinístico.
 Não importa Notion. Não faz chamadas externas. Funciona 100% offline.
 """
 
+import heapq
 import json
 import os
-from datetime import datetime, timezone, timedelta
-from pathlib import Path
-from typing import Dict, List, Optional
+from array import array
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from app.audit_segments import has_audit_data, iter_audit_lines
 
 
 # Environment variables
 VERITTA_AUDIT_LOG_PATH = os.getenv("VERITTA_AUDIT_LOG_PATH", "audit.log")
 VERITTA_ORPHAN_SLA_S = int(os.getenv("VERITTA_ORPHAN_SLA_S", "30"))
+# Max out-of-order skew (s) tolerated between audit writers in streaming mode
+VERITTA_ORPHAN_REORDER_S = float(os.getenv("VERITTA_ORPHAN_REORDER_S", "5"))
 
 
 class OrphanReconciler:
@@ -35,16 +41,23 @@ class OrphanReconciler:
     5. Mark as ORPHAN_ALLOW if age > SLA
     """
     
-    def __init__(self, audit_log_path: str = VERITTA_AUDIT_LOG_PATH, sla_s: int = VERITTA_ORPHAN_SLA_S):
+    def __init__(
+        self,
+        audit_log_path: str = VERITTA_AUDIT_LOG_PATH,
+        sla_s: int = VERITTA_ORPHAN_SLA_S,
+        since: Optional[datetime] = None,
+    ):
         """
         Initialize reconciler.
         
         Args:
-            audit_log_path: Path to audit.log file (JSON lines)
+            audit_log_path: Path to audit.log file (JSON lines) or segment base path
             sla_s: SLA in seconds for orphan detection (default 30)
+            since: Optional aware UTC cutoff; indexed segments older than it are skipped
         """
         self.audit_log_path = audit_log_path
         self.sla_s = sla_s
+        self.since = since
         self.traces: Dict[str, dict] = {}  # trace_id → {opened_ts, events, etc}
     
     def load_audit_log(self) -> bool:
@@ -54,26 +67,24 @@ class OrphanReconciler:
         Returns:
             True if successful, False if file not found or empty.
         """
-        path = Path(self.audit_log_path)
-        
-        if not path.exists():
+        if not has_audit_data(self.audit_log_path):
             return False
         
         self.traces = {}
         
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        event = json.loads(line)
-                        self._process_event(event)
-                    except json.JSONDecodeError as e:
-                        # Silently skip malformed lines (audit.log may have mixed content)
-                        pass
+            # Legacy single file + rolling segments (app.audit_segments)
+            for line_num, line in enumerate(iter_audit_lines(self.audit_log_path, since=self.since), 1):
+                line = line.strip()
+                if not line:
+                    continue
+                
+                try:
+                    event = json.loads(line)
+                    self._process_event(event)
+                except json.JSONDecodeError as e:
+                    # Silently skip malformed lines (audit.log may have mixed content)
+                    pass
         except Exception as e:
             # If file can't be read, return False
             return False
@@ -229,6 +240,7 @@ class OrphanReconciler:
 def analyze_audit_log(
     audit_log_path: str = VERITTA_AUDIT_LOG_PATH,
     sla_s: int = VERITTA_ORPHAN_SLA_S,
+    workers: int = 1,
 ) -> List[Dict]:
     """
     Analyze audit.log and return reconciliation report.
@@ -236,10 +248,290 @@ def analyze_audit_log(
     Args:
         audit_log_path: Path to audit.log
         sla_s: SLA in seconds for orphan detection
+        workers: Worker processes (>1 uses app.tools.audit_scan, same output)
     
     Returns:
         List of trace status dicts
     """
+    if workers > 1:
+        from app.tools.audit_scan import parallel_reconcile
+        
+        return parallel_reconcile(audit_log_path, sla_s, workers=workers)
+    
     reconciler = OrphanReconciler(audit_log_path=audit_log_path, sla_s=sla_s)
     reconciler.load_audit_log()
     return reconciler.reconcile()
+
+
+class StreamingOrphanReconciler:
+    """
+    Streaming, bounded-memory variant of OrphanReconciler.
+
+    Events are released in timestamp order through a small reorder buffer
+    (VERITTA_ORPHAN_REORDER_S) and only state needed to classify future events
+    is kept:
+
+    - open ALLOW traces in a slot table (trace_id -> slot; opened ts in a flat
+      array, free-list reuse), evicted when resolved or emitted as ORPHAN_ALLOW
+    - recently closed trace_ids (for one SLA window) so a late ActionResult of a
+      resolved/denied trace is not reported as INCONSISTENT
+
+    Age is measured against the stream watermark (newest released ts, or wall
+    clock via advance() while following), so an ALLOW is emitted as
+    ORPHAN_ALLOW as soon as the watermark passes opened_ts + SLA.
+
+    Only non-OK results are emitted (same dict shape as reconcile()); OK traces
+    are counted in `status_counts`.
+    """
+
+    def __init__(
+        self,
+        sla_s: int = VERITTA_ORPHAN_SLA_S,
+        reorder_s: float = VERITTA_ORPHAN_REORDER_S,
+        on_result: Optional[Callable[[Dict], None]] = None,
+    ):
+        """
+        Initialize streaming reconciler.
+
+        Args:
+            sla_s: SLA in seconds for orphan detection
+            reorder_s: Out-of-order tolerance; events are held this long before release
+            on_result: Optional callback for each emitted result (else use return values)
+        """
+        self.sla_s = sla_s
+        self.reorder_s = reorder_s
+        self.on_result = on_result
+
+        # Reorder buffer: (ts, seq, event)
+        self._pending: List[Tuple[float, int, dict]] = []
+        self._seq = 0
+        self._watermark: Optional[float] = None
+
+        # Open ALLOW slot table
+        self._slot_trace: List[Optional[str]] = []
+        self._slot_opened = array("d")
+        self._free: List[int] = []
+        self._open: Dict[str, int] = {}
+        # Expiry queue in opened order (monotonic since events are released in ts order)
+        self._expiry: Deque[Tuple[float, int, str]] = deque()
+
+        # Recently closed trace_ids (trace_id -> closed ts), pruned after one SLA window
+        self._closed: Dict[str, float] = {}
+        self._closed_order: Deque[Tuple[float, str]] = deque()
+
+        self.status_counts: Dict[str, int] = {}
+        self.events_processed = 0
+        self.peak_open_traces = 0
+
+    @property
+    def open_traces(self) -> int:
+        return len(self._open)
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+
+    def feed_line(self, line) -> List[Dict]:
+        """Feed one raw JSONL line (str or bytes); malformed lines are skipped."""
+        line = line.strip()
+        if not line:
+            return []
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return []
+        if not isinstance(event, dict):
+            return []
+        return self.feed(event)
+
+    def feed(self, event: dict) -> List[Dict]:
+        """
+        Feed one audit event.
+
+        Returns:
+            Results emitted by this call (orphans crossing the SLA, inconsistencies).
+        """
+        if not event.get("trace_id"):
+            return []
+
+        opened = OrphanReconciler._parse_ts(event.get("ts_utc"))
+        if opened is None:
+            # Cannot be ordered: apply immediately
+            return self._apply(event, None)
+
+        ts = opened.timestamp()
+        heapq.heappush(self._pending, (ts, self._seq, event))
+        self._seq += 1
+
+        emitted: List[Dict] = []
+        horizon = ts - self.reorder_s
+        while self._pending and self._pending[0][0] <= horizon:
+            ev_ts, _, ev = heapq.heappop(self._pending)
+            emitted.extend(self._release(ev_ts, ev))
+        return emitted
+
+    def advance(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Advance the clock without new events (follow mode while the log is idle).
+
+        Pending events older than now - reorder_s are released and open ALLOWs
+        past the SLA are emitted.
+        """
+        now_ts = (now or datetime.now(timezone.utc)).timestamp()
+        emitted: List[Dict] = []
+        horizon = now_ts - self.reorder_s
+        while self._pending and self._pending[0][0] <= horizon:
+            ev_ts, _, ev = heapq.heappop(self._pending)
+            emitted.extend(self._release(ev_ts, ev))
+        if self._watermark is None or horizon > self._watermark:
+            self._watermark = horizon
+            emitted.extend(self._expire())
+        return emitted
+
+    def flush(self) -> List[Dict]:
+        """
+        Release every buffered event (end of input).
+
+        ALLOWs still within SLA of the final watermark stay open (not orphans yet).
+        """
+        emitted: List[Dict] = []
+        while self._pending:
+            ev_ts, _, ev = heapq.heappop(self._pending)
+            emitted.extend(self._release(ev_ts, ev))
+        return emitted
+
+    # ------------------------------------------------------------------
+    # Core
+    # ------------------------------------------------------------------
+
+    def _release(self, ts: float, event: dict) -> List[Dict]:
+        if self._watermark is None or ts > self._watermark:
+            self._watermark = ts
+        emitted = self._apply(event, ts)
+        emitted.extend(self._expire())
+        return emitted
+
+    def _apply(self, event: dict, ts: Optional[float]) -> List[Dict]:
+        self.events_processed += 1
+        trace_id = event["trace_id"]
+        event_type = event.get("event_type")
+        emitted: List[Dict] = []
+
+        if event_type == "decision_audit":
+            decision = event.get("decision")
+            if decision == "ALLOW":
+                if trace_id in self._open or trace_id in self._closed:
+                    return emitted
+                if ts is None:
+                    # Inconclusive timestamp parsing (same rule as reconcile())
+                    emitted.append(self._emit(trace_id, event.get("ts_utc"), event.get("ts_utc"), None, "INCONCLUSIVE"))
+                    self._close(trace_id)
+                else:
+                    self._open_trace(trace_id, ts)
+            elif decision == "DENY":
+                # DENY traces are not orphans (no action expected)
+                if trace_id in self._open:
+                    self._free_slot(trace_id)
+                if trace_id not in self._closed:
+                    self._count("OK")
+                self._close(trace_id)
+
+        elif event_type == "action_audit" and event.get("status"):
+            if trace_id in self._open:
+                self._free_slot(trace_id)
+                self._count("OK")
+                self._close(trace_id)
+            elif trace_id not in self._closed:
+                # ActionResult without decision → inconsistent
+                emitted.append(self._emit(trace_id, event.get("ts_utc"), event.get("ts_utc"), None, "INCONSISTENT"))
+                self._close(trace_id)
+
+        return emitted
+
+    def _open_trace(self, trace_id: str, ts: float) -> None:
+        if self._free:
+            slot = self._free.pop()
+            self._slot_trace[slot] = trace_id
+            self._slot_opened[slot] = ts
+        else:
+            slot = len(self._slot_trace)
+            self._slot_trace.append(trace_id)
+            self._slot_opened.append(ts)
+        self._open[trace_id] = slot
+        self._expiry.append((ts, slot, trace_id))
+        if len(self._open) > self.peak_open_traces:
+            self.peak_open_traces = len(self._open)
+
+    def _free_slot(self, trace_id: str) -> None:
+        slot = self._open.pop(trace_id)
+        self._slot_trace[slot] = None
+        self._free.append(slot)
+
+    def _close(self, trace_id: str) -> None:
+        if self._watermark is None:
+            return
+        self._closed[trace_id] = self._watermark
+        self._closed_order.append((self._watermark, trace_id))
+
+    def _expire(self) -> List[Dict]:
+        emitted: List[Dict] = []
+        if self._watermark is None:
+            return emitted
+
+        deadline = self._watermark - self.sla_s
+        while self._expiry and self._expiry[0][0] < deadline:
+            opened, slot, trace_id = self._expiry.popleft()
+            if self._slot_trace[slot] != trace_id:
+                continue  # Resolved earlier (slot freed or reused)
+            self._free_slot(trace_id)
+            self._close(trace_id)
+            emitted.append(self._emit(
+                trace_id,
+                datetime.fromtimestamp(opened, tz=timezone.utc).isoformat(),
+                datetime.fromtimestamp(self._watermark, tz=timezone.utc).isoformat(),
+                self._watermark - opened,
+                "ORPHAN_ALLOW",
+            ))
+
+        # Closed trace_ids only matter for one SLA window (+ reorder skew)
+        forget = deadline - self.reorder_s
+        while self._closed_order and self._closed_order[0][0] < forget:
+            closed_ts, trace_id = self._closed_order.popleft()
+            if self._closed.get(trace_id) == closed_ts:
+                del self._closed[trace_id]
+        return emitted
+
+    def _count(self, status: str) -> None:
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def _emit(self, trace_id, opened_ts_utc, last_ts_utc, age_s, status) -> Dict:
+        self._count(status)
+        result = {
+            "trace_id": trace_id,
+            "opened_ts_utc": opened_ts_utc,
+            "last_ts_utc": last_ts_utc,
+            "age_s": age_s,
+            "status": status,
+        }
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+
+def stream_reconcile(
+    lines: Iterable,
+    sla_s: int = VERITTA_ORPHAN_SLA_S,
+    reorder_s: float = VERITTA_ORPHAN_REORDER_S,
+) -> Tuple[List[Dict], StreamingOrphanReconciler]:
+    """
+    Reconcile an iterable of JSONL lines in one streaming pass.
+
+    Returns:
+        (non-OK results in emission order, reconciler with status_counts/stats)
+    """
+    reconciler = StreamingOrphanReconciler(sla_s=sla_s, reorder_s=reorder_s)
+    results: List[Dict] = []
+    for line in lines:
+        results.extend(reconciler.feed_line(line))
+    results.extend(reconciler.flush())
+    return results, reconciler
@@ -5,30 +5,46 @@ Usage:
     python -m app.tools.reconcile_cli
     python app/tools/reconcile_cli.py
     python app/tools/reconcile_cli.py --plain
+    python app/tools/reconcile_cli.py --stream
+    python app/tools/reconcile_cli.py --follow
     
 Environment variables:
     VERITTA_AUDIT_LOG_PATH: Path to audit.log (default: audit.log)
     VERITTA_ORPHAN_SLA_S: SLA in seconds (default: 30)
+    VERITTA_ORPHAN_REORDER_S: Out-of-order tolerance for --stream/--follow (default: 5)
+    VERITTA_AUDIT_SCAN_WORKERS: Worker processes for the batch scan (default: 1)
 
 Output:
     Summary of trace statuses (OK, ORPHAN_ALLOW, INCONSISTENT)
     List of problematic trace_ids
     
     --plain: Text-only output (no emojis or decorative chars)
+    --stream: One streaming pass in constant memory (age measured against the
+              log watermark instead of each trace's own last event)
+    --follow: Keep tailing the log and print orphans as they cross the SLA
+    --workers N: Parse the log in N processes (batch mode, identical output)
 """
 
 import argparse
 import os
 import sys
+import time
 from pathlib import Path
 
 # Add parent directories to path so imports work
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.tools.orphan_reconciler import analyze_audit_log
+from app.audit_segments import AuditTailer, has_audit_data, iter_audit_lines
+from app.tools.audit_parser import get_scan_workers
+from app.tools.orphan_reconciler import (
+    VERITTA_ORPHAN_REORDER_S,
+    StreamingOrphanReconciler,
+    analyze_audit_log,
+    stream_reconcile,
+)
 
 
-def _format_report(results, sla_s, audit_log_path, plain=False):
+def _format_report(results, sla_s, audit_log_path, plain=False, status_counts=None):
     """
     Format reconciliation report.
     
@@ -37,6 +53,8 @@ def _format_report(results, sla_s, audit_log_path, plain=False):
         sla_s: SLA threshold in seconds
         audit_log_path: Path to audit log
         plain: If True, use text-only format (no emojis)
+        status_counts: Optional precomputed counts (streaming mode, where
+                       results only hold non-OK traces)
     
     Returns:
         Tuple of (formatted_output, should_exit_1)
@@ -55,19 +73,21 @@ def _format_report(results, sla_s, audit_log_path, plain=False):
     
     lines.append("")
     
-    if not results:
+    if not results and not status_counts:
         lines.append("No traces found in audit.log")
         return "\n".join(lines), False
     
     # Count by status
-    status_counts = {}
+    counted = status_counts is None
+    status_counts = {} if counted else dict(status_counts)
     orphans = []
     inconsistent = []
     inconclusive = []
     
     for result in results:
         status = result["status"]
-        status_counts[status] = status_counts.get(status, 0) + 1
+        if counted:
+            status_counts[status] = status_counts.get(status, 0) + 1
         
         if status == "ORPHAN_ALLOW":
             orphans.append(result)
@@ -84,7 +104,7 @@ def _format_report(results, sla_s, audit_log_path, plain=False):
         lines.append("📊 SUMMARY")
         lines.append("━" * 40)
     
-    lines.append(f"Total traces:      {len(results)}")
+    lines.append(f"Total traces:      {sum(status_counts.values())}")
     
     if plain:
         lines.append(f"OK:                {status_counts.get('OK', 0)}")
@@ -156,6 +176,70 @@ def _format_report(results, sla_s, audit_log_path, plain=False):
     return "\n".join(lines), False  # Exit code 0
 
 
+def _format_result_line(result, plain=False):
+    """Format one streamed result (--follow prints them as they are emitted)."""
+    age = result.get("age_s")
+    age_str = f"{age:.1f}s" if age is not None else "unknown"
+    prefix = "" if plain else {"ORPHAN_ALLOW": "🔴 ", "INCONSISTENT": "🔶 "}.get(result["status"], "❔ ")
+    return f"{prefix}{result['status']} {result['trace_id']} (opened: {result['opened_ts_utc']}, age: {age_str})"
+
+
+def follow(
+    audit_log_path,
+    sla_s,
+    plain=False,
+    interval_s=1.0,
+    reorder_s=VERITTA_ORPHAN_REORDER_S,
+    should_stop=None,
+    out=print,
+):
+    """
+    Tail the audit log (file + segments) and print non-OK traces as they are detected.
+
+    Memory is bounded by open ALLOWs within the SLA, not by log size. The wall
+    clock only advances the SLA once the tail has caught up with the log, so a
+    backlog being replayed never produces false orphans.
+
+    Args:
+        audit_log_path: Path to audit log (or segment base path)
+        sla_s: SLA threshold in seconds
+        plain: Text-only output
+        interval_s: Poll interval while idle
+        reorder_s: Out-of-order tolerance between writers
+        should_stop: Optional callable checked after each poll (tests)
+        out: Output function
+
+    Returns:
+        Exit code (1 if any orphan/inconsistency was reported, else 0)
+    """
+    found = []
+
+    def _report(result):
+        found.append(result["status"])
+        out(_format_result_line(result, plain=plain))
+
+    reconciler = StreamingOrphanReconciler(sla_s=sla_s, reorder_s=reorder_s, on_result=_report)
+    tailer = AuditTailer(audit_log_path)
+
+    try:
+        while True:
+            read = 0
+            for raw in tailer.read_new():
+                read += 1
+                reconciler.feed_line(raw)
+            if read == 0:
+                # Caught up: let wall-clock time age open ALLOWs
+                reconciler.advance()
+            if should_stop is not None and should_stop():
+                break
+            if read == 0:
+                time.sleep(interval_s)
+    except KeyboardInterrupt:
+        pass
+
+    return 1 if found else 0
+
+
 def main():
     """
     Run reconciliation and print summary report.
@@ -168,14 +252,36 @@ def main():
         action="store_true",
         help="Text-only output (no emojis or decorative characters)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Single streaming pass in constant memory"
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep tailing the audit log and report orphans as they cross the SLA"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Poll interval in seconds for --follow (default: 1.0)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for the batch scan (default: VERITTA_AUDIT_SCAN_WORKERS or 1)"
+    )
     args = parser.parse_args()
     
     # Read environment variables
     audit_log_path = os.getenv("VERITTA_AUDIT_LOG_PATH", "audit.log")
     sla_s = int(os.getenv("VERITTA_ORPHAN_SLA_S", "30"))
     
-    # Check if file exists
-    if not Path(audit_log_path).exists():
+    # Check if file (or rolling segments) exists
+    if not has_audit_data(audit_log_path):
         if args.plain:
             print(f"File not found: {audit_log_path}")
             print(f"Status: NO DATA")
@@ -184,11 +290,25 @@ def main():
             print(f"Status: NO DATA")
         return 1
     
+    if args.follow:
+        return follow(audit_log_path, sla_s, plain=args.plain, interval_s=args.interval)
+    
     # Analyze
-    results = analyze_audit_log(audit_log_path=audit_log_path, sla_s=sla_s)
+    status_counts = None
+    if args.stream:
+        results, reconciler = stream_reconcile(iter_audit_lines(audit_log_path), sla_s=sla_s)
+        status_counts = dict(reconciler.status_counts)
+        # ALLOWs still within SLA at end of log are OK (may complete later)
+        if reconciler.open_traces:
+            status_counts["OK"] = status_counts.get("OK", 0) + reconciler.open_traces
+    else:
+        workers = args.workers if args.workers is not None else get_scan_workers()
+        results = analyze_audit_log(audit_log_path=audit_log_path, sla_s=sla_s, workers=workers)
     
     # Format and print
-    output, should_exit_1 = _format_report(results, sla_s, audit_log_path, plain=args.plain)
+    output, should_exit_1 = _format_report(
+        results, sla_s, audit_log_path, plain=args.plain, status_counts=status_counts
+    )
     print(output)
     
     return 1 if should_exit_1 else 0
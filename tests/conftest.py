@@ -7,6 +7,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.action_matrix import reset_action_matrix
+from app.audit_aggregator import get_checkpoint_path, stop_audit_aggregator
 
 
 # ============================================================================
@@ -84,6 +85,7 @@ def test_client(test_db_session):
     """
     from app.main import app
     from app.db.database import get_db
+    from app.db.async_database import ThreadedAsyncSession, get_async_db
     
     def override_get_db():
         try:
@@ -91,7 +93,11 @@ def test_client(test_db_session):
         finally:
             pass  # Fixture handles cleanup
     
+    async def override_get_async_db():
+        yield ThreadedAsyncSession(test_db_session)
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     client = TestClient(app)
     
@@ -124,8 +130,8 @@ def test_client(test_db_session):
     yield client
     
     # Cleanup
-    if get_db in app.dependency_overrides:
-        del app.dependency_overrides[get_db]
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_async_db, None)
 
 
 # Alias for backward compatibility with tests that request 'client' instead of 'test_client'
@@ -158,12 +164,14 @@ def cleanup_audit_log():
     
     yield
     
-    # Cleanup after test
-    if Path(audit_log_path).exists():
-        try:
-            Path(audit_log_path).unlink()
-        except OSError:
-            pass
+    # Summary requests start the aggregator thread on demand: stop it, drop its checkpoint
+    stop_audit_aggregator()
+    for path in (audit_log_path, get_checkpoint_path(audit_log_path)):
+        if Path(path).exists():
+            try:
+                Path(path).unlink()
+            except OSError:
+                pass
 
 
 @pytest.fixture(autouse=True)
@@ -9,6 +9,7 @@ from sqlalchemy import create_engine, event
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.db.async_database import ThreadedAsyncSession, get_async_db
 from app.db.database import get_db, SessionLocal
 from app.db.session_repository import SessionRepository
 from app.models.session import SessionModel
@@ -65,7 +66,11 @@ def test_client(test_db):
     def override_get_db():
         yield test_db
     
+    async def override_get_async_db():
+        yield ThreadedAsyncSession(test_db)
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     
     client = TestClient(app)
     
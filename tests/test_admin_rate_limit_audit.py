@@ -0,0 +1,186 @@
+"""
+Tests for AdminRateLimit on the shared limiter engine + ALLOW audit modes.
+
+Verify:
+- Limit per admin key (independent keys, G10 user keys unaffected)
+- Admin key is hashed before reaching the limiter backend
+- DENY always audited, in every mode
+- ALLOW audit: every / sampled (1 in N) / aggregated (one summary per window)
+- flush_allow_audit emits the pending summary
+- Closed windows are flushed without further traffic (background flusher);
+  a failed summary write is kept and retried with its counts
+"""
+
+import uuid
+
+import pytest
+
+import app.gates.admin_rate_limit as admin_rate_limit
+from app.gates.admin_rate_limit import AdminRateLimit, get_allow_audit_mode
+from app.rate_limiter import RateLimiter, get_rate_limiter, set_rate_limiter
+
+
+class FakeClock:
+    def __init__(self, t=6000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def records(monkeypatch):
+    captured = []
+    monkeypatch.setattr(admin_rate_limit, "log_decision", captured.append)
+    return captured
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    previous = get_rate_limiter()
+    limiter = RateLimiter()
+    set_rate_limiter(limiter)
+    clock = FakeClock()
+    monkeypatch.setattr(AdminRateLimit, "_clock", clock)
+    AdminRateLimit.reset()
+    yield limiter, clock
+    AdminRateLimit.reset()
+    set_rate_limiter(previous)
+
+
+def _call(key="admin-key"):
+    return AdminRateLimit.check(key, str(uuid.uuid4()))
+
+
+class TestLimit:
+    def test_denies_over_limit(self, monkeypatch, records):
+        monkeypatch.setenv("VERITTA_ADMIN_RATE_LIMIT_PER_MIN", "3")
+
+        results = [_call()[0] for _ in range(5)]
+
+        assert results == [True, True, True, False, False]
+        assert _call("other-key")[0] is True
+
+    def test_deny_record(self, monkeypatch, records):
+        monkeypatch.setenv("VERITTA_ADMIN_RATE_LIMIT_PER_MIN", "1")
+        _call()
+
+        allowed, reason, record = _call()
+
+        assert (allowed, reason) == (False, "RATE_LIMIT_EXCEEDED")
+        assert record.decision == "DENY" and record.profile_id == "ADMIN_G10"
+        assert records[-1] is record
+
+    def test_limiter_key_is_hashed(self, fresh_state, records):
+        limiter, _ = fresh_state
+        _call("super-secret-admin-key")
+
+        keys = [k for shard in limiter._shards for k in shard.buckets]
+        assert len(keys) == 1
+        assert keys[0].startswith("admin_g10:") and "super-secret" not in keys[0]
+
+    def test_reset_key(self, monkeypatch, records):
+        monkeypatch.setenv("VERITTA_ADMIN_RATE_LIMIT_PER_MIN", "1")
+        _call()
+
+        AdminRateLimit.reset("admin-key")
+        assert _call()[0] is True
+
+
+class TestAllowAudit:
+    @pytest.mark.parametrize("mode", ["every", "sampled", "aggregated"])
+    def test_deny_always_audited(self, monkeypatch, records, mode):
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", mode)
+        monkeypatch.setenv("VERITTA_ADMIN_RATE_LIMIT_PER_MIN", "2")
+
+        for _ in range(5):
+            _call()
+
+        assert sum(r.decision == "DENY" for r in records) == 3
+
+    def test_every(self, monkeypatch, records):
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", "every")
+
+        for _ in range(4):
+            _, _, record = _call()
+            assert record is not None
+
+        assert [r.decision for r in records] == ["ALLOW"] * 4
+
+    def test_unknown_mode_audits_every_call(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", "nope")
+
+        assert get_allow_audit_mode() == "every"
+
+    def test_sampled(self, monkeypatch, records):
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", "sampled")
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_SAMPLE_EVERY", "10")
+
+        audited = [_call()[2] is not None for _ in range(25)]
+
+        assert [i for i, a in enumerate(audited) if a] == [0, 10, 20]
+        assert len(records) == 3
+        assert _call("second-key")[2] is not None  # First ALLOW of each key
+
+    def test_aggregated_one_summary_per_window(self, monkeypatch, fresh_state, records):
+        _, clock = fresh_state
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", "aggregated")
+
+        for _ in range(30):
+            assert _call()[2] is None
+        _call("second-key")
+        assert records == []
+
+        clock.t += 60
+        _call()
+
+        assert len(records) == 1
+        summary = records[0]
+        assert summary.decision == "ALLOW"
+        assert "ADMIN_G10 window summary: 31 allowed, 2 key(s)" in summary.matched_rules[0]
+
+    def test_flush_emits_pending_summary(self, monkeypatch, records):
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", "aggregated")
+        for _ in range(3):
+            _call()
+
+        summary = AdminRateLimit.flush_allow_audit()
+
+        assert records == [summary]
+        assert "3 allowed" in summary.matched_rules[0]
+        assert AdminRateLimit.flush_allow_audit() is None
+
+    def test_closed_window_flushed_without_traffic(self, monkeypatch, fresh_state, records):
+        _, clock = fresh_state
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", "aggregated")
+        for _ in range(3):
+            _call()
+        assert AdminRateLimit._flusher.is_alive()
+
+        assert AdminRateLimit.flush_due() is None  # window still open
+        clock.t += 60
+        summary = AdminRateLimit.flush_due()
+
+        assert records == [summary]
+        assert "3 allowed" in summary.matched_rules[0]
+
+    def test_failed_summary_write_retried(self, monkeypatch, fresh_state, records):
+        _, clock = fresh_state
+        monkeypatch.setenv("VERITTA_ADMIN_AUDIT_ALLOW_MODE", "aggregated")
+        for _ in range(3):
+            _call()
+        clock.t += 60
+
+        def failing(record):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(admin_rate_limit, "log_decision", failing)
+        with pytest.raises(OSError):
+            AdminRateLimit.flush_due()
+        monkeypatch.setattr(admin_rate_limit, "log_decision", records.append)
+        _call()
+        AdminRateLimit.flush_allow_audit()
+
+        assert len(records) == 2
+        assert "3 allowed" in records[0].matched_rules[0]
+        assert "1 allowed" in records[1].matched_rules[0]
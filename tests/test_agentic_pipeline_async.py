@@ -0,0 +1,184 @@
+"""
+Tests for the async pipeline (run_agentic_action_async) and AsyncExecutor.
+
+Verify:
+- Same ActionResult as the sync pipeline (shared governance steps)
+- aexecute awaited on the event loop (execute not called)
+- Sync executors offloaded: event loop keeps running during the call
+- asyncio.wait_for timeout => BLOCKED / EXECUTOR_TIMEOUT, coroutine cancelled
+- aexecute exception => FAILED / EXECUTOR_EXCEPTION
+- Hundreds of in-flight async executor calls on one loop
+"""
+
+import asyncio
+import time
+import uuid
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.agentic_pipeline import run_agentic_action, run_agentic_action_async
+from app.executor_pool import ExecutorPool
+from app.executors.base import ExecutorLimits, is_async_executor
+
+
+def _limits():
+    return ExecutorLimits(timeout_ms=1000, max_payload_bytes=10_000, max_depth=10, max_list_items=100)
+
+
+class SyncExecutor:
+    executor_id = "test.sync"
+    version = "1.0.0"
+    capabilities = []
+
+    def __init__(self, delay_s=0.0):
+        self.limits = _limits()
+        self.delay_s = delay_s
+
+    def execute(self, req):
+        time.sleep(self.delay_s)
+        return {"echo": req.payload}
+
+
+class AsyncEchoExecutor(SyncExecutor):
+    executor_id = "test.async"
+
+    def __init__(self, delay_s=0.0, error=None):
+        super().__init__(delay_s)
+        self.error = error
+        self.cancelled = False
+        self.sync_calls = 0
+
+    def execute(self, req):
+        self.sync_calls += 1
+        return super().execute(req)
+
+    async def aexecute(self, req):
+        try:
+            await asyncio.sleep(self.delay_s)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return {"echo": req.payload}
+
+
+@pytest.fixture
+def pool():
+    p = ExecutorPool(max_workers=4)
+    with patch("app.agentic_pipeline.get_executor_pool", return_value=p):
+        yield p
+    p.shutdown(wait=False)
+
+
+@pytest.fixture
+def use_executor():
+    registry = Mock()
+    registry.actions = {
+        "test_action": {"action_version": "1.0.0", "executor_id": "test.exec",
+                        "min_executor_version": "1.0.0", "required_capabilities": []}
+    }
+
+    patches = []
+
+    def _use(executor):
+        patches.extend([
+            patch("app.agentic_pipeline.get_executor", return_value=executor),
+            patch("app.agentic_pipeline.get_action_registry", return_value=registry),
+        ])
+        for p in patches[-2:]:
+            p.start()
+        return executor
+
+    yield _use
+    for p in patches:
+        p.stop()
+
+
+def _tid():
+    return str(uuid.uuid4())
+
+
+class TestAsyncPipeline:
+    def test_is_async_executor(self):
+        assert is_async_executor(AsyncEchoExecutor())
+        assert not is_async_executor(SyncExecutor())
+        assert not is_async_executor(Mock())
+
+    async def test_same_result_as_sync(self, pool, use_executor):
+        use_executor(SyncExecutor())
+        payload = {"x": [1, 2, 3]}
+
+        sync_result, _ = run_agentic_action("test_action", payload, _tid())
+        async_result, _ = await run_agentic_action_async("test_action", payload, _tid())
+
+        assert async_result.status == sync_result.status == "SUCCESS"
+        assert async_result.input_digest == sync_result.input_digest
+        assert async_result.output_digest == sync_result.output_digest
+
+    async def test_aexecute_awaited(self, pool, use_executor):
+        executor = use_executor(AsyncEchoExecutor())
+
+        result, _ = await run_agentic_action_async("test_action", {"x": 1}, _tid())
+
+        assert result.status == "SUCCESS"
+        assert executor.sync_calls == 0
+
+    async def test_sync_executor_does_not_block_loop(self, pool, use_executor):
+        use_executor(SyncExecutor(delay_s=0.3))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result, _ = await run_agentic_action_async("test_action", {"x": 1}, _tid())
+        task.cancel()
+
+        assert result.status == "SUCCESS"
+        assert ticks >= 10
+
+    async def test_timeout_cancels_coroutine(self, pool, use_executor, monkeypatch):
+        monkeypatch.setenv("VERITTA_EXECUTOR_TIMEOUT_S", "0.05")
+        executor = use_executor(AsyncEchoExecutor(delay_s=5))
+
+        start = time.perf_counter()
+        result, output = await run_agentic_action_async("test_action", {"x": 1}, _tid())
+
+        assert time.perf_counter() - start < 1.0
+        assert result.status == "BLOCKED"
+        assert result.reason_codes == ["EXECUTOR_TIMEOUT"]
+        assert output is None
+        assert executor.cancelled
+        assert pool.stats()["timeouts"] == 1
+
+    async def test_sync_timeout_offloaded(self, pool, use_executor, monkeypatch):
+        monkeypatch.setenv("VERITTA_EXECUTOR_TIMEOUT_S", "0.05")
+        use_executor(SyncExecutor(delay_s=0.5))
+
+        result, _ = await run_agentic_action_async("test_action", {"x": 1}, _tid())
+
+        assert result.reason_codes == ["EXECUTOR_TIMEOUT"]
+
+    async def test_exception_maps_to_failed(self, pool, use_executor):
+        use_executor(AsyncEchoExecutor(error=ValueError("boom")))
+
+        result, _ = await run_agentic_action_async("test_action", {"x": 1}, _tid())
+
+        assert result.status == "FAILED"
+        assert result.reason_codes == ["EXECUTOR_EXCEPTION"]
+
+    async def test_hundreds_in_flight(self, pool, use_executor):
+        use_executor(AsyncEchoExecutor(delay_s=0.2))
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(run_agentic_action_async("test_action", {"i": i}, _tid()) for i in range(200))
+        )
+
+        assert all(r.status == "SUCCESS" for r, _ in results)
+        assert time.perf_counter() - start < 3.0  # Serial would be 40s
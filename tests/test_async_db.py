@@ -0,0 +1,209 @@
+"""
+Tests for the async database layer (app.db.async_database).
+
+Verify:
+- DATABASE_URL → async driver URL mapping; mode selection (fail-closed driver mode)
+- ThreadedAsyncSession: buffered rows, DML rowcount, commit/refresh
+- AsyncSessionRepository / AsyncPreferencesRepository semantics
+- Load: event-loop lag under concurrent DB calls, before (sync Session on
+  the loop, as the routes did) and after (async data access)
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import async_database
+from app.db.async_database import ThreadedAsyncSession, async_mode, to_async_url
+from app.db.preferences_repository import AsyncPreferencesRepository
+from app.db.session_cache import SessionCache
+from app.db.session_repository import AsyncSessionRepository, SessionRepository
+from app.models.session import Base, SessionModel
+
+DB_LATENCY_S = 0.05
+
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def slow_factory(factory):
+    """Every statement takes DB_LATENCY_S (network round trip)."""
+    engine = factory.kw["bind"]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def latency(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(DB_LATENCY_S)
+
+    return factory
+
+
+class TestMode:
+    @pytest.mark.parametrize("url, expected", [
+        ("postgresql://u:p@db:5432/techno_os", "postgresql+asyncpg://u:p@db:5432/techno_os"),
+        ("postgresql+psycopg2://u:p@db/x", "postgresql+asyncpg://u:p@db/x"),
+        ("postgres://u:p@db/x", "postgresql+asyncpg://u:p@db/x"),
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("mysql://u:p@db/x", None),
+    ])
+    def test_to_async_url(self, url, expected):
+        assert to_async_url(url) == expected
+
+    def test_thread_mode_forced(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_DB_ASYNC_MODE", "thread")
+        assert async_mode() == "thread"
+
+    def test_driver_mode_fails_closed_without_driver(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_DB_ASYNC_MODE", "driver")
+        monkeypatch.setattr(async_database, "async_driver_available", lambda url: False)
+
+        with pytest.raises(RuntimeError):
+            async_mode()
+
+    def test_auto_falls_back_to_thread(self, monkeypatch):
+        monkeypatch.delenv("VERITTA_DB_ASYNC_MODE", raising=False)
+        monkeypatch.setattr(async_database, "async_driver_available", lambda url: False)
+
+        assert async_mode() == "thread"
+
+    async def test_preferences_keep_env_database_url(self, monkeypatch, tmp_path):
+        from app.db import engines
+        from app.routes.preferences import get_preferences_db
+
+        url = f"sqlite:///{tmp_path / 'prefs.db'}"
+        monkeypatch.setenv("DATABASE_URL", url)
+        monkeypatch.setenv("VERITTA_DB_ASYNC_MODE", "thread")
+
+        gen = get_preferences_db()
+        db = await gen.__anext__()
+        assert db.sync_session.get_bind() is engines.get_engine(url)
+        assert engines.get_engine(url).pool._metrics_label() == "preferences"
+        await gen.aclose()
+        await async_database.close_async_engine()
+        engines._engines.pop(("sync", url)).dispose()
+
+    async def test_dependency_yields_and_closes(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_DB_ASYNC_MODE", "thread")
+        await async_database.close_async_engine()
+
+        gen = async_database.get_async_db()
+        db = await gen.__anext__()
+        assert isinstance(db, ThreadedAsyncSession)
+        assert (await db.execute(text("SELECT 1"))).scalar() == 1
+        await gen.aclose()
+        await async_database.close_async_engine()
+
+
+class TestThreadedSession:
+    async def test_rows_and_dml(self, factory):
+        db = ThreadedAsyncSession(factory())
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.add(SessionModel(user_id="u1", api_key_hash="h", expires_at=now - timedelta(hours=1)))
+        await db.commit()
+
+        rows = (await db.execute(text("SELECT user_id FROM sessions"))).all()
+        deleted = await db.execute(text("DELETE FROM sessions"))
+        await db.commit()
+
+        assert rows == [("u1",)]
+        assert deleted.rowcount == 1
+        await db.close()
+
+
+class TestAsyncRepositories:
+    async def test_session_repository(self, factory):
+        cache = SessionCache(max_entries=100, ttl_s=30, negative_ttl_s=5)
+        repo = AsyncSessionRepository(ThreadedAsyncSession(factory()), cache=cache)
+
+        session = await repo.create("u1", "h" * 64)
+        assert await repo.validate(session.session_id) == (True, None)
+        assert await repo.get_active_count() == 1
+
+        await repo.revoke(session.session_id)
+
+        assert await repo.validate(session.session_id) == (False, "SESSION_REVOKED")
+        assert await repo.validate("missing") == (False, "SESSION_INVALID")
+        # Same rows as the sync repository
+        sync_db = factory()
+        assert SessionRepository(sync_db).get_by_id(session.session_id).is_revoked()
+        sync_db.close()
+        cache.close()
+
+    async def test_preferences_upsert(self, factory):
+        repo = AsyncPreferencesRepository(ThreadedAsyncSession(factory()))
+
+        assert await repo.get("u_12345678") is None
+        pref, action = await repo.upsert("u_12345678", tone="tecnico", language="en-US")
+        assert action == "create"
+        pref, action = await repo.upsert("u_12345678", language="pt-BR")
+
+        assert action == "update"
+        assert (pref.tone_preference, pref.language) == ("tecnico", "pt-BR")
+
+
+async def _max_loop_lag(work, tick_s=0.002):
+    """Run work() while a ticker measures the worst event-loop lag (seconds)."""
+    lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(tick_s)
+            lag = max(lag, time.perf_counter() - start - tick_s)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    try:
+        await work()
+    finally:
+        done.set()
+        await task
+    return lag
+
+
+class TestEventLoopLag:
+    CONCURRENCY = 10
+
+    async def test_async_data_access_keeps_loop_responsive(self, slow_factory):
+        session = SessionRepository(slow_factory()).create("u1", "h" * 64)
+
+        async def blocking_request():
+            # Before: sync Session inside async def (old routes)
+            db = slow_factory()
+            try:
+                SessionRepository(db).get_by_id(session.session_id)
+            finally:
+                db.close()
+
+        async def async_request():
+            # After: awaitable session (get_async_db)
+            db = ThreadedAsyncSession(slow_factory())
+            try:
+                await AsyncSessionRepository(db).get_by_id(session.session_id)
+            finally:
+                await db.close()
+
+        async def load(request):
+            await asyncio.gather(*(request() for _ in range(self.CONCURRENCY)))
+
+        await async_request()  # warm-up: worker threads, statement compile cache
+        lag_before = await _max_loop_lag(lambda: load(blocking_request))
+        lag_after = await _max_loop_lag(lambda: load(async_request))
+
+        # Before: the loop is frozen for the whole batch of round trips
+        assert lag_before >= DB_LATENCY_S * self.CONCURRENCY * 0.8
+        # After: round trips overlap in worker threads; what remains is GIL
+        # contention with the ORM work in those threads
+        assert lag_after < lag_before / 4
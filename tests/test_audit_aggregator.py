@@ -0,0 +1,315 @@
+"""
+Tests for incremental audit summary aggregator (per-minute rollups + checkpoint).
+
+Verify:
+- Rollup summary matches the scanning parser (VERITTA_AUDIT_AGGREGATOR=off)
+- Polls are incremental (only new lines are read; partial lines wait)
+- Restart resumes from checkpoint without rescanning
+- Replaced files are re-read from the start
+- Segments outside retention are skipped via their index
+- `limit` counts events like the scanning parser (boundary minute re-read)
+- The catch-up poll runs on the background thread; the parser scans meanwhile
+  (an unstarted aggregator is started, never polled on the request)
+- Concurrent checkpoint writers use their own temp files
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.tools.audit_parser as audit_parser
+from app.audit_aggregator import AuditAggregator, get_checkpoint_path
+from app.audit_segments import segment_path, write_segment_index
+from app.tools.audit_parser import AuditParser
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def _events(now=NOW):
+    events = []
+    for i in range(60):
+        ts = (now - timedelta(minutes=i * 7)).isoformat()
+        if i % 3 == 0:
+            events.append({"event_type": "decision_audit", "decision": "ALLOW", "ts_utc": ts})
+        elif i % 3 == 1:
+            events.append({
+                "event_type": "decision_audit",
+                "decision": "DENY",
+                "reason_codes": ["RATE_LIMIT"] if i % 2 else ["PROFILE_MISMATCH", "RATE_LIMIT"],
+                "ts_utc": ts,
+            })
+        else:
+            events.append({"event_type": "action_audit", "status": "SUCCESS", "ts_utc": ts})
+    # Outside the 1-day window but inside retention
+    events.append({"event_type": "decision_audit", "decision": "DENY", "reason_codes": ["OLD"],
+                   "ts_utc": (now - timedelta(days=3)).isoformat()})
+    return events
+
+
+def _append(path, events):
+    with open(path, "a", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps(e) + "\n")
+
+
+@pytest.fixture
+def audit_log(tmp_path, monkeypatch):
+    path = tmp_path / "audit.log"
+    monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(path))
+    return path
+
+
+def _comparable(summary):
+    return {k: summary[k] for k in ("decisions", "deny_breakdown", "events_by_type", "events_processed")}
+
+
+class TestSummaryEquivalence:
+    @pytest.mark.parametrize("event_type", [None, "decision_audit", "action_audit"])
+    @pytest.mark.parametrize("days", [1, 7])
+    def test_matches_scanning_parser(self, audit_log, monkeypatch, event_type, days):
+        _append(audit_log, _events())
+
+        monkeypatch.setenv("VERITTA_AUDIT_AGGREGATOR", "off")
+        scanned = AuditParser.summarize(days=days, event_type=event_type)
+        monkeypatch.setenv("VERITTA_AUDIT_AGGREGATOR", "on")
+        rolled = AuditParser.summarize(days=days, event_type=event_type)
+
+        assert _comparable(rolled) == _comparable(scanned)
+        assert rolled["window"] == scanned["window"]
+
+    def test_deny_breakdown_and_window(self, audit_log):
+        _append(audit_log, _events())
+
+        summary = AuditAggregator(str(audit_log)).summarize(days=1)
+
+        assert summary["decisions"] == {"allow": 20, "deny": 20}
+        assert summary["deny_breakdown"] == {"RATE_LIMIT": 20, "PROFILE_MISMATCH": 10}
+        assert summary["events_by_type"] == {"decision_audit": 40, "action_audit": 20}
+
+
+def _chronological(minutes=40, per_minute=7, now=NOW):
+    """Log order = time order; per_minute not dividing the limit puts it mid-minute."""
+    events = []
+    start = now.replace(second=0, microsecond=0) - timedelta(minutes=minutes)
+    for m in range(minutes):
+        for j in range(per_minute):
+            ts = (start + timedelta(minutes=m, seconds=j)).isoformat()
+            if j % 3 == 0:
+                events.append({"event_type": "action_audit", "status": "SUCCESS", "ts_utc": ts})
+            else:
+                events.append({"event_type": "decision_audit", "decision": "DENY" if j % 2 else "ALLOW",
+                               "reason_codes": [f"R{m % 4}"], "ts_utc": ts})
+    return events
+
+
+class TestLimit:
+    @pytest.mark.parametrize("event_type", [None, "decision_audit", "action_audit"])
+    def test_limit_counts_events(self, audit_log, monkeypatch, event_type):
+        _append(audit_log, _chronological())
+
+        monkeypatch.setenv("VERITTA_AUDIT_AGGREGATOR", "off")
+        scanned = AuditParser.summarize(days=1, limit=100, event_type=event_type)
+        rolled = AuditAggregator(str(audit_log)).summarize(days=1, limit=100, event_type=event_type)
+
+        assert rolled["events_processed"] == 100
+        assert _comparable(rolled) == _comparable(scanned)
+
+    def test_limit_without_line_positions(self, audit_log, monkeypatch):
+        _append(audit_log, _chronological())
+        monkeypatch.setenv("VERITTA_AUDIT_AGGREGATOR", "off")
+        scanned = AuditParser.summarize(days=1, limit=100)
+
+        agg = AuditAggregator(str(audit_log))
+        agg.poll()
+        for rollup in agg._minutes.values():
+            rollup.first = None  # checkpoint written before positions were kept
+
+        assert _comparable(agg.summarize(days=1, limit=100)) == _comparable(scanned)
+
+
+class TestCatchUp:
+    def test_catch_up_runs_on_thread(self, audit_log, monkeypatch):
+        _append(audit_log, _events())
+        agg = AuditAggregator(str(audit_log))
+        gate = threading.Event()
+        original_poll = agg.poll
+
+        def slow_poll(now=None):
+            gate.wait(5)
+            return original_poll(now=now)
+
+        monkeypatch.setattr(agg, "poll", slow_poll)
+        monkeypatch.setattr(audit_parser, "get_audit_aggregator", lambda path: agg)
+        monkeypatch.setenv("VERITTA_AUDIT_AGG_POLL_MS", "10")
+        agg.start()
+        try:
+            assert not agg.ready
+            # Answered by the scan, without waiting for the catch-up
+            assert AuditParser.summarize(days=1)["decisions"] == {"allow": 20, "deny": 20}
+
+            gate.set()
+            assert agg._caught_up.wait(5)
+            assert agg.ready
+            assert AuditParser.summarize(days=1)["decisions"] == {"allow": 20, "deny": 20}
+        finally:
+            gate.set()
+            agg.stop()
+
+    def test_unstarted_aggregator_started_not_polled(self, audit_log, monkeypatch):
+        _append(audit_log, _events())
+        agg = AuditAggregator(str(audit_log))
+        request_thread = threading.current_thread()
+        polled_on = []
+        original_poll = agg.poll
+
+        def recording_poll(now=None):
+            polled_on.append(threading.current_thread())
+            return original_poll(now=now)
+
+        monkeypatch.setattr(agg, "poll", recording_poll)
+        monkeypatch.setattr(audit_parser, "get_audit_aggregator", lambda path: agg)
+        try:
+            assert not agg.ready
+            assert AuditParser.summarize(days=1)["decisions"] == {"allow": 20, "deny": 20}
+
+            assert agg._caught_up.wait(5)
+            assert polled_on and request_thread not in polled_on
+        finally:
+            monkeypatch.setattr(agg, "poll", original_poll)
+            agg.stop()
+
+
+class TestIncrementalTail:
+    def test_poll_reads_only_new_lines(self, audit_log):
+        _append(audit_log, _events()[:10])
+        agg = AuditAggregator(str(audit_log))
+
+        assert agg.poll() == 10
+        assert agg.poll() == 0
+
+        _append(audit_log, _events()[10:15])
+        assert agg.poll() == 5
+        assert agg.lines_read == 15
+
+    def test_partial_line_waits_for_newline(self, audit_log):
+        agg = AuditAggregator(str(audit_log))
+        line = json.dumps({"event_type": "action_audit", "ts_utc": NOW.isoformat()})
+
+        with open(audit_log, "w") as f:
+            f.write(line[:20])
+        assert agg.poll() == 0
+
+        with open(audit_log, "a") as f:
+            f.write(line[20:] + "\n")
+        assert agg.poll() == 1
+        assert agg.summarize()["events_by_type"]["action_audit"] == 1
+
+    def test_replaced_file_is_read_from_start(self, audit_log):
+        agg = AuditAggregator(str(audit_log))
+        _append(audit_log, [{"event_type": "action_audit", "n": 1, "ts_utc": NOW.isoformat()}])
+        agg.poll()
+
+        audit_log.unlink()
+        _append(audit_log, [{"event_type": "action_audit", "n": 22, "ts_utc": NOW.isoformat()}])
+
+        assert agg.poll() == 1
+        assert agg.summarize()["events_by_type"]["action_audit"] == 2
+
+    def test_parse_errors_counted(self, audit_log):
+        with open(audit_log, "w") as f:
+            f.write("not json\n")
+            f.write(json.dumps({"event_type": "action_audit", "ts_utc": "yesterday"}) + "\n")
+
+        assert AuditAggregator(str(audit_log)).summarize()["parse_errors"] == 2
+
+
+class TestCheckpoint:
+    def test_restart_resumes_from_checkpoint(self, audit_log):
+        _append(audit_log, _events())
+        first = AuditAggregator(str(audit_log))
+        expected = first.summarize(days=7)
+        first.save_checkpoint()
+        assert os.path.exists(get_checkpoint_path(str(audit_log)))
+
+        second = AuditAggregator(str(audit_log))
+        assert second.poll() == 0  # Nothing rescanned
+        assert _comparable(second.summarize(days=7)) == _comparable(expected)
+
+        _append(audit_log, [{"event_type": "action_audit", "ts_utc": NOW.isoformat()}])
+        assert second.poll() == 1
+        assert second.lines_read == 1
+
+    def test_checkpoint_for_other_log_is_ignored(self, audit_log, tmp_path):
+        _append(audit_log, _events()[:3])
+        ckpt = str(tmp_path / "shared.json")
+        agg = AuditAggregator(str(audit_log), checkpoint_path=ckpt)
+        agg.poll()
+        agg.save_checkpoint()
+
+        other = tmp_path / "other.log"
+        _append(other, _events()[:1])
+        assert AuditAggregator(str(other), checkpoint_path=ckpt).poll() == 1
+
+    def test_concurrent_checkpoint_writers(self, audit_log, tmp_path):
+        _append(audit_log, _events())
+        workers = [AuditAggregator(str(audit_log)) for _ in range(4)]
+        errors = []
+
+        def write(agg):
+            try:
+                for _ in range(20):
+                    agg._dirty = True
+                    agg.save_checkpoint()
+            except OSError as e:
+                errors.append(e)
+
+        for agg in workers:
+            agg.poll()
+        threads = [threading.Thread(target=write, args=(agg,)) for agg in workers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        assert AuditAggregator(str(audit_log)).poll() == 0  # Valid checkpoint
+        assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+    def test_corrupt_checkpoint_rebuilds(self, audit_log):
+        _append(audit_log, _events()[:4])
+        with open(get_checkpoint_path(str(audit_log)), "w") as f:
+            f.write("{broken")
+
+        assert AuditAggregator(str(audit_log)).poll() == 4
+
+    def test_background_thread_checkpoints_on_stop(self, audit_log, monkeypatch):
+        monkeypatch.setenv("VERITTA_AUDIT_AGG_POLL_MS", "10")
+        _append(audit_log, _events()[:5])
+
+        agg = AuditAggregator(str(audit_log))
+        agg.start()
+        agg.stop()
+
+        with open(get_checkpoint_path(str(audit_log))) as f:
+            data = json.load(f)
+        assert data["cursors"]["audit.log"][1] == audit_log.stat().st_size
+
+
+class TestSegmentSources:
+    def test_reads_segments_and_skips_expired_indexed_segments(self, audit_log):
+        base = str(audit_log)
+        expired = NOW - timedelta(days=30)
+        old_seg = segment_path(base, expired.strftime("%Y%m%d%H"), 0)
+        _append(old_seg, [{"event_type": "action_audit", "ts_utc": expired.isoformat()}] * 50)
+        write_segment_index(old_seg)
+
+        cur_seg = segment_path(base, NOW.strftime("%Y%m%d%H"), 0)
+        _append(cur_seg, [{"event_type": "action_audit", "ts_utc": NOW.isoformat()}] * 3)
+
+        agg = AuditAggregator(base)
+        assert agg.poll() == 3  # Expired segment skipped without reading
+        assert agg.summarize(days=7)["events_by_type"]["action_audit"] == 3
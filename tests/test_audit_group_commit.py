@@ -0,0 +1,198 @@
+"""
+Tests for group-commit audit sink (writer thread + fsync policy).
+
+Verify:
+- Concurrent appends are all persisted as valid JSONL
+- Records are committed in batches (fewer writes than records)
+- Write failures propagate to callers (fail-closed)
+- File replaced/removed underneath the writer is reopened
+- fsync policy "batch" fsyncs per batch, "never" does not
+- An idle (interval) fsync failure is counted and the writer keeps running
+- Direct mode keeps the legacy open/write/close behavior
+"""
+
+import json
+import os
+import threading
+
+import pytest
+
+from app import audit_sink
+from app.audit_sink import GroupCommitWriter, append_audit_record
+
+
+@pytest.fixture(autouse=True)
+def fresh_writer():
+    """Each test gets its own global writer (env-driven policy)."""
+    audit_sink.shutdown_audit_writer()
+    yield
+    audit_sink.shutdown_audit_writer()
+
+
+def _read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class TestGroupCommitSink:
+    def test_append_is_visible_when_call_returns(self, tmp_path, monkeypatch):
+        audit_log = tmp_path / "audit.log"
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(audit_log))
+
+        append_audit_record({"event_type": "decision_audit", "n": 1})
+
+        assert _read_lines(audit_log) == [{"event_type": "decision_audit", "n": 1}]
+
+    def test_concurrent_appends_are_batched(self, tmp_path, monkeypatch):
+        audit_log = tmp_path / "audit.log"
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(audit_log))
+
+        n_threads, per_thread = 16, 50
+        barrier = threading.Barrier(n_threads)
+
+        def worker(tid):
+            barrier.wait()
+            for i in range(per_thread):
+                append_audit_record({"tid": tid, "i": i})
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        records = _read_lines(audit_log)
+        assert len(records) == n_threads * per_thread
+        assert {(r["tid"], r["i"]) for r in records} == {
+            (t, i) for t in range(n_threads) for i in range(per_thread)
+        }
+
+        writer = audit_sink.get_audit_writer()
+        assert writer.records_written == n_threads * per_thread
+        assert writer.batches_written < writer.records_written
+
+    def test_write_failure_propagates_to_caller(self, tmp_path, monkeypatch):
+        # A directory cannot be opened for append (fails even as root)
+        bad_path = tmp_path / "is_a_dir"
+        bad_path.mkdir()
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(bad_path))
+
+        with pytest.raises(OSError):
+            append_audit_record({"event_type": "decision_audit"})
+
+        # Writer recovers once the path is valid again
+        good = tmp_path / "audit.log"
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(good))
+        append_audit_record({"ok": True})
+        assert _read_lines(good) == [{"ok": True}]
+
+    def test_non_serializable_record_raises_on_caller(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(tmp_path / "audit.log"))
+
+        with pytest.raises(TypeError):
+            append_audit_record({"bad": object()})
+
+    def test_removed_file_is_reopened(self, tmp_path, monkeypatch):
+        audit_log = tmp_path / "audit.log"
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(audit_log))
+
+        append_audit_record({"n": 1})
+        audit_log.unlink()
+        append_audit_record({"n": 2})
+
+        assert _read_lines(audit_log) == [{"n": 2}]
+
+    def test_path_change_switches_file(self, tmp_path, monkeypatch):
+        first = tmp_path / "a.log"
+        second = tmp_path / "nested" / "b.log"
+
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(first))
+        append_audit_record({"n": 1})
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(second))
+        append_audit_record({"n": 2})
+
+        assert _read_lines(first) == [{"n": 1}]
+        assert _read_lines(second) == [{"n": 2}]
+
+
+class TestFsyncPolicy:
+    def test_batch_policy_fsyncs_each_batch(self, tmp_path, monkeypatch):
+        calls = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(audit_sink.os, "fsync", lambda fd: (calls.append(fd), real_fsync(fd)))
+
+        writer = GroupCommitWriter(fsync_policy="batch")
+        try:
+            path = str(tmp_path / "audit.log")
+            writer.submit(path, '{"n":1}\n').result(timeout=5)
+            writer.submit(path, '{"n":2}\n').result(timeout=5)
+        finally:
+            writer.close()
+
+        assert writer.fsyncs == writer.batches_written == 2
+        assert len(calls) == 2
+
+    def test_never_policy_does_not_fsync(self, tmp_path, monkeypatch):
+        calls = []
+        monkeypatch.setattr(audit_sink.os, "fsync", lambda fd: calls.append(fd))
+
+        writer = GroupCommitWriter(fsync_policy="never")
+        try:
+            writer.submit(str(tmp_path / "audit.log"), '{"n":1}\n').result(timeout=5)
+        finally:
+            writer.close()
+
+        assert calls == []
+        assert writer.fsyncs == 0
+
+    def test_interval_policy_fsyncs_pending_writes(self, tmp_path):
+        writer = GroupCommitWriter(fsync_policy="interval", fsync_interval_s=0.01)
+        try:
+            writer.submit(str(tmp_path / "audit.log"), '{"n":1}\n').result(timeout=5)
+        finally:
+            writer.close()
+
+        assert writer.fsyncs >= 1
+
+    def test_idle_fsync_failure_keeps_writer_alive(self, tmp_path, monkeypatch):
+        real_fsync = os.fsync
+        failed = threading.Event()
+
+        def flaky_fsync(fd):
+            if not failed.is_set():
+                failed.set()
+                raise OSError(5, "Input/output error")
+            real_fsync(fd)
+
+        monkeypatch.setattr(audit_sink.os, "fsync", flaky_fsync)
+
+        writer = GroupCommitWriter(fsync_policy="interval", fsync_interval_s=0.01)
+        # Only the idle timeout fsyncs (never inside a batch), so the failure hits that path
+        writer._last_fsync = float("inf")
+        path = str(tmp_path / "audit.log")
+        try:
+            writer.submit(path, '{"n":1}\n').result(timeout=5)
+            assert failed.wait(timeout=5)
+            writer.submit(path, '{"n":2}\n').result(timeout=5)
+        finally:
+            writer.close()
+
+        assert writer.fsync_errors == 1
+        assert writer.fsyncs == 1
+        assert [r["n"] for r in _read_lines(path)] == [1, 2]
+
+    def test_unknown_policy_falls_back_to_never(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_AUDIT_FSYNC", "sometimes")
+        assert audit_sink.get_fsync_policy()[0] == "never"
+
+
+class TestDirectMode:
+    def test_direct_mode_writes_without_writer_thread(self, tmp_path, monkeypatch):
+        audit_log = tmp_path / "audit.log"
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(audit_log))
+        monkeypatch.setenv("VERITTA_AUDIT_SINK_MODE", "direct")
+
+        append_audit_record({"n": 1})
+
+        assert _read_lines(audit_log) == [{"n": 1}]
+        assert audit_sink._writer is None
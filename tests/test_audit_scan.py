@@ -0,0 +1,184 @@
+"""
+Tests for parallel audit scan (newline-aligned ranges + process pool + reduce).
+
+Verify:
+- Ranges are newline-aligned, contiguous and cover the file
+- Parallel summary == serial AuditParser scan (incl. limit hit mid-range)
+- AuditParser.summarize (request path) never uses the process pool
+- Parallel reconciliation == serial OrphanReconciler
+- Segments + legacy file are scanned in the same order as the serial reader
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.audit_segments import audit_sources, segment_path
+from app.tools.audit_parser import AuditParser
+from app.tools import audit_scan
+from app.tools.audit_scan import parallel_reconcile, parallel_summarize, plan_ranges
+from app.tools.orphan_reconciler import OrphanReconciler
+
+
+def _ts(delta_s):
+    return (datetime.now(timezone.utc) + timedelta(seconds=delta_s)).isoformat()
+
+
+def _make_lines(n=600, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        trace_id = f"trace-{rng.randrange(n // 3):04d}"
+        kind = rng.random()
+        if kind < 0.02:
+            lines.append("{not json")
+        elif kind < 0.03:
+            lines.append("")
+        elif kind < 0.05:
+            lines.append(json.dumps({"event_type": "decision_audit", "trace_id": trace_id, "decision": "ALLOW",
+                                     "ts_utc": "garbage"}))
+        elif kind < 0.10:
+            # Outside a 1-day window
+            lines.append(json.dumps({"event_type": "decision_audit", "trace_id": trace_id, "decision": "DENY",
+                                     "reason_codes": ["OLD"], "ts_utc": _ts(-3 * 86400)}))
+        elif kind < 0.45:
+            lines.append(json.dumps({"event_type": "decision_audit", "trace_id": trace_id,
+                                     "decision": rng.choice(["ALLOW", "DENY"]),
+                                     "reason_codes": rng.sample(["A", "B", "C"], 2),
+                                     "ts_utc": _ts(-rng.randrange(3600))}))
+        elif kind < 0.55:
+            lines.append(json.dumps({"event_type": "decision_audit", "trace_id": trace_id,
+                                     "ts_utc": _ts(-rng.randrange(3600))}))
+        elif kind < 0.60:
+            lines.append(json.dumps({"event_type": "action_audit", "trace_id": trace_id, "status": "SUCCESS"}))
+        else:
+            lines.append(json.dumps({"event_type": "action_audit", "trace_id": trace_id,
+                                     "status": rng.choice(["SUCCESS", "FAILED", "BLOCKED"]),
+                                     "ts_utc": _ts(-rng.randrange(3600))}))
+    return lines
+
+
+def _without_ts(summary):
+    return {k: v for k, v in summary.items() if k != "ts_utc"}
+
+
+def _parallel(path, days, limit, event_type=None, workers=2, chunk_bytes=None):
+    cutoff_time = (datetime.now(timezone.utc) - timedelta(days=days)).replace(tzinfo=None)
+    state = parallel_summarize(
+        str(path), cutoff_time, limit=limit, event_type=event_type, workers=workers, chunk_bytes=chunk_bytes
+    )
+    return AuditParser._summary_response(days, limit, state)
+
+
+@pytest.fixture
+def audit_log(tmp_path, monkeypatch):
+    path = tmp_path / "audit.log"
+    path.write_text("\n".join(_make_lines()) + "\n")
+    monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(path))
+    monkeypatch.setenv("VERITTA_AUDIT_AGGREGATOR", "off")
+    return path
+
+
+class TestPlanRanges:
+    @pytest.mark.parametrize("chunk", [1, 7, 100, 4096, 10**9])
+    def test_ranges_are_newline_aligned_and_cover_file(self, tmp_path, chunk):
+        path = tmp_path / "a.jsonl"
+        data = b"".join(f'{{"n":{i}}}\n'.encode() for i in range(50)) + b'{"tail":true}'
+        path.write_bytes(data)
+
+        ranges = plan_ranges([(str(path), 0)], chunk_bytes=chunk)
+
+        assert ranges[0][1] == 0 and ranges[-1][2] == len(data)
+        for (_, _, end), (_, start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert data[end - 1:end] == b"\n"
+
+    def test_start_offset_and_empty_files(self, tmp_path):
+        path = tmp_path / "a.jsonl"
+        path.write_bytes(b'{"a":1}\n{"b":2}\n')
+        empty = tmp_path / "empty.jsonl"
+        empty.write_bytes(b"")
+
+        ranges = plan_ranges([(str(empty), 0), (str(path), 8)], chunk_bytes=4)
+
+        assert ranges == [(str(path), 8, 16)]
+
+
+class TestParallelSummary:
+    @pytest.mark.parametrize("limit", [100, 137, 50000])
+    @pytest.mark.parametrize("event_type", [None, "decision_audit"])
+    def test_matches_serial(self, audit_log, limit, event_type):
+        serial = AuditParser.summarize(days=1, limit=limit, event_type=event_type)
+
+        parallel = _parallel(audit_log, 1, limit, event_type, workers=3, chunk_bytes=2048)
+
+        assert _without_ts(parallel) == _without_ts(serial)
+
+    def test_matches_serial_over_segments(self, tmp_path, monkeypatch):
+        base = tmp_path / "audit.log"
+        lines = _make_lines(900, seed=11)
+        base.write_text("\n".join(lines[:300]) + "\n")
+        for seq, chunk in enumerate((lines[300:600], lines[600:])):
+            with open(segment_path(str(base), "2026010710", seq), "w") as f:
+                f.write("\n".join(chunk) + "\n")
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(base))
+        monkeypatch.setenv("VERITTA_AUDIT_AGGREGATOR", "off")
+
+        serial = AuditParser.summarize(days=7, limit=50000)
+        parallel = _parallel(base, 7, 50000, chunk_bytes=1500)
+
+        assert len(audit_sources(str(base))) == 3
+        assert _without_ts(parallel) == _without_ts(serial)
+
+    def test_request_path_stays_serial(self, audit_log, monkeypatch):
+        monkeypatch.setenv("VERITTA_AUDIT_SCAN_WORKERS", "4")
+
+        def no_pool(*args, **kwargs):
+            raise AssertionError("summarize() must not start a process pool")
+
+        monkeypatch.setattr(audit_scan, "ProcessPoolExecutor", no_pool)
+
+        summary = AuditParser.summarize(days=1, limit=50000)
+
+        assert summary["decisions"]["allow"] + summary["decisions"]["deny"] > 0
+
+
+class TestParallelReconcile:
+    @pytest.mark.parametrize("chunk", [300, 5000, 10**9])
+    def test_matches_serial(self, audit_log, chunk):
+        serial = OrphanReconciler(audit_log_path=str(audit_log), sla_s=30)
+        serial.load_audit_log()
+
+        parallel = parallel_reconcile(str(audit_log), sla_s=30, workers=2, chunk_bytes=chunk)
+
+        assert parallel == serial.reconcile()
+
+    def test_stops_where_serial_loader_stops(self, tmp_path):
+        # A JSON line that is not an object aborts the serial loader
+        lines = _make_lines(200)
+        lines.insert(120, "[1, 2, 3]")
+        path = tmp_path / "audit.log"
+        path.write_text("\n".join(lines) + "\n")
+
+        serial = OrphanReconciler(audit_log_path=str(path), sla_s=30)
+        serial.load_audit_log()
+
+        assert parallel_reconcile(str(path), sla_s=30, workers=2, chunk_bytes=500) == serial.reconcile()
+
+    def test_missing_log_returns_empty(self, tmp_path):
+        assert parallel_reconcile(str(tmp_path / "nope.log"), sla_s=30, workers=2) == []
+
+    def test_cli_workers_flag(self, audit_log, monkeypatch, capsys):
+        from app.tools.reconcile_cli import main
+
+        monkeypatch.setattr("sys.argv", ["reconcile_cli.py", "--plain"])
+        serial_code = main()
+        serial_out = capsys.readouterr().out
+
+        monkeypatch.setattr("sys.argv", ["reconcile_cli.py", "--plain", "--workers", "2"])
+        parallel_code = main()
+
+        assert parallel_code == serial_code
+        assert capsys.readouterr().out == serial_out
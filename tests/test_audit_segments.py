@@ -0,0 +1,225 @@
+"""
+Tests for segmented audit log (rotation + sparse sidecar index).
+
+Verify:
+- SegmentManager rotates on size and on UTC hour boundary
+- Restarted manager resumes the newest segment of the hour
+- Sidecar index has min/max ts, event_type counts and sparse offsets
+- Readers skip segments older than the window and seek via the index
+- AuditParser / OrphanReconciler read segments transparently
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import audit_sink
+from app.audit_segments import (
+    SegmentManager,
+    build_segment_index,
+    iter_audit_lines,
+    list_segments,
+    load_segment_index,
+    segment_path,
+    write_segment_index,
+)
+from app.tools.audit_parser import AuditParser
+from app.tools.orphan_reconciler import OrphanReconciler
+
+
+def _iso(dt: datetime) -> str:
+    # Same format as app.audit_log (datetime.isoformat with +00:00)
+    return dt.isoformat()
+
+
+def _write_segment(path, events):
+    with open(path, "w", encoding="utf-8") as f:
+        for e in events:
+            f.write(json.dumps(e) + "\n")
+
+
+def _wait_for(path, timeout_s=2.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestSegmentRotation:
+    def test_rotates_on_size(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("VERITTA_AUDIT_SEGMENT_MAX_BYTES", "100")
+        base = str(tmp_path / "audit.log")
+        now = datetime(2026, 1, 7, 10, 30, tzinfo=timezone.utc)
+        mgr = SegmentManager()
+
+        p1, closed1 = mgr.reserve(base, 60, now=now)
+        p2, closed2 = mgr.reserve(base, 30, now=now)
+        p3, closed3 = mgr.reserve(base, 30, now=now)
+
+        assert p1 == p2 == segment_path(base, "2026010710", 0)
+        assert closed1 is None and closed2 is None
+        assert p3 == segment_path(base, "2026010710", 1)
+        assert closed3 == p1
+
+    def test_rotates_on_hour_boundary(self, tmp_path):
+        base = str(tmp_path / "audit.log")
+        mgr = SegmentManager()
+
+        p1, _ = mgr.reserve(base, 10, now=datetime(2026, 1, 7, 10, 59, tzinfo=timezone.utc))
+        p2, closed = mgr.reserve(base, 10, now=datetime(2026, 1, 7, 11, 0, tzinfo=timezone.utc))
+
+        assert p1 == segment_path(base, "2026010710", 0)
+        assert p2 == segment_path(base, "2026010711", 0)
+        assert closed == p1
+
+    def test_restart_resumes_newest_segment_with_room(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("VERITTA_AUDIT_SEGMENT_MAX_BYTES", "1000")
+        base = str(tmp_path / "audit.log")
+        now = datetime(2026, 1, 7, 10, 0, tzinfo=timezone.utc)
+        (tmp_path / "audit-2026010710-0.jsonl").write_text("x" * 1000)
+        (tmp_path / "audit-2026010710-1.jsonl").write_text("x" * 10)
+
+        path, _ = SegmentManager().reserve(base, 10, now=now)
+
+        assert path == segment_path(base, "2026010710", 1)
+
+
+class TestSegmentIndex:
+    def test_index_contents(self, tmp_path):
+        seg = tmp_path / "audit-2026010710-0.jsonl"
+        t0 = datetime(2026, 1, 7, 10, 0, tzinfo=timezone.utc)
+        events = [
+            {"event_type": "decision_audit" if i % 2 else "action_audit", "ts_utc": _iso(t0 + timedelta(seconds=i))}
+            for i in range(10)
+        ]
+        _write_segment(seg, events)
+
+        index = build_segment_index(str(seg), every=4)
+
+        assert index["lines"] == 10
+        assert index["bytes"] == seg.stat().st_size
+        assert index["event_types"] == {"decision_audit": 5, "action_audit": 5}
+        assert index["min_ts_utc"] == t0.isoformat()
+        assert index["max_ts_utc"] == (t0 + timedelta(seconds=9)).isoformat()
+        assert [o[0] for o in index["offsets"]] == [0, 4, 8]
+        # Checkpoint offsets point at line starts
+        with open(seg, "rb") as f:
+            f.seek(index["offsets"][1][1])
+            assert json.loads(f.readline())["ts_utc"] == events[4]["ts_utc"]
+
+    def test_stale_index_is_ignored(self, tmp_path):
+        seg = tmp_path / "audit-2026010710-0.jsonl"
+        _write_segment(seg, [{"event_type": "action_audit", "ts_utc": "2026-01-07T10:00:00+00:00"}])
+        write_segment_index(str(seg))
+        assert load_segment_index(str(seg)) is not None
+
+        with open(seg, "a") as f:
+            f.write("{}\n")
+
+        assert load_segment_index(str(seg)) is None
+
+
+class TestSegmentReaders:
+    def _make_history(self, tmp_path):
+        """Two old indexed segments + one current segment."""
+        now = datetime.now(timezone.utc)
+        old = now - timedelta(days=10)
+        base = str(tmp_path / "audit.log")
+
+        old_seg = segment_path(base, old.strftime("%Y%m%d%H"), 0)
+        _write_segment(old_seg, [
+            {"event_type": "decision_audit", "decision": "DENY", "reason_codes": ["OLD"], "trace_id": "t-old", "ts_utc": _iso(old)},
+        ])
+        write_segment_index(old_seg)
+
+        cur_seg = segment_path(base, now.strftime("%Y%m%d%H"), 0)
+        _write_segment(cur_seg, [
+            {"event_type": "decision_audit", "decision": "ALLOW", "trace_id": "t-new", "ts_utc": _iso(now)},
+            {"event_type": "action_audit", "status": "SUCCESS", "trace_id": "t-new", "ts_utc": _iso(now)},
+        ])
+        return base, old_seg, cur_seg
+
+    def test_iter_skips_segments_outside_window(self, tmp_path):
+        base, old_seg, _ = self._make_history(tmp_path)
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+
+        all_lines = list(iter_audit_lines(base))
+        windowed = list(iter_audit_lines(base, since=since))
+
+        assert len(all_lines) == 3
+        assert len(windowed) == 2
+        assert all("t-old" not in line for line in windowed)
+
+    def test_iter_seeks_inside_indexed_segment(self, tmp_path):
+        base = str(tmp_path / "audit.log")
+        t0 = datetime(2026, 1, 7, 10, 0, tzinfo=timezone.utc)
+        seg = segment_path(base, "2026010710", 0)
+        _write_segment(seg, [{"i": i, "ts_utc": _iso(t0 + timedelta(minutes=i))} for i in range(20)])
+        write_segment_index(seg, every=5)
+
+        lines = list(iter_audit_lines(base, since=t0 + timedelta(minutes=12)))
+
+        # Enters at checkpoint line 10 (all earlier lines older than cutoff)
+        assert [json.loads(line)["i"] for line in lines] == list(range(10, 20))
+
+    def test_legacy_file_read_before_segments(self, tmp_path):
+        base = tmp_path / "audit.log"
+        base.write_text(json.dumps({"n": "legacy"}) + "\n")
+        _write_segment(segment_path(str(base), "2026010710", 0), [{"n": "seg"}])
+
+        assert [json.loads(line)["n"] for line in iter_audit_lines(str(base))] == ["legacy", "seg"]
+
+    def test_audit_parser_reads_segments(self, tmp_path, monkeypatch):
+        base, _, _ = self._make_history(tmp_path)
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", base)
+
+        summary = AuditParser.summarize(days=1)
+
+        assert summary["decisions"] == {"allow": 1, "deny": 0}
+        assert summary["events_by_type"] == {"decision_audit": 1, "action_audit": 1}
+        assert "OLD" not in summary["deny_breakdown"]
+
+    def test_orphan_reconciler_reads_segments(self, tmp_path):
+        base, _, _ = self._make_history(tmp_path)
+
+        reconciler = OrphanReconciler(audit_log_path=base, sla_s=30)
+        assert reconciler.load_audit_log() is True
+        results = {r["trace_id"]: r["status"] for r in reconciler.reconcile()}
+
+        assert results == {"t-old": "OK", "t-new": "OK"}
+
+
+class TestSegmentedSink:
+    @pytest.fixture(autouse=True)
+    def fresh_writer(self):
+        audit_sink.shutdown_audit_writer()
+        yield
+        audit_sink.shutdown_audit_writer()
+
+    @pytest.mark.parametrize("mode", ["group", "direct"])
+    def test_sink_rotates_and_seals(self, tmp_path, monkeypatch, mode):
+        base = tmp_path / "audit.log"
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(base))
+        monkeypatch.setenv("VERITTA_AUDIT_ROTATION", "segments")
+        monkeypatch.setenv("VERITTA_AUDIT_SINK_MODE", mode)
+        monkeypatch.setenv("VERITTA_AUDIT_SEGMENT_MAX_BYTES", "200")
+
+        for i in range(20):
+            audit_sink.append_audit_record({"event_type": "action_audit", "i": i, "ts_utc": _iso(datetime.now(timezone.utc))})
+
+        segments = list_segments(str(base))
+        assert not base.exists()
+        assert len(segments) > 1
+
+        # Records are complete and ordered across segments
+        assert [json.loads(line)["i"] for line in iter_audit_lines(str(base))] == list(range(20))
+
+        # Closed segments get a sidecar index (built off the write path)
+        first = segments[0][2]
+        assert _wait_for(first + ".idx")
+        assert load_segment_index(first) is not None
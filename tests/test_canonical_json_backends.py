@@ -0,0 +1,212 @@
+"""
+Conformance suite: orjson canonical backend vs stdlib reference (byte-for-byte).
+
+Every corpus entry must produce identical canonical bytes (and so identical
+sha256 input_digest values) on both backends, or fail with the same
+exception class. Corpus: unicode, floats, nesting, large lists, integers,
+non-JSON types and subclasses. Plain payloads stay on the orjson fast path
+(type walk, no fallback); the benchmark tool runs.
+"""
+
+import dataclasses
+import enum
+import hashlib
+import math
+import random
+import struct
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pytest
+
+import app.canonical_json as canonical_json
+from app.canonical_json import (
+    OrjsonCanonicalBackend,
+    StdlibCanonicalBackend,
+    get_canonical_backend,
+    set_canonical_backend,
+)
+from app.digests import sha256_json_or_none
+from app.tools.bench_canonical_json import SHAPES, benchmark
+
+pytest.importorskip("orjson")
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+class StrColor(str, enum.Enum):
+    BLUE = "blue"
+
+
+class Level(enum.IntEnum):
+    HIGH = 3
+
+
+class Text(str):
+    pass
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+
+
+def _nested(depth):
+    obj = {"leaf": 1}
+    for i in range(depth):
+        obj = {"n": obj, "i": i} if i % 2 else [obj, i]
+    return obj
+
+
+def _random_floats(n, seed=5):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        x = struct.unpack("d", struct.pack("Q", rng.getrandbits(64)))[0]
+        if math.isfinite(x):
+            out.append(x)
+        out.append(rng.uniform(-1, 1) * 10 ** rng.randint(-12, 20))
+    return out
+
+
+CORPUS = {
+    "empty_dict": {},
+    "empty_list": [],
+    "scalars": [None, True, False, 0, -1, "", "x"],
+    "unicode": {"pt": "ação çãõ", "emoji": "😀🚀", "cjk": "漢字", "rtl": "שלום", "combining": "é"},
+    "escapes": "\x00\x01\x1f\x7f  \"\\\b\f\n\r\t/",
+    "key_order": {"￿": 1, "😀": 2, "a": 3, "é": 4, "퟿": 5, "": 6, "B": 7, "b": 8},
+    "floats_simple": [0.0, -0.0, 1.0, 1.5, 100.0, 0.1 + 0.2, 1 / 3, 123456789012345.6],
+    "floats_edges": [1e-4, 9.999e-5, 1e-5, 1e15, 9.99e15, 1e16, 1e22, 5e-324, 1.7976931348623157e308],
+    "floats_random": _random_floats(2000),
+    "non_finite": [math.nan, math.inf, -math.inf],
+    "nan_vs_null": {"a": math.nan},
+    "ints": [2 ** 53, 2 ** 63 - 1, -(2 ** 63), 2 ** 64, -(2 ** 64) - 1, 10 ** 30],
+    "nested_100": _nested(100),
+    "nested_300": _nested(300),
+    "large_list": list(range(100_000)),
+    "large_mixed": [{"id": i, "v": i * 0.5, "s": f"item-{i}-ç"} for i in range(5000)],
+    "large_text": {"text": "lorem ipsum ção " * 15000},
+    "tuple": {"t": (1, "a", None)},
+    "nested_enum_in_tuple": {"a": [{"b": (1, None, Color.RED)}]},
+    "nested_uuid": [[{"u": uuid.UUID(int=1)}]],
+    "inf_beside_none": {"a": None, "b": [1.5, {"c": -math.inf}]},
+    "nan_without_null": [math.nan],
+    "int_keys": {1: "a", 2: "b"},
+    "bool_none_keys": {True: 1, None: 2},
+    "mixed_keys": {1: "a", "b": 2},
+    "ordered_dict": OrderedDict([("b", 1), ("a", 2)]),
+    "str_subclass": {"s": Text("x"), Text("k"): 1},
+    "str_enum": {"c": StrColor.BLUE},
+    "int_enum": {"l": Level.HIGH},
+    "plain_enum": {"c": Color.RED},
+    "uuid": {"u": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+    "datetime": {"ts": datetime(2026, 1, 1, tzinfo=timezone.utc)},
+    "dataclass": {"p": Point(1)},
+    "bytes": {"b": b"x"},
+    "set": {"s": {1}},
+    "lone_surrogate": {"s": "\ud800"},
+    "float_like_strings": {"a": "1e5", "b": "0.00001", "c": "1e+16"},
+    "governance_payload": {
+        "action": "process",
+        "payload": {"text": "Olá, governança!", "lang": "pt-BR", "scores": [0.25, 0.5, 1e-7]},
+        "meta": {"trace": "abc", "n": 3},
+    },
+}
+
+
+def _outcome(backend, obj):
+    try:
+        return "ok", backend.encode(obj)
+    except (TypeError, ValueError) as e:
+        # UnicodeEncodeError is a ValueError; compare the family only
+        return ("type" if isinstance(e, TypeError) else "value"), None
+
+
+@pytest.fixture
+def restore_backend():
+    previous = get_canonical_backend()
+    yield
+    canonical_json._backend = previous
+
+
+class TestBackendConformance:
+    @pytest.mark.parametrize("name", sorted(CORPUS))
+    def test_byte_identical(self, name):
+        obj = CORPUS[name]
+
+        assert _outcome(OrjsonCanonicalBackend(), obj) == _outcome(StdlibCanonicalBackend(), obj)
+
+    @pytest.mark.parametrize("name", sorted(CORPUS))
+    def test_digest_identical(self, name, restore_backend):
+        set_canonical_backend("stdlib")
+        reference = sha256_json_or_none(CORPUS[name])
+        set_canonical_backend("orjson")
+
+        assert sha256_json_or_none(CORPUS[name]) == reference
+
+    def test_historical_digest_unchanged(self, restore_backend):
+        # input_digest as written by the stdlib-only implementation
+        payload = {"text": "ação", "n": [1, 2.5, None], "b": True}
+        expected = hashlib.sha256('{"b":true,"n":[1,2.5,null],"text":"ação"}'.encode("utf-8")).hexdigest()
+
+        for name in ("stdlib", "orjson"):
+            set_canonical_backend(name)
+            assert sha256_json_or_none(payload) == expected
+
+
+class TestFallbacks:
+    def test_plain_payload_uses_fast_path(self):
+        backend = OrjsonCanonicalBackend()
+        backend.encode(CORPUS["large_mixed"])
+
+        assert backend.fallbacks == 0
+
+    @pytest.mark.parametrize("name", sorted(SHAPES))
+    def test_benchmark_shapes_use_fast_path(self, name):
+        backend = OrjsonCanonicalBackend()
+        backend.encode(SHAPES[name])
+
+        assert backend.fallbacks == 0
+
+    def test_exponent_like_strings_use_fast_path(self):
+        backend = OrjsonCanonicalBackend()
+        backend.encode(CORPUS["float_like_strings"])
+
+        assert backend.fallbacks == 0
+
+    @pytest.mark.parametrize("name", ["nan_vs_null", "plain_enum", "uuid", "floats_edges", "int_keys",
+                                      "nested_enum_in_tuple", "nested_uuid", "inf_beside_none"])
+    def test_divergent_inputs_fall_back(self, name):
+        backend = OrjsonCanonicalBackend()
+        _outcome(backend, CORPUS[name])
+
+        assert backend.fallbacks == 1
+
+
+class TestBackendSelection:
+    def test_auto_prefers_orjson(self, restore_backend):
+        assert set_canonical_backend("auto").name == "orjson"
+
+    def test_stdlib_forced(self, restore_backend):
+        assert set_canonical_backend("stdlib").name == "stdlib"
+
+    def test_orjson_missing_falls_back(self, restore_backend, monkeypatch):
+        monkeypatch.setattr(canonical_json, "_orjson", None)
+
+        assert set_canonical_backend("orjson").name == "stdlib"
+        assert set_canonical_backend("auto").name == "stdlib"
+
+    def test_unknown_name_uses_stdlib(self, restore_backend):
+        assert set_canonical_backend("simdjson").name == "stdlib"
+
+
+class TestBenchmark:
+    def test_benchmark_runs(self):
+        results = benchmark(["stdlib", "orjson"], min_time=0.001)
+
+        assert set(results) == set(SHAPES)
+        assert all(t > 0 for timings in results.values() for t in timings.values())
@@ -0,0 +1,143 @@
+"""
+Tests for request-scoped canonical JSON cache (app.canonical_json).
+
+Verify:
+- Outside a scope nothing is cached (legacy behavior)
+- Inside a scope each container is encoded/hashed once (hit/miss counters)
+- id() reuse is guarded (weakref or strong reference)
+- Serialization errors are cached and re-raised with the same type
+- /process encodes each payload object at most once per request
+"""
+
+import json
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.canonical_json as canonical_json
+from app.canonical_json import (
+    canonical_bytes,
+    canonical_cache_stats,
+    canonical_scope,
+    canonical_sha256,
+    get_canonical_cache,
+)
+from app.digests import sha256_json_or_none
+from app.payload_limits import canonical_json_bytes
+
+
+@pytest.fixture
+def encode_calls(monkeypatch):
+    calls = []
+    original = canonical_json._encode
+
+    def counting(obj):
+        calls.append(obj)
+        return original(obj)
+
+    monkeypatch.setattr(canonical_json, "_encode", counting)
+    return calls
+
+
+class _Weakrefable(dict):
+    pass
+
+
+class TestCanonicalScope:
+    def test_no_cache_outside_scope(self, encode_calls):
+        payload = {"b": 1, "a": [1, 2]}
+
+        sha256_json_or_none(payload)
+        sha256_json_or_none(payload)
+
+        assert get_canonical_cache() is None
+        assert len(encode_calls) == 2
+
+    def test_encoded_once_per_scope(self, encode_calls):
+        payload = {"b": 1, "a": "ç"}
+        expected = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        before = canonical_cache_stats()
+
+        with canonical_scope() as cache:
+            assert canonical_bytes(payload) == expected
+            assert canonical_sha256(payload) == hashlib.sha256(expected).hexdigest()
+            assert sha256_json_or_none(payload) == hashlib.sha256(expected).hexdigest()
+            assert canonical_json_bytes(payload) == len(expected)
+
+        assert len(encode_calls) == 1
+        assert cache.stats() == {"hits": 3, "misses": 1, "entries": 1}
+        after = canonical_cache_stats()
+        assert after["hits"] - before["hits"] == 3
+        assert after["misses"] - before["misses"] == 1
+
+    def test_nested_scopes_share_cache(self):
+        with canonical_scope() as outer:
+            with canonical_scope() as inner:
+                assert inner is outer
+            assert get_canonical_cache() is outer
+        assert get_canonical_cache() is None
+
+    def test_scalars_not_cached(self, encode_calls):
+        with canonical_scope() as cache:
+            canonical_bytes("texto")
+            canonical_bytes("texto")
+
+        assert len(encode_calls) == 2
+        assert cache.stats()["entries"] == 0
+
+
+class TestIdentityGuard:
+    def test_weakref_guard_detects_id_reuse(self):
+        with canonical_scope() as cache:
+            first = _Weakrefable(a=1)
+            canonical_sha256(first)
+            del first
+
+            # CPython usually hands the freed id to the next object of the same size
+            second = _Weakrefable(a=2)
+            digest = canonical_sha256(second)
+
+        assert digest == hashlib.sha256(b'{"a":2}').hexdigest()
+        assert cache.misses == 2
+
+    def test_strong_guard_keeps_object_alive(self):
+        with canonical_scope() as cache:
+            for i in range(200):
+                # Temporaries: without a strong guard ids would be recycled
+                assert canonical_sha256({"n": i}) == hashlib.sha256(f'{{"n":{i}}}'.encode()).hexdigest()
+
+        assert cache.stats() == {"hits": 0, "misses": 200, "entries": 200}
+
+
+class TestErrors:
+    def test_serialization_error_cached(self, encode_calls):
+        payload = {"a": object()}
+
+        with canonical_scope() as cache:
+            assert sha256_json_or_none(payload) is None
+            with pytest.raises(TypeError):
+                canonical_bytes(payload)
+            with pytest.raises(TypeError):
+                canonical_json_bytes(payload)
+
+        assert len(encode_calls) == 1
+        assert cache.hits == 2
+
+
+class TestProcessRequest:
+    def test_each_object_encoded_once(self, encode_calls):
+        from app.main import app
+
+        client = TestClient(app)
+        response = client.post(
+            "/process",
+            json={"text": "payload"},
+            headers={"X-API-Key": "TEST_BETA_API_KEY_VALID_FOR_TESTING"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["input_digest"] == sha256_json_or_none({"text": "payload"})
+        encoded = [id(obj) for obj in encode_calls if isinstance(obj, (dict, list))]
+        assert encoded
+        assert len(encoded) == len(set(encoded))
@@ -0,0 +1,160 @@
+"""
+Tests for the engine registry and pool instrumentation (app.db.engines).
+
+Verify:
+- One engine per URL per process; app.db.database uses the registry
+- PoolConfig from env (size, overflow, timeout, recycle, pre-ping)
+- Pool metrics: checkout latency, checked-out and overflow gauges,
+  wait timeouts; exposed on /metrics
+- In-memory SQLite keeps its single shared connection
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+
+from app.db import database, engines
+from app.db.engines import (
+    InstrumentedQueuePool,
+    PoolConfig,
+    db_pool_checked_out,
+    db_pool_checkout_seconds,
+    db_pool_overflow,
+    db_pool_wait_timeouts_total,
+    dispose_engines,
+    get_engine,
+)
+from app.main import app
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    urls = []
+
+    def make(name, config=None):
+        url = f"sqlite:///{tmp_path / (name + '.db')}"
+        urls.append(url)
+        return get_engine(url, name=name, config=config)
+
+    yield make
+    for url in urls:
+        engines._engines.pop(("sync", url)).dispose()
+
+
+def _gauge(gauge, pool):
+    return gauge.labels(pool=pool)._value.get()
+
+
+def _checkouts(pool):
+    return db_pool_checkout_seconds.labels(pool=pool)._sum, sum(
+        b.get() for b in db_pool_checkout_seconds.labels(pool=pool)._buckets
+    )
+
+
+class TestRegistry:
+    def test_one_engine_per_url(self, make_engine, tmp_path):
+        engine = make_engine("t_registry")
+
+        assert get_engine(str(engine.url)) is engine
+
+    def test_database_module_uses_registry(self):
+        assert get_engine(database.DATABASE_URL) is database.engine
+
+    def test_memory_sqlite_single_connection(self):
+        engine = get_engine("sqlite:///:memory:")
+
+        assert isinstance(engine.pool, StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE IF NOT EXISTS t_static (x INTEGER)"))
+        dispose_engines()
+        with engine.connect() as conn:
+            # dispose_engines keeps the in-memory database
+            conn.execute(text("SELECT * FROM t_static"))
+
+    def test_pool_config_applied(self, make_engine):
+        engine = make_engine("t_config", PoolConfig(pool_size=3, max_overflow=2, pool_timeout_s=1.5,
+                                                     pool_recycle_s=60, pre_ping=False))
+
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 2
+        assert engine.pool._timeout == 1.5
+        assert engine.pool._recycle == 60
+        assert not engine.pool._pre_ping
+
+
+class TestPoolConfig:
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_DB_POOL_SIZE", "4")
+        monkeypatch.setenv("VERITTA_DB_MAX_OVERFLOW", "0")
+        monkeypatch.setenv("VERITTA_DB_POOL_TIMEOUT_S", "2.5")
+        monkeypatch.setenv("VERITTA_DB_POOL_RECYCLE_S", "0")
+        monkeypatch.setenv("VERITTA_DB_POOL_PRE_PING", "off")
+
+        config = PoolConfig.from_env()
+
+        assert (config.pool_size, config.max_overflow, config.pool_timeout_s) == (4, 0, 2.5)
+        assert config.engine_kwargs()["pool_recycle"] == -1
+        assert config.pre_ping is False
+
+    def test_invalid_values_fall_back(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_DB_POOL_SIZE", "zero")
+        monkeypatch.setenv("VERITTA_DB_MAX_OVERFLOW", "-3")
+
+        assert PoolConfig.from_env() == PoolConfig()
+
+
+class TestPoolMetrics:
+    def test_checkout_latency_and_checked_out(self, make_engine):
+        engine = make_engine("t_checkout")
+        _, count_before = _checkouts("t_checkout")
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert _gauge(db_pool_checked_out, "t_checkout") == 1
+
+        assert _gauge(db_pool_checked_out, "t_checkout") == 0
+        assert _checkouts("t_checkout")[1] == count_before + 1
+
+    def test_overflow_gauge(self, make_engine):
+        engine = make_engine("t_overflow", PoolConfig(pool_size=1, max_overflow=2))
+
+        first, second = engine.connect(), engine.connect()
+        assert _gauge(db_pool_overflow, "t_overflow") == 1
+        first.close()
+        second.close()
+
+        assert _gauge(db_pool_overflow, "t_overflow") == 0
+
+    def test_wait_timeout_counted(self, make_engine):
+        engine = make_engine("t_timeout", PoolConfig(pool_size=1, max_overflow=0, pool_timeout_s=0.05))
+        before = db_pool_wait_timeouts_total.labels(pool="t_timeout")._value.get()
+
+        held = engine.connect()
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+        held.close()
+
+        assert db_pool_wait_timeouts_total.labels(pool="t_timeout")._value.get() == before + 1
+
+    def test_instrumentation_survives_dispose(self, make_engine):
+        engine = make_engine("t_dispose")
+        dispose_engines()
+        _, count_before = _checkouts("t_dispose")
+
+        with engine.connect():
+            assert _gauge(db_pool_checked_out, "t_dispose") == 1
+
+        assert _checkouts("t_dispose")[1] == count_before + 1
+
+    def test_exposed_on_metrics(self, make_engine):
+        with make_engine("t_exposed").connect():
+            pass
+
+        body = TestClient(app).get("/metrics").text
+
+        assert 'db_pool_checkout_seconds_count{pool="t_exposed"}' in body
+        assert 'db_pool_checked_out{pool="t_exposed"}' in body
+        assert "db_pool_wait_timeouts_total" in body
@@ -0,0 +1,156 @@
+"""
+Tests for the shared executor pool (app.executor_pool) and its use in
+run_agentic_action.
+
+Verify:
+- Worker threads are reused across calls (no pool per request)
+- Per-executor concurrency from ExecutorLimits.max_concurrency
+- Saturation: queue waits, reject raises PoolSaturated, full queue rejects
+- Timeout: queued call never runs, running call sees cancellation_requested()
+  and keeps its lane slot until it returns
+- Pipeline maps saturation to BLOCKED / EXECUTOR_SATURATED
+"""
+
+import threading
+import time
+import uuid
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.agentic_pipeline import run_agentic_action
+from app.executor_pool import ExecutorPool, PoolSaturated, cancellation_requested
+from app.executors.base import ExecutorLimits
+
+
+def _limits(max_concurrency=None):
+    return ExecutorLimits(
+        timeout_ms=1000, max_payload_bytes=10_000, max_depth=10, max_list_items=100,
+        max_concurrency=max_concurrency,
+    )
+
+
+@pytest.fixture
+def pool():
+    p = ExecutorPool(max_workers=8, per_executor=4, max_queue=4, saturation_policy="queue")
+    yield p
+    p.shutdown(wait=True)
+
+
+class TestExecutorPool:
+    def test_reuses_worker_threads(self, pool):
+        names = {pool.run("ex", _limits(), lambda: threading.current_thread().name, timeout=5) for _ in range(50)}
+
+        assert len(names) <= 8
+        assert all(n.startswith("executor-pool") for n in names)
+
+    def test_per_executor_concurrency_limit(self, pool):
+        active, peak, lock = [0], [0], threading.Lock()
+
+        def work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        calls = [pool.submit("ex", _limits(max_concurrency=2), work) for _ in range(6)]
+        for c in calls:
+            c.result(timeout=5)
+
+        assert peak[0] == 2
+        assert pool.stats()["lanes"]["ex"] == {"limit": 2, "running": 0, "queued": 0}
+
+    def test_full_queue_rejects(self, pool):
+        release = threading.Event()
+        limits = _limits(max_concurrency=1)
+        pool.submit("ex", limits, release.wait)
+        for _ in range(4):
+            pool.submit("ex", limits, lambda: None)
+
+        with pytest.raises(PoolSaturated):
+            pool.submit("ex", limits, lambda: None)
+        assert pool.submit("other", limits, lambda: 1).result(timeout=5) == 1  # Lanes independent
+
+        release.set()
+        assert pool.stats()["rejected"] == 1
+
+    def test_reject_policy(self):
+        pool = ExecutorPool(max_workers=2, per_executor=1, saturation_policy="reject")
+        release = threading.Event()
+        try:
+            pool.submit("ex", None, release.wait)
+            with pytest.raises(PoolSaturated):
+                pool.submit("ex", None, lambda: None)
+        finally:
+            release.set()
+            pool.shutdown(wait=True)
+
+    def test_timeout_cancels_queued_call(self, pool):
+        release = threading.Event()
+        ran = []
+        limits = _limits(max_concurrency=1)
+        pool.submit("ex", limits, release.wait)
+
+        with pytest.raises(TimeoutError):
+            pool.run("ex", limits, ran.append, 1, timeout=0.05)
+        release.set()
+        pool.run("ex", limits, lambda: None, timeout=5)
+
+        assert ran == []
+        assert pool.stats()["timeouts"] == 1
+
+    def test_timeout_is_cooperative_and_keeps_slot(self, pool):
+        limits = _limits(max_concurrency=1)
+        seen = []
+
+        def slow():
+            deadline = time.time() + 5
+            while not cancellation_requested() and time.time() < deadline:
+                time.sleep(0.005)
+            seen.append(cancellation_requested())
+
+        with pytest.raises(TimeoutError):
+            pool.run("ex", limits, slow, timeout=0.05)
+        # Slot held until the executor returns, then handed back
+        assert pool.run("ex", limits, lambda: "next", timeout=5) == "next"
+        assert seen == [True]
+
+    def test_exception_propagates(self, pool):
+        def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            pool.run("ex", None, boom, timeout=5)
+        assert pool.stats()["lanes"]["ex"]["running"] == 0
+
+
+class TestPipelineIntegration:
+    def test_saturated_lane_blocks(self):
+        saturated = ExecutorPool(max_workers=1, per_executor=1, saturation_policy="reject")
+        release = threading.Event()
+        executor = Mock()
+        executor.executor_id = "test.pool"
+        executor.version = "1.0.0"
+        executor.capabilities = []
+        executor.limits = _limits()
+        registry = Mock()
+        registry.actions = {
+            "test_action": {"action_version": "1.0.0", "executor_id": "test.pool",
+                            "min_executor_version": "1.0.0", "required_capabilities": []}
+        }
+        saturated.submit("test.pool", executor.limits, release.wait)
+        try:
+            with patch("app.agentic_pipeline.get_executor", return_value=executor), \
+                    patch("app.agentic_pipeline.get_action_registry", return_value=registry), \
+                    patch("app.agentic_pipeline.get_executor_pool", return_value=saturated):
+                result, output = run_agentic_action("test_action", {"x": 1}, str(uuid.uuid4()))
+        finally:
+            release.set()
+            saturated.shutdown(wait=True)
+
+        assert result.status == "BLOCKED"
+        assert result.reason_codes == ["EXECUTOR_SATURATED"]
+        assert output is None
+        executor.execute.assert_not_called()
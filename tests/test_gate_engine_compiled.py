@@ -0,0 +1,131 @@
+"""
+Testes diferenciais: engine compilado (evaluate_gate) vs interpretador de
+referência (evaluate_gate_reference).
+
+Garante resultado idêntico (decision, reasons, evaluated_keys, matched_rules,
+profile_hash) para payloads aleatórios em todos os profiles e combinações de
+allow_external / deny_unknown_fields.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from app.contracts.gate_v1 import GateInput
+from app.gate_engine import (
+    DEFAULT_RULES,
+    FORBIDDEN_ADMIN_KEYS_BASELINE,
+    Rule,
+    evaluate_gate,
+    evaluate_gate_reference,
+    get_compiled_profile,
+    invalidate_compiled_profiles,
+    rule_profile_presence,
+)
+from app.gate_profiles import DEFAULT_PROFILES, PolicyProfile
+
+
+def _comparable(result):
+    return result.model_dump(exclude={"at"})
+
+
+def _key_pool():
+    keys = set(FORBIDDEN_ADMIN_KEYS_BASELINE) | {"external_id", "external_source", "x", "zzz", "Agent_ID", ""}
+    for profile in DEFAULT_PROFILES.values():
+        keys |= set(profile.allowlist) | set(profile.forbidden_keys)
+    return sorted(keys)
+
+
+def _random_inputs(n=400, seed=1234):
+    rng = random.Random(seed)
+    pool = _key_pool()
+    actions = sorted(DEFAULT_PROFILES) + ["UNKNOWN.ACTION"]
+    for _ in range(n):
+        keys = rng.sample(pool, rng.randint(0, 6))
+        yield GateInput(
+            action=rng.choice(actions),
+            payload={k: rng.choice([1, "v", None, {"n": 1}]) for k in keys},
+            allow_external=rng.random() < 0.5,
+            deny_unknown_fields=rng.random() < 0.5,
+        )
+
+
+class TestCompiledMatchesReference:
+    def test_random_payloads(self):
+        for inp in _random_inputs():
+            assert _comparable(evaluate_gate(inp)) == _comparable(evaluate_gate_reference(inp)), inp
+
+    @pytest.mark.parametrize("allow_external,deny_unknown", list(itertools.product([False, True], repeat=2)))
+    @pytest.mark.parametrize("action", sorted(DEFAULT_PROFILES))
+    def test_each_profile_each_flag_combination(self, action, allow_external, deny_unknown):
+        profile = DEFAULT_PROFILES[action]
+        payloads = [
+            {},
+            {k: 1 for k in profile.allowlist},
+            {**{k: 1 for k in profile.allowlist}, "external_source": "s", "external_id": "e"},
+            {**{k: 1 for k in profile.allowlist}, "unknown_b": 1, "unknown_a": 2},
+            {"root": 1, "admin": 1, "external_id": "e", "other": 1},
+        ]
+        for payload in payloads:
+            inp = GateInput(action=action, payload=payload, allow_external=allow_external,
+                            deny_unknown_fields=deny_unknown)
+            assert _comparable(evaluate_gate(inp)) == _comparable(evaluate_gate_reference(inp))
+
+    def test_profile_with_forbidden_keys_and_external(self, monkeypatch):
+        monkeypatch.setitem(DEFAULT_PROFILES, "TEST.COMPILED", PolicyProfile(
+            name="test_compiled.v1",
+            allowlist=frozenset({"a", "external_id"}),
+            deny_unknown_fields=False,
+            allow_external=True,
+            forbidden_keys=frozenset({"secret"}),
+        ))
+
+        for payload in ({"a": 1, "secret": 1}, {"a": 1, "external_id": 1, "b": 2}, {"b": 1, "a": 2}):
+            for allow_external in (False, True):
+                inp = GateInput(action="TEST.COMPILED", payload=payload, allow_external=allow_external,
+                                deny_unknown_fields=False)
+                assert _comparable(evaluate_gate(inp)) == _comparable(evaluate_gate_reference(inp))
+
+
+class TestCompiledCache:
+    def test_checker_reused_until_catalog_changes(self, monkeypatch):
+        first = get_compiled_profile("process")
+        assert get_compiled_profile("process") is first
+
+        monkeypatch.setitem(DEFAULT_PROFILES, "process", PolicyProfile(
+            name="process.v2", allowlist=frozenset({"text", "lang"})))
+        second = get_compiled_profile("process")
+        assert second is not first
+        assert "lang" in second.allowed
+
+        out = evaluate_gate(GateInput(action="process", payload={"text": "t", "lang": "pt"}))
+        assert out.decision.value == "ALLOW"
+
+    def test_unknown_action(self):
+        assert get_compiled_profile("NOPE") is None
+        inp = GateInput(action="NOPE", payload={"x": 1})
+        assert _comparable(evaluate_gate(inp)) == _comparable(evaluate_gate_reference(inp))
+
+    def test_baseline_change_requires_invalidation(self, monkeypatch):
+        monkeypatch.setattr(
+            "app.gate_engine.FORBIDDEN_ADMIN_KEYS_BASELINE",
+            set(FORBIDDEN_ADMIN_KEYS_BASELINE) | {"text"},
+        )
+        invalidate_compiled_profiles()
+        try:
+            inp = GateInput(action="process", payload={"text": "t"})
+            assert evaluate_gate(inp).decision.value == "DENY"
+            assert _comparable(evaluate_gate(inp)) == _comparable(evaluate_gate_reference(inp))
+        finally:
+            monkeypatch.undo()
+            invalidate_compiled_profiles()
+
+
+class TestCustomRules:
+    def test_custom_rules_use_interpreter(self):
+        custom = (Rule("profile_presence", rule_profile_presence),)
+        inp = GateInput(action="process", payload={"admin": 1})
+
+        assert evaluate_gate(inp, custom).decision.value == "ALLOW"
+        assert evaluate_gate(inp, DEFAULT_RULES).decision.value == "DENY"
@@ -0,0 +1,275 @@
+"""
+Tests for pooled async LLM clients (app.llm.async_clients, app.llm.http_pool)
+against a local fake provider server (app.tools.fake_llm_server).
+
+Verify:
+- Wire format + response mapping per provider (sync and async)
+- One shared keep-alive connection pool per provider (connection reuse)
+- Per-provider concurrency semaphore
+- Errors: HTTP status => ProviderError (status first, retryable), timeout => TimeoutError
+- create_async_llm_client keeps the allowlist (fail-closed)
+- LLMClient.generate_async default (thread offload) and LLMExecutorV1.aexecute
+- Circuit breaker: a hung provider cancelled by the caller's timeout counts
+  as a failure (aexecute and astream); a consumer closing the stream does not
+- Benchmark runs (async beats sync under provider latency)
+"""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.action_contracts import ActionRequest
+from app.executors.llm_executor_v1 import LLMExecutorV1
+from app.llm.circuit_breaker import CircuitBreaker, CircuitState
+from app.llm.async_clients import (
+    AnthropicAsyncClient,
+    DeepSeekAsyncClient,
+    GeminiAsyncClient,
+    GrokAsyncClient,
+    OpenAIAsyncClient,
+)
+from app.llm.client import LLMClient
+from app.llm.errors import ConfigurationError, ProviderError
+from app.llm.factory import create_async_llm_client
+from app.llm.fake_client import FakeLLMClient
+from app.llm.http_pool import (
+    close_async_http_clients,
+    close_sync_http_clients,
+    get_async_http_client,
+    http2_enabled,
+)
+from app.tools.bench_llm_clients import benchmark
+from app.tools.fake_llm_server import FakeLLMServer, fake_text
+
+PROVIDERS = [
+    (OpenAIAsyncClient, "/v1"),
+    (GrokAsyncClient, "/v1"),
+    (DeepSeekAsyncClient, "/v1"),
+    (AnthropicAsyncClient, ""),
+    (GeminiAsyncClient, ""),
+]
+
+KW = dict(model="gpt-4o-mini", temperature=0.0, max_tokens=16, timeout_s=5.0)
+
+
+@pytest.fixture
+def server():
+    s = FakeLLMServer().start()
+    yield s
+    s.stop()
+
+
+@pytest.fixture
+async def pools():
+    yield
+    await close_async_http_clients()
+    close_sync_http_clients()
+
+
+def _client(cls, server, suffix="/v1"):
+    return cls("test-key", base_url=server.url + suffix)
+
+
+class TestProviders:
+    @pytest.mark.parametrize("cls,suffix", PROVIDERS)
+    async def test_generate_async(self, server, pools, cls, suffix):
+        result = await _client(cls, server, suffix).generate_async(prompt="hello world", **KW)
+
+        assert result["text"] == fake_text("hello world")
+        assert result["model"] == "gpt-4o-mini"
+        assert set(result["usage"]) == {"prompt", "completion", "total"}
+
+    @pytest.mark.parametrize("cls,suffix", PROVIDERS)
+    def test_generate_sync(self, server, cls, suffix):
+        try:
+            result = _client(cls, server, suffix).generate(prompt="hello world", **KW)
+        finally:
+            close_sync_http_clients()
+
+        assert result["text"] == fake_text("hello world")
+
+    async def test_auth_headers(self, server, pools):
+        await _client(OpenAIAsyncClient, server).generate_async(prompt="p", **KW)
+        assert server.last_headers["authorization"] == "Bearer test-key"
+
+        await _client(AnthropicAsyncClient, server, "").generate_async(prompt="p", **KW)
+        assert server.last_headers["x-api-key"] == "test-key"
+        assert "anthropic-version" in server.last_headers
+
+    def test_base_url_from_env(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_OPENAI_BASE_URL", "http://proxy.local/v1/")
+
+        assert OpenAIAsyncClient("k")._base_url == "http://proxy.local/v1"
+
+
+class TestPooling:
+    async def test_connections_reused(self, server, pools):
+        client = _client(OpenAIAsyncClient, server)
+        for i in range(20):
+            await client.generate_async(prompt=f"p{i}", **KW)
+
+        assert server.requests == 20
+        assert server.connections == 1
+
+    async def test_one_pool_per_provider(self, server, pools):
+        a = _client(OpenAIAsyncClient, server)
+        b = _client(OpenAIAsyncClient, server)
+        await a.generate_async(prompt="a", **KW)
+        await b.generate_async(prompt="b", **KW)
+
+        assert get_async_http_client("openai", server.url + "/v1") is get_async_http_client("openai", server.url + "/v1")
+        assert server.connections == 1
+
+    async def test_provider_concurrency_cap(self, server, pools, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_PROVIDER_CONCURRENCY", "4")
+        server.latency_s = 0.1
+        client = _client(OpenAIAsyncClient, server)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client.generate_async(prompt=f"p{i}", **KW) for i in range(16)))
+
+        assert time.perf_counter() - start >= 0.35  # 16 / 4 rounds of 100 ms
+        assert server.connections <= 4
+
+    def test_http2_needs_h2(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_HTTP2", "off")
+        assert http2_enabled() is False
+
+
+class TestErrors:
+    async def test_http_error_maps_to_provider_error(self, server, pools):
+        server.fail_statuses.append(503)
+
+        with pytest.raises(ProviderError) as exc:
+            await _client(OpenAIAsyncClient, server).generate_async(prompt="p", **KW)
+        assert str(exc.value).startswith("503")
+
+    async def test_timeout(self, server, pools):
+        server.latency_s = 0.5
+
+        with pytest.raises(TimeoutError):
+            await _client(OpenAIAsyncClient, server).generate_async(prompt="p", **{**KW, "timeout_s": 0.1})
+
+
+class TestFactory:
+    def test_fake_provider(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "fake")
+
+        assert isinstance(create_async_llm_client("fake"), FakeLLMClient)
+
+    def test_pooled_provider(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "openai,anthropic")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
+
+        assert isinstance(create_async_llm_client("anthropic"), AnthropicAsyncClient)
+
+    def test_allowlist_fail_closed(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "fake")
+
+        with pytest.raises(ConfigurationError):
+            create_async_llm_client("openai", api_key="k")
+
+
+class SyncOnlyClient(LLMClient):
+    def generate(self, *, prompt, model, temperature, max_tokens, timeout_s):
+        return {"text": prompt.upper(), "usage": None, "model": model, "latency_ms": 0}
+
+
+class TestExecutor:
+    async def test_protocol_default_offloads_sync_generate(self):
+        result = await SyncOnlyClient().generate_async(prompt="abc", **KW)
+
+        assert result["text"] == "ABC"
+
+    async def test_aexecute_over_pooled_client(self, server, pools):
+        executor = LLMExecutorV1(client=_client(OpenAIAsyncClient, server))
+        req = ActionRequest(
+            action="llm_generate",
+            payload={"prompt": "hi", "model": "gpt-4o-mini", "max_tokens": 16},
+            trace_id=str(uuid.uuid4()),
+        )
+
+        out = await executor.aexecute(req)
+
+        assert out["text"] == fake_text("hi")
+        assert out == executor.execute(req)
+        close_sync_http_clients()
+
+    async def test_aexecute_policy_violation(self):
+        executor = LLMExecutorV1(client=FakeLLMClient())
+        req = ActionRequest(
+            action="llm_generate",
+            payload={"prompt": "hi", "model": "not-allowed", "max_tokens": 16},
+            trace_id=str(uuid.uuid4()),
+        )
+
+        with pytest.raises(ValueError, match="POLICY_VIOLATION"):
+            await executor.aexecute(req)
+
+
+class HangingClient(LLMClient):
+    """Provider that never answers (client timeout longer than the caller's)."""
+
+    def generate(self, *, prompt, model, temperature, max_tokens, timeout_s):
+        raise AssertionError("sync path not used")
+
+    async def generate_async(self, *, prompt, model, temperature, max_tokens, timeout_s):
+        await asyncio.sleep(3600)
+
+    async def generate_stream(self, *, prompt, model, temperature, max_tokens, timeout_s):
+        await asyncio.sleep(3600)
+        yield  # pragma: no cover
+
+
+class TestCircuitBreaker:
+    @pytest.fixture
+    def executor(self):
+        executor = LLMExecutorV1(client=HangingClient())
+        executor._circuit_breaker = CircuitBreaker(failure_threshold=3)
+        return executor
+
+    def _req(self):
+        return ActionRequest(
+            action="llm_generate",
+            payload={"prompt": "hi", "model": "gpt-4o-mini", "max_tokens": 16},
+            trace_id=str(uuid.uuid4()),
+        )
+
+    async def test_cancelled_aexecute_counts_as_failure(self, executor):
+        for _ in range(3):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(executor.aexecute(self._req()), 0.02)
+
+        assert executor._circuit_breaker.state == CircuitState.OPEN
+        with pytest.raises(RuntimeError, match="PROVIDER_ERROR") as exc:
+            await executor.aexecute(self._req())
+        assert "CIRCUIT_OPEN" in str(exc.value.__cause__)
+
+    async def test_cancelled_stream_counts_as_failure(self, executor):
+        for _ in range(3):
+            stream = executor.astream(self._req())
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(anext(stream), 0.02)
+            await stream.aclose()
+
+        assert executor._circuit_breaker.state == CircuitState.OPEN
+
+    async def test_consumer_close_not_a_failure(self):
+        executor = LLMExecutorV1(client=FakeLLMClient())
+        breaker = executor._circuit_breaker = CircuitBreaker(failure_threshold=1)
+        stream = executor.astream(self._req())
+
+        await anext(stream)  # {"model"}: provider stream open
+        await stream.aclose()
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker._failure_count == 0
+
+
+class TestBenchmark:
+    def test_async_beats_sync(self):
+        results = benchmark(requests=16, latency_s=0.05, threads=2)
+
+        assert results["async"]["seconds"] < results["sync"]["seconds"]
@@ -0,0 +1,290 @@
+"""
+Tests for the governed LLM response cache (app.llm.response_cache).
+
+Verify:
+- Key = SHA256 of the canonical request; raw prompt never stored (memory, disk)
+- Memory tier: LRU by entries and bytes, TTL
+- Disk tier (sqlite): survives a new cache instance, TTL, byte budget, promotion;
+  running byte total matches the table (reopen, overwrite, expiry)
+- LLMExecutorV1: hit skips the provider (sync and async), clients without a
+  declared provider are never cached
+- Pipeline: SUCCESS ActionResult carries LLM_CACHE_HIT; output_digest unchanged
+- Prometheus hit/miss counters
+"""
+
+import hashlib
+import sqlite3
+import uuid
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.action_contracts import ActionRequest
+from app.agentic_pipeline import run_agentic_action, run_agentic_action_async
+from app.canonical_json import canonical_sha256
+from app.executors.llm_executor_v1 import LLMExecutorV1
+from app.llm.fake_client import FakeLLMClient
+from app.llm.response_cache import (
+    REASON_LLM_CACHE_HIT,
+    LLMResponseCache,
+    get_llm_response_cache,
+    llm_cache_key,
+    set_llm_response_cache,
+)
+
+PROMPT = "secret prompt text"
+RESPONSE = {"text": "answer", "model": "gpt-4o-mini", "usage": {"prompt": 3, "completion": 1, "total": 4}}
+PAYLOAD = {"prompt": PROMPT, "model": "gpt-4o-mini", "max_tokens": 16}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingClient(FakeLLMClient):
+    provider = "fake"
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def generate(self, **kwargs):
+        self.calls += 1
+        return super().generate(**kwargs)
+
+
+def _key(prompt=PROMPT, **overrides):
+    fields = dict(provider="openai", model="gpt-4o-mini", prompt=prompt, max_tokens=16, temperature=0.0)
+    fields.update(overrides)
+    return llm_cache_key(**fields)
+
+
+@pytest.fixture
+def cache():
+    c = LLMResponseCache(max_entries=100, max_bytes=1_000_000, ttl_s=60)
+    set_llm_response_cache(c)
+    yield c
+    set_llm_response_cache(None)
+
+
+class TestKey:
+    def test_digest_of_canonical_request(self):
+        expected = canonical_sha256({"provider": "openai", "model": "gpt-4o-mini", "prompt": PROMPT,
+                                     "max_tokens": 16, "temperature": 0.0})
+        assert _key() == expected
+
+    @pytest.mark.parametrize("override", [
+        {"provider": "anthropic"}, {"model": "gpt-4"}, {"max_tokens": 17}, {"prompt": "other"},
+    ])
+    def test_fields_change_key(self, override):
+        assert _key(**override) != _key()
+
+    def test_sampling_not_cacheable(self):
+        assert _key(temperature=0.7) is None
+
+
+class TestMemoryTier:
+    def test_hit_returns_copy(self):
+        c = LLMResponseCache(ttl_s=60)
+        c.put(_key(), RESPONSE)
+
+        first = c.get(_key())
+        first["text"] = "mutated"
+
+        assert c.get(_key()) == RESPONSE
+
+    def test_ttl(self):
+        clock = FakeClock()
+        c = LLMResponseCache(ttl_s=10, clock=clock)
+        c.put(_key(), RESPONSE)
+
+        clock.now += 11
+
+        assert c.get(_key()) is None
+        assert c.stats()["entries"] == 0
+
+    def test_lru_by_entries(self):
+        c = LLMResponseCache(max_entries=2, ttl_s=60)
+        c.put(_key("a"), RESPONSE)
+        c.put(_key("b"), RESPONSE)
+        c.get(_key("a"))
+        c.put(_key("c"), RESPONSE)
+
+        assert c.get(_key("b")) is None
+        assert c.get(_key("a")) is not None
+
+    def test_byte_budget(self):
+        c = LLMResponseCache(max_bytes=300, ttl_s=60)
+        for i in range(10):
+            c.put(_key(str(i)), {**RESPONSE, "text": "x" * 50})
+
+        assert c.stats()["bytes"] <= 300
+        assert c.get(_key("9")) is not None
+        assert c.get(_key("0")) is None
+
+    def test_not_cacheable(self):
+        c = LLMResponseCache(ttl_s=60)
+
+        assert c.put(None, RESPONSE) is False
+        assert c.put(_key(), {"text": None}) is False
+        assert c.put(_key(), {"text": "t", "usage": object()}) is False
+
+    def test_raw_prompt_not_stored(self):
+        c = LLMResponseCache(ttl_s=60)
+        c.put(_key(), RESPONSE)
+
+        assert all(PROMPT not in key and PROMPT.encode() not in value for key, (_, value) in c._entries.items())
+
+
+class TestDiskTier:
+    def test_survives_new_instance(self, tmp_path):
+        path = str(tmp_path / "llm_cache.db")
+        LLMResponseCache(ttl_s=60, disk_path=path).put(_key(), RESPONSE)
+
+        c = LLMResponseCache(ttl_s=60, disk_path=path)
+
+        assert c.get(_key()) == RESPONSE
+        assert c.stats()["entries"] == 1  # promoted to memory
+
+    def test_ttl(self, tmp_path):
+        clock = FakeClock()
+        path = str(tmp_path / "llm_cache.db")
+        LLMResponseCache(ttl_s=10, disk_path=path, clock=clock).put(_key(), RESPONSE)
+
+        clock.now += 11
+
+        assert LLMResponseCache(ttl_s=10, disk_path=path, clock=clock).get(_key()) is None
+
+    def test_byte_budget(self, tmp_path):
+        path = str(tmp_path / "llm_cache.db")
+        c = LLMResponseCache(ttl_s=60, disk_path=path, disk_max_bytes=500)
+        for i in range(20):
+            c.put(_key(str(i)), {**RESPONSE, "text": "x" * 50})
+
+        total = sqlite3.connect(path).execute("SELECT SUM(size) FROM llm_response_cache").fetchone()[0]
+        assert total <= 500
+
+    def test_running_byte_total(self, tmp_path):
+        clock = FakeClock()
+        path = str(tmp_path / "llm_cache.db")
+        c = LLMResponseCache(ttl_s=10, disk_path=path, clock=clock)
+        for i in range(5):
+            c.put(_key(str(i)), RESPONSE)
+        c.put(_key("0"), {**RESPONSE, "text": "longer answer"})  # overwrite: old size released
+
+        def stored():
+            return sqlite3.connect(path).execute("SELECT SUM(size) FROM llm_response_cache").fetchone()[0] or 0
+
+        assert c._disk._bytes == stored() > 0
+        assert LLMResponseCache(ttl_s=10, disk_path=path, clock=clock)._disk._bytes == stored()
+
+        clock.now += 11
+        assert c._disk.get(_key("1"), clock.now) is None  # expired row deleted on read
+        assert c._disk._bytes == stored()
+
+    def test_raw_prompt_not_on_disk(self, tmp_path):
+        path = tmp_path / "llm_cache.db"
+        c = LLMResponseCache(ttl_s=60, disk_path=str(path))
+        c.put(_key(), RESPONSE)
+        c.close()
+
+        data = b"".join(p.read_bytes() for p in tmp_path.iterdir())
+        assert PROMPT.encode() not in data
+        assert hashlib.sha256(PROMPT.encode()).hexdigest().encode() not in data
+
+    def test_unusable_path_keeps_memory_tier(self, tmp_path):
+        c = LLMResponseCache(ttl_s=60, disk_path=str(tmp_path / "missing" / "cache.db"))
+
+        assert not c.disk_enabled
+        assert c.put(_key(), RESPONSE)
+
+
+class TestGlobalCache:
+    def test_off(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_CACHE", "off")
+
+        assert get_llm_response_cache() is None
+
+    def test_counters(self, cache):
+        def hits():
+            return REGISTRY.get_sample_value("llm_cache_requests_total", {"tier": "memory", "result": "hit"}) or 0
+
+        before = hits()
+        cache.put(_key(), RESPONSE)
+        cache.get(_key())
+
+        assert hits() == before + 1
+
+
+def _req(payload=PAYLOAD):
+    return ActionRequest(action="llm_generate", payload=payload, trace_id=str(uuid.uuid4()))
+
+
+class TestExecutor:
+    def test_second_call_served_from_cache(self, cache):
+        client = CountingClient()
+        executor = LLMExecutorV1(client=client)
+
+        first = executor.execute(_req())
+        second = executor.execute(_req())
+
+        assert first == second
+        assert client.calls == 1
+
+    async def test_async_shares_cache(self, cache):
+        client = CountingClient()
+        executor = LLMExecutorV1(client=client)
+
+        executor.execute(_req())
+        out = await executor.aexecute(_req())
+
+        assert out["text"] == FakeLLMClient().generate(prompt=PROMPT, model="m", temperature=0, max_tokens=1,
+                                                        timeout_s=1)["text"]
+        assert client.calls == 1
+
+    def test_client_without_provider_not_cached(self, cache):
+        client = FakeLLMClient()
+        executor = LLMExecutorV1(client=client)
+
+        executor.execute(_req())
+
+        assert cache.stats()["entries"] == 0
+
+    def test_errors_not_cached(self, cache):
+        client = CountingClient()
+        client.simulate_timeout = True
+        executor = LLMExecutorV1(client=client)
+
+        with pytest.raises(RuntimeError):
+            executor.execute(_req())
+
+        assert cache.stats()["entries"] == 0
+
+
+class TestPipelineReasonCode:
+    @pytest.fixture
+    def executor(self, cache):
+        executor = LLMExecutorV1(client=CountingClient())
+        with patch("app.agentic_pipeline.get_executor", return_value=executor):
+            yield executor
+
+    def test_sync_pipeline(self, executor):
+        miss, _ = run_agentic_action("llm_generate", PAYLOAD, str(uuid.uuid4()))
+        hit, _ = run_agentic_action("llm_generate", PAYLOAD, str(uuid.uuid4()))
+
+        assert miss.status == hit.status == "SUCCESS"
+        assert miss.reason_codes == []
+        assert hit.reason_codes == [REASON_LLM_CACHE_HIT]
+        assert hit.output_digest == miss.output_digest
+
+    async def test_async_pipeline(self, executor):
+        await run_agentic_action_async("llm_generate", PAYLOAD, str(uuid.uuid4()))
+        hit, _ = await run_agentic_action_async("llm_generate", PAYLOAD, str(uuid.uuid4()))
+
+        assert hit.reason_codes == [REASON_LLM_CACHE_HIT]
+        assert executor._client.calls == 1
@@ -0,0 +1,296 @@
+"""
+Tests for latency-aware routing and hedged requests (app.llm.routing_client).
+
+Verify:
+- Routing: unmeasured providers explored first, then lowest latency EWMA
+- Health: error-rate EWMA over the threshold skips a provider until retry-after
+- Governance: allowlist re-checked and Policy validated on every routed call;
+  per-provider model map, mapped models held to Policy.ALLOWED_MODELS
+- Hedging (async): slow primary => duplicate to the second provider, first
+  success wins, loser cancelled; primary failure hands over at once
+- Factory: LLM_PROVIDER=router builds members through the governed factory
+- Executor: router result flows through LLMExecutorV1 / pipeline
+"""
+
+import asyncio
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.agentic_pipeline import run_agentic_action_async
+from app.executors.llm_executor_v1 import LLMExecutorV1
+from app.llm.errors import ConfigurationError
+from app.llm.factory import create_async_llm_client, create_llm_client
+from app.llm.fake_client import FakeLLMClient
+from app.llm.policy import Policy
+from app.llm.routing_client import RoutingLLMClient
+
+KWARGS = dict(prompt="hello", model="gpt-4o-mini", temperature=0.0, max_tokens=16, timeout_s=5.0)
+
+
+class ProviderClient(FakeLLMClient):
+    """Fake provider with configurable latency / failure."""
+
+    def __init__(self, name, delay_s=0.0, fail=False):
+        super().__init__()
+        self.provider = name
+        self.delay_s = delay_s
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+        self.models = []
+
+    def generate(self, **kwargs):
+        self.calls += 1
+        self.models.append(kwargs["model"])
+        time.sleep(self.delay_s)
+        if self.fail:
+            raise RuntimeError("PROVIDER_ERROR")
+        return {**super().generate(**kwargs), "provider": self.provider}
+
+    async def generate_async(self, **kwargs):
+        self.calls += 1
+        self.models.append(kwargs["model"])
+        try:
+            await asyncio.sleep(self.delay_s)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError("PROVIDER_ERROR")
+        return {**FakeLLMClient.generate(self, **kwargs), "provider": self.provider}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def allowed(monkeypatch):
+    monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "fast,slow,fake")
+
+
+def _router(*clients, **kwargs):
+    kwargs.setdefault("hedge", False)
+    return RoutingLLMClient({c.provider: c for c in clients}, **kwargs)
+
+
+class TestRouting:
+    def test_explores_then_picks_fastest(self):
+        slow, fast = ProviderClient("slow", 0.05), ProviderClient("fast", 0.0)
+        router = _router(slow, fast)
+
+        router.generate(**KWARGS)
+        router.generate(**KWARGS)
+        for _ in range(5):
+            assert router.generate(**KWARGS)["provider"] == "fast"
+
+        assert slow.calls == 1
+        assert router.ranked() == ["fast", "slow"]
+
+    def test_unhealthy_provider_skipped_until_retry_after(self):
+        clock = FakeClock()
+        bad, good = ProviderClient("fast", fail=True), ProviderClient("slow", 0.01)
+        router = _router(bad, good, max_error_rate=0.5, ewma_alpha=0.6, retry_after_s=30, clock=clock)
+
+        with pytest.raises(RuntimeError):
+            router.generate(**KWARGS)
+
+        assert router.ranked() == ["slow"]
+        clock.now += 31
+        assert "fast" in router.ranked()
+
+    def test_all_unhealthy_still_routes(self):
+        a = ProviderClient("fast", fail=True)
+        router = _router(a, ewma_alpha=1.0)
+
+        with pytest.raises(RuntimeError):
+            router.generate(**KWARGS)
+
+        assert router.ranked() == ["fast"]
+
+    def test_stats_and_gauges(self):
+        router = _router(ProviderClient("fast"))
+        router.generate(**KWARGS)
+
+        assert router.stats()["fast"]["calls"] == 1
+        assert REGISTRY.get_sample_value("llm_router_error_rate", {"provider": "fast"}) == 0.0
+
+    def test_provider_key_covers_members(self):
+        assert _router(ProviderClient("fast"), ProviderClient("slow")).provider == "router:fast,slow"
+
+
+class TestGovernance:
+    def test_provider_removed_from_allowlist_not_routed(self, monkeypatch):
+        fast, slow = ProviderClient("fast"), ProviderClient("slow")
+        router = _router(fast, slow)
+        monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "slow")
+
+        router.generate(**KWARGS)
+
+        assert fast.calls == 0 and slow.calls == 1
+
+    def test_no_allowed_provider_fails_closed(self, monkeypatch):
+        router = _router(ProviderClient("fast"))
+        monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "other")
+
+        with pytest.raises(ConfigurationError):
+            router.generate(**KWARGS)
+
+    def test_policy_checked_on_every_call(self):
+        client = ProviderClient("fast")
+        router = _router(client)
+
+        with pytest.raises(ValueError, match="POLICY_VIOLATION"):
+            router.generate(**{**KWARGS, "model": "not-allowed"})
+
+        assert client.calls == 0
+
+    def test_model_map(self):
+        client = ProviderClient("fast")
+        router = _router(client, model_map={"fast": {"gpt-4o-mini": "gpt-3.5-turbo"}})
+
+        router.generate(**KWARGS)
+        router.generate(**{**KWARGS, "model": "gpt-4"})
+
+        assert client.models == ["gpt-3.5-turbo", "gpt-4"]
+
+    def test_mapped_model_outside_policy_rejected_at_build(self):
+        with pytest.raises(ConfigurationError):
+            _router(ProviderClient("fast"), model_map={"fast": {"gpt-4o-mini": "fast-small"}})
+
+    async def test_mapped_model_outside_policy_rejected_per_call(self, monkeypatch):
+        fast, slow = ProviderClient("fast"), ProviderClient("slow")
+        router = _router(fast, slow, hedge=True, model_map={"slow": {"gpt-4o-mini": "gpt-4"}})
+        # Policy narrowed after startup: the hedge target's model is no longer allowed
+        monkeypatch.setattr(Policy, "ALLOWED_MODELS", ["gpt-4o-mini"])
+
+        with pytest.raises(ValueError, match="POLICY_VIOLATION"):
+            await router.generate_async(**KWARGS)
+        with pytest.raises(ValueError, match="POLICY_VIOLATION"):
+            router.generate(**KWARGS)
+
+        assert fast.calls == 0 and slow.calls == 0
+
+    def test_invalid_model_map_env(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_ROUTER_MODEL_MAP", "[1, 2]")
+
+        with pytest.raises(ConfigurationError):
+            RoutingLLMClient({"fast": ProviderClient("fast")})
+
+
+def _hedges(winner):
+    return REGISTRY.get_sample_value("llm_hedged_requests_total", {"winner": winner}) or 0
+
+
+class TestHedging:
+    async def test_slow_primary_hedged_and_cancelled(self):
+        primary, secondary = ProviderClient("fast", 1.0), ProviderClient("slow", 0.01)
+        router = _router(primary, secondary, hedge=True, hedge_min_delay_s=0.05)
+        before = _hedges("hedge")
+
+        start = time.perf_counter()
+        resp = await router.generate_async(**KWARGS)
+
+        assert resp["provider"] == "slow"
+        assert time.perf_counter() - start < 0.5
+        assert primary.cancelled == 1
+        assert _hedges("hedge") == before + 1
+        # Cancelled loser is not counted as a provider error
+        assert router.stats()["fast"]["calls"] == 0
+
+    async def test_fast_primary_not_hedged(self):
+        primary, secondary = ProviderClient("fast", 0.0), ProviderClient("slow", 0.0)
+        router = _router(primary, secondary, hedge=True, hedge_min_delay_s=0.2)
+
+        await router.generate_async(**KWARGS)
+
+        assert secondary.calls == 0
+
+    async def test_primary_failure_hands_over_immediately(self):
+        primary, secondary = ProviderClient("fast", fail=True), ProviderClient("slow", 0.0)
+        router = _router(primary, secondary, hedge=True, hedge_min_delay_s=5.0)
+
+        resp = await asyncio.wait_for(router.generate_async(**KWARGS), 1.0)
+
+        assert resp["provider"] == "slow"
+
+    async def test_both_fail_raises(self):
+        router = _router(ProviderClient("fast", fail=True), ProviderClient("slow", fail=True),
+                         hedge=True, hedge_min_delay_s=0.01)
+
+        with pytest.raises(RuntimeError, match="PROVIDER_ERROR"):
+            await router.generate_async(**KWARGS)
+
+    async def test_hedge_delay_follows_p95(self):
+        primary, secondary = ProviderClient("fast", 0.0), ProviderClient("slow", 0.0)
+        router = _router(primary, secondary, hedge=True, hedge_min_delay_s=0.01)
+        for _ in range(10):
+            router._record("fast", 0.3)
+
+        assert router._hedge_delay("fast") == pytest.approx(0.3)
+
+    async def test_caller_cancel_cancels_both(self):
+        primary, secondary = ProviderClient("fast", 1.0), ProviderClient("slow", 1.0)
+        router = _router(primary, secondary, hedge=True, hedge_min_delay_s=0.01)
+
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(router.generate_async(**KWARGS), 0.1)
+
+        assert primary.cancelled == 1 and secondary.cancelled == 1
+
+    async def test_stream_routed(self):
+        router = _router(ProviderClient("fast"))
+
+        chunks = [c async for c in router.generate_stream(**KWARGS)]
+
+        assert "".join(c.text for c in chunks).startswith("FAKE::")
+        assert router.stats()["fast"]["calls"] == 1
+
+
+class TestFactory:
+    def test_router_members_built_by_factory(self, monkeypatch):
+        monkeypatch.setenv("LLM_PROVIDER", "router")
+        monkeypatch.setenv("VERITTA_LLM_ROUTER_PROVIDERS", "fake")
+
+        for factory in (create_llm_client, create_async_llm_client):
+            client = factory()
+            assert isinstance(client, RoutingLLMClient)
+            assert client.providers == ["fake"]
+
+    def test_member_outside_allowlist_fails_closed(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_ROUTER_PROVIDERS", "fake,openai")
+        monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "fake")
+
+        with pytest.raises(ConfigurationError):
+            create_llm_client(provider="router")
+
+    def test_member_without_api_key_fails_closed(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_ROUTER_PROVIDERS", "fake,openai")
+        monkeypatch.setenv("VERITTA_LLM_ALLOWED_PROVIDERS", "fake,openai")
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        with pytest.raises(ConfigurationError):
+            create_async_llm_client(provider="router")
+
+
+class TestPipeline:
+    async def test_routed_generation(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_CACHE", "off")
+        slow, fast = ProviderClient("slow", 0.05), ProviderClient("fast", 0.0)
+        executor = LLMExecutorV1(client=_router(slow, fast))
+        payload = {"prompt": "p", "model": "gpt-4o-mini", "max_tokens": 16}
+
+        with patch("app.agentic_pipeline.get_executor", return_value=executor):
+            for _ in range(4):
+                result, _ = await run_agentic_action_async("llm_generate", payload, str(uuid.uuid4()))
+                assert result.status == "SUCCESS"
+
+        assert slow.calls == 1 and fast.calls == 3
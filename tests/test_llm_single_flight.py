@@ -0,0 +1,226 @@
+"""
+Tests for single-flight coalescing of identical LLM generations (app.llm.single_flight).
+
+Verify:
+- Concurrent identical calls run once (sync threads, async tasks, mixed)
+- Followers get their own copy of the result / exception
+- Async leader cancelled => a follower takes over; follower cancelled => leader unaffected
+- key None => never coalesced
+- Pipeline: one provider call, one ActionResult + audit record per request
+  (own trace_id), followers marked LLM_COALESCED
+- Prometheus llm_coalesced_requests_total
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.agentic_pipeline import run_agentic_action, run_agentic_action_async
+from app.executor_pool import ExecutorPool
+from app.executors.llm_executor_v1 import LLMExecutorV1
+from app.llm.fake_client import FakeLLMClient
+from app.llm.single_flight import REASON_LLM_COALESCED, SingleFlight, get_single_flight
+
+PAYLOAD = {"prompt": "template prompt", "model": "gpt-4o-mini", "max_tokens": 16}
+
+
+class SlowClient(FakeLLMClient):
+    provider = "fake"
+
+    def __init__(self, delay_s=0.2):
+        super().__init__()
+        self.delay_s = delay_s
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay_s)
+        return super().generate(**kwargs)
+
+    async def generate_async(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self.delay_s)
+        return FakeLLMClient.generate(self, **kwargs)
+
+
+class TestSyncCoalescing:
+    def test_one_call_for_concurrent_callers(self):
+        flights = SingleFlight()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"text": "t"}
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: flights.call("k", fn), range(8)))
+
+        assert len(calls) == 1
+        assert sum(coalesced for _, coalesced in results) == 7
+        outputs = [r for r, _ in results]
+        assert all(o == {"text": "t"} for o in outputs)
+        assert len({id(o) for o in outputs}) == 8
+        assert flights.inflight() == 0
+
+    def test_exception_shared_as_copies(self):
+        flights = SingleFlight()
+        errors = []
+
+        def fn():
+            time.sleep(0.2)
+            raise RuntimeError("PROVIDER_ERROR")
+
+        def caller(_):
+            try:
+                flights.call("k", fn)
+            except RuntimeError as e:
+                errors.append(e)
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(caller, range(4)))
+
+        assert len(errors) == 4
+        assert all(str(e) == "PROVIDER_ERROR" for e in errors)
+        assert len({id(e) for e in errors}) == 4
+
+    def test_no_key_never_coalesced(self):
+        flights = SingleFlight()
+
+        assert flights.call(None, lambda: 1) == (1, False)
+        assert flights.inflight() == 0
+
+    def test_sequential_calls_not_coalesced(self):
+        flights = SingleFlight()
+
+        assert flights.call("k", lambda: 1) == (1, False)
+        assert flights.call("k", lambda: 2) == (2, False)
+
+
+class TestAsyncCoalescing:
+    async def test_one_call_for_concurrent_tasks(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def afn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            return {"text": "t"}
+
+        results = await asyncio.gather(*(flights.acall("k", afn) for _ in range(50)))
+
+        assert calls == 1
+        assert sum(c for _, c in results) == 49
+
+    async def test_cancelled_leader_hands_over(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def afn():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            return calls
+
+        leader = asyncio.create_task(flights.acall("k", afn))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flights.acall("k", afn))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        result, coalesced = await follower
+        assert calls == 2
+        assert result == 2 and coalesced is False
+
+    async def test_cancelled_follower_does_not_cancel_leader(self):
+        flights = SingleFlight()
+
+        async def afn():
+            await asyncio.sleep(0.1)
+            return "done"
+
+        leader = asyncio.create_task(flights.acall("k", afn))
+        await asyncio.sleep(0.01)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(flights.acall("k", afn), 0.02)
+
+        assert await leader == ("done", False)
+
+    async def test_sync_follower_of_async_leader(self):
+        flights = SingleFlight()
+
+        async def afn():
+            await asyncio.sleep(0.2)
+            return "async"
+
+        leader = asyncio.create_task(flights.acall("k", afn))
+        await asyncio.sleep(0.01)
+        result = await asyncio.to_thread(flights.call, "k", lambda: "sync")
+
+        assert result == ("async", True)
+        assert await leader == ("async", False)
+
+
+@pytest.fixture
+def llm_executor(monkeypatch):
+    monkeypatch.setenv("VERITTA_LLM_CACHE", "off")
+    executor = LLMExecutorV1(client=SlowClient())
+    pool = ExecutorPool(max_workers=16, per_executor=16)
+    audited = []
+    with patch("app.agentic_pipeline.get_executor", return_value=executor), \
+            patch("app.agentic_pipeline.get_executor_pool", return_value=pool), \
+            patch("app.agentic_pipeline.log_action_result", side_effect=audited.append):
+        yield executor, audited
+    pool.shutdown(wait=False)
+
+
+def _coalesced_total():
+    return REGISTRY.get_sample_value("llm_coalesced_requests_total", {"model": "gpt-4o-mini"}) or 0
+
+
+class TestPipeline:
+    def test_sync_pipeline(self, llm_executor):
+        executor, audited = llm_executor
+        before = _coalesced_total()
+        trace_ids = [str(uuid.uuid4()) for _ in range(8)]
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda t: run_agentic_action("llm_generate", PAYLOAD, t)[0], trace_ids))
+
+        assert executor._client.calls == 1
+        assert [r.trace_id for r in results] == trace_ids
+        assert all(r.status == "SUCCESS" for r in results)
+        assert sum(r.reason_codes == [REASON_LLM_COALESCED] for r in results) == 7
+        assert len({r.output_digest for r in results}) == 1
+        assert sorted(r.trace_id for r in audited if r.status == "SUCCESS") == sorted(trace_ids)
+        assert _coalesced_total() == before + 7
+
+    async def test_async_pipeline(self, llm_executor):
+        executor, _ = llm_executor
+
+        results = await asyncio.gather(
+            *(run_agentic_action_async("llm_generate", PAYLOAD, str(uuid.uuid4())) for _ in range(20))
+        )
+
+        assert executor._client.calls == 1
+        assert sum(r.reason_codes == [REASON_LLM_COALESCED] for r, _ in results) == 19
+
+    def test_disabled(self, llm_executor, monkeypatch):
+        monkeypatch.setenv("VERITTA_LLM_SINGLE_FLIGHT", "off")
+        executor, _ = llm_executor
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda _: run_agentic_action("llm_generate", PAYLOAD, str(uuid.uuid4())), range(4)))
+
+        assert get_single_flight() is None
+        assert executor._client.calls == 4
@@ -0,0 +1,217 @@
+"""
+Tests for streaming ORPHAN RECONCILER (bounded memory, timestamp order).
+
+Casos:
+1. ALLOW emitido como ORPHAN_ALLOW assim que o watermark passa o SLA
+2. ALLOW + ActionResult => OK, slot liberado e reutilizado
+3. Eventos fora de ordem (dentro do reorder window) => sem falso INCONSISTENT
+4. Memória limitada: open/closed tables não crescem com o histórico
+5. Mesmo resultado que o modo batch quando o log continua além do SLA
+6. reconcile_cli --stream / --follow
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.tools.orphan_reconciler import (
+    OrphanReconciler,
+    StreamingOrphanReconciler,
+    stream_reconcile,
+)
+from app.tools.reconcile_cli import follow, main
+
+
+T0 = datetime(2026, 1, 7, 12, 0, tzinfo=timezone.utc)
+
+
+def ts(delta_s: float = 0) -> str:
+    return (T0 + timedelta(seconds=delta_s)).isoformat().replace("+00:00", "Z")
+
+
+def allow(trace_id, delta_s):
+    return {"event_type": "decision_audit", "trace_id": trace_id, "decision": "ALLOW", "ts_utc": ts(delta_s)}
+
+
+def deny(trace_id, delta_s):
+    return {"event_type": "decision_audit", "trace_id": trace_id, "decision": "DENY", "ts_utc": ts(delta_s)}
+
+
+def action(trace_id, delta_s, status="SUCCESS"):
+    return {"event_type": "action_audit", "trace_id": trace_id, "status": status, "ts_utc": ts(delta_s)}
+
+
+class TestStreamingReconciler:
+    def test_orphan_emitted_when_watermark_crosses_sla(self):
+        rec = StreamingOrphanReconciler(sla_s=30, reorder_s=5)
+
+        assert rec.feed(allow("t-1", 0)) == []
+        assert rec.feed(deny("d-1", 20)) == []  # Releases ALLOW (watermark 0)
+
+        emitted = rec.feed(deny("d-2", 40))  # Releases d-1: watermark 20, within SLA
+        assert emitted == []
+
+        emitted = rec.feed(deny("d-3", 45))  # Releases d-2: watermark 40 > 0 + 30
+
+        assert [(r["trace_id"], r["status"]) for r in emitted] == [("t-1", "ORPHAN_ALLOW")]
+        assert emitted[0]["age_s"] > 30
+        assert rec.open_traces == 0
+
+    def test_resolved_trace_is_evicted_and_slot_reused(self):
+        rec = StreamingOrphanReconciler(sla_s=30, reorder_s=0)
+
+        for i in range(1000):
+            rec.feed(allow(f"t-{i}", i))
+            rec.feed(action(f"t-{i}", i + 0.5))
+
+        assert rec.open_traces == 0
+        assert rec.peak_open_traces == 1
+        assert len(rec._slot_trace) == 1
+        assert rec.status_counts == {"OK": 1000}
+
+    def test_out_of_order_within_reorder_window(self):
+        # ActionResult line written before its ALLOW (concurrent writers)
+        results, rec = stream_reconcile(
+            [json.dumps(action("t-1", 1.0)), json.dumps(allow("t-1", 0.5))],
+            sla_s=30,
+            reorder_s=5,
+        )
+
+        assert results == []
+        assert rec.status_counts == {"OK": 1}
+
+    def test_action_without_decision_is_inconsistent(self):
+        results, _ = stream_reconcile([json.dumps(action("t-x", 0))], sla_s=30)
+
+        assert [(r["trace_id"], r["status"]) for r in results] == [("t-x", "INCONSISTENT")]
+
+    def test_deny_with_action_is_ok(self):
+        results, rec = stream_reconcile(
+            [json.dumps(deny("t-d", 0)), json.dumps(action("t-d", 1, "BLOCKED"))],
+            sla_s=30,
+        )
+
+        assert results == []
+        assert rec.status_counts == {"OK": 1}
+
+    def test_allow_without_ts_is_inconclusive(self):
+        event = allow("t-n", 0)
+        event["ts_utc"] = "not-a-timestamp"
+
+        results, _ = stream_reconcile([json.dumps(event)], sla_s=30)
+
+        assert [r["status"] for r in results] == ["INCONCLUSIVE"]
+
+    def test_memory_bounded_over_long_history(self):
+        rec = StreamingOrphanReconciler(sla_s=30, reorder_s=5)
+        peak_closed = 0
+
+        # 20k traces, one per second, every 10th never completes
+        for i in range(20000):
+            rec.feed(allow(f"t-{i}", i))
+            if i % 10:
+                rec.feed(action(f"t-{i}", i + 1))
+            peak_closed = max(peak_closed, len(rec._closed))
+        rec.flush()
+
+        assert rec.status_counts["ORPHAN_ALLOW"] >= 1990
+        assert rec.peak_open_traces <= 40
+        assert peak_closed <= 100
+        assert len(rec._pending) == 0
+
+    def test_malformed_lines_skipped(self):
+        results, rec = stream_reconcile(["{bad", "", "[]", json.dumps(allow("t", 0))], sla_s=30)
+
+        assert results == []
+        assert rec.open_traces == 1
+
+
+class TestStreamingMatchesBatch:
+    def test_same_non_ok_traces_as_batch(self, tmp_path):
+        audit_log = tmp_path / "audit.log"
+        events = []
+        for i in range(50):
+            base = i * 3
+            tid = f"trace-{i:03d}"
+            if i % 5 == 0:
+                # Orphan: dummy event later keeps batch age > SLA
+                events.append(allow(tid, base))
+                events.append({"event_type": "decision_audit", "trace_id": tid, "ts_utc": ts(base + 45)})
+            elif i % 7 == 0:
+                events.append(action(tid, base))
+            elif i % 3 == 0:
+                events.append(deny(tid, base))
+            else:
+                events.append(allow(tid, base))
+                events.append(action(tid, base + 2))
+        # Log keeps going well past the last SLA
+        events.append(deny("tail", 50 * 3 + 120))
+        events.sort(key=lambda e: e["ts_utc"])
+        audit_log.write_text("".join(json.dumps(e) + "\n" for e in events))
+
+        batch = OrphanReconciler(audit_log_path=str(audit_log), sla_s=30)
+        batch.load_audit_log()
+        expected = {(r["trace_id"], r["status"]) for r in batch.reconcile() if r["status"] != "OK"}
+
+        with open(audit_log) as f:
+            results, _ = stream_reconcile(f, sla_s=30)
+
+        assert {(r["trace_id"], r["status"]) for r in results} == expected
+
+
+class TestReconcileCliStreaming:
+    def test_cli_stream_mode(self, tmp_path, monkeypatch, capsys):
+        audit_log = tmp_path / "audit.log"
+        events = [allow("t-orphan", 0), allow("t-ok", 1), action("t-ok", 2), deny("t-late", 100)]
+        audit_log.write_text("".join(json.dumps(e) + "\n" for e in events))
+
+        monkeypatch.setenv("VERITTA_AUDIT_LOG_PATH", str(audit_log))
+        monkeypatch.setattr("sys.argv", ["reconcile_cli.py", "--stream", "--plain"])
+        exit_code = main()
+
+        out = capsys.readouterr().out
+        assert exit_code == 1
+        assert "Total traces:      3" in out
+        assert "ORPHAN_ALLOW:      1" in out
+        assert "t-orphan" in out
+
+    def test_follow_reports_orphan_after_catching_up(self, tmp_path):
+        audit_log = tmp_path / "audit.log"
+        old = datetime.now(timezone.utc) - timedelta(seconds=120)
+        audit_log.write_text(json.dumps({
+            "event_type": "decision_audit",
+            "trace_id": "t-stuck",
+            "decision": "ALLOW",
+            "ts_utc": old.isoformat(),
+        }) + "\n")
+
+        printed = []
+        polls = []
+
+        def should_stop():
+            polls.append(1)
+            return len(polls) >= 2
+
+        exit_code = follow(str(audit_log), sla_s=30, plain=True, interval_s=0.01,
+                           should_stop=should_stop, out=printed.append)
+
+        assert exit_code == 1
+        assert len(printed) == 1
+        assert printed[0].startswith("ORPHAN_ALLOW t-stuck")
+
+    def test_follow_no_false_orphan_while_replaying_backlog(self, tmp_path):
+        audit_log = tmp_path / "audit.log"
+        old = datetime.now(timezone.utc) - timedelta(seconds=600)
+        audit_log.write_text(
+            json.dumps({"event_type": "decision_audit", "trace_id": "t-1", "decision": "ALLOW",
+                        "ts_utc": old.isoformat()}) + "\n"
+            + json.dumps({"event_type": "action_audit", "trace_id": "t-1", "status": "SUCCESS",
+                          "ts_utc": (old + timedelta(seconds=1)).isoformat()}) + "\n"
+        )
+
+        printed = []
+        polls = []
+        exit_code = follow(str(audit_log), sla_s=30, interval_s=0.01,
+                           should_stop=lambda: polls.append(1) or len(polls) >= 3, out=printed.append)
+
+        assert exit_code == 0
+        assert printed == []
@@ -0,0 +1,171 @@
+"""
+Tests for single-pass PayloadInspector (app.payload_limits).
+
+Verify:
+- Report matches the legacy helpers (canonical_json_bytes, max_depth,
+  max_list_items, sha256_json_or_none, recursive forbidden-field walk)
+- check_limits() raises like the legacy check sequence
+- Non-JSON, cyclic and very deep payloads fail the same way
+- request.state cache computes one report per payload object
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.digests import sha256_json_or_none
+from app.gates_f21 import FORBIDDEN_PAYLOAD_FIELDS, _contains_forbidden_fields
+from app.payload_limits import (
+    LimitExceeded,
+    PayloadInspector,
+    canonical_json_bytes,
+    get_request_payload_report,
+    inspect_payload,
+    max_depth,
+    max_list_items,
+)
+
+
+def _legacy_forbidden(obj, path=""):
+    """Original recursive implementation (reference)."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key.lower() in FORBIDDEN_PAYLOAD_FIELDS:
+                return key, path
+            if isinstance(value, (dict, list)):
+                result = _legacy_forbidden(value, f"{path}.{key}" if path else key)
+                if result:
+                    return result
+    elif isinstance(obj, list):
+        for idx, item in enumerate(obj):
+            result = _legacy_forbidden(item, f"{path}[{idx}]")
+            if result:
+                return result
+    return None
+
+
+def _legacy_check(payload, max_bytes, max_depth_limit, max_list_limit):
+    byte_size = canonical_json_bytes(payload)
+    if byte_size > max_bytes:
+        raise LimitExceeded("bytes")
+    if max_depth(payload, max_safe_depth=max_depth_limit + 10) > max_depth_limit:
+        raise LimitExceeded("depth")
+    if max_list_items(payload, max_safe_items=max_list_limit + 100) > max_list_limit:
+        raise LimitExceeded("items")
+
+
+def _random_value(rng, depth=0):
+    kind = rng.random()
+    if depth > 6 or kind < 0.4:
+        return rng.choice([1, 2.5, "texto", "ç✓", None, True])
+    if kind < 0.7:
+        keys = ["a", "b", "text", "API_KEY", "Bearer", "nested", "z"]
+        return {rng.choice(keys) + str(i): _random_value(rng, depth + 1) for i in range(rng.randint(0, 3))} | (
+            {rng.choice(["api_key", "Authorization"]): 1} if rng.random() < 0.15 else {}
+        )
+    return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))]
+
+
+def _outcome(fn, *args):
+    try:
+        fn(*args)
+        return "ok"
+    except LimitExceeded:
+        return "limit"
+    except TypeError:
+        return "type"
+
+
+class TestReportMatchesLegacy:
+    def test_random_payloads(self):
+        rng = random.Random(8)
+        inspector = PayloadInspector(FORBIDDEN_PAYLOAD_FIELDS)
+        for _ in range(500):
+            payload = _random_value(rng)
+            report = inspector.inspect(payload)
+
+            assert report.byte_size == canonical_json_bytes(payload)
+            assert report.depth == max_depth(payload)
+            assert report.max_list_len == max_list_items(payload)
+            assert report.sha256 == sha256_json_or_none(payload)
+            assert report.first_forbidden == _legacy_forbidden(payload)
+            assert _contains_forbidden_fields(payload) == _legacy_forbidden(payload)
+
+            for limits in ((10_000, 100, 100), (40, 100, 100), (10_000, 2, 100), (10_000, 100, 2)):
+                assert _outcome(report.check_limits, *limits) == _outcome(_legacy_check, payload, *limits)
+
+    def test_forbidden_hits_in_depth_first_order(self):
+        payload = {"x": {"y": [{"Bearer": 1}]}, "api_key": 2}
+        report = inspect_payload(payload, FORBIDDEN_PAYLOAD_FIELDS)
+
+        assert report.forbidden_hits == (("Bearer", "x.y[0]"), ("api_key", ""))
+        assert _contains_forbidden_fields(payload["x"], "x") == ("Bearer", "x.y[0]")
+
+    def test_scalar_payload(self):
+        report = inspect_payload("texto")
+
+        assert (report.depth, report.max_list_len, report.forbidden_hits) == (0, 0, ())
+        assert report.canonical == b'"texto"'
+
+
+class TestFailureModes:
+    def test_non_json_payload(self):
+        report = inspect_payload({"a": object()})
+
+        assert report.sha256 is None and report.canonical is None
+        with pytest.raises(TypeError):
+            report.check_limits(10_000, 10, 10)
+
+    def test_cyclic_payload_is_bounded(self):
+        payload = {"a": []}
+        payload["a"].append(payload)
+
+        report = inspect_payload(payload)
+
+        assert report.sha256 is None
+        with pytest.raises(TypeError):
+            report.check_limits(10_000, 10, 10)
+
+    def test_very_deep_payload_is_limit_violation(self):
+        payload = []
+        for _ in range(5000):
+            payload = [payload]
+
+        report = PayloadInspector(max_safe_depth=200).inspect(payload)
+
+        assert report.depth_exceeded
+        with pytest.raises(LimitExceeded):
+            report.check_limits(10**9, 100, 10)
+
+
+class TestRequestStateCache:
+    def test_report_computed_once_per_payload(self, monkeypatch):
+        calls = []
+        original = PayloadInspector.inspect
+
+        def counting(self, payload):
+            calls.append(payload)
+            return original(self, payload)
+
+        monkeypatch.setattr(PayloadInspector, "inspect", counting)
+        request = SimpleNamespace(state=SimpleNamespace())
+        body = {"action": "process", "payload": {"text": "oi"}}
+
+        first = get_request_payload_report(request, body, FORBIDDEN_PAYLOAD_FIELDS)
+        again = get_request_payload_report(request, body, FORBIDDEN_PAYLOAD_FIELDS)
+        inner = get_request_payload_report(request, body["payload"])
+
+        assert again is first
+        assert inner.sha256 == sha256_json_or_none(body["payload"])
+        assert len(calls) == 2
+
+    def test_different_forbidden_set_recomputes(self):
+        request = SimpleNamespace(state=SimpleNamespace())
+        body = {"api_key": "x"}
+
+        plain = get_request_payload_report(request, body)
+        strict = get_request_payload_report(request, body, FORBIDDEN_PAYLOAD_FIELDS)
+
+        assert plain.forbidden_hits == ()
+        assert strict.first_forbidden == ("api_key", "")
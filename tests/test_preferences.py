@@ -3,7 +3,7 @@
 Tests cover:
 - Model validation
 - Schema validation (enums, fail-closed)
-- Auth dependency (user_id extraction)
+- Auth dependency (user_id extraction, F2.3 session on the session backend)
 - GET endpoint (existing/non-existing preferences)
 - PUT endpoint (create/update, partial update)
 - Security (user_id in payload rejected)
@@ -17,8 +17,11 @@ from unittest.mock import Mock, AsyncMock
 from fastapi import HTTPException, Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from uuid import uuid4
 
+from app.db.async_database import ThreadedAsyncSession
+
 from app.models.user_preference import UserPreference, Base
 from app.schemas.preferences import (
     ToneEnum,
@@ -27,7 +30,9 @@ from app.schemas.preferences import (
     PreferencesPutRequest,
     PreferencesGetResponse,
 )
-from app.dependencies.auth import get_user_from_gate
+from app.dependencies.auth import get_user_from_gate, get_user_from_session
+from app.session_backend import MemorySessionBackend, set_session_backend
+from app.session_store import SessionStore, sha256_str
 
 
 # Test database setup (unique per test session)
@@ -39,7 +44,8 @@ def get_test_db_url():
 @pytest.fixture(scope="function")
 def test_engine():
     """Create test engine."""
-    engine = create_engine(get_test_db_url(), connect_args={"check_same_thread": False})
+    # StaticPool: routes run DB calls in worker threads (one in-memory DB)
+    engine = create_engine(get_test_db_url(), connect_args={"check_same_thread": False}, poolclass=StaticPool)
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
@@ -55,6 +61,12 @@ def db_session(test_engine):
     session.close()
 
 
+@pytest.fixture
+def async_db(db_session):
+    """Awaitable session for the async routes (same underlying session)."""
+    return ThreadedAsyncSession(db_session)
+
+
 @pytest.fixture
 def mock_request():
     """Mock FastAPI Request with auth headers."""
@@ -193,18 +205,75 @@ async def test_get_user_from_gate_missing_header(mock_request_no_user):
     assert "gate bypass" in str(exc_info.value.detail).lower()
 
 
+@pytest.fixture
+def session_backend():
+    """Per-test session backend (same source as the F2.3 chain)."""
+    backend = MemorySessionBackend(SessionStore())
+    set_session_backend(backend)
+    yield backend
+    set_session_backend(None)
+
+
+def _session_request(mock_request, session_id, api_key="sk_test_prefs"):
+    mock_request.headers = {
+        "Authorization": f"Bearer {api_key}",
+        "X-VERITTA-USER-ID": "u_12345678",
+        "X-VERITTA-SESSION-ID": session_id,
+    }
+    return mock_request
+
+
+async def test_get_user_from_session_success(session_backend, mock_request):
+    """Test live session on the backend yields the user_id."""
+    session_id, _ = session_backend.create("u_12345678", sha256_str("sk_test_prefs"), ttl_s=60)
+
+    assert await get_user_from_session(_session_request(mock_request, session_id)) == "u_12345678"
+
+
+async def test_get_user_from_session_revoked(session_backend, mock_request):
+    """Test session revoked on the backend is refused (fail-closed)."""
+    session_id, _ = session_backend.create("u_12345678", sha256_str("sk_test_prefs"), ttl_s=60)
+    session_backend.revoke(session_id)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_user_from_session(_session_request(mock_request, session_id))
+
+    assert exc_info.value.status_code == 401
+
+
+async def test_get_user_from_session_unknown_or_missing(session_backend, mock_request):
+    """Test unknown session id and missing session header are refused."""
+    with pytest.raises(HTTPException) as exc_info:
+        await get_user_from_session(_session_request(mock_request, "sess_0000000000000000"))
+    assert exc_info.value.status_code == 401
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_user_from_session(mock_request)  # user header only
+    assert exc_info.value.status_code == 401
+
+
+async def test_get_user_from_session_key_mismatch(session_backend, mock_request):
+    """Test session bound to another API key is refused."""
+    session_id, _ = session_backend.create("u_12345678", sha256_str("sk_other"), ttl_s=60)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_user_from_session(_session_request(mock_request, session_id))
+
+    assert exc_info.value.status_code == 403
+
+
 # ==============================================================================
 # INTEGRATION TESTS — GET Endpoint
 # ==============================================================================
 
-async def test_get_preferences_not_found(db_session, mock_request):
+async def test_get_preferences_not_found(db_session, async_db, mock_request):
     """Test GET returns null values when preferences don't exist."""
     from app.routes.preferences import get_preferences
     
     response = await get_preferences(
         request=mock_request,
         user_id="u_12345678",
-        db=db_session,
+        db=async_db,
     )
     
     assert response.user_id == "u_12345678"
@@ -213,7 +282,7 @@ async def test_get_preferences_not_found(db_session, mock_request):
     assert response.language is None
 
 
-async def test_get_preferences_existing(db_session, mock_request):
+async def test_get_preferences_existing(db_session, async_db, mock_request):
     """Test GET returns existing preferences."""
     # Seed preferences
     pref = UserPreference(
@@ -231,7 +300,7 @@ async def test_get_preferences_existing(db_session, mock_request):
     response = await get_preferences(
         request=mock_request,
         user_id="u_12345678",
-        db=db_session,
+        db=async_db,
     )
     
     assert response.user_id == "u_12345678"
@@ -244,7 +313,7 @@ async def test_get_preferences_existing(db_session, mock_request):
 # INTEGRATION TESTS — PUT Endpoint
 # ==============================================================================
 
-async def test_put_preferences_create(db_session, mock_request):
+async def test_put_preferences_create(db_session, async_db, mock_request):
     """Test PUT creates new preferences."""
     from app.routes.preferences import put_preferences
     
@@ -257,7 +326,7 @@ async def test_put_preferences_create(db_session, mock_request):
         request=mock_request,
         body=body,
         user_id="u_12345678",
-        db=db_session,
+        db=async_db,
     )
     
     assert response.user_id == "u_12345678"
@@ -272,7 +341,7 @@ async def test_put_preferences_create(db_session, mock_request):
     assert pref.tone_preference == "institucional"
 
 
-async def test_put_preferences_update(db_session, mock_request):
+async def test_put_preferences_update(db_session, async_db, mock_request):
     """Test PUT updates existing preferences."""
     # Seed existing preferences
     pref = UserPreference(
@@ -293,14 +362,14 @@ async def test_put_preferences_update(db_session, mock_request):
         request=mock_request,
         body=body,
         user_id="u_12345678",
-        db=db_session,
+        db=async_db,
     )
     
     assert response.tone == "institucional"
     assert response.output_format == "json"  # Unchanged
 
 
-async def test_put_preferences_partial_update(db_session, mock_request):
+async def test_put_preferences_partial_update(db_session, async_db, mock_request):
     """Test PUT with partial update (only some fields)."""
     # Seed existing
     pref = UserPreference(
@@ -323,7 +392,7 @@ async def test_put_preferences_partial_update(db_session, mock_request):
         request=mock_request,
         body=body,
         user_id="u_12345678",
-        db=db_session,
+        db=async_db,
     )
     
     # language updated, others unchanged
@@ -332,7 +401,7 @@ async def test_put_preferences_partial_update(db_session, mock_request):
     assert response.language == "pt-BR"
 
 
-async def test_put_preferences_reject_user_id_in_payload(db_session, mock_request):
+async def test_put_preferences_reject_user_id_in_payload(db_session, async_db, mock_request):
     """Test PUT rejects user_id in request body (fail-closed security)."""
     from app.routes.preferences import put_preferences
     
@@ -345,7 +414,7 @@ async def test_put_preferences_reject_user_id_in_payload(db_session, mock_reques
             request=mock_request,
             body=body,
             user_id="u_12345678",
-            db=db_session,
+            db=async_db,
         )
     
     assert exc_info.value.status_code == 400
@@ -0,0 +1,320 @@
+"""
+Tests for streamed LLM output (/process/stream, run_agentic_action_stream).
+
+Verify:
+- StreamingJSONDigest == sha256_json_or_none of the assembled output
+- Pooled clients parse each provider's SSE stream (model, text deltas + usage)
+- First chunk arrives before the generation completes (time-to-first-byte)
+- LLMExecutorV1.astream assembles to execute()'s output, client-reported
+  model included
+- Pipeline: same output_digest as the async pipeline, audited once at the end;
+  idle timeout => EXECUTOR_TIMEOUT; consumer close => FAILED / STREAM_ABORTED;
+  non-streaming executors send no chunks; executor reason codes kept
+- /process/stream: SSE chunk events, then the ActionResult event
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.action_contracts import ActionRequest, ActionResult
+from app.agentic_pipeline import run_agentic_action_async, run_agentic_action_stream
+from app.digests import StreamingJSONDigest, sha256_json_or_none
+from app.executor_pool import ExecutorPool
+from app.executors.base import ExecutorLimits, OutputChunk, add_execution_reason, is_streaming_executor
+from app.executors.llm_executor_v1 import LLMExecutorV1
+from app.llm.async_clients import AnthropicAsyncClient, GeminiAsyncClient, OpenAIAsyncClient
+from app.llm.client import LLMClient
+from app.llm.errors import ProviderError
+from app.llm.fake_client import FakeLLMClient
+from app.llm.http_pool import close_async_http_clients
+from app.tools.fake_llm_server import FakeLLMServer, fake_text
+
+KW = dict(model="gpt-4o-mini", temperature=0.0, max_tokens=16, timeout_s=5.0)
+LLM_PAYLOAD = {"prompt": "hello", "model": "gpt-4o-mini", "max_tokens": 16}
+
+
+@pytest.fixture
+def server():
+    s = FakeLLMServer().start()
+    yield s
+    s.stop()
+
+
+@pytest.fixture
+async def pools():
+    yield
+    await close_async_http_clients()
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestStreamingDigest:
+    @pytest.mark.parametrize("pieces", [["ab", "c"], ["olá ", "\"mundo\"\n", "😀\\"], [], [""]])
+    def test_matches_canonical_digest(self, pieces):
+        digest = StreamingJSONDigest("text")
+        digest.add_fields({"model": "m"})
+        for piece in pieces:
+            digest.update(piece)
+        digest.add_fields({"usage": {"prompt": 1, "total": 2}})
+
+        expected = {"model": "m", "text": "".join(pieces), "usage": {"prompt": 1, "total": 2}}
+        assert digest.digest() == sha256_json_or_none(expected)
+
+    def test_leading_field_after_text_rejected(self):
+        digest = StreamingJSONDigest("text")
+        digest.update("x")
+
+        with pytest.raises(ValueError):
+            digest.add_fields({"model": "m"})
+
+    def test_non_json_field(self):
+        digest = StreamingJSONDigest("text")
+        digest.update("x")
+        digest.add_fields({"usage": object()})
+
+        assert digest.digest() is None
+
+
+class TestProviderStreams:
+    @pytest.mark.parametrize("cls,suffix", [
+        (OpenAIAsyncClient, "/v1"), (AnthropicAsyncClient, ""), (GeminiAsyncClient, ""),
+    ])
+    async def test_chunks_and_usage(self, server, pools, cls, suffix):
+        client = cls("test-key", base_url=server.url + suffix)
+
+        chunks = await _collect(client.generate_stream(prompt="hello world", **KW))
+
+        assert len(chunks) > 2
+        assert chunks[0].model == "gpt-4o-mini" and not chunks[0].text
+        assert "".join(c.text for c in chunks) == fake_text("hello world")
+        assert chunks[-1].usage == {"prompt": 2, "completion": 1, "total": 3}
+
+    async def test_first_chunk_before_completion(self, server, pools):
+        server.chunk_delay_s = 0.1
+        client = OpenAIAsyncClient("test-key", base_url=server.url + "/v1")
+
+        start = time.perf_counter()
+        arrivals = [time.perf_counter() - start async for _ in client.generate_stream(prompt="p", **KW)]
+
+        assert arrivals[0] < 0.1
+        assert arrivals[-1] >= 0.3
+
+    async def test_http_error(self, server, pools):
+        server.fail_statuses.append(429)
+        client = OpenAIAsyncClient("test-key", base_url=server.url + "/v1")
+
+        with pytest.raises(ProviderError) as exc:
+            await _collect(client.generate_stream(prompt="p", **KW))
+        assert str(exc.value).startswith("429")
+
+    async def test_protocol_default_single_chunk(self):
+        class SyncOnly(LLMClient):
+            def generate(self, *, prompt, model, temperature, max_tokens, timeout_s):
+                return {"text": prompt.upper(), "usage": {"total": 1}, "model": model, "latency_ms": 0}
+
+        chunks = await _collect(SyncOnly().generate_stream(prompt="abc", **KW))
+
+        assert [c.text for c in chunks] == ["", "ABC", ""]
+        assert chunks[0].model == "gpt-4o-mini"
+        assert chunks[-1].usage == {"total": 1}
+
+
+class TestExecutorStream:
+    async def test_assembles_to_execute_output(self):
+        executor = LLMExecutorV1(client=FakeLLMClient())
+        req = ActionRequest(action="llm_generate", payload=LLM_PAYLOAD, trace_id=str(uuid.uuid4()))
+
+        chunks = await _collect(executor.astream(req))
+
+        output = {"text": "".join(c.text for c in chunks)}
+        for chunk in chunks:
+            output.update(chunk.fields or {})
+        assert is_streaming_executor(executor)
+        assert output == executor.execute(req)
+
+    async def test_client_reported_model(self):
+        class Dated(LLMClient):
+            # Provider reports the resolved model version (routing / aliases)
+            def generate(self, *, prompt, model, temperature, max_tokens, timeout_s):
+                return {"text": prompt, "usage": {"total": 1}, "model": f"{model}-2024-07-18", "latency_ms": 0}
+
+        executor = LLMExecutorV1(client=Dated())
+        req = ActionRequest(action="llm_generate", payload=LLM_PAYLOAD, trace_id=str(uuid.uuid4()))
+
+        chunks = await _collect(executor.astream(req))
+
+        assert chunks[0].fields == {"model": "gpt-4o-mini-2024-07-18"}
+        assert chunks[0].fields["model"] == executor.execute(req)["model"]
+
+    async def test_policy_violation_before_any_text(self):
+        executor = LLMExecutorV1(client=FakeLLMClient())
+        req = ActionRequest(action="llm_generate", payload={**LLM_PAYLOAD, "model": "nope"},
+                            trace_id=str(uuid.uuid4()))
+
+        with pytest.raises(ValueError, match="POLICY_VIOLATION"):
+            await _collect(executor.astream(req))
+
+
+class SlowStreamExecutor:
+    executor_id = "test.stream"
+    version = "1.0.0"
+    capabilities = []
+    stream_field = "text"
+
+    def __init__(self, pieces=("a", "b", "c"), delay_s=0.0):
+        self.limits = ExecutorLimits(timeout_ms=1000, max_payload_bytes=10_000, max_depth=10, max_list_items=100)
+        self.pieces = pieces
+        self.delay_s = delay_s
+        self.closed = False
+
+    def execute(self, req):
+        return {"model": "m", "text": "".join(self.pieces)}
+
+    async def astream(self, req):
+        try:
+            yield OutputChunk(fields={"model": "m"})
+            for piece in self.pieces:
+                await asyncio.sleep(self.delay_s)
+                yield OutputChunk(text=piece)
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def use_executor():
+    registry = Mock()
+    registry.actions = {"test_action": {"action_version": "1.0.0", "min_executor_version": "1.0.0",
+                                        "required_capabilities": []}}
+    pool = ExecutorPool(max_workers=2)
+    audited = []
+    patches = [
+        patch("app.agentic_pipeline.get_action_registry", return_value=registry),
+        patch("app.agentic_pipeline.get_executor_pool", return_value=pool),
+        patch("app.agentic_pipeline.log_action_result", side_effect=audited.append),
+    ]
+    for p in patches:
+        p.start()
+
+    def _use(executor):
+        p = patch("app.agentic_pipeline.get_executor", return_value=executor)
+        p.start()
+        patches.append(p)
+        return audited
+
+    yield _use
+    for p in patches:
+        p.stop()
+    pool.shutdown(wait=False)
+
+
+def _tid():
+    return str(uuid.uuid4())
+
+
+class TestPipelineStream:
+    async def test_chunks_then_result(self, use_executor):
+        audited = use_executor(SlowStreamExecutor())
+
+        items = await _collect(run_agentic_action_stream("test_action", {"x": 1}, _tid()))
+
+        assert items[:-1] == ["a", "b", "c"]
+        result = items[-1]
+        assert isinstance(result, ActionResult) and result.status == "SUCCESS"
+        assert result.output_digest == sha256_json_or_none({"model": "m", "text": "abc"})
+        assert [r.status for r in audited] == ["PENDING", "SUCCESS"]
+
+    async def test_same_digest_as_async_pipeline(self, use_executor):
+        use_executor(SlowStreamExecutor())
+
+        streamed = (await _collect(run_agentic_action_stream("test_action", {"x": 1}, _tid())))[-1]
+        result, _ = await run_agentic_action_async("test_action", {"x": 1}, _tid())
+
+        assert streamed.output_digest == result.output_digest
+
+    async def test_idle_timeout(self, use_executor, monkeypatch):
+        monkeypatch.setenv("VERITTA_EXECUTOR_TIMEOUT_S", "0.05")
+        executor = SlowStreamExecutor(delay_s=1.0)
+        use_executor(executor)
+
+        items = await _collect(run_agentic_action_stream("test_action", {"x": 1}, _tid()))
+
+        assert len(items) == 1
+        assert items[0].reason_codes == ["EXECUTOR_TIMEOUT"]
+        assert executor.closed
+
+    async def test_consumer_close_audited(self, use_executor):
+        executor = SlowStreamExecutor()
+        audited = use_executor(executor)
+
+        stream = run_agentic_action_stream("test_action", {"x": 1}, _tid())
+        assert await anext(stream) == "a"
+        await stream.aclose()
+
+        assert executor.closed
+        assert audited[-1].status == "FAILED"
+        assert audited[-1].reason_codes == ["STREAM_ABORTED"]
+
+    async def test_executor_reason_codes_kept(self, use_executor):
+        class Annotating(SlowStreamExecutor):
+            async def astream(self, req):
+                yield OutputChunk(fields={"model": "m"})
+                add_execution_reason("TEST_REASON")
+                yield OutputChunk(text="abc")
+
+        use_executor(Annotating())
+
+        items = await _collect(run_agentic_action_stream("test_action", {"x": 1}, _tid()))
+
+        assert items[-1].status == "SUCCESS"
+        assert items[-1].reason_codes == ["TEST_REASON"]
+
+    async def test_non_streaming_executor_result_only(self, use_executor):
+        executor = SlowStreamExecutor()
+        executor.astream = None
+        use_executor(executor)
+
+        items = await _collect(run_agentic_action_stream("test_action", {"x": 1}, _tid()))
+
+        assert len(items) == 1 and items[0].status == "SUCCESS"
+
+
+def _events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestProcessStreamEndpoint:
+    def test_sse_events(self):
+        from app.main import app
+
+        client = TestClient(app)
+        body = {"action": "llm_generate", "payload": LLM_PAYLOAD}
+        headers = {"X-API-Key": "TEST_BETA_API_KEY_VALID_FOR_TESTING"}
+        response = client.post("/process/stream", json=body, headers=headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _events(response.text)
+        assert [e for e, _ in events[:-1]] == ["chunk"] * (len(events) - 1)
+        assert "".join(d["text"] for _, d in events[:-1]) == fake_text("hello")
+        name, result = events[-1]
+        assert name == "result" and result["status"] == "SUCCESS"
+        assert result["output_digest"] == client.post("/process", json=body, headers=headers).json()["output_digest"]
+
+    def test_gate_still_applies(self):
+        from app.main import app
+
+        response = TestClient(app).post("/process/stream", json={"action": "llm_generate", "payload": LLM_PAYLOAD})
+
+        assert response.status_code == 401
@@ -0,0 +1,103 @@
+"""
+Fingerprint de profiles memoizado por versão do catálogo.
+
+Garante:
+- Hash calculado uma vez por versão (sem custo no hot path)
+- Qualquer mutação em DEFAULT_PROFILES invalida o cache (inclusive monkeypatch)
+- Restaurar o catálogo restaura o hash original
+"""
+
+import pytest
+
+from app import gate_artifacts
+from app.gate_artifacts import profiles_fingerprint_sha256
+from app.gate_profiles import (
+    DEFAULT_PROFILES,
+    PolicyProfile,
+    register_profile,
+    unregister_profile,
+)
+
+
+TEST_ACTION = "TEST.FINGERPRINT"
+TEST_PROFILE = PolicyProfile(name="test_fingerprint.v1", allowlist=frozenset({"x"}))
+
+
+@pytest.fixture
+def count_computes(monkeypatch):
+    calls = []
+    real = gate_artifacts._compute_profiles_fingerprint
+
+    def counting():
+        calls.append(1)
+        return real()
+
+    monkeypatch.setattr(gate_artifacts, "_compute_profiles_fingerprint", counting)
+    gate_artifacts._fingerprint_cache = None
+    return calls
+
+
+def test_fingerprint_computed_once_per_version(count_computes):
+    first = profiles_fingerprint_sha256()
+    for _ in range(100):
+        assert profiles_fingerprint_sha256() == first
+
+    assert len(count_computes) == 1
+
+
+def test_cached_value_matches_fresh_computation():
+    assert profiles_fingerprint_sha256() == gate_artifacts._compute_profiles_fingerprint()
+
+
+def test_register_and_unregister_invalidate(count_computes):
+    original = profiles_fingerprint_sha256()
+    version = DEFAULT_PROFILES.version
+
+    register_profile(TEST_ACTION, TEST_PROFILE)
+    try:
+        assert DEFAULT_PROFILES.version != version
+        changed = profiles_fingerprint_sha256()
+        assert changed != original
+        assert changed == gate_artifacts._compute_profiles_fingerprint()
+    finally:
+        assert unregister_profile(TEST_ACTION) == TEST_PROFILE
+
+    assert profiles_fingerprint_sha256() == original
+    assert unregister_profile(TEST_ACTION) is None
+
+
+def test_monkeypatch_setitem_gets_correct_hash(monkeypatch):
+    original = profiles_fingerprint_sha256()
+
+    with monkeypatch.context() as m:
+        m.setitem(DEFAULT_PROFILES, "process", PolicyProfile(name="process.v2", allowlist=frozenset({"text", "lang"})))
+        patched = profiles_fingerprint_sha256()
+        assert patched != original
+        assert patched == gate_artifacts._compute_profiles_fingerprint()
+
+    assert profiles_fingerprint_sha256() == original
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda c: c.update({TEST_ACTION: TEST_PROFILE}),
+        lambda c: c.setdefault(TEST_ACTION, TEST_PROFILE),
+        lambda c: c.__ior__({TEST_ACTION: TEST_PROFILE}),
+    ],
+)
+def test_all_dict_mutations_bump_version(mutate):
+    before = DEFAULT_PROFILES.version
+    mutate(DEFAULT_PROFILES)
+    try:
+        assert DEFAULT_PROFILES.version != before
+    finally:
+        DEFAULT_PROFILES.pop(TEST_ACTION, None)
+
+
+def test_reads_do_not_bump_version():
+    before = DEFAULT_PROFILES.version
+    DEFAULT_PROFILES.get("process")
+    list(DEFAULT_PROFILES.items())
+    assert "process" in DEFAULT_PROFILES
+    assert DEFAULT_PROFILES.version == before
@@ -0,0 +1,151 @@
+"""
+Tests for O(1) sliding-window rate limiter (app.rate_limiter).
+
+Verify:
+- First window admits exactly `limit` requests (same as the old rolling log)
+- Previous window weight decays linearly; 2 idle windows == fresh key
+- Idle keys are evicted; VERITTA_RATE_LIMIT_MAX_KEYS bounds memory (LRU),
+  never by evicting a live bucket (new keys denied while the shard is full)
+- Thread-safe under contention (striped locks)
+"""
+
+import threading
+
+import pytest
+
+from app.rate_limiter import RateLimiter, WindowCounter
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _allowed(limiter, key, n, limit=10, window=60):
+    return sum(limiter.check(key, limit, window) for _ in range(n))
+
+
+class TestSlidingWindow:
+    def test_first_window_admits_exactly_limit(self, clock):
+        limiter = RateLimiter(stripes=4, clock=clock)
+
+        assert _allowed(limiter, "k", 15) == 10
+        clock.t += 59
+        assert limiter.check("k", 10, 60) is False
+
+    def test_previous_window_weight_decays(self, clock):
+        limiter = RateLimiter(stripes=4, clock=clock)
+        assert _allowed(limiter, "k", 10) == 10
+
+        # Halfway into next window: estimate = 10 * 0.5 + curr
+        clock.t += 90
+        assert _allowed(limiter, "k", 10) == 5
+
+        # Window after: prev = 5, at its start estimate = 5
+        clock.t += 30
+        assert _allowed(limiter, "k", 10) == 5
+
+    def test_two_idle_windows_reset_state(self, clock):
+        limiter = RateLimiter(stripes=4, clock=clock)
+        _allowed(limiter, "k", 10)
+
+        clock.t += 120
+        assert _allowed(limiter, "k", 15) == 10
+
+    def test_window_change_restarts_bucket(self, clock):
+        limiter = RateLimiter(stripes=4, clock=clock)
+        _allowed(limiter, "k", 10)
+
+        assert limiter.check("k", 10, 30) is True
+
+    def test_keys_are_independent(self, clock):
+        limiter = RateLimiter(stripes=1, clock=clock)
+        _allowed(limiter, "a", 10)
+
+        assert limiter.check("b", 10, 60) is True
+        assert limiter.check("a", 10, 60) is False
+
+    def test_bucket_is_slotted(self, clock):
+        assert not hasattr(WindowCounter(60, 0.0), "__dict__")
+
+
+class TestEviction:
+    def test_idle_keys_swept_on_access(self, clock):
+        limiter = RateLimiter(stripes=1, clock=clock)
+        for i in range(3):
+            limiter.check(f"session-{i}", 10, 60)
+
+        clock.t += 121
+        limiter.check("active", 10, 60)
+
+        assert limiter.key_count() == 1
+
+    def test_sweep_removes_only_idle(self, clock):
+        limiter = RateLimiter(stripes=4, clock=clock)
+        for i in range(100):
+            limiter.check(f"old-{i}", 10, 60)
+        clock.t += 200
+        limiter.check("fresh", 10, 60)
+
+        limiter.sweep()
+
+        assert limiter.key_count() == 1
+
+    def test_max_keys_bound(self, clock):
+        limiter = RateLimiter(stripes=2, max_keys=10, clock=clock)
+        for i in range(1000):
+            limiter.check(f"k-{i}", 10, 60)
+
+        assert limiter.key_count() <= 10
+
+    def test_full_shard_never_evicts_live_bucket(self, clock):
+        limiter = RateLimiter(stripes=1, max_keys=3, clock=clock)
+        assert _allowed(limiter, "victim", 5) == 5
+        limiter.check("k-1", 10, 60)
+        limiter.check("k-2", 10, 60)
+
+        # Full of live buckets: new keys denied, victim keeps its count
+        assert limiter.check("k-3", 10, 60) is False
+        assert limiter.key_count() == 3
+        assert limiter.check("victim", 5, 60) is False
+
+        clock.t += 120
+        # Idle buckets make room again
+        assert limiter.check("k-3", 10, 60) is True
+
+    def test_reset(self, clock):
+        limiter = RateLimiter(stripes=4, clock=clock)
+        _allowed(limiter, "k", 10)
+
+        limiter.reset("k")
+        assert limiter.check("k", 10, 60) is True
+
+        limiter.reset_all()
+        assert limiter.key_count() == 0
+
+
+class TestConcurrency:
+    def test_single_key_contention_admits_exactly_limit(self):
+        limiter = RateLimiter(stripes=8)
+        barrier = threading.Barrier(16)
+        allowed = []
+
+        def worker():
+            barrier.wait()
+            allowed.append(_allowed(limiter, "hot", 200, limit=1000, window=3600))
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(allowed) == 1000
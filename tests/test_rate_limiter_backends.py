@@ -0,0 +1,239 @@
+"""
+Tests for shared-state rate limiter backends (app.rate_limiter_backends).
+
+Verify:
+- VERITTA_RATE_LIMIT_BACKEND selects memory / shm / redis
+- shm and redis (fake server) give the same decisions as the in-process limiter
+- shm limit holds across processes (one table, N workers); reset_all
+  respects group locks held by other threads
+- shm full group: new keys denied, live counts never reset; idle slots reused
+- redis: one round trip per check, NOSCRIPT reload, AUTH, fail-closed
+- Benchmark runs for every backend
+"""
+
+import multiprocessing
+import threading
+
+import pytest
+
+import app.rate_limiter as rate_limiter
+from app.rate_limiter import RateLimiter, get_rate_limiter, set_rate_limiter
+from app.rate_limiter_backends import (
+    RedisRateLimiter,
+    SharedMemoryRateLimiter,
+    create_rate_limiter,
+)
+from app.tools.bench_rate_limiter import benchmark
+from app.tools.fake_redis import FakeRedisServer
+
+
+class FakeClock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+# (advance_s, key, limit, window_s)
+SCRIPT = (
+    [(0, "a", 5, 60)] * 7
+    + [(0, "b", 3, 10)] * 4
+    + [(45, "a", 5, 60)] * 3
+    + [(30, "a", 5, 60)] * 5
+    + [(200, "a", 5, 60)] * 6
+    + [(5, "b", 3, 20)] * 4
+)
+
+
+def _memory_decisions():
+    clock = FakeClock()
+    return _replay(RateLimiter(clock=clock), clock)
+
+
+def _replay(limiter, clock):
+    decisions = []
+    for advance, key, limit, window in SCRIPT:
+        clock.t += advance
+        decisions.append(limiter.check(key, limit, window))
+    return decisions
+
+
+@pytest.fixture
+def shm_path(tmp_path):
+    return str(tmp_path / "ratelimit")
+
+
+@pytest.fixture
+def fake_redis():
+    clock = FakeClock()
+    server = FakeRedisServer(clock=clock).start()
+    server.fake_clock = clock
+    yield server
+    server.stop()
+
+
+def _shm_worker(path, n, queue):
+    limiter = SharedMemoryRateLimiter(path=path)
+    queue.put(sum(limiter.check("hot", 1000, 3600) for _ in range(n)))
+    limiter.close()
+
+
+class TestBackendSelection:
+    @pytest.mark.parametrize("name,cls", [("memory", RateLimiter), ("shm", SharedMemoryRateLimiter),
+                                          ("redis", RedisRateLimiter), ("bogus", RateLimiter)])
+    def test_env_selects_backend(self, monkeypatch, shm_path, name, cls):
+        monkeypatch.setenv("VERITTA_RATE_LIMIT_BACKEND", name)
+        monkeypatch.setenv("VERITTA_RATE_LIMIT_SHM_PATH", shm_path)
+
+        assert isinstance(create_rate_limiter(), cls)
+
+    def test_global_limiter_built_from_env(self, monkeypatch, shm_path):
+        monkeypatch.setenv("VERITTA_RATE_LIMIT_BACKEND", "shm")
+        monkeypatch.setenv("VERITTA_RATE_LIMIT_SHM_PATH", shm_path)
+        previous = rate_limiter._rate_limiter
+        set_rate_limiter(None)
+        try:
+            assert isinstance(get_rate_limiter(), SharedMemoryRateLimiter)
+        finally:
+            set_rate_limiter(previous)
+
+
+class TestSharedMemory:
+    def test_same_decisions_as_memory(self, shm_path):
+        expected = _memory_decisions()
+        clock = FakeClock()
+
+        assert _replay(SharedMemoryRateLimiter(path=shm_path, clock=clock), clock) == expected
+
+    def test_state_shared_between_instances(self, shm_path):
+        first = SharedMemoryRateLimiter(path=shm_path, slots=64)
+        second = SharedMemoryRateLimiter(path=shm_path, slots=4096)
+
+        assert second.slots == 64  # Table geometry comes from the existing file
+        assert sum(first.check("k", 3, 60) for _ in range(2)) == 2
+        assert [second.check("k", 3, 60) for _ in range(2)] == [True, False]
+
+    def test_limit_holds_across_processes(self, shm_path):
+        SharedMemoryRateLimiter(path=shm_path).reset_all()
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        procs = [ctx.Process(target=_shm_worker, args=(shm_path, 400, queue)) for _ in range(4)]
+        for p in procs:
+            p.start()
+        totals = [queue.get(timeout=60) for _ in procs]
+        for p in procs:
+            p.join(timeout=60)
+
+        assert sum(totals) == 1000
+
+    def test_full_group_denies_new_key(self, shm_path):
+        clock = FakeClock()
+        limiter = SharedMemoryRateLimiter(path=shm_path, slots=8, clock=clock)  # one group
+        for i in range(8):
+            clock.t += 1
+            assert limiter.check(f"k-{i}", 3, 60) is True
+        before = rate_limiter.rate_limit_table_full_total.labels(backend="shm")._value.get()
+
+        assert limiter.check("k-8", 3, 60) is False
+        assert limiter.key_count() == 8
+        assert rate_limiter.rate_limit_table_full_total.labels(backend="shm")._value.get() == before + 1
+        # Existing counts unchanged: each live key has 2 hits left, then denied
+        for i in range(8):
+            assert [limiter.check(f"k-{i}", 3, 60) for _ in range(3)] == [True, True, False]
+
+    def test_full_group_reuses_idle_slot(self, shm_path):
+        clock = FakeClock()
+        limiter = SharedMemoryRateLimiter(path=shm_path, slots=8, clock=clock)
+        for i in range(8):
+            limiter.check(f"k-{i}", 1, 60)
+        clock.t += 120  # every key idle (2 windows)
+
+        assert limiter.check("k-8", 1, 60) is True
+        assert limiter.key_count() == 8
+
+    def test_reset(self, shm_path):
+        limiter = SharedMemoryRateLimiter(path=shm_path)
+        limiter.check("k", 1, 60)
+
+        limiter.reset("k")
+        assert limiter.check("k", 1, 60) is True
+        limiter.reset_all()
+        assert limiter.key_count() == 0
+
+    def test_reset_all_waits_for_held_group_lock(self, shm_path):
+        limiter = SharedMemoryRateLimiter(path=shm_path, slots=64)
+        limiter.check("k", 5, 60)
+        done = threading.Event()
+        worker = threading.Thread(target=lambda: (limiter.reset_all(), done.set()))
+
+        with limiter._locked_group(0):
+            worker.start()
+            # Same-process fcntl locks never block: only the group lock protects the check
+            assert not done.wait(0.2)
+        worker.join(timeout=5)
+
+        assert done.is_set() and limiter.key_count() == 0
+
+
+class TestRedis:
+    def test_same_decisions_as_memory(self, fake_redis):
+        expected = _memory_decisions()
+
+        assert _replay(RedisRateLimiter(url=fake_redis.url), fake_redis.fake_clock) == expected
+
+    def test_one_command_per_check(self, fake_redis):
+        limiter = RedisRateLimiter(url=fake_redis.url)
+        limiter.check("k", 10, 60)
+        before = fake_redis.commands
+
+        for _ in range(5):
+            limiter.check("k", 10, 60)
+
+        assert fake_redis.commands - before == 5
+
+    def test_noscript_falls_back_to_eval(self, fake_redis):
+        fake_redis.scripts.clear()
+        limiter = RedisRateLimiter(url=fake_redis.url)
+
+        assert [limiter.check("k", 1, 60) for _ in range(2)] == [True, False]
+
+    def test_auth(self):
+        server = FakeRedisServer(password="s3cret").start()
+        try:
+            assert RedisRateLimiter(url=server.url).check("k", 1, 60) is True
+            no_auth = server.url.replace(":s3cret@", "")
+            assert RedisRateLimiter(url=no_auth).check("k", 1, 60) is False
+        finally:
+            server.stop()
+
+    def test_fail_closed_when_unreachable(self, fake_redis):
+        url = fake_redis.url
+        fake_redis.stop()
+
+        assert RedisRateLimiter(url=url, timeout_s=0.2).check("k", 100, 60) is False
+
+    def test_idle_keys_expire(self, fake_redis):
+        limiter = RedisRateLimiter(url=fake_redis.url)
+        limiter.check("k", 1, 60)
+
+        fake_redis.fake_clock.t += 121
+        assert limiter.check("k", 1, 60) is True
+
+    def test_reset(self, fake_redis):
+        limiter = RedisRateLimiter(url=fake_redis.url)
+        limiter.check("a", 1, 60)
+        limiter.check("b", 1, 60)
+
+        limiter.reset("a")
+        assert limiter.check("a", 1, 60) is True
+        limiter.reset_all()
+        assert limiter.check("b", 1, 60) is True
+
+
+class TestBenchmark:
+    def test_runs_every_backend(self):
+        results = benchmark(["memory", "shm", "redis"], checks=2000, keys=10, threads=2)
+
+        assert set(results) == {"memory", "shm", "redis"}
+        assert all(rate > 0 for rate in results.values())
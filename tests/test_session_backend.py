@@ -0,0 +1,328 @@
+"""
+Tests for the tiered session backend (app.session_backend).
+
+Verify:
+- Two workers (two backends over one SQL database + one L2 file): a session
+  created on one is visible on the other
+- Reads: L1 hit and L2 hit do not touch SQL; L1 never outlives expires_at
+- Revocation: write-through on the revoking worker, other worker denies
+  within the L1 TTL; admin revoke refreshes the tiers; with a revocation
+  channel the other worker's tiers are marked at once, without one the
+  L2 TTL is capped at the L1 TTL; a read in flight during mark_revoked
+  never fills L1/L2 as valid (tombstone)
+- touch(): updated_at written in one batched UPDATE, by the flusher thread
+- F2.3 chain validates against the configured backend, off the event loop
+- memory backend keeps the SessionStore behaviour
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session_cache import SessionCache, UnixSocketRevocationChannel
+from app.f23_bindings import get_bindings
+from app.main import app
+from app.models.session import SessionModel
+from app.rate_limiter import get_rate_limiter
+from app.session_backend import (
+    MemorySessionBackend,
+    TieredSessionBackend,
+    get_session_backend,
+    new_session_id,
+    set_session_backend,
+)
+from app.session_store import SessionStore, seed_session, sha256_str
+
+API_KEY = "sk_test_f23"
+KEY_HASH = sha256_str(API_KEY)
+USER = "u_user0001"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime.now(timezone.utc).timestamp()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def sql(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}", connect_args={"check_same_thread": False})
+    SessionModel.metadata.create_all(bind=engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement.split()[0].upper(), executemany))
+
+    factory = sessionmaker(bind=engine)
+    factory.statements = statements
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def workers(sql, tmp_path):
+    clock = FakeClock()
+    backends = [
+        TieredSessionBackend(sql, l2_path=str(tmp_path / "l2.db"), l1_ttl_s=5, touch_flush_s=60, clock=clock)
+        for _ in range(2)
+    ]
+    yield backends[0], backends[1], clock
+    for b in backends:
+        b.close()
+
+
+def _selects(sql):
+    return sum(1 for verb, _ in sql.statements if verb == "SELECT")
+
+
+class TestTiers:
+    def test_created_on_one_worker_visible_on_other(self, workers, sql):
+        a, b, _ = workers
+        session_id, _ = a.create(USER, KEY_HASH)
+
+        record = b.get(session_id)
+
+        assert record is not None and record.user_id == USER and record.is_valid()
+
+    def test_l1_and_l2_hits_skip_sql(self, workers, sql):
+        a, b, _ = workers
+        session_id, _ = a.create(USER, KEY_HASH)
+        sql.statements.clear()
+
+        a.get(session_id)  # L1
+        b.get(session_id)  # L2 (write-through by a)
+        b.get(session_id)  # L1
+
+        assert _selects(sql) == 0
+
+    def test_sql_is_source_of_truth(self, sql, tmp_path):
+        a = TieredSessionBackend(sql, touch_flush_s=60)
+        session_id, _ = a.create(USER, KEY_HASH)
+        a.close()
+        fresh = TieredSessionBackend(sql, touch_flush_s=60)
+
+        assert fresh.get(session_id).api_key_sha256 == KEY_HASH
+        assert fresh.get("sess_missing0000000") is None
+        fresh.close()
+
+    def test_l1_capped_at_expires_at(self, workers, sql):
+        a, _, clock = workers
+        session_id, _ = a.create(USER, KEY_HASH, ttl_s=2)
+        sql.statements.clear()
+
+        clock.now += 3
+        a.get(session_id)
+
+        # L1 and L2 entries ended at expires_at: SQL decides
+        assert _selects(sql) == 1
+
+    def test_unusable_l2_degrades_to_sql(self, sql, tmp_path):
+        backend = TieredSessionBackend(sql, l2_path=str(tmp_path / "missing" / "l2.db"), touch_flush_s=60)
+
+        session_id, _ = backend.create(USER, KEY_HASH)
+
+        assert not backend.l2_enabled
+        assert backend.get(session_id) is not None
+        backend.close()
+
+
+class TestRevocation:
+    def test_revoke_write_through(self, workers):
+        a, b, clock = workers
+        session_id, _ = a.create(USER, KEY_HASH)
+        assert b.get(session_id).is_valid()
+
+        a.revoke(session_id)
+
+        assert a.get(session_id).revoked
+        clock.now += 6  # b's L1 entry expires, L2 has the revocation
+        assert b.get(session_id).revoked
+
+    def test_mark_revoked_refreshes_tiers(self, workers, sql):
+        a, _, _ = workers
+        session_id, _ = a.create(USER, KEY_HASH)
+        db = sql()
+        db.query(SessionModel).filter_by(session_id=session_id).update(
+            {"revoked_at": datetime.now(timezone.utc).replace(tzinfo=None)}
+        )
+        db.commit()
+        db.close()
+
+        a.mark_revoked(session_id)
+
+        assert a.get(session_id).revoked
+
+    def test_read_in_flight_during_revoke_stays_revoked(self, workers, sql, monkeypatch):
+        a, b, clock = workers
+        session_id, _ = a.create(USER, KEY_HASH)
+        a.clear_all()  # L1 and L2 empty: next read goes to SQL
+        sql_get = a._sql_get
+
+        def stale_read(sid):
+            record = sql_get(sid)  # still valid in SQL
+            a.mark_revoked(sid)  # another worker revokes meanwhile (channel)
+            return record
+
+        monkeypatch.setattr(a, "_sql_get", stale_read)
+
+        assert a.get(session_id).revoked
+        monkeypatch.setattr(a, "_sql_get", sql_get)
+        assert a.get(session_id).revoked  # L1
+        assert b.get(session_id).revoked  # L2 written as revoked
+
+    def test_channel_revocation_reaches_other_worker(self, sql, tmp_path):
+        caches = [SessionCache(ttl_s=30, channel=UnixSocketRevocationChannel(str(tmp_path / "revoke")))
+                  for _ in range(2)]
+        a, b = [TieredSessionBackend(sql, l2_path=str(tmp_path / "l2.db"), l1_ttl_s=30, l2_ttl_s=60,
+                                     touch_flush_s=60, revocations=cache) for cache in caches]
+        try:
+            session_id, _ = a.create(USER, KEY_HASH)
+            assert b.get(session_id).is_valid()
+
+            a.revoke(session_id)
+
+            deadline = time.monotonic() + 2.0
+            while b.get(session_id).is_valid() and time.monotonic() < deadline:
+                time.sleep(0.005)
+            # Well within b's L1 TTL: the channel marked b's tiers
+            assert b.get(session_id).revoked
+        finally:
+            for backend in (a, b):
+                backend.close()
+            for cache in caches:
+                cache.close()
+
+    def test_l2_ttl_capped_without_channel(self, sql, tmp_path):
+        backend = TieredSessionBackend(sql, l2_path=str(tmp_path / "l2.db"), l1_ttl_s=5, l2_ttl_s=60,
+                                       touch_flush_s=60, revocations=SessionCache())
+
+        assert backend._l2.ttl_s == 5
+        backend.close()
+
+
+class TestTouch:
+    def test_batched_updated_at(self, workers, sql):
+        a, _, _ = workers
+        ids = [a.create(USER, KEY_HASH)[0] for _ in range(20)]
+        old = datetime(2000, 1, 1)
+        db = sql()
+        db.query(SessionModel).update({"updated_at": old})
+        db.commit()
+        sql.statements.clear()
+
+        for session_id in ids:
+            a.touch(session_id)
+            a.touch(session_id)
+        assert a.flush() == 20
+
+        updates = [s for s in sql.statements if s[0] == "UPDATE"]
+        assert updates == [("UPDATE", True)]
+        db.expire_all()
+        assert all(row.updated_at > old for row in db.query(SessionModel).all())
+        db.close()
+
+    def test_batch_size_wakes_flusher(self, sql):
+        backend = TieredSessionBackend(sql, touch_flush_s=60, touch_batch=3)
+        ids = [backend.create(USER, KEY_HASH)[0] for _ in range(3)]
+        sql.statements.clear()
+
+        for session_id in ids[:2]:
+            backend.touch(session_id)
+        backend.touch(ids[2])
+        # touch() itself never writes; the flusher thread does
+        deadline = time.monotonic() + 2.0
+        while ("UPDATE", True) not in sql.statements and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+        assert ("UPDATE", True) in sql.statements
+        assert backend.flush() == 0
+        backend.close()
+
+
+class TestMemoryBackend:
+    def test_wraps_session_store(self):
+        store = SessionStore()
+        backend = MemorySessionBackend(store)
+
+        session_id, _ = backend.create(USER, KEY_HASH, ttl_s=60)
+        backend.revoke(session_id)
+
+        assert store.get(session_id).revoked
+
+    def test_session_id_format(self):
+        assert len(new_session_id()) == 21 and new_session_id().startswith("sess_")
+
+
+class TestF23Chain:
+    @pytest.fixture
+    def tiered(self, workers, monkeypatch):
+        a, b, _ = workers
+        monkeypatch.setenv("VERITTA_BETA_API_KEY", API_KEY)
+        get_rate_limiter().reset_all()
+        bindings = get_bindings()
+        bindings.clear_all()
+        bindings.add_binding(KEY_HASH, USER)
+        set_session_backend(b)
+        yield a, b
+        set_session_backend(None)
+
+    def _process(self, session_id):
+        return TestClient(app).post(
+            "/process",
+            json={"text": "hello"},
+            headers={
+                "Authorization": f"Bearer {API_KEY}",
+                "X-VERITTA-USER-ID": USER,
+                "X-VERITTA-SESSION-ID": session_id,
+            },
+        )
+
+    def test_session_from_other_worker_accepted(self, tiered):
+        a, _ = tiered
+        session_id, _ = a.create(USER, KEY_HASH)
+
+        assert self._process(session_id).status_code not in (401, 403)
+
+    def test_backend_read_off_event_loop(self, tiered, monkeypatch):
+        a, b = tiered
+        session_id, _ = a.create(USER, KEY_HASH)
+        threads = []
+        get = b.get
+
+        def recording_get(sid):
+            threads.append(threading.current_thread())
+            return get(sid)
+
+        monkeypatch.setattr(b, "get", recording_get)
+
+        assert self._process(session_id).status_code not in (401, 403)
+        # TestClient runs the app's event loop in its portal thread
+        assert threads and all(t.name.startswith("asyncio_") for t in threads)
+
+    def test_seed_session_goes_through_backend(self, tiered, sql):
+        _, b = tiered
+        seed_session("sess_0123456789abcdef", USER, API_KEY,
+                     expires_at=datetime.now(timezone.utc) + timedelta(hours=1))
+
+        assert get_session_backend() is b
+        db = sql()
+        assert db.get(SessionModel, "sess_0123456789abcdef") is not None
+        db.close()
+
+    def test_revoked_session_denied(self, tiered):
+        a, b = tiered
+        session_id, _ = a.create(USER, KEY_HASH)
+        b.revoke(session_id)
+
+        response = self._process(session_id)
+
+        assert response.status_code == 401
+        assert response.json()["reason_codes"] == ["G5_session_expired"]
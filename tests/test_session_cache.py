@@ -0,0 +1,267 @@
+"""
+Tests for the read-through session validation cache (app.db.session_cache).
+
+Verify:
+- SessionCache: TTL capped at expires_at, negative cache, LRU bound
+- SessionRepository: repeated validation reads SQL once (negative ids too)
+- Revocation: denied locally at once (no SQL), fanned out over the UDS
+  channel to another worker's cache, propagation delay measured; a SQL
+  read interleaved with a revoke never re-validates the session
+- /admin/sessions/revoke invalidates the process-wide cache
+"""
+
+import hashlib
+import socket
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.async_database import ThreadedAsyncSession, get_async_db
+from app.db.session_cache import (
+    SessionCache,
+    SessionRecord,
+    UnixSocketRevocationChannel,
+    _libpq_dsn,
+    get_session_cache,
+    set_session_cache,
+)
+from app.db.session_repository import SessionRepository
+from app.main import app
+from app.models.session import SessionModel
+
+API_KEY_HASH = hashlib.sha256(b"key").hexdigest()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SessionModel.metadata.create_all(bind=engine)
+    selects = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    session = sessionmaker(bind=engine)()
+    session.selects = selects
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _record(expires_in=3600.0, revoked=False, now=None):
+    return SessionRecord("u_abc12345", API_KEY_HASH, (now or time.time()) + expires_in, revoked)
+
+
+class TestSessionCache:
+    def test_hit_and_miss(self):
+        cache = SessionCache(ttl_s=30)
+
+        assert cache.get("s1") == (False, None)
+        cache.put("s1", _record())
+        found, record = cache.get("s1")
+
+        assert found and record.user_id == "u_abc12345"
+
+    def test_ttl_capped_at_expires_at(self):
+        clock = FakeClock()
+        cache = SessionCache(ttl_s=30, clock=clock)
+        cache.put("s1", _record(expires_in=5, now=clock.now))
+
+        clock.now += 6
+
+        assert cache.get("s1") == (False, None)
+
+    def test_expired_record_not_cached(self):
+        cache = SessionCache(ttl_s=30)
+        cache.put("s1", _record(expires_in=-1))
+
+        assert len(cache) == 0
+
+    def test_negative_cache(self):
+        clock = FakeClock()
+        cache = SessionCache(ttl_s=30, negative_ttl_s=5, clock=clock)
+        cache.put("unknown", None)
+
+        assert cache.get("unknown") == (True, None)
+        clock.now += 6
+        assert cache.get("unknown") == (False, None)
+
+    def test_lru_bound(self):
+        cache = SessionCache(max_entries=2, ttl_s=30)
+        cache.put("a", _record())
+        cache.put("b", _record())
+        cache.get("a")
+        cache.put("c", _record())
+
+        assert cache.get("b") == (False, None)
+        assert cache.get("a")[0]
+
+    def test_record_is_slotted(self):
+        with pytest.raises(AttributeError):
+            _record().extra = 1
+
+
+class TestReadThrough:
+    def test_validate_reads_sql_once(self, db):
+        repo = SessionRepository(db, cache=SessionCache(ttl_s=30))
+        session_id = repo.create(user_id="u_abc12345", api_key_hash=API_KEY_HASH).session_id
+        db.selects.clear()
+
+        for _ in range(5):
+            assert repo.validate(session_id) == (True, None)
+
+        assert db.selects == []
+
+    def test_unknown_id_negative_cached(self, db):
+        repo = SessionRepository(db, cache=SessionCache(ttl_s=30))
+
+        for _ in range(5):
+            assert repo.validate("00000000-0000-0000-0000-000000000000") == (False, "SESSION_INVALID")
+
+        assert len(db.selects) == 1
+
+    def test_uncached_repository_reads_sql(self, db):
+        repo = SessionRepository(db)
+        session_id = repo.create(user_id="u_abc12345", api_key_hash=API_KEY_HASH).session_id
+        db.selects.clear()
+
+        repo.validate(session_id)
+        repo.validate(session_id)
+
+        assert len(db.selects) == 2
+
+
+class TestRevocation:
+    def test_local_revoke_denies_without_sql(self, db):
+        repo = SessionRepository(db, cache=SessionCache(ttl_s=30))
+        session_id = repo.create(user_id="u_abc12345", api_key_hash=API_KEY_HASH).session_id
+        repo.validate(session_id)
+
+        repo.revoke(session_id)
+        db.selects.clear()
+
+        assert repo.validate(session_id) == (False, "SESSION_REVOKED")
+        assert db.selects == []
+
+    def test_stale_read_after_revoke_stays_revoked(self):
+        # Validator read SQL (not revoked), then the revoke lands, then the
+        # validator caches what it read
+        cache = SessionCache(ttl_s=30)
+        stale = _record()
+        cache.put("sid", _record())
+
+        cache.revoke("sid", time.time())
+        cache.put("sid", stale)
+
+        assert cache.get("sid")[1].revoked
+
+    def test_revoke_uncached_leaves_tombstone(self, db):
+        cache = SessionCache(ttl_s=30)
+        repo = SessionRepository(db, cache=cache)
+        session_id = repo.create(user_id="u_abc12345", api_key_hash=API_KEY_HASH).session_id
+        cache.clear()
+        stale = SessionRecord.from_model(repo.get_by_id(session_id))
+
+        repo.revoke(session_id)
+        cache.put(session_id, stale)
+        cache.put("gone", None)  # unrelated ids still negative-cached
+
+        assert repo.validate(session_id) == (False, "SESSION_REVOKED")
+        assert cache.get("gone") == (True, None)
+
+    def test_stale_negative_read_ignored_after_revoke(self):
+        cache = SessionCache(ttl_s=30)
+
+        cache.revoke("sid", time.time())
+        cache.put("sid", None)
+
+        assert cache.get("sid") == (False, None)
+
+    def test_uds_fan_out(self, db, tmp_path):
+        def propagated():
+            return REGISTRY.get_sample_value(
+                "session_revocation_propagation_seconds_count", {"channel": "uds"}
+            ) or 0
+
+        worker_a = SessionCache(ttl_s=30, channel=UnixSocketRevocationChannel(str(tmp_path)))
+        worker_b = SessionCache(ttl_s=30, channel=UnixSocketRevocationChannel(str(tmp_path)))
+        try:
+            session_id = SessionRepository(db, cache=worker_a).create(
+                user_id="u_abc12345", api_key_hash=API_KEY_HASH
+            ).session_id
+            repo_b = SessionRepository(db, cache=worker_b)
+            assert repo_b.validate(session_id) == (True, None)
+            before = propagated()
+
+            SessionRepository(db, cache=worker_a).revoke(session_id)
+
+            deadline = time.monotonic() + 2.0
+            while repo_b.validate(session_id)[0] and time.monotonic() < deadline:
+                time.sleep(0.005)
+            assert repo_b.validate(session_id) == (False, "SESSION_REVOKED")
+            assert propagated() == before + 1
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_stale_socket_removed(self, tmp_path):
+        stale = tmp_path / "gone.sock"
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        s.bind(str(stale))
+        s.close()
+        channel = UnixSocketRevocationChannel(str(tmp_path))
+
+        channel.publish("sid", time.time())
+
+        assert not stale.exists()
+
+    def test_postgres_dsn_from_sqlalchemy_url(self):
+        dsn = _libpq_dsn("postgresql+psycopg2://user:pw@db:5432/techno_os")
+
+        assert dsn == "postgresql://user:pw@db:5432/techno_os"
+
+
+class TestAdminRevoke:
+    def test_revoke_endpoint_updates_cache(self, db, monkeypatch):
+        monkeypatch.setenv("VERITTA_ADMIN_API_KEY", "test-admin-secret-key")
+        set_session_cache(SessionCache(ttl_s=30))
+        app.dependency_overrides[get_async_db] = lambda: ThreadedAsyncSession(db)
+        try:
+            repo = SessionRepository(db, cache=get_session_cache())
+            session_id = repo.create(user_id="u_abc12345", api_key_hash=API_KEY_HASH).session_id
+            assert repo.validate(session_id) == (True, None)
+
+            response = TestClient(app).post(
+                "/admin/sessions/revoke",
+                json={"session_id": session_id},
+                headers={"X-ADMIN-KEY": "test-admin-secret-key"},
+            )
+
+            assert response.status_code == 200
+            db.selects.clear()
+            assert repo.validate(session_id) == (False, "SESSION_REVOKED")
+            assert db.selects == []
+        finally:
+            app.dependency_overrides.clear()
+            set_session_cache(None)
@@ -0,0 +1,240 @@
+"""
+Tests for the session expiry sweeper (app.session_sweeper).
+
+Verify:
+- delete_expired_batch removes at most `limit` expired rows, earliest first
+- revoked and live sessions are kept
+- cleanup_expired(batch_size) loops until done
+- sweep_sql runs several batches and records metrics; errors are counted
+- SessionStore.sweep_expired: heap order, stale entries, limit
+- tiered backend drops stale L1/L2 entries
+- sweeper task starts and stops on the running loop
+"""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session_repository import SessionRepository
+from app.models.session import SessionModel
+from app.session_backend import MemorySessionBackend, TieredSessionBackend
+from app.session_store import SessionRecord, SessionStore
+from app.session_sweeper import (
+    SessionSweeper,
+    session_sweep_rows_removed_total,
+    session_sweep_runs_total,
+    start_session_sweeper,
+    stop_session_sweeper,
+)
+
+
+def _naive_now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def sql(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}", connect_args={"check_same_thread": False})
+    SessionModel.metadata.create_all(bind=engine)
+    deletes = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("DELETE"):
+            deletes.append(statement)
+
+    factory = sessionmaker(bind=engine)
+    factory.deletes = deletes
+    yield factory
+    engine.dispose()
+
+
+def _seed(factory, expired=0, live=0, revoked=0):
+    now = _naive_now()
+    db = factory()
+    n = 0
+    for count, delta, revoked_at in (
+        (expired, timedelta(hours=-1), None),
+        (live, timedelta(hours=1), None),
+        (revoked, timedelta(hours=-1), now),
+    ):
+        for _ in range(count):
+            db.add(SessionModel(
+                session_id=f"s-{n:08d}",
+                user_id="u1",
+                api_key_hash="h" * 64,
+                created_at=now - timedelta(hours=2),
+                expires_at=now + delta - timedelta(seconds=n),
+                revoked_at=revoked_at,
+                updated_at=now,
+            ))
+            n += 1
+    db.commit()
+    db.close()
+
+
+def _count(factory):
+    db = factory()
+    try:
+        return db.query(SessionModel).count()
+    finally:
+        db.close()
+
+
+def _value(counter, **labels):
+    return counter.labels(**labels)._value.get()
+
+
+class TestBatchedDelete:
+    def test_batch_bounded_by_limit(self, sql):
+        _seed(sql, expired=25, live=5)
+        db = sql()
+
+        assert SessionRepository(db).delete_expired_batch(10) == 10
+        assert _count(sql) == 20
+        db.close()
+
+    def test_revoked_and_live_kept(self, sql):
+        _seed(sql, expired=3, live=4, revoked=2)
+        db = sql()
+
+        assert SessionRepository(db).delete_expired_batch(100) == 3
+        assert _count(sql) == 6
+        db.close()
+
+    def test_cleanup_expired_loops_batches(self, sql):
+        _seed(sql, expired=25, live=1)
+        db = sql()
+        sql.deletes.clear()
+
+        assert SessionRepository(db).cleanup_expired(batch_size=10) == 25
+        assert len(sql.deletes) == 3
+        db.close()
+
+    def test_cleanup_expired_unbatched_default(self, sql):
+        _seed(sql, expired=4, live=1)
+        db = sql()
+
+        assert SessionRepository(db).cleanup_expired() == 4
+        db.close()
+
+
+class TestSweeper:
+    async def test_sweep_sql_multiple_batches(self, sql):
+        _seed(sql, expired=25, live=2)
+        sweeper = SessionSweeper(sql, backend=MemorySessionBackend(SessionStore()), batch_size=10, pause_s=0)
+        removed_before = _value(session_sweep_rows_removed_total, store="sql")
+        ok_before = _value(session_sweep_runs_total, store="sql", result="ok")
+        sql.deletes.clear()
+
+        assert await sweeper.sweep_once() == 25
+
+        assert len(sql.deletes) == 3
+        assert _count(sql) == 2
+        assert _value(session_sweep_rows_removed_total, store="sql") - removed_before == 25
+        assert _value(session_sweep_runs_total, store="sql", result="ok") - ok_before == 1
+
+    async def test_max_batches_caps_run(self, sql):
+        _seed(sql, expired=25)
+        sweeper = SessionSweeper(sql, backend=MemorySessionBackend(SessionStore()),
+                                 batch_size=5, pause_s=0, max_batches=2)
+
+        assert await sweeper.sweep_sql() == 10
+        assert _count(sql) == 15
+
+    async def test_error_counted_not_raised(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")  # no sessions table
+        sweeper = SessionSweeper(sessionmaker(bind=engine), backend=MemorySessionBackend(SessionStore()))
+        errors_before = _value(session_sweep_runs_total, store="sql", result="error")
+
+        assert await sweeper.sweep_sql() == 0
+        assert _value(session_sweep_runs_total, store="sql", result="error") - errors_before == 1
+        engine.dispose()
+
+    async def test_start_stop(self, sql, monkeypatch):
+        monkeypatch.setenv("VERITTA_SESSION_SWEEP_INTERVAL_S", "0.01")
+        _seed(sql, expired=3)
+        sweeper = SessionSweeper(sql, backend=MemorySessionBackend(SessionStore()), pause_s=0)
+
+        sweeper.start()
+        for _ in range(100):
+            if _count(sql) == 0:
+                break
+            await asyncio.sleep(0.01)
+        await sweeper.stop()
+
+        assert _count(sql) == 0
+        assert sweeper._task is None
+
+    async def test_memory_sweep_off_the_loop(self, sql):
+        store = SessionStore()
+        now = datetime.now(timezone.utc)
+        store.put("old", SessionRecord(user_id="u1", api_key_sha256="h", created_at=now,
+                                       expires_at=now - timedelta(minutes=1)))
+        backend = MemorySessionBackend(store)
+        threads = []
+        original = backend.sweep_expired
+
+        def sweep(limit):
+            threads.append(threading.current_thread())
+            return original(limit=limit)
+
+        backend.sweep_expired = sweep
+        sweeper = SessionSweeper(sql, backend=backend)
+
+        assert await sweeper.sweep_memory() == 1
+        assert threads and threading.main_thread() not in threads
+
+    async def test_disabled_by_env(self, monkeypatch):
+        monkeypatch.setenv("VERITTA_SESSION_SWEEPER", "off")
+
+        assert start_session_sweeper() is None
+        await stop_session_sweeper()
+
+
+class TestMemorySweep:
+    def _record(self, expires_at):
+        now = datetime.now(timezone.utc)
+        return SessionRecord(user_id="u1", api_key_sha256="h", created_at=now, expires_at=expires_at)
+
+    def test_removes_expired_earliest_first(self):
+        store = SessionStore()
+        now = datetime.now(timezone.utc)
+        for i in range(5):
+            store.put(f"old{i}", self._record(now - timedelta(minutes=5 - i)))
+        store.put("live", self._record(now + timedelta(hours=1)))
+
+        assert store.sweep_expired(limit=2) == 2
+        assert store.get("old0") is None and store.get("old1") is None
+        assert store.get("old2") is not None
+        assert store.sweep_expired() == 3
+        assert store.get("live") is not None
+
+    def test_stale_heap_entries_skipped(self):
+        store = SessionStore()
+        now = datetime.now(timezone.utc)
+        store.put("renewed", self._record(now - timedelta(minutes=1)))
+        store.put("renewed", self._record(now + timedelta(hours=1)))
+        store.put("gone", self._record(now - timedelta(minutes=1)))
+        store.delete("gone")
+
+        assert store.sweep_expired() == 0
+        assert store.get("renewed") is not None
+
+    def test_tiered_backend_drops_stale_tiers(self, sql, tmp_path):
+        clock_now = [datetime.now(timezone.utc).timestamp()]
+        backend = TieredSessionBackend(sql, l2_path=str(tmp_path / "l2.db"), l1_ttl_s=5,
+                                       touch_flush_s=60, clock=lambda: clock_now[0])
+        backend.create("u1", "h" * 64, ttl_s=2)
+        backend.create("u1", "h" * 64, ttl_s=3600)
+
+        clock_now[0] += 10
+        # both L1 entries (l1_ttl_s=5) + both L2 rows (no revocation channel:
+        # L2 TTL capped at the L1 TTL)
+        assert backend.sweep_expired() == 4
+        assert backend.sweep_expired() == 0
+        backend.close()